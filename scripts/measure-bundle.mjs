@@ -0,0 +1,132 @@
+// First-load cost of a production build: the JS and CSS index.html pulls in
+// before the app can run, raw and gzipped, and optionally time-to-interactive
+// measured in headless Chromium against `vite preview`.
+//
+//   npm run build && npm run measure -- --save before.json
+//   (change things, rebuild)
+//   npm run build && npm run measure -- --compare before.json
+//
+// Add --tti to also load the page and time it (needs Playwright's Chromium).
+//
+// To get the baseline for a change already committed, build its parent in a
+// separate worktree and save from there:
+//
+//   git worktree add ../before <commit>^ && cd ../before
+//   npm ci && npm run build && node <repo>/scripts/measure-bundle.mjs --tti --save before.json
+//
+// then compare from the main tree with --tti --compare ../before/before.json.
+// Time to interactive varies with the machine, so take both numbers on the same one.
+import { spawn } from 'node:child_process'
+import { readFileSync, readdirSync, writeFileSync } from 'node:fs'
+import { join } from 'node:path'
+import { gzipSync } from 'node:zlib'
+
+const DIST = 'dist'
+const PREVIEW_PORT = 4173
+// A page is interactive once no long task has run for this long
+const QUIET_WINDOW_MS = 5000
+const TTI_RUNS = 3
+
+const args = process.argv.slice(2)
+const option = name => {
+  const index = args.indexOf(name)
+  return index === -1 ? undefined : args[index + 1]
+}
+
+function fileSize(path) {
+  const bytes = readFileSync(join(DIST, path))
+  return { raw: bytes.length, gzip: gzipSync(bytes).length }
+}
+
+/** Files index.html loads up front: the entry script, its modulepreloads and stylesheets */
+function firstLoadFiles() {
+  const html = readFileSync(join(DIST, 'index.html'), 'utf8')
+  const files = new Set()
+  for (const [, src] of html.matchAll(/<script[^>]+type="module"[^>]+src="\/?([^"]+)"/g)) files.add(src)
+  for (const [, href] of html.matchAll(/<link[^>]+rel="(?:modulepreload|stylesheet)"[^>]+href="\/?([^"]+)"/g)) files.add(href)
+  return [...files]
+}
+
+function measureSizes() {
+  const first = firstLoadFiles()
+  const total = (files, ext) =>
+    files.filter(file => file.endsWith(ext)).reduce((sum, file) => {
+      const size = fileSize(file)
+      return { raw: sum.raw + size.raw, gzip: sum.gzip + size.gzip }
+    }, { raw: 0, gzip: 0 })
+  const assets = readdirSync(join(DIST, 'assets')).map(file => `assets/${file}`)
+  return {
+    firstLoadJs: total(first, '.js'),
+    firstLoadCss: total(first, '.css'),
+    allJs: total(assets, '.js'),
+    firstLoadFiles: first,
+    lazyChunks: assets.filter(file => file.endsWith('.js') && !first.includes(file)).length,
+  }
+}
+
+async function measureTti() {
+  const { chromium } = await import('playwright')
+  const preview = spawn('npx', ['vite', 'preview', '--port', String(PREVIEW_PORT), '--strictPort'], { stdio: 'ignore', shell: true })
+  const url = `http://localhost:${PREVIEW_PORT}/`
+  try {
+    for (let attempt = 0; ; attempt++) {
+      try {
+        await fetch(url)
+        break
+      } catch (error) {
+        if (attempt > 50) throw error
+        await new Promise(resolve => setTimeout(resolve, 200))
+      }
+    }
+    const browser = await chromium.launch()
+    const runs = []
+    for (let run = 0; run < TTI_RUNS; run++) {
+      const page = await browser.newPage()
+      await page.addInitScript(() => {
+        window.__longTasks = []
+        new PerformanceObserver(list => {
+          for (const entry of list.getEntries()) window.__longTasks.push(entry.startTime + entry.duration)
+        }).observe({ type: 'longtask', buffered: true })
+      })
+      await page.goto(url, { waitUntil: 'networkidle' })
+      await page.waitForTimeout(QUIET_WINDOW_MS)
+      runs.push(
+        await page.evaluate(() => {
+          const [navigation] = performance.getEntriesByType('navigation')
+          const lastLongTask = Math.max(0, ...window.__longTasks)
+          return Math.round(Math.max(navigation.domContentLoadedEventEnd, lastLongTask))
+        })
+      )
+      await page.close()
+    }
+    await browser.close()
+    runs.sort((a, b) => a - b)
+    return { ttiMs: runs[Math.floor(runs.length / 2)], ttiRuns: runs }
+  } finally {
+    preview.kill()
+  }
+}
+
+const kb = bytes => `${(bytes / 1024).toFixed(1)} kB`
+
+function report(result, baseline) {
+  const row = (label, value, before, format) => {
+    const change = before === undefined ? '' : ` (before ${format(before)}, ${value - before >= 0 ? '+' : ''}${format(value - before)})`
+    console.log(`${label.padEnd(24)}${format(value)}${change}`)
+  }
+  row('First-load JS (gzip)', result.firstLoadJs.gzip, baseline?.firstLoadJs.gzip, kb)
+  row('First-load JS (raw)', result.firstLoadJs.raw, baseline?.firstLoadJs.raw, kb)
+  row('First-load CSS (gzip)', result.firstLoadCss.gzip, baseline?.firstLoadCss.gzip, kb)
+  row('All JS (gzip)', result.allJs.gzip, baseline?.allJs.gzip, kb)
+  row('Lazy chunks', result.lazyChunks, baseline?.lazyChunks, String)
+  if (result.ttiMs !== undefined) row('Time to interactive', result.ttiMs, baseline?.ttiMs, ms => `${ms} ms`)
+}
+
+const result = measureSizes()
+if (args.includes('--tti')) Object.assign(result, await measureTti())
+
+const comparePath = option('--compare')
+report(result, comparePath ? JSON.parse(readFileSync(comparePath, 'utf8')) : undefined)
+
+const savePath = option('--save')
+if (savePath) writeFileSync(savePath, JSON.stringify(result, null, 2))
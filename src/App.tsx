@@ -1,12 +1,23 @@
-import { useEffect } from 'react'
+import { Suspense, lazy, useEffect } from 'react'
 import { useAppStore } from '@/store/app-store'
 import { aiService } from '@/services/ai-service'
 import Layout from '@/components/Layout'
 import PromptBuilder from '@/modules/PromptBuilder'
-import AgentRunner from '@/modules/AgentRunner'
-import ResultsViewer from '@/modules/ResultsViewer'
-import TaskLog from '@/modules/TaskLog'
-import Settings from '@/modules/Settings'
+import { runWhenIdle } from '@/utils/utils'
+
+// The prompt builder is the landing tab and ships in the entry chunk; every
+// other tab is its own chunk, fetched when first opened or once the app is idle
+const tabLoaders = {
+  research: () => import('@/modules/AgentRunner'),
+  results: () => import('@/modules/ResultsViewer'),
+  history: () => import('@/modules/TaskLog'),
+  settings: () => import('@/modules/Settings'),
+}
+
+const AgentRunner = lazy(tabLoaders.research)
+const ResultsViewer = lazy(tabLoaders.results)
+const TaskLog = lazy(tabLoaders.history)
+const Settings = lazy(tabLoaders.settings)
 
 export default function App() {
   const { ui, settings } = useAppStore()
@@ -34,6 +45,8 @@ export default function App() {
     }
   }, [ui.darkMode])
 
+  useEffect(() => runWhenIdle(() => Object.values(tabLoaders).forEach(load => load().catch(() => {}))), [])
+
   const renderCurrentTab = () => {
     switch (ui.currentTab) {
       case 'prompt':
@@ -53,7 +66,9 @@ export default function App() {
 
   return (
     <Layout>
-      {renderCurrentTab()}
+      <Suspense fallback={<div className="p-6 text-muted-foreground">Loading…</div>}>
+        {renderCurrentTab()}
+      </Suspense>
     </Layout>
   )
 }
\ No newline at end of file
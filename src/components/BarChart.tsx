@@ -0,0 +1,51 @@
+import React from 'react';
+
+export interface BarChartProps {
+  values: ArrayLike<number>;
+  labels: string[];
+  /** Formats a value for the tooltip */
+  format?: (value: number) => string;
+  height?: number;
+  /** Draw horizontal bars with labels beside them instead of columns */
+  horizontal?: boolean;
+  title: string;
+}
+
+const BAR_GAP = 2;
+const ROW_HEIGHT = 22;
+const LABEL_WIDTH = 140;
+
+/** Plain SVG bar chart; scales to its container width */
+const BarChart: React.FC<BarChartProps> = ({ values, labels, format = String, height = 120, horizontal = false, title }) => {
+  let max = 0;
+  for (let i = 0; i < values.length; i++) max = Math.max(max, values[i]);
+  const scale = max > 0 ? 1 / max : 0;
+
+  if (horizontal) {
+    const svgHeight = values.length * ROW_HEIGHT;
+    return (
+      <svg role="img" aria-label={title} width="100%" height={svgHeight} viewBox={`0 0 400 ${svgHeight}`}>
+        {Array.from(values, (value, i) => (
+          <g key={labels[i]} transform={`translate(0 ${i * ROW_HEIGHT})`}>
+            <title>{`${labels[i]}: ${format(value)}`}</title>
+            <text x={0} y={ROW_HEIGHT / 2} dominantBaseline="middle" className="fill-current text-xs">{labels[i]}</text>
+            <rect x={LABEL_WIDTH} y={BAR_GAP} height={ROW_HEIGHT - BAR_GAP * 2} width={(400 - LABEL_WIDTH) * value * scale} className="fill-primary" />
+          </g>
+        ))}
+      </svg>
+    );
+  }
+
+  const width = 100 / Math.max(1, values.length);
+  return (
+    <svg role="img" aria-label={title} width="100%" height={height} viewBox={`0 0 100 ${height}`} preserveAspectRatio="none">
+      {Array.from(values, (value, i) => (
+        <rect key={labels[i]} x={i * width} y={height - height * value * scale} width={Math.max(0, width - 0.3)} height={height * value * scale} className="fill-primary">
+          <title>{`${labels[i]}: ${format(value)}`}</title>
+        </rect>
+      ))}
+    </svg>
+  );
+};
+
+export default BarChart;
@@ -0,0 +1,42 @@
+import { describe, it, expect, vi } from 'vitest';
+import { render, screen, fireEvent } from '@testing-library/react';
+import ModelPicker from './ModelPicker';
+
+const models = [
+  { id: 'openai/gpt-4.1', name: 'GPT-4.1', context_length: 1_047_576, pricing: { prompt: '0.000002', completion: '0.000008' } },
+  { id: 'openai/o3-deep-research', name: 'o3 Deep Research', context_length: 200_000, pricing: { prompt: '0.00001', completion: '0.00004' } },
+  { id: 'anthropic/claude-sonnet-4', name: 'Claude Sonnet 4', context_length: 200_000, pricing: { prompt: '0.000003', completion: '0.000015' } },
+];
+
+describe('ModelPicker', () => {
+  it('filters the catalog as you type and selects with the keyboard', () => {
+    const onChange = vi.fn();
+    render(<ModelPicker id="model" value="openai/gpt-4.1" onChange={onChange} models={models} />);
+    const input = screen.getByRole('combobox');
+    fireEvent.change(input, { target: { value: 'claude' } });
+    expect(screen.getAllByRole('option')).toHaveLength(1);
+    fireEvent.keyDown(input, { key: 'Enter' });
+    expect(onChange).toHaveBeenCalledWith('anthropic/claude-sonnet-4');
+  });
+
+  it('selects an exact id without opening a result', () => {
+    const onChange = vi.fn();
+    render(<ModelPicker id="model" value="" onChange={onChange} models={models} />);
+    fireEvent.change(screen.getByRole('combobox'), { target: { value: 'openai/o3-deep-research' } });
+    expect(onChange).toHaveBeenCalledWith('openai/o3-deep-research');
+  });
+
+  it('applies the context length filter', () => {
+    render(<ModelPicker id="model" value="" onChange={vi.fn()} models={models} />);
+    fireEvent.change(screen.getByLabelText('Minimum context length'), { target: { value: '1000000' } });
+    fireEvent.change(screen.getByRole('combobox'), { target: { value: 'openai' } });
+    expect(screen.getAllByRole('option').map(o => o.textContent)).toEqual([expect.stringContaining('GPT-4.1')]);
+  });
+
+  it('accepts any id when no catalog is loaded', () => {
+    const onChange = vi.fn();
+    render(<ModelPicker id="model" value="" onChange={onChange} />);
+    fireEvent.change(screen.getByRole('combobox'), { target: { value: 'custom/model' } });
+    expect(onChange).toHaveBeenCalledWith('custom/model');
+  });
+});
@@ -0,0 +1,190 @@
+import React, { useDeferredValue, useMemo, useState } from 'react';
+import Input from '@/components/Input';
+import Select from '@/components/Select';
+import VirtualList from '@/components/VirtualList';
+import { ModelSearchIndex, type ModelFilter } from '@/services/model-search';
+import type { OpenRouterModel } from '@/services/openrouter-service';
+
+const ROW_HEIGHT = 44;
+const LIST_HEIGHT = ROW_HEIGHT * 7;
+
+const CONTEXT_FILTERS = [
+  { label: 'Any context', value: 0 },
+  { label: '≥ 32K', value: 32_000 },
+  { label: '≥ 128K', value: 128_000 },
+  { label: '≥ 200K', value: 200_000 },
+  { label: '≥ 1M', value: 1_000_000 },
+];
+
+const PRICE_FILTERS = [
+  { label: 'Any price', value: '' },
+  { label: 'Free', value: '0' },
+  { label: '≤ $1/M in', value: '1' },
+  { label: '≤ $5/M in', value: '5' },
+  { label: '≤ $15/M in', value: '15' },
+];
+
+export interface ModelPickerProps {
+  id: string;
+  value: string;
+  onChange: (model: string) => void;
+  /** Catalog to search; without it the field accepts any model id */
+  models?: OpenRouterModel[];
+  placeholder?: string;
+}
+
+const formatContext = (tokens?: number) =>
+  !tokens ? '' : tokens >= 1_000_000 ? `${+(tokens / 1_000_000).toFixed(1)}M ctx` : `${Math.round(tokens / 1000)}K ctx`;
+
+const formatPrice = (perToken?: string) => {
+  const price = parseFloat(perToken ?? '');
+  if (!Number.isFinite(price) || price < 0) return '';
+  return price === 0 ? 'free' : `$${+(price * 1_000_000).toFixed(2)}/M in`;
+};
+
+/**
+ * Typeahead model selector. Typing searches the catalog through a
+ * prefix/fuzzy index and shows matches in a virtualized list; typing an
+ * exact model id selects it directly.
+ */
+const ModelPicker: React.FC<ModelPickerProps> = ({ id, value, onChange, models, placeholder = 'Search models…' }) => {
+  const [query, setQuery] = useState('');
+  const [open, setOpen] = useState(false);
+  const [active, setActive] = useState(0);
+  const [minContext, setMinContext] = useState(0);
+  const [maxPrice, setMaxPrice] = useState('');
+
+  const index = useMemo(() => (models?.length ? new ModelSearchIndex(models) : null), [models]);
+  // Rendering the list may lag a fast typist, but the input itself never does
+  const deferredQuery = useDeferredValue(query);
+  const filter: ModelFilter = useMemo(
+    () => ({ minContext, maxInputPrice: maxPrice === '' ? undefined : Number(maxPrice) }),
+    [minContext, maxPrice]
+  );
+  const results = useMemo(() => (index ? index.search(deferredQuery, filter) : []), [index, deferredQuery, filter]);
+  const listId = `${id}-listbox`;
+
+  const choose = (model: OpenRouterModel) => {
+    onChange(model.id);
+    setQuery('');
+    setOpen(false);
+  };
+
+  const handleChange = (e: React.ChangeEvent<HTMLInputElement>) => {
+    const text = e.target.value;
+    setQuery(text);
+    setActive(0);
+    setOpen(!!index);
+    const trimmed = text.trim();
+    // Clearing the field, an exact id, or any id when there is no catalog to pick from
+    if (!trimmed || !index || index.has(trimmed)) onChange(trimmed);
+  };
+
+  const handleKeyDown = (e: React.KeyboardEvent<HTMLInputElement>) => {
+    if (!index) return;
+    if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+      e.preventDefault();
+      setOpen(true);
+      const step = e.key === 'ArrowDown' ? 1 : -1;
+      setActive(i => Math.min(Math.max(i + step, 0), Math.max(results.length - 1, 0)));
+    } else if (e.key === 'Enter' && open) {
+      // Keep Enter from submitting the surrounding form
+      e.preventDefault();
+      if (results[active]) choose(results[active]);
+    } else if (e.key === 'Escape') {
+      setOpen(false);
+      setQuery('');
+    }
+  };
+
+  return (
+    <div className="space-y-2">
+      <div className="relative">
+        <Input
+          id={id}
+          role="combobox"
+          aria-expanded={open}
+          aria-controls={listId}
+          aria-autocomplete="list"
+          aria-activedescendant={open && results[active] ? `${id}-option-${active}` : undefined}
+          autoComplete="off"
+          placeholder={open && value ? value : placeholder}
+          value={open ? query : value}
+          onChange={handleChange}
+          onFocus={() => index && setOpen(true)}
+          onBlur={() => {
+            setOpen(false);
+            setQuery('');
+          }}
+          onKeyDown={handleKeyDown}
+        />
+        {open && index && (
+          <div className="absolute z-20 mt-1 w-full rounded-lg border border-border bg-card shadow-lg">
+            {results.length === 0 ? (
+              <div className="p-3 text-sm text-muted-foreground">No models match</div>
+            ) : (
+              <VirtualList
+                id={listId}
+                role="listbox"
+                count={results.length}
+                itemHeight={ROW_HEIGHT}
+                height={LIST_HEIGHT}
+                scrollToIndex={active}
+                renderItem={(i, style) => {
+                  const model = results[i];
+                  const details = [formatContext(model.context_length), formatPrice(model.pricing?.prompt)].filter(Boolean).join(' · ');
+                  return (
+                    <div
+                      key={model.id}
+                      id={`${id}-option-${i}`}
+                      role="option"
+                      aria-selected={i === active}
+                      style={style}
+                      className={`px-3 flex flex-col justify-center cursor-pointer ${i === active ? 'bg-accent' : ''}`}
+                      // Select before the input's blur closes the list
+                      onMouseDown={e => {
+                        e.preventDefault();
+                        choose(model);
+                      }}
+                      onMouseEnter={() => setActive(i)}
+                    >
+                      <span className="text-sm truncate">{model.name}</span>
+                      <span className="text-xs text-muted-foreground truncate">
+                        {model.id}
+                        {details && ` · ${details}`}
+                      </span>
+                    </div>
+                  );
+                }}
+              />
+            )}
+          </div>
+        )}
+      </div>
+      {index && (
+        <div className="flex gap-2">
+          <Select
+            aria-label="Minimum context length"
+            value={minContext}
+            onChange={e => setMinContext(Number(e.target.value))}
+          >
+            {CONTEXT_FILTERS.map(f => (
+              <option key={f.value} value={f.value}>{f.label}</option>
+            ))}
+          </Select>
+          <Select
+            aria-label="Maximum input price"
+            value={maxPrice}
+            onChange={e => setMaxPrice(e.target.value)}
+          >
+            {PRICE_FILTERS.map(f => (
+              <option key={f.label} value={f.value}>{f.label}</option>
+            ))}
+          </Select>
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default ModelPicker;
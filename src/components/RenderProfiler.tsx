@@ -0,0 +1,41 @@
+import React from 'react';
+
+export interface RenderStats {
+  commits: number;
+  totalDuration: number;
+  lastDuration: number;
+  maxDuration: number;
+}
+
+const isDev = !!(import.meta as any).env?.DEV;
+
+/**
+ * Commit counts and timings per profiler id, collected in development
+ * builds only. Inspect `window.__renderStats` in the browser console.
+ */
+export const renderStats = new Map<string, RenderStats>();
+
+if (isDev && typeof window !== 'undefined') {
+  (window as any).__renderStats = renderStats;
+}
+
+const onRender: React.ProfilerOnRenderCallback = (id, _phase, actualDuration) => {
+  const stats = renderStats.get(id) ?? { commits: 0, totalDuration: 0, lastDuration: 0, maxDuration: 0 };
+  stats.commits++;
+  stats.totalDuration += actualDuration;
+  stats.lastDuration = actualDuration;
+  stats.maxDuration = Math.max(stats.maxDuration, actualDuration);
+  renderStats.set(id, stats);
+};
+
+/** React.Profiler in development, a pass-through in production builds */
+const RenderProfiler: React.FC<{ id: string; children: React.ReactNode }> = ({ id, children }) =>
+  isDev ? (
+    <React.Profiler id={id} onRender={onRender}>
+      {children}
+    </React.Profiler>
+  ) : (
+    <>{children}</>
+  );
+
+export default RenderProfiler;
@@ -0,0 +1,71 @@
+import React, { useEffect, useRef, useState } from 'react';
+
+export interface VirtualListProps {
+  count: number;
+  /** Fixed row height in pixels */
+  itemHeight: number;
+  /** Viewport height in pixels */
+  height: number;
+  renderItem: (index: number, style: React.CSSProperties) => React.ReactNode;
+  /** Rows rendered beyond each edge of the viewport */
+  overscan?: number;
+  /** Keep this row scrolled into view */
+  scrollToIndex?: number;
+  /** Called with the rendered row range `[first, last)` whenever it changes */
+  onRangeChange?: (first: number, last: number) => void;
+  className?: string;
+  role?: string;
+  id?: string;
+}
+
+/** Renders only the rows inside the viewport, so list length does not affect render cost */
+const VirtualList: React.FC<VirtualListProps> = ({
+  count,
+  itemHeight,
+  height,
+  renderItem,
+  overscan = 4,
+  scrollToIndex,
+  onRangeChange,
+  className = '',
+  role,
+  id,
+}) => {
+  const ref = useRef<HTMLDivElement>(null);
+  const [scrollTop, setScrollTop] = useState(0);
+
+  useEffect(() => {
+    const el = ref.current;
+    if (!el || scrollToIndex === undefined || scrollToIndex < 0) return;
+    const top = scrollToIndex * itemHeight;
+    if (top < el.scrollTop) el.scrollTop = top;
+    else if (top + itemHeight > el.scrollTop + height) el.scrollTop = top + itemHeight - height;
+  }, [scrollToIndex, itemHeight, height]);
+
+  const first = Math.max(0, Math.floor(scrollTop / itemHeight) - overscan);
+  const last = Math.min(count, Math.ceil((scrollTop + height) / itemHeight) + overscan);
+
+  useEffect(() => {
+    onRangeChange?.(first, last);
+  }, [first, last, onRangeChange]);
+
+  const rows: React.ReactNode[] = [];
+  for (let i = first; i < last; i++) {
+    rows.push(renderItem(i, { position: 'absolute', top: i * itemHeight, height: itemHeight, left: 0, right: 0 }));
+  }
+
+  return (
+    <div
+      ref={ref}
+      id={id}
+      role={role}
+      className={`overflow-y-auto ${className}`}
+      style={{ height: Math.min(height, count * itemHeight) }}
+      onScroll={e => setScrollTop(e.currentTarget.scrollTop)}
+    >
+      <div style={{ position: 'relative', height: count * itemHeight }}>{rows}</div>
+    </div>
+  );
+};
+
+export default VirtualList;
@@ -0,0 +1,19 @@
+import { useEffect, useState } from 'react';
+
+const supported = () => typeof window !== 'undefined' && typeof window.matchMedia === 'function';
+
+/** Whether `query` matches, updated only when the match flips rather than on every resize */
+export function useMediaQuery(query: string, fallback = true): boolean {
+  const [matches, setMatches] = useState(() => (supported() ? window.matchMedia(query).matches : fallback));
+
+  useEffect(() => {
+    if (!supported()) return;
+    const mql = window.matchMedia(query);
+    const onChange = () => setMatches(mql.matches);
+    onChange();
+    mql.addEventListener('change', onChange);
+    return () => mql.removeEventListener('change', onChange);
+  }, [query]);
+
+  return matches;
+}
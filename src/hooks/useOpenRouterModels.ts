@@ -0,0 +1,26 @@
+import { useQuery, useQueryClient } from '@tanstack/react-query';
+import { fetchOpenRouterModels, type OpenRouterModel } from '@/services/openrouter-service';
+import { hashString } from '@/utils/utils';
+
+const HOUR = 60 * 60 * 1000;
+
+/**
+ * The OpenRouter model list for `apiKey`. The query is persisted, so after
+ * the first visit models render from IndexedDB immediately and are
+ * revalidated in the background once an hour with a conditional request.
+ */
+export function useOpenRouterModels(apiKey: string) {
+  const queryClient = useQueryClient();
+  // The key is hashed so it never appears in the persisted cache
+  const queryKey = ['openrouter-models', apiKey ? hashString(apiKey) : ''];
+
+  return useQuery({
+    queryKey,
+    queryFn: ({ signal }) =>
+      fetchOpenRouterModels(apiKey, { signal, cached: queryClient.getQueryData<OpenRouterModel[]>(queryKey) }),
+    enabled: !!apiKey,
+    staleTime: HOUR,
+    gcTime: 24 * HOUR,
+    meta: { persist: true },
+  });
+}
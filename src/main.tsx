@@ -1,10 +1,13 @@
-import React from 'react'
+import React, { Suspense, lazy } from 'react'
 import ReactDOM from 'react-dom/client'
 import { QueryClient, QueryClientProvider } from '@tanstack/react-query'
-import { ReactQueryDevtools } from '@tanstack/react-query-devtools'
 import App from './App.tsx'
+import { runWhenIdle } from '@/utils/utils'
 import './styles/globals.css'
 
+// Only rendered in development, so production never fetches the devtools chunk
+const ReactQueryDevtools = lazy(() => import('@tanstack/react-query-devtools').then(module => ({ default: module.ReactQueryDevtools })))
+
 // Create a client
 const queryClient = new QueryClient({
   defaultOptions: {
@@ -31,7 +34,26 @@ ReactDOM.createRoot(document.getElementById('root')!).render(
   <React.StrictMode>
     <QueryClientProvider client={queryClient}>
       <App />
-      <ReactQueryDevtools initialIsOpen={false} />
+      {import.meta.env.DEV && (
+        <Suspense fallback={null}>
+          <ReactQueryDevtools initialIsOpen={false} />
+        </Suspense>
+      )}
     </QueryClientProvider>
   </React.StrictMode>,
-)
\ No newline at end of file
+)
+
+// Cached queries (the model catalog) are hydrated once IndexedDB answers,
+// after the first render; a query already fetching keeps the newer result
+import('@/services/query-persistence')
+  .then(async ({ persistQueryCache, restoreQueryCache }) => {
+    await restoreQueryCache(queryClient)
+    persistQueryCache(queryClient)
+  })
+  .catch(() => {})
+
+// The indexes derived from history (search, row metadata, usage, versions)
+// are their own chunk, loaded and synced with the history once the page is idle
+runWhenIdle(() => {
+  import('@/store/history-sync').then(({ startHistorySync }) => startHistorySync()).catch(() => {})
+})
@@ -1,10 +1,45 @@
-import { describe, it, expect } from 'vitest';
-import { render } from '@testing-library/react';
-// import { ExportSync } from './index'; // Uncomment when component exists
+import { describe, it, expect, beforeEach, vi } from 'vitest';
+import { render, screen, fireEvent } from '@testing-library/react';
+import { ExportSync } from './index';
+import { useAppStore } from '@/store/app-store';
+
+vi.mock('@/store/app-store', async () => {
+  const actual = await vi.importActual<any>('@/store/app-store');
+  return {
+    ...actual,
+    useAppStore: vi.fn(),
+  };
+});
+
+const history = Array.from({ length: 5000 }, (_, i) => ({
+  id: `r${i}`,
+  title: `Research ${i}`,
+  prompt: '',
+  status: 'completed',
+  createdAt: '2024-05-01T00:00:00.000Z',
+  result: { report: `Report ${i}`, thoughtProcess: '', sources: [] },
+}));
 
 describe('ExportSync', () => {
-  it('renders without crashing', () => {
-    // render(<ExportSync />);
-    expect(true).toBe(true); // Placeholder
+  beforeEach(() => {
+    const state = { researchHistory: history, settings: {} };
+    (useAppStore as unknown as ReturnType<typeof vi.fn>).mockImplementation((selector?: (s: typeof state) => unknown) =>
+      selector ? selector(state) : state
+    );
+  });
+
+  it('exports everything without rendering a row per research', () => {
+    render(<ExportSync />);
+    expect(screen.getByText('All 5000 completed research selected.')).toBeInTheDocument();
+    expect(screen.queryByText('Research 0')).not.toBeInTheDocument();
+    expect(screen.getByRole('button', { name: 'Export all' })).toBeInTheDocument();
+  });
+
+  it('renders only the visible rows of the selection list', () => {
+    render(<ExportSync />);
+    fireEvent.click(screen.getByRole('button', { name: 'Choose research' }));
+    expect(screen.getAllByText(/^Research \d+$/).length).toBeLessThan(30);
+    fireEvent.click(screen.getByText('Research 1'));
+    expect(screen.getByRole('button', { name: 'Export 1' })).toBeInTheDocument();
   });
-}); 
\ No newline at end of file
+});
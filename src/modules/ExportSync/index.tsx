@@ -1,14 +1,226 @@
-import React from 'react';
+import React, { useEffect, useMemo, useRef, useState } from 'react';
 import Card from '@/components/Card';
+import Button from '@/components/Button';
+import VirtualList from '@/components/VirtualList';
+import { useAppStore } from '@/store/app-store';
+import { fileSystemService } from '@/services/file-system';
+import { bulkExport, type BulkExportProgress } from '@/services/export/bulk';
+import { syncVault } from '@/services/export/vault';
+import { notionService } from '@/services/notion-service';
+import type { ExportFormat } from '@/types/types';
+import { formatDate } from '@/utils/utils';
+
+const FORMATS: Array<{ id: ExportFormat; label: string }> = [
+  { id: 'markdown', label: 'Markdown' },
+  { id: 'pdf', label: 'PDF' },
+  { id: 'docx', label: 'DOCX' },
+];
+
+const ROW_HEIGHT = 28;
+const LIST_HEIGHT = 256;
 
-// TODO: Implement PDF/DOCX/Markdown export and Notion/Obsidian integration
 export const ExportSync: React.FC = () => {
+  // Narrow selectors: only history and the Notion settings re-render the card
+  const researchHistory = useAppStore(state => state.researchHistory);
+  const notionToken = useAppStore(state => state.settings?.notionToken);
+  const notionDatabaseId = useAppStore(state => state.settings?.notionDatabaseId);
+  const canSyncNotion = !!(notionToken && notionDatabaseId);
+  const exportable = useMemo(() => researchHistory.filter(r => r.result), [researchHistory]);
+  // The selection list is only rendered once asked for; everything is exported by default
+  const [choosing, setChoosing] = useState(false);
+  const [selected, setSelected] = useState<ReadonlySet<string>>(() => new Set());
+  const [formats, setFormats] = useState<ExportFormat[]>(['markdown', 'pdf']);
+  const [directoryName, setDirectoryName] = useState<string | null>(null);
+  const [progress, setProgress] = useState<BulkExportProgress | null>(null);
+  const [message, setMessage] = useState('');
+  const [isExporting, setIsExporting] = useState(false);
+  const abortRef = useRef<AbortController | null>(null);
+
+  // Show the directory remembered from a previous session
+  useEffect(() => {
+    fileSystemService.storedDirectoryName().then(setDirectoryName).catch(() => {});
+  }, []);
+
+  // Selected research still in history; with none selected, everything is exported
+  const chosen = useMemo(() => exportable.filter(r => selected.has(r.id)), [exportable, selected]);
+  const targets = chosen.length ? chosen : exportable;
+  const allSelected = exportable.length > 0 && chosen.length === exportable.length;
+
+  const toggleAll = () => {
+    setSelected(allSelected ? new Set() : new Set(exportable.map(r => r.id)));
+  };
+
+  const toggle = (id: string) => {
+    setSelected(prev => {
+      const next = new Set(prev);
+      if (!next.delete(id)) next.add(id);
+      return next;
+    });
+  };
+
+  const toggleFormat = (format: ExportFormat) => {
+    setFormats(prev => (prev.includes(format) ? prev.filter(f => f !== format) : [...prev, format]));
+  };
+
+  const chooseDirectory = async () => {
+    try {
+      await fileSystemService.selectExportDirectory();
+      setDirectoryName(fileSystemService.directoryName);
+    } catch (e) {
+      setMessage((e as Error).message);
+    }
+  };
+
+  const runExport = async () => {
+    const controller = new AbortController();
+    abortRef.current = controller;
+    setIsExporting(true);
+    setMessage('');
+    try {
+      // Re-granting permission for a remembered directory needs this click
+      if (!(await fileSystemService.restoreExportDirectory({ request: true }))) {
+        await fileSystemService.selectExportDirectory();
+      }
+      setDirectoryName(fileSystemService.directoryName);
+      const result = await bulkExport(targets, { formats, signal: controller.signal, onProgress: setProgress });
+      setMessage(`Exported ${result.completed} of ${result.total} researches${result.failed ? `, ${result.failed} failed` : ''}.`);
+    } catch (e) {
+      setMessage((e as any).name === 'AbortError' ? 'Export cancelled.' : (e as Error).message);
+    } finally {
+      abortRef.current = null;
+      setIsExporting(false);
+    }
+  };
+
+  const syncToVault = async () => {
+    const controller = new AbortController();
+    abortRef.current = controller;
+    setIsExporting(true);
+    setMessage('');
+    try {
+      if (!(await fileSystemService.restoreExportDirectory({ request: true }))) {
+        await fileSystemService.selectExportDirectory();
+      }
+      setDirectoryName(fileSystemService.directoryName);
+      const result = await syncVault(exportable, {
+        signal: controller.signal,
+        onProgress: ({ checked, written, total }) => setMessage(`Checked ${checked}/${total} notes, ${written} written`),
+      });
+      setMessage(`Vault synced: ${result.written} files written, ${result.skipped} unchanged${result.errors.length ? `, ${result.errors.length} failed` : ''}.`);
+    } catch (e) {
+      setMessage((e as any).name === 'AbortError' ? 'Vault sync cancelled.' : (e as Error).message);
+    } finally {
+      abortRef.current = null;
+      setIsExporting(false);
+    }
+  };
+
+  const syncToNotion = async () => {
+    const controller = new AbortController();
+    abortRef.current = controller;
+    setIsExporting(true);
+    setMessage('');
+    notionService.setConfig({ token: notionToken! });
+    let synced = 0;
+    try {
+      // Sequential on purpose: Notion's rate limit is shared across all pages
+      for (const research of targets) {
+        await notionService.syncResearch(research, notionDatabaseId!, {
+          signal: controller.signal,
+          onProgress: ({ completed, total }) =>
+            setMessage(`Syncing "${research.title}" to Notion: ${completed}/${total} changes (${synced}/${targets.length} done)`),
+        });
+        synced++;
+      }
+      setMessage(`Synced ${synced} researches to Notion.`);
+    } catch (e) {
+      setMessage(
+        (e as any).name === 'AbortError'
+          ? 'Notion sync cancelled; it will resume where it stopped.'
+          : `Notion sync failed after ${synced} researches: ${(e as Error).message}`
+      );
+    } finally {
+      abortRef.current = null;
+      setIsExporting(false);
+    }
+  };
+
   return (
     <Card>
       <h2 className="text-xl font-semibold mb-2">Export & Sync</h2>
-      <p>Export and integration features will be implemented here.</p>
+      <div className="flex flex-wrap items-center gap-3 mb-4 text-sm">
+        <span className="text-muted-foreground">Folder: {directoryName || 'None selected'}</span>
+        <Button size="sm" variant="outline" onClick={chooseDirectory} disabled={isExporting}>Choose folder</Button>
+        {FORMATS.map(format => (
+          <label key={format.id} className="flex items-center gap-1">
+            <input type="checkbox" checked={formats.includes(format.id)} onChange={() => toggleFormat(format.id)} />
+            {format.label}
+          </label>
+        ))}
+      </div>
+      {exportable.length === 0 ? (
+        <p className="mb-4">No completed research to export yet.</p>
+      ) : !choosing ? (
+        <div className="flex items-center gap-3 mb-4 text-sm">
+          <span>{chosen.length ? `${chosen.length} of ${exportable.length}` : `All ${exportable.length}`} completed research selected.</span>
+          <Button size="sm" variant="outline" onClick={() => setChoosing(true)}>Choose research</Button>
+        </div>
+      ) : (
+        <div className="border rounded-lg mb-4">
+          <label className="flex items-center gap-2 px-3 py-2 border-b font-medium text-sm">
+            <input type="checkbox" checked={allSelected} onChange={toggleAll} />
+            Select all ({exportable.length})
+          </label>
+          <VirtualList
+            count={exportable.length}
+            itemHeight={ROW_HEIGHT}
+            height={Math.min(LIST_HEIGHT, exportable.length * ROW_HEIGHT)}
+            renderItem={(index, style) => {
+              const research = exportable[index];
+              return (
+                <label key={research.id} style={style} className="flex items-center gap-2 px-3 text-sm">
+                  <input type="checkbox" checked={selected.has(research.id)} onChange={() => toggle(research.id)} />
+                  <span className="flex-1 truncate">{research.title}</span>
+                  <span className="text-xs text-muted-foreground">{formatDate(research.createdAt)}</span>
+                </label>
+              );
+            }}
+          />
+        </div>
+      )}
+      <div className="flex items-center gap-3">
+        <Button onClick={runExport} disabled={isExporting || !exportable.length || !formats.length}>
+          Export {chosen.length || 'all'}
+        </Button>
+        <Button variant="outline" onClick={syncToVault} disabled={isExporting || !exportable.length}>
+          Sync to Obsidian vault
+        </Button>
+        {canSyncNotion && (
+          <Button variant="outline" onClick={syncToNotion} disabled={isExporting || !exportable.length}>
+            Sync to Notion
+          </Button>
+        )}
+        {isExporting && (
+          <Button variant="outline" onClick={() => abortRef.current?.abort()}>Cancel</Button>
+        )}
+      </div>
+      {progress && (
+        <div className="mt-4">
+          <div className="w-full bg-accent h-2 rounded">
+            <div
+              className="bg-primary h-2 rounded"
+              style={{ width: `${progress.total ? ((progress.completed + progress.failed) / progress.total) * 100 : 0}%` }}
+            />
+          </div>
+          <div className="flex justify-between text-xs text-muted-foreground mt-1">
+            <span>{progress.completed + progress.failed}/{progress.total} researches</span>
+            <span>{progress.throughput.toFixed(1)}/min · {(progress.bytesWritten / 1024 / 1024).toFixed(1)} MB</span>
+          </div>
+        </div>
+      )}
+      {message && <div className="text-sm mt-2">{message}</div>}
     </Card>
   );
 };
 
-export default ExportSync; 
\ No newline at end of file
+export default ExportSync;
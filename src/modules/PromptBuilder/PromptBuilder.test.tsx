@@ -3,6 +3,7 @@ import { render, screen, fireEvent, waitFor, act } from '@testing-library/react'
 import PromptBuilder from './index';
 import { useAppStore } from '@/store/app-store';
 import { QueryClient, QueryClientProvider } from '@tanstack/react-query';
+import { renderStats } from '@/components/RenderProfiler';
 
 // Helper to create a QueryClient for tests
 const createTestQueryClient = () =>
@@ -123,4 +124,49 @@ describe('PromptBuilder', () => {
     expect(setCurrentResearch).toHaveBeenCalled();
     expect(setUI).toHaveBeenCalledWith({ currentTab: 'research' });
   });
+
+  it('offers an earlier near-identical research instead of running again', async () => {
+    const earlier = {
+      id: 'earlier',
+      title: 'Remote work and commercial real estate',
+      prompt: JSON.stringify({
+        model: 'o3-deep-research',
+        input: [{ role: 'user', content: 'How has remote work changed commercial real estate vacancy rates in major US cities?' }],
+      }),
+      status: 'completed',
+      createdAt: '2024-05-01T00:00:00.000Z',
+    };
+    (useAppStore as unknown as ReturnType<typeof vi.fn>).mockReturnValue({
+      addResearch,
+      setCurrentResearch,
+      setUI,
+      settings: { researchModel: 'o3-deep-research', openrouterApiKey: 'test-key' },
+      researchHistory: [earlier],
+    });
+    renderWithQueryClient(<PromptBuilder />);
+    fireEvent.change(screen.getByPlaceholderText('What do you want to research?'), {
+      target: { value: 'How has remote work changed commercial real estate vacancy rates in major US cities?' },
+    });
+    fireEvent.click(screen.getByText('Run ▶'));
+    fireEvent.click(await screen.findByText('Open existing result'));
+    expect(addResearch).not.toHaveBeenCalled();
+    expect(setCurrentResearch).toHaveBeenCalledWith(earlier);
+    expect(setUI).toHaveBeenCalledWith({ currentTab: 'results' });
+  });
+
+  it('re-renders only the prompt step while typing', () => {
+    renderWithQueryClient(<PromptBuilder />);
+    const textarea = screen.getByPlaceholderText('What do you want to research?');
+    const commits = (id: string) => renderStats.get(id)?.commits ?? 0;
+    const navBefore = commits('PromptBuilder.Nav');
+    const stepBefore = commits('PromptBuilder.Step');
+    let text = '';
+    for (let i = 0; i < 200; i++) {
+      text += 'word word ';
+      fireEvent.change(textarea, { target: { value: text } });
+    }
+    expect(textarea).toHaveValue(text);
+    expect(commits('PromptBuilder.Step') - stepBefore).toBeGreaterThanOrEqual(200);
+    expect(commits('PromptBuilder.Nav')).toBe(navBefore);
+  });
 }); 
\ No newline at end of file
@@ -0,0 +1,122 @@
+import { createContext, useContext } from 'react';
+import { createStore, useStore, type StoreApi } from 'zustand';
+import type { TokenCount } from '@/services/tokenizer';
+
+// Define OpenRouter-compatible config and tool types
+export interface OpenRouterTool {
+  type: 'web_search_preview';
+}
+export interface OpenRouterPromptConfig {
+  userPrompt: string;
+  systemPrompt?: string;
+  model: string;
+  maxTokens: number;
+  tools: OpenRouterTool[];
+  background?: boolean;
+}
+
+export const BASE_CONFIG: OpenRouterPromptConfig = {
+  userPrompt: '',
+  systemPrompt: '',
+  model: '',
+  maxTokens: 2000,
+  tools: [{ type: 'web_search_preview' }],
+  background: true,
+};
+
+export interface PromptDraftState extends OpenRouterPromptConfig {
+  step: number;
+  errors: Record<string, string>;
+  /** Token counts for the two prompts, kept here so every consumer shares one tokenizer call */
+  userTokens: TokenCount;
+  systemTokens: TokenCount;
+  update: (patch: Partial<PromptDraftState>) => void;
+}
+
+export type PromptDraftStore = StoreApi<PromptDraftState>;
+
+/**
+ * Store for one builder session. Components subscribe to the fields they
+ * show, so a keystroke in a prompt re-renders only what depends on it.
+ */
+export const createPromptDraftStore = (initial: Partial<OpenRouterPromptConfig> = {}): PromptDraftStore =>
+  createStore<PromptDraftState>()(set => ({
+    ...BASE_CONFIG,
+    ...initial,
+    step: 0,
+    errors: {},
+    userTokens: { tokens: 0, exact: true },
+    systemTokens: { tokens: 0, exact: true },
+    update: patch => set(patch),
+  }));
+
+export const PromptDraftContext = createContext<PromptDraftStore | null>(null);
+
+export function usePromptDraftStore(): PromptDraftStore {
+  const store = useContext(PromptDraftContext);
+  if (!store) throw new Error('usePromptDraft must be used inside PromptBuilder');
+  return store;
+}
+
+/** Subscribe to one slice of the draft; return primitives or stable references */
+export function usePromptDraft<T>(selector: (state: PromptDraftState) => T): T {
+  return useStore(usePromptDraftStore(), selector);
+}
+
+// Helper to determine if model is o3/o4 (Deep Research)
+const isDeepResearchModel = (model: string) => /o3|o4/i.test(model);
+
+// In handleRun and the preview, construct payload based on model type
+export const buildPayload = (cfg: Pick<OpenRouterPromptConfig, 'model' | 'userPrompt' | 'systemPrompt' | 'maxTokens'>) => {
+  if (isDeepResearchModel(cfg.model)) {
+    return {
+      model: cfg.model,
+      input: [
+        { role: 'system', content: cfg.systemPrompt || '' },
+        { role: 'user', content: cfg.userPrompt }
+      ],
+      max_tokens: cfg.maxTokens,
+    };
+  } else {
+    return {
+      model: cfg.model,
+      messages: [
+        { role: 'system', content: cfg.systemPrompt || '' },
+        { role: 'user', content: cfg.userPrompt }
+      ],
+      max_tokens: cfg.maxTokens,
+    };
+  }
+};
+
+export const validateStep = (config: OpenRouterPromptConfig, stepIdx: number): boolean => {
+  if (stepIdx === 0) {
+    return !!config.userPrompt && config.userPrompt.length >= 10;
+  }
+  if (stepIdx === 1) {
+    return !!config.model && !!config.maxTokens && config.maxTokens >= 100;
+  }
+  if (stepIdx === 2) {
+    if (!config.tools || config.tools.length === 0) return false;
+    for (const tool of config.tools) {
+      if (tool.type === 'web_search_preview') return true;
+    }
+    return false;
+  }
+  return true;
+};
+
+export const stepErrors = (config: OpenRouterPromptConfig, stepIdx: number): Record<string, string> => {
+  const errors: Record<string, string> = {};
+  if (stepIdx === 0) {
+    if (!config.userPrompt || config.userPrompt.length < 10) errors.userPrompt = 'User prompt is required (min 10 chars)';
+  }
+  if (stepIdx === 1) {
+    if (!config.model) errors.model = 'Model is required';
+    if (!config.maxTokens || config.maxTokens < 100) errors.maxTokens = 'Max tokens must be at least 100';
+  }
+  if (stepIdx === 2) {
+    if (!config.tools || config.tools.length === 0) errors.tools = 'Select at least one tool (required by OpenRouter models)';
+  }
+  return errors;
+};
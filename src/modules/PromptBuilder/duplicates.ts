@@ -0,0 +1,40 @@
+import type { Research } from '@/types/types';
+import { MinHashIndex } from '@/services/minhash';
+import { researchPromptText } from '@/utils/utils';
+
+// Prompts this similar are treated as re-runs of an earlier research
+export const DUPLICATE_THRESHOLD = 0.7;
+
+const index = new MinHashIndex();
+// The prompt string each research was indexed from, to spot changes by identity
+const indexed = new Map<string, string>();
+
+/** Bring the index in line with `history`, hashing only new or changed prompts */
+export function syncPromptIndex(history: Research[]): void {
+  for (const research of history) {
+    if (indexed.get(research.id) === research.prompt) continue;
+    index.add(research.id, researchPromptText(research.prompt));
+    indexed.set(research.id, research.prompt);
+  }
+  if (indexed.size > history.length) {
+    const ids = new Set(history.map(research => research.id));
+    for (const id of indexed.keys()) {
+      if (!ids.has(id)) {
+        index.remove(id);
+        indexed.delete(id);
+      }
+    }
+  }
+}
+
+/** The most similar earlier research to `prompt` that did not fail, if any is close enough */
+export function findSimilarResearch(history: Research[], prompt: string): { research: Research; similarity: number } | null {
+  syncPromptIndex(history);
+  const byId = new Map<string, Research>();
+  for (const match of index.query(researchPromptText(prompt), DUPLICATE_THRESHOLD)) {
+    if (byId.size === 0) history.forEach(research => byId.set(research.id, research));
+    const research = byId.get(match.id);
+    if (research && research.status !== 'error') return { research, similarity: match.similarity };
+  }
+  return null;
+}
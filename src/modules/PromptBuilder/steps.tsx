@@ -0,0 +1,250 @@
+import React, { useEffect, useMemo, useState } from 'react';
+import Button from '@/components/Button';
+import Input from '@/components/Input';
+import Textarea from '@/components/Textarea';
+import ModelPicker from '@/components/ModelPicker';
+import { useOpenRouterModels } from '@/hooks/useOpenRouterModels';
+import { calculateCost, modelCatalog } from '@/services/model-catalog';
+import { useTokenCount } from './useTokenCount';
+import { usePromptEnhancement, type PromptEnhancer } from './usePromptEnhancement';
+import { buildPayload, usePromptDraft, usePromptDraftStore, validateStep, type PromptDraftState } from './draft-store';
+
+export const SIDEBAR_STEPS = [
+  { id: 0, label: 'Query & Prompt' },
+  { id: 1, label: 'Model & Tokens' },
+  { id: 2, label: 'Tools' },
+  { id: 3, label: 'Advanced' },
+  { id: 4, label: 'Preview JSON' },
+];
+
+// Chat formatting adds ~3 tokens per message plus 3 to prime the reply
+const MESSAGE_OVERHEAD_TOKENS = 3 * 2 + 3;
+
+// Used when the model catalog has no context length for the selected model
+const DEFAULT_CONTEXT_LENGTH = 128000;
+
+const selectInputTokens = (s: PromptDraftState) => s.userTokens.tokens + s.systemTokens.tokens + MESSAGE_OVERHEAD_TOKENS;
+const selectTokensExact = (s: PromptDraftState) => s.userTokens.exact && s.systemTokens.exact;
+
+/** Counts tokens for both prompts once and publishes them to the draft */
+export const TokenCountSync = React.memo(function TokenCountSync() {
+  const store = usePromptDraftStore();
+  const userTokens = useTokenCount(usePromptDraft(s => s.userPrompt));
+  const systemTokens = useTokenCount(usePromptDraft(s => s.systemPrompt || ''));
+
+  useEffect(() => {
+    store.getState().update({ userTokens, systemTokens });
+  }, [store, userTokens, systemTokens]);
+
+  return null;
+});
+
+export const StepNav = React.memo(function StepNav() {
+  const store = usePromptDraftStore();
+  const step = usePromptDraft(s => s.step);
+  const errors = usePromptDraft(s => s.errors);
+
+  return (
+    <aside className="w-56 flex-shrink-0">
+      <nav className="sticky top-24 space-y-2">
+        {SIDEBAR_STEPS.map((s, idx) => (
+          <div
+            key={s.id}
+            className={`flex items-center gap-2 cursor-pointer px-3 py-2 rounded-lg ${step === idx ? 'bg-primary/10 font-bold' : 'hover:bg-accent/50 opacity-80'}`}
+            onClick={() => store.getState().update({ step: idx })}
+          >
+            <span className={`h-3 w-3 rounded-full ${step === idx ? 'bg-primary' : 'bg-accent'}`} />
+            {s.label}
+            {errors[s.label.toLowerCase().replace(/\s/g, '')] && <span className="text-destructive ml-2">!</span>}
+          </div>
+        ))}
+      </nav>
+    </aside>
+  );
+});
+
+export const PromptStep = React.memo(function PromptStep({ enhancer, promptModel }: { enhancer: PromptEnhancer; promptModel: string }) {
+  const store = usePromptDraftStore();
+  const userPrompt = usePromptDraft(s => s.userPrompt);
+  const systemPrompt = usePromptDraft(s => s.systemPrompt);
+  const userTokens = usePromptDraft(s => s.userTokens);
+  const systemTokens = usePromptDraft(s => s.systemTokens);
+  const tokensExact = usePromptDraft(selectTokensExact);
+  const error = usePromptDraft(s => s.errors.userPrompt);
+  const update = store.getState().update;
+  const enhancement = usePromptEnhancement(enhancer, userPrompt, systemPrompt || '', promptModel);
+
+  return (
+    <div className="space-y-6">
+      <div>
+        <label htmlFor="userPrompt" className="block text-sm font-medium mb-2">User Prompt *</label>
+        <Textarea
+          id="userPrompt"
+          value={userPrompt}
+          onChange={e => update({ userPrompt: e.target.value })}
+          rows={3}
+          maxLength={2000}
+          placeholder="What do you want to research?"
+        />
+        <div className="flex justify-between text-xs text-muted-foreground">
+          <span>{userPrompt.length}/2000 · {tokensExact ? '' : '~'}{userTokens.tokens} tokens</span>
+          {error && <span className="text-destructive">{error}</span>}
+        </div>
+        <div className="mt-2 space-y-2">
+          <Button size="sm" variant="outline" disabled={!enhancement.ready || enhancement.enhancing} onClick={enhancement.enhance}>
+            {enhancement.enhancing ? 'Enhancing...' : 'Enhance prompt'}
+          </Button>
+          {enhancement.error && <div className="text-xs text-destructive">{enhancement.error}</div>}
+          {enhancement.suggestion && (
+            <div className="border rounded-md p-3 space-y-2 bg-muted/50">
+              <div className="text-sm whitespace-pre-wrap">{enhancement.suggestion}</div>
+              <div className="flex gap-2">
+                <Button size="sm" onClick={() => { update({ userPrompt: enhancement.suggestion!.slice(0, 2000) }); enhancement.dismiss(); }}>
+                  Use suggestion
+                </Button>
+                <Button size="sm" variant="ghost" onClick={enhancement.dismiss}>Dismiss</Button>
+              </div>
+            </div>
+          )}
+        </div>
+      </div>
+      <div>
+        <label htmlFor="systemPrompt" className="block text-sm font-medium mb-2">(Optional) System Instructions</label>
+        <Textarea
+          id="systemPrompt"
+          value={systemPrompt}
+          onChange={e => update({ systemPrompt: e.target.value })}
+          rows={2}
+          maxLength={1000}
+          placeholder="System-level instructions for the research agent..."
+        />
+        <div className="flex justify-between text-xs text-muted-foreground">
+          <span>{systemPrompt?.length || 0}/1000 · {systemTokens.exact ? '' : '~'}{systemTokens.tokens} tokens</span>
+        </div>
+      </div>
+    </div>
+  );
+});
+
+export const ModelStep = React.memo(function ModelStep({ apiKey }: { apiKey: string }) {
+  const store = usePromptDraftStore();
+  const model = usePromptDraft(s => s.model);
+  const maxTokens = usePromptDraft(s => s.maxTokens);
+  const inputTokens = usePromptDraft(selectInputTokens);
+  const tokensExact = usePromptDraft(selectTokensExact);
+  const modelError = usePromptDraft(s => s.errors.model);
+  const maxTokensError = usePromptDraft(s => s.errors.maxTokens);
+  const { data: routerModels } = useOpenRouterModels(apiKey);
+  const update = store.getState().update;
+
+  const modelInfo = modelCatalog.get(model);
+  const contextLimit = modelInfo?.contextLength ?? DEFAULT_CONTEXT_LENGTH;
+  const maxOutputLimit = modelInfo?.maxOutputTokens ?? contextLimit;
+
+  return (
+    <div className="space-y-6">
+      <div>
+        <label htmlFor="model" className="block text-sm font-medium mb-2">Model *</label>
+        <ModelPicker
+          id="model"
+          value={model}
+          onChange={value => update({ model: value })}
+          models={routerModels}
+        />
+        {modelError && <div className="text-xs text-destructive">{modelError}</div>}
+      </div>
+      <div>
+        <label htmlFor="maxTokens" className="block text-sm font-medium mb-2">Max Output Tokens *</label>
+        <Input
+          id="maxTokens"
+          type="number"
+          min={100}
+          max={maxOutputLimit}
+          value={maxTokens}
+          onChange={e => update({ maxTokens: Number(e.target.value) })}
+        />
+        <div className="text-xs text-muted-foreground mt-1">Hard ceiling—cost ∝ length</div>
+        {maxTokensError && <div className="text-xs text-destructive">{maxTokensError}</div>}
+      </div>
+      <div className="mt-2">
+        <div className="w-full bg-accent h-2 rounded">
+          <div
+            className="bg-primary h-2 rounded"
+            style={{ width: `${Math.min(100, ((inputTokens + maxTokens) / contextLimit) * 100)}%` }}
+          />
+        </div>
+        <div className="flex justify-between text-xs text-muted-foreground mt-1">
+          <span>Context used: {tokensExact ? '' : '~'}{inputTokens} input + {maxTokens} output</span>
+          <span>Limit: {contextLimit.toLocaleString('en-US')}</span>
+        </div>
+      </div>
+    </div>
+  );
+});
+
+export const ToolsStep = React.memo(function ToolsStep() {
+  return (
+    <div className="space-y-6">
+      {/* Remove: 'Enable Web Search Preview' checkbox and logic from case 2 in renderStep */}
+    </div>
+  );
+});
+
+export const AdvancedStep = React.memo(function AdvancedStep() {
+  return (
+    <div className="space-y-6">
+      {/* Remove: 'Run asynchronously' checkbox and logic from case 3 in renderStep */}
+    </div>
+  );
+});
+
+/** Only mounted while step 4 is shown, so the payload is never serialized while typing */
+export const PreviewStep = React.memo(function PreviewStep() {
+  const userPrompt = usePromptDraft(s => s.userPrompt);
+  const systemPrompt = usePromptDraft(s => s.systemPrompt);
+  const model = usePromptDraft(s => s.model);
+  const maxTokens = usePromptDraft(s => s.maxTokens);
+  const [jsonCopied, setJsonCopied] = useState(false);
+
+  const previewJson = useMemo(
+    () => JSON.stringify(buildPayload({ userPrompt, systemPrompt, model, maxTokens }), null, 2),
+    [userPrompt, systemPrompt, model, maxTokens]
+  );
+
+  return (
+    <div className="space-y-4">
+      <div className="flex items-center justify-between">
+        <h3 className="text-lg font-semibold">Preview JSON</h3>
+        <Button size="sm" variant="outline" onClick={async () => { await navigator.clipboard.writeText(previewJson); setJsonCopied(true); setTimeout(() => setJsonCopied(false), 1200); }}>
+          {jsonCopied ? 'Copied!' : 'Copy'}
+        </Button>
+      </div>
+      <pre className="bg-muted/50 border rounded-md p-4 text-xs overflow-x-auto max-h-96 whitespace-pre-wrap">{previewJson}</pre>
+    </div>
+  );
+});
+
+export const CostEstimate = React.memo(function CostEstimate({ apiKey }: { apiKey: string }) {
+  const inputTokens = usePromptDraft(selectInputTokens);
+  const maxTokens = usePromptDraft(s => s.maxTokens);
+  const model = usePromptDraft(s => s.model);
+  // Refetches refresh the catalog, so estimates are recomputed when one lands
+  const { dataUpdatedAt } = useOpenRouterModels(apiKey);
+
+  // Cost estimator: tokenized prompt input plus the worst-case output
+  const outputTokens = maxTokens || 2000;
+  const cost = useMemo(() => calculateCost(inputTokens, outputTokens, model), [inputTokens, outputTokens, model, dataUpdatedAt]);
+
+  return <div className="text-xs text-muted-foreground ml-4">Cost estimate: ~AUD ${cost.toFixed(4)}</div>;
+});
+
+export const RunButton = React.memo(function RunButton({ isRunning, onRun }: { isRunning: boolean; onRun: () => void }) {
+  // A boolean slice, so typing re-renders this only when validity flips
+  const canRun = usePromptDraft(s => validateStep(s, 0) && validateStep(s, 1) && validateStep(s, 2));
+
+  return (
+    <Button className="w-full md:w-auto" onClick={() => onRun()} disabled={isRunning || !canRun}>
+      {isRunning ? 'Running...' : 'Run ▶'}
+    </Button>
+  );
+});
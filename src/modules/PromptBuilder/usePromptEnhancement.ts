@@ -0,0 +1,50 @@
+import { useEffect, useMemo, useState } from 'react';
+import { aiService } from '@/services/ai-service';
+import { Speculator } from '@/services/speculation';
+import type { PromptConfig } from '@/types/types';
+
+export type PromptEnhancer = Speculator<PromptConfig, string>;
+
+// One enhancer per page load, so closing and reopening the builder keeps the wasted-request cap
+export const promptEnhancer: PromptEnhancer = new Speculator<PromptConfig, string>({
+  run: (config, signal) => aiService.generatePrompt(config, signal),
+  key: config => JSON.stringify([config.model, config.goal, config.constraints, config.depth]),
+  debounceMs: 1200,
+  maxWasted: 5,
+});
+
+/**
+ * Enhanced version of the prompt being typed. The enhancement is requested
+ * in the background once the prompt settles, so asking for it usually
+ * returns at once.
+ */
+export function usePromptEnhancement(enhancer: PromptEnhancer, userPrompt: string, systemPrompt: string, model: string) {
+  const [suggestion, setSuggestion] = useState<string | null>(null);
+  const [enhancing, setEnhancing] = useState(false);
+  const [error, setError] = useState('');
+  const ready = aiService.isConfigured && !!model && userPrompt.length >= 10;
+
+  const input: PromptConfig = useMemo(
+    () => ({ goal: userPrompt, scope: '', constraints: systemPrompt, depth: 'medium', model }),
+    [userPrompt, systemPrompt, model]
+  );
+
+  useEffect(() => {
+    if (ready) enhancer.schedule(input);
+  }, [enhancer, input, ready]);
+
+  const enhance = async () => {
+    setEnhancing(true);
+    setError('');
+    try {
+      setSuggestion(await enhancer.get(input));
+    } catch (e) {
+      // Aborted because the prompt changed again; the next request supersedes it
+      if ((e as any).name !== 'AbortError') setError((e as Error).message);
+    } finally {
+      setEnhancing(false);
+    }
+  };
+
+  return { ready, enhance, enhancing, suggestion, error, dismiss: () => setSuggestion(null) };
+}
@@ -0,0 +1,14 @@
+import { useEffect, useState } from 'react';
+import { estimateTokens, tokenizerService, type TokenCount } from '@/services/tokenizer';
+
+/** Live token count for `text`, estimated immediately and made exact by the tokenizer worker */
+export function useTokenCount(text: string): TokenCount {
+  const [count, setCount] = useState<TokenCount>(() => ({ tokens: estimateTokens(text), exact: false }));
+
+  useEffect(() => {
+    // Results for superseded text are dropped when the effect is cleaned up
+    return tokenizerService.count(text, setCount);
+  }, [text]);
+
+  return count;
+}
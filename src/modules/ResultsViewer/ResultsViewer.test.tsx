@@ -1,4 +1,4 @@
-import { render, screen, fireEvent } from '@testing-library/react';
+import { render, screen, fireEvent, within } from '@testing-library/react';
 import { ResultsViewer } from './index';
 import { useAppStore } from '@/store/app-store';
 import { describe, it, expect, beforeEach, vi } from 'vitest';
@@ -78,4 +78,28 @@ describe('ResultsViewer', () => {
     expect(screen.getByText('Export PDF')).toBeInTheDocument();
     expect(screen.getByText('Export DOCX')).toBeInTheDocument();
   });
-}); 
\ No newline at end of file
+
+  it('compares runs of the same prompt side by side', async () => {
+    const prompt = JSON.stringify({ model: 'openai/o3', messages: [{ role: 'user', content: 'Compare heat pumps' }] });
+    const run = (id: string, report: string, completedAt: string) => ({
+      ...mockResearch,
+      id,
+      prompt,
+      completedAt,
+      result: { ...mockResearch.result, report },
+    });
+    const first = run('v1', 'Intro\nHeat pumps cost more upfront.\nSummary', '2024-01-01T00:00:00.000Z');
+    const second = run('v2', 'Intro\nHeat pumps cost less to run.\nSummary', '2024-02-01T00:00:00.000Z');
+    (useAppStore as unknown as ReturnType<typeof vi.fn>).mockReturnValue({
+      currentResearch: second,
+      researchHistory: [first, second],
+      setUI: vi.fn(),
+      updateResearch: vi.fn(),
+    });
+    render(<ResultsViewer />);
+    fireEvent.click(await screen.findByText('Versions (2)'));
+    const changed = await screen.findByTitle('Heat pumps cost more upfront.');
+    expect(within(changed.parentElement!).getByText('Heat pumps cost less to run.')).toBeInTheDocument();
+    expect(screen.getByText('1 changed · 0 removed · 0 added lines')).toBeInTheDocument();
+  });
+});
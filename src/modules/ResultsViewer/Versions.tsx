@@ -0,0 +1,118 @@
+import React, { useEffect, useMemo, useState } from 'react';
+import Select from '@/components/Select';
+import VirtualList from '@/components/VirtualList';
+import type { Research } from '@/types/types';
+import { researchVersions, versionKey, type DiffRow, type VersionInfo } from '@/services/versions';
+
+const ROW_HEIGHT = 20;
+const VIEW_HEIGHT = 480;
+
+const ROW_CLASSES: Record<DiffRow['kind'], [left: string, right: string]> = {
+  same: ['', ''],
+  changed: ['bg-red-50 text-red-900', 'bg-emerald-50 text-emerald-900'],
+  removed: ['bg-red-50 text-red-900', 'bg-muted/50'],
+  added: ['bg-muted/50', 'bg-emerald-50 text-emerald-900'],
+};
+
+/** Recorded versions of the research's prompt, oldest first */
+export function useResearchVersions(research: Research | null, history: Research[]): VersionInfo[] {
+  const [versions, setVersions] = useState<VersionInfo[]>([]);
+  useEffect(() => {
+    if (!research?.result) return;
+    let cancelled = false;
+    researchVersions
+      .versions(research, history)
+      .then(list => {
+        if (!cancelled) setVersions([...list].sort((a, b) => a.completedAt.localeCompare(b.completedAt)));
+      })
+      .catch(() => {});
+    return () => {
+      cancelled = true;
+    };
+  }, [research, history]);
+  return versions;
+}
+
+interface VersionsProps {
+  research: Research;
+  versions: VersionInfo[];
+}
+
+/** Side-by-side line diff between any two versions, computed off the main thread and rendered virtually */
+export const Versions: React.FC<VersionsProps> = ({ research, versions }) => {
+  const key = versionKey(research);
+  const current = Math.max(0, versions.findIndex(version => version.researchId === research.id));
+  const [left, setLeft] = useState(Math.max(0, current - 1));
+  const [right, setRight] = useState(current);
+  const [rows, setRows] = useState<DiffRow[] | null>(null);
+  const [changesOnly, setChangesOnly] = useState(false);
+
+  useEffect(() => {
+    if (!versions[left] || !versions[right]) return;
+    const controller = new AbortController();
+    setRows(null);
+    researchVersions
+      .diff(key, versions[left].index, versions[right].index, { signal: controller.signal })
+      .then(setRows)
+      .catch(() => {});
+    return () => controller.abort();
+  }, [key, versions, left, right]);
+
+  const shown = useMemo(() => (rows && changesOnly ? rows.filter(row => row.kind !== 'same') : rows), [rows, changesOnly]);
+  const counts = useMemo(() => {
+    const total = { changed: 0, removed: 0, added: 0 };
+    rows?.forEach(row => {
+      if (row.kind !== 'same') total[row.kind]++;
+    });
+    return total;
+  }, [rows]);
+
+  const label = (version: VersionInfo, i: number) =>
+    `Version ${i + 1} · ${new Date(version.completedAt).toLocaleString()}${version.researchId === research.id ? ' (this run)' : ''}`;
+
+  const versionSelect = (value: number, onChange: (value: number) => void, name: string) => (
+    <Select aria-label={name} value={value} onChange={e => onChange(Number(e.target.value))}>
+      {versions.map((version, i) => (
+        <option key={version.researchId} value={i}>{label(version, i)}</option>
+      ))}
+    </Select>
+  );
+
+  return (
+    <div className="space-y-3">
+      <div className="grid grid-cols-2 gap-4">
+        {versionSelect(left, setLeft, 'Older version')}
+        {versionSelect(right, setRight, 'Newer version')}
+      </div>
+      <div className="flex items-center gap-6 text-sm">
+        <span>{counts.changed} changed · {counts.removed} removed · {counts.added} added lines</span>
+        <label className="flex items-center gap-2">
+          <input type="checkbox" checked={changesOnly} onChange={e => setChangesOnly(e.target.checked)} />
+          Changed lines only
+        </label>
+      </div>
+      {!shown ? (
+        <p className="text-sm text-muted-foreground">Comparing versions…</p>
+      ) : (
+        <VirtualList
+          count={shown.length}
+          itemHeight={ROW_HEIGHT}
+          height={VIEW_HEIGHT}
+          className="border rounded bg-background font-mono text-xs"
+          renderItem={(i, style) => {
+            const row = shown[i];
+            const [leftClass, rightClass] = ROW_CLASSES[row.kind];
+            return (
+              <div key={i} style={style} className="grid grid-cols-2">
+                <div className={`px-2 whitespace-pre overflow-hidden text-ellipsis ${leftClass}`} title={row.left}>{row.left}</div>
+                <div className={`px-2 whitespace-pre overflow-hidden text-ellipsis border-l ${rightClass}`} title={row.right}>{row.right}</div>
+              </div>
+            );
+          }}
+        />
+      )}
+    </div>
+  );
+};
+
+export default Versions;
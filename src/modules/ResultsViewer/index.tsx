@@ -1,10 +1,16 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import Card from '@/components/Card';
 import { useAppStore } from '@/store/app-store';
-import type { Source } from '@/types/types';
+import type { ExportProgress, Research, Source } from '@/types/types';
 import { fileSystemService } from '@/services/file-system';
-import { PDFDocument, StandardFonts, rgb } from 'pdf-lib';
-import { Document, Packer, Paragraph, TextRun, HeadingLevel } from 'docx';
+import { calculateCost, modelCatalog } from '@/services/model-catalog';
+import { citationIndex } from '@/services/citations';
+import { modelFromPrompt, runWhenIdle } from '@/utils/utils';
+import { exportService, renderMarkdownChunks, BUNDLE_MIME_TYPE, EXPORT_MIME_TYPES, type BinaryExportFormat } from '@/services/export';
+import { Versions, useResearchVersions } from './Versions';
+
+// Stable default while the store has no history
+const NO_HISTORY: Research[] = [];
 
 // Helper to parse citations in the report (e.g., [1], [2]) and link to sources
 function parseReportWithCitations(report: string, onCiteClick: (idx: number) => void) {
@@ -35,12 +41,18 @@ function parseReportWithCitations(report: string, onCiteClick: (idx: number) =>
 
 // TODO: Implement tabbed interface, citation management, and export functionality
 export const ResultsViewer: React.FC = () => {
-  const { currentResearch, setUI, updateResearch } = useAppStore();
-  const [activeTab, setActiveTab] = useState<'report' | 'process' | 'sources'>('report');
+  const { currentResearch, researchHistory = NO_HISTORY, setUI, updateResearch } = useAppStore();
+  const [activeTab, setActiveTab] = useState<'report' | 'process' | 'sources' | 'versions'>('report');
   const [highlightedSource, setHighlightedSource] = useState<number | null>(null);
   const [isExporting, setIsExporting] = useState(false);
+  const [exportProgress, setExportProgress] = useState<ExportProgress | null>(null);
+  const exportAbortRef = useRef<AbortController | null>(null);
   const [search, setSearch] = useState('');
   const [expandedSources, setExpandedSources] = useState<Record<number, boolean>>({});
+  const versions = useResearchVersions(currentResearch, researchHistory);
+
+  // Export libraries are split out of the main bundle; fetch them once the report is on screen
+  useEffect(() => runWhenIdle(() => exportService.prewarm()), []);
 
   if (!currentResearch || !currentResearch.result) {
     return (
@@ -59,6 +71,8 @@ export const ResultsViewer: React.FC = () => {
 
   const { result } = currentResearch;
   const sources: Source[] = result.sources || [];
+  const researchModel = modelFromPrompt(currentResearch.prompt);
+  const modelInfo = modelCatalog.get(researchModel);
 
   // Handler for clicking a citation in the report
   const handleCitationClick = (idx: number) => {
@@ -84,127 +98,55 @@ export const ResultsViewer: React.FC = () => {
     setExpandedSources(prev => ({ ...prev, [idx]: !prev[idx] }));
   };
 
-  // Export as Markdown
+  // Export as Markdown, streamed to disk chunk by chunk
   const exportAsMarkdown = async () => {
-    const content = `# ${currentResearch.title}\n\n**Generated:** ${new Date(currentResearch.createdAt).toLocaleDateString()}\n${currentResearch.completedAt ? `**Completed:** ${new Date(currentResearch.completedAt).toLocaleDateString()}` : ''}\n\n## Research Prompt\n\n\u0060\u0060\u0060\n${currentResearch.prompt}\n\u0060\u0060\u0060\n\n## Research Report\n\n${result.report}\n\n${result.thoughtProcess ? `## Research Process\n\n${result.thoughtProcess}\n\n` : ''}${sources.length ? `## Sources\n\n${sources.map((source, i) => `${i + 1}. [${source.title}](${source.url})${source.snippet ? `\n> ${source.snippet}` : ''}`).join('\n\n')}` : ''}`;
-    await fileSystemService.saveFile(`${currentResearch.title.substring(0, 50)}.md`, content, 'text/markdown');
+    await fileSystemService.saveStream(`${currentResearch.title.substring(0, 50)}.md`, renderMarkdownChunks(currentResearch), EXPORT_MIME_TYPES.markdown);
   };
 
-  // Export as PDF
-  const exportAsPDF = async () => {
+  // PDF and DOCX are built in a worker so large reports don't freeze the UI
+  const exportBinary = async (format: BinaryExportFormat) => {
+    const controller = new AbortController();
+    exportAbortRef.current = controller;
     setIsExporting(true);
     try {
-      const pdfDoc = await PDFDocument.create();
-      const page = pdfDoc.addPage([612, 792]);
-      const helveticaFont = await pdfDoc.embedFont(StandardFonts.Helvetica);
-      const helveticaBold = await pdfDoc.embedFont(StandardFonts.HelveticaBold);
-      const { width, height } = page.getSize();
-      const margin = 50;
-      let y = height - margin;
-      const addText = (text: string, font = helveticaFont, size = 12, color = rgb(0, 0, 0)) => {
-        const maxWidth = width - 2 * margin;
-        const words = text.split(' ');
-        let line = '';
-        for (const word of words) {
-          const testLine = line + (line ? ' ' : '') + word;
-          const textWidth = font.widthOfTextAtSize(testLine, size);
-          if (textWidth > maxWidth && line) {
-            page.drawText(line, { x: margin, y, size, font, color });
-            y -= size + 5;
-            line = word;
-          } else {
-            line = testLine;
-          }
-          if (y < margin) {
-            y = height - margin;
-          }
-        }
-        if (line) {
-          page.drawText(line, { x: margin, y, size, font, color });
-          y -= size + 10;
-        }
-      };
-      addText(currentResearch.title, helveticaBold, 16, rgb(0.1, 0.1, 0.5));
-      y -= 10;
-      addText(`Generated: ${new Date(currentResearch.createdAt).toLocaleDateString()}`, helveticaFont, 10, rgb(0.5, 0.5, 0.5));
-      if (currentResearch.completedAt) {
-        addText(`Completed: ${new Date(currentResearch.completedAt).toLocaleDateString()}`, helveticaFont, 10, rgb(0.5, 0.5, 0.5));
-      }
-      y -= 20;
-      if (result.report) {
-        addText('Research Report', helveticaBold, 14);
-        y -= 5;
-        addText(result.report);
-        y -= 20;
-      }
-      if (result.thoughtProcess) {
-        addText('Research Process', helveticaBold, 14);
-        y -= 5;
-        addText(result.thoughtProcess);
-        y -= 20;
-      }
-      if (sources.length > 0) {
-        addText('Sources', helveticaBold, 14);
-        y -= 5;
-        sources.forEach((source, i) => {
-          addText(`${i + 1}. ${source.title}`);
-          if (source.url) addText(`   ${source.url}`, helveticaFont, 10, rgb(0, 0, 0.8));
-          if (source.snippet) addText(`   "${source.snippet}"`, helveticaFont, 10, rgb(0.3, 0.3, 0.3));
-          y -= 5;
-        });
-      }
-      const pdfBytes = await pdfDoc.save();
-      await fileSystemService.saveFile(`${currentResearch.title.substring(0, 50)}.pdf`, new Blob([pdfBytes], { type: 'application/pdf' }), 'application/pdf');
+      const buffer = await exportService.render(format, currentResearch, {
+        signal: controller.signal,
+        onProgress: setExportProgress,
+      });
+      const mimeType = EXPORT_MIME_TYPES[format];
+      await fileSystemService.saveStream(`${currentResearch.title.substring(0, 50)}.${format}`, [buffer], mimeType);
     } catch (e) {
-      alert('PDF export failed');
+      if ((e as any).name !== 'AbortError') alert(`${format.toUpperCase()} export failed`);
     } finally {
+      exportAbortRef.current = null;
+      setExportProgress(null);
       setIsExporting(false);
     }
   };
 
-  // Export as DOCX
-  const exportAsDOCX = async () => {
+  // Every format plus the research JSON and sources in one ZIP. The save
+  // dialog opens first; the archive is then zipped and written chunk by chunk
+  const exportBundle = async () => {
+    const controller = new AbortController();
+    exportAbortRef.current = controller;
     setIsExporting(true);
     try {
-      const paragraphs: Paragraph[] = [];
-      paragraphs.push(new Paragraph({ text: currentResearch.title, heading: HeadingLevel.TITLE }));
-      paragraphs.push(new Paragraph({ children: [new TextRun({ text: `Generated: ${new Date(currentResearch.createdAt).toLocaleDateString()}`, italics: true })] }));
-      if (currentResearch.completedAt) {
-        paragraphs.push(new Paragraph({ children: [new TextRun({ text: `Completed: ${new Date(currentResearch.completedAt).toLocaleDateString()}`, italics: true })] }));
-      }
-      paragraphs.push(new Paragraph({ text: '' }));
-      if (result.report) {
-        paragraphs.push(new Paragraph({ text: 'Research Report', heading: HeadingLevel.HEADING_1 }));
-        result.report.split('\n').forEach(paragraph => {
-          if (paragraph.trim()) paragraphs.push(new Paragraph({ text: paragraph.trim() }));
-        });
-      }
-      if (result.thoughtProcess) {
-        paragraphs.push(new Paragraph({ text: '' }));
-        paragraphs.push(new Paragraph({ text: 'Research Process', heading: HeadingLevel.HEADING_1 }));
-        result.thoughtProcess.split('\n').forEach(paragraph => {
-          if (paragraph.trim()) paragraphs.push(new Paragraph({ text: paragraph.trim() }));
-        });
-      }
-      if (sources.length > 0) {
-        paragraphs.push(new Paragraph({ text: '' }));
-        paragraphs.push(new Paragraph({ text: 'Sources', heading: HeadingLevel.HEADING_1 }));
-        sources.forEach((source, i) => {
-          paragraphs.push(new Paragraph({ children: [new TextRun({ text: `${i + 1}. `, bold: true }), new TextRun({ text: source.title })] }));
-          if (source.url) paragraphs.push(new Paragraph({ children: [new TextRun({ text: `   ${source.url}`, color: '0066CC' })] }));
-          if (source.snippet) paragraphs.push(new Paragraph({ children: [new TextRun({ text: `   "${source.snippet}"`, italics: true })] }));
-        });
-      }
-      const doc = new Document({ sections: [{ properties: {}, children: paragraphs }] });
-      const docxBuffer = await Packer.toBlob(doc);
-      await fileSystemService.saveFile(`${currentResearch.title.substring(0, 50)}.docx`, docxBuffer, 'application/vnd.openxmlformats-officedocument.wordprocessingml.document');
+      const filename = `${fileSystemService.researchFolderName(currentResearch.title, currentResearch.createdAt)}.zip`;
+      await fileSystemService.saveStream(filename, exportService.bundle(currentResearch, { signal: controller.signal }), BUNDLE_MIME_TYPE);
     } catch (e) {
-      alert('DOCX export failed');
+      if ((e as any).name !== 'AbortError' && (e as Error).message !== 'Save cancelled') alert('Bundle export failed');
     } finally {
+      exportAbortRef.current = null;
       setIsExporting(false);
     }
   };
 
+  // Export as PDF
+  const exportAsPDF = () => exportBinary('pdf');
+
+  // Export as DOCX
+  const exportAsDOCX = () => exportBinary('docx');
+
   return (
     <Card>
       <h2 className="text-xl font-semibold mb-4">Results Viewer</h2>
@@ -225,7 +167,10 @@ export const ResultsViewer: React.FC = () => {
         <div className="mb-4 p-3 bg-emerald-50 border border-emerald-200 rounded text-emerald-900 text-sm flex gap-6">
           <div>Input Tokens: <span className="font-semibold">{currentResearch.cost.inputTokens}</span></div>
           <div>Output Tokens: <span className="font-semibold">{currentResearch.cost.outputTokens}</span></div>
-          <div>Total Cost: <span className="font-semibold">${currentResearch.cost.totalCost.toFixed(4)}</span></div>
+          <div>Total Cost: <span className="font-semibold">${(currentResearch.cost.totalCost || calculateCost(currentResearch.cost.inputTokens, currentResearch.cost.outputTokens, researchModel)).toFixed(4)}</span></div>
+          {modelInfo?.contextLength && (
+            <div>Context: <span className="font-semibold">{Math.round(((currentResearch.cost.inputTokens + currentResearch.cost.outputTokens) / modelInfo.contextLength) * 100)}%</span> of {modelInfo.contextLength.toLocaleString('en-US')}</div>
+          )}
         </div>
       )}
       {/* Export Buttons */}
@@ -233,6 +178,15 @@ export const ResultsViewer: React.FC = () => {
         <button className="px-3 py-1 rounded bg-primary text-white hover:bg-primary/90" onClick={exportAsMarkdown} disabled={isExporting}>Export Markdown</button>
         <button className="px-3 py-1 rounded bg-primary text-white hover:bg-primary/90" onClick={exportAsPDF} disabled={isExporting}>Export PDF</button>
         <button className="px-3 py-1 rounded bg-primary text-white hover:bg-primary/90" onClick={exportAsDOCX} disabled={isExporting}>Export DOCX</button>
+        <button className="px-3 py-1 rounded bg-primary text-white hover:bg-primary/90" onClick={exportBundle} disabled={isExporting}>Export Bundle (.zip)</button>
+        {isExporting && exportAbortRef.current && (
+          <div className="flex items-center gap-2 text-sm text-muted-foreground">
+            <span>
+              {exportProgress?.stage === 'encode' ? 'Encoding' : 'Building'}… {Math.round((exportProgress?.progress || 0) * 100)}%
+            </span>
+            <button className="px-3 py-1 rounded border hover:bg-accent" onClick={() => exportAbortRef.current?.abort()}>Cancel</button>
+          </div>
+        )}
       </div>
       {/* Search/filter */}
       <div className="mb-4">
@@ -251,6 +205,7 @@ export const ResultsViewer: React.FC = () => {
             { id: 'report', label: 'Report', available: !!result.report },
             { id: 'process', label: 'Thought Process', available: !!result.thoughtProcess },
             { id: 'sources', label: 'Sources', available: !!sources.length },
+            { id: 'versions', label: `Versions${versions.length > 1 ? ` (${versions.length})` : ''}`, available: versions.length > 1 },
           ].map(tab => (
             <button
               key={tab.id}
@@ -317,6 +272,9 @@ export const ResultsViewer: React.FC = () => {
                       )}
                       <div className="text-xs text-muted-foreground mt-2">
                         Cited at: {source.citedAt ? new Date(source.citedAt).toLocaleString() : 'Unknown'}
+                        {source.url && (citationIndex.source(source.url)?.citedBy.size ?? 0) > 1 && (
+                          <> · cited in {citationIndex.source(source.url)!.citedBy.size} research tasks</>
+                        )}
                       </div>
                     </div>
                   )}
@@ -327,6 +285,9 @@ export const ResultsViewer: React.FC = () => {
             )}
           </div>
         )}
+        {activeTab === 'versions' && versions.length > 1 && (
+          <Versions key={currentResearch.id} research={currentResearch} versions={versions} />
+        )}
       </div>
     </Card>
   );
@@ -1,11 +1,11 @@
-import React, { useState } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import React, { useState, useSyncExternalStore } from 'react';
 import { useAppStore } from '@/store/app-store';
 import Button from '@/components/Button';
 import Card from '@/components/Card';
 import Input from '@/components/Input';
-import Select from '@/components/Select';
-import { fetchOpenRouterModels } from '@/services/openrouter-service';
+import ModelPicker from '@/components/ModelPicker';
+import { useOpenRouterModels } from '@/hooks/useOpenRouterModels';
+import { responseCache } from '@/services/response-cache';
 
 function Settings() {
   const { settings, updateSettings } = useAppStore();
@@ -13,12 +13,13 @@ function Settings() {
   const [promptModel, setPromptModel] = useState(settings.promptModel);
   const [researchModel, setResearchModel] = useState(settings.researchModel);
   const [saved, setSaved] = useState(false);
+  const cacheStats = useSyncExternalStore(
+    listener => responseCache.subscribe(listener),
+    () => responseCache.getStats()
+  );
+  const cacheLookups = cacheStats.hits + cacheStats.misses + cacheStats.coalesced;
 
-  const { data: routerModels } = useQuery({
-    queryKey: ['openrouter-models', routerKey],
-    queryFn: () => fetchOpenRouterModels(routerKey),
-    enabled: !!routerKey,
-  });
+  const { data: routerModels } = useOpenRouterModels(routerKey);
 
   const handleSave = (e: React.FormEvent) => {
     e.preventDefault();
@@ -48,26 +49,27 @@ function Settings() {
         {routerModels && (
           <>
             <div>
-              <label className="block text-sm font-medium mb-2">Prompt Creator Model</label>
-              <Select value={promptModel} onChange={e => setPromptModel(e.target.value)}>
-                {routerModels.map(m => (
-                  <option key={m.id} value={m.id}>{m.name}</option>
-                ))}
-              </Select>
+              <label htmlFor="promptModel" className="block text-sm font-medium mb-2">Prompt Creator Model</label>
+              <ModelPicker id="promptModel" value={promptModel} onChange={setPromptModel} models={routerModels} />
             </div>
             <div>
-              <label className="block text-sm font-medium mb-2">Research Model</label>
-              <Select value={researchModel} onChange={e => setResearchModel(e.target.value)}>
-                {routerModels.map(m => (
-                  <option key={m.id} value={m.id}>{m.name}</option>
-                ))}
-              </Select>
+              <label htmlFor="researchModel" className="block text-sm font-medium mb-2">Research Model</label>
+              <ModelPicker id="researchModel" value={researchModel} onChange={setResearchModel} models={routerModels} />
             </div>
           </>
         )}
         <Button type="submit" className="w-full">Save</Button>
         {saved && <div className="text-emerald-600 text-sm mt-2">Settings saved!</div>}
       </form>
+      <div className="border-t pt-4 space-y-2">
+        <h3 className="text-sm font-medium">Response cache</h3>
+        <div className="text-sm text-muted-foreground">
+          {cacheLookups === 0
+            ? 'No cached requests yet.'
+            : `${Math.round(((cacheStats.hits + cacheStats.coalesced) / cacheLookups) * 100)}% hit rate (${cacheStats.hits} cached, ${cacheStats.coalesced} shared, ${cacheStats.misses} sent) · saved ~$${cacheStats.savedCost.toFixed(4)}`}
+        </div>
+        <Button type="button" size="sm" variant="outline" onClick={() => responseCache.clear()}>Clear cache</Button>
+      </div>
     </Card>
   );
 }
@@ -0,0 +1,70 @@
+import React, { useEffect, useSyncExternalStore } from 'react';
+import BarChart from '@/components/BarChart';
+import { dayDate, dayNumber, usageAnalytics } from '@/services/analytics';
+
+// Days shown in the spend chart, ending today
+const SPEND_DAYS = 30;
+// Models shown in the token chart, most used first
+const TOP_MODELS = 8;
+
+const formatUsd = (value: number) => `$${value.toFixed(2)}`;
+const formatTokens = (value: number) => `${Math.round(value).toLocaleString('en-US')} tokens`;
+const shortDate = (day: number) => dayDate(day).toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
+
+/** Charts drawn from the rollup tables alone, so their cost does not grow with history */
+export const Analytics: React.FC = () => {
+  useSyncExternalStore(
+    listener => usageAnalytics.subscribe(listener),
+    () => usageAnalytics.getVersion()
+  );
+  useEffect(() => {
+    usageAnalytics.restore();
+  }, []);
+
+  const { days, models } = usageAnalytics;
+  const today = dayNumber(new Date());
+  const dayKeys = Array.from({ length: SPEND_DAYS }, (_, i) => today - SPEND_DAYS + 1 + i);
+  const spend = Float64Array.from(dayKeys, day => days.value(day, 'spend'));
+
+  let completed = 0;
+  let failed = 0;
+  let totalSpend = 0;
+  for (let row = 0; row < models.length; row++) {
+    completed += models.columns.completed[row];
+    failed += models.columns.failed[row];
+    totalSpend += models.columns.spend[row];
+  }
+  const tokens = (row: number) => models.columns.inputTokens[row] + models.columns.outputTokens[row];
+  const topRows = Array.from({ length: models.length }, (_, row) => row)
+    .filter(row => tokens(row) > 0)
+    .sort((a, b) => tokens(b) - tokens(a))
+    .slice(0, TOP_MODELS);
+  const finished = completed + failed;
+
+  return (
+    <div className="mt-6 space-y-4">
+      <div className="flex gap-6 text-sm">
+        <div>Total spend: <span className="font-semibold">{formatUsd(totalSpend)}</span></div>
+        <div>Success rate: <span className="font-semibold">{finished ? `${Math.round((completed / finished) * 100)}%` : '—'}</span></div>
+      </div>
+      <div>
+        <h3 className="text-sm font-medium mb-1">Spend per day (last {SPEND_DAYS} days)</h3>
+        <BarChart title="Spend per day" values={spend} labels={dayKeys.map(shortDate)} format={formatUsd} />
+      </div>
+      {topRows.length > 0 && (
+        <div>
+          <h3 className="text-sm font-medium mb-1">Tokens per model</h3>
+          <BarChart
+            title="Tokens per model"
+            horizontal
+            values={topRows.map(tokens)}
+            labels={topRows.map(row => models.keys[row])}
+            format={formatTokens}
+          />
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default Analytics;
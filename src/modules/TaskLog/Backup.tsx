@@ -0,0 +1,102 @@
+import React, { useEffect, useRef, useState } from 'react';
+import Button from '@/components/Button';
+import { useAppStore } from '@/store/app-store';
+import { backupHistory, restoreHistory, type RestoreProgress } from '@/services/backup';
+
+export const Backup: React.FC = () => {
+  // Only the count is rendered; the records are read when a backup or restore starts
+  const historySize = useAppStore(state => state.researchHistory.length);
+  const importResearch = useAppStore(state => state.importResearch);
+  const [gzip, setGzip] = useState(true);
+  const [busy, setBusy] = useState(false);
+  const [progress, setProgress] = useState<RestoreProgress | null>(null);
+  const [message, setMessage] = useState('');
+  const fileRef = useRef<HTMLInputElement>(null);
+  const abortRef = useRef<AbortController | null>(null);
+
+  useEffect(() => () => abortRef.current?.abort(), []);
+
+  const runBackup = async () => {
+    setBusy(true);
+    setMessage('');
+    try {
+      const history = useAppStore.getState().researchHistory;
+      await backupHistory(history, { gzip });
+      setMessage(`Backed up ${history.length} research tasks.`);
+    } catch (e) {
+      setMessage((e as Error).message);
+    } finally {
+      setBusy(false);
+    }
+  };
+
+  const runRestore = async (file: File) => {
+    const controller = new AbortController();
+    abortRef.current = controller;
+    setBusy(true);
+    setMessage('');
+    setProgress(null);
+    // Records already inserted stay in history if the restore stops early
+    let added = 0;
+    try {
+      const result = await restoreHistory(file, {
+        existingIds: useAppStore.getState().researchHistory.map(r => r.id),
+        insert: importResearch,
+        onProgress: latest => {
+          added = latest.added;
+          setProgress(latest);
+        },
+        signal: controller.signal,
+      });
+      setMessage(
+        `Restored ${result.added} research tasks` +
+          (result.duplicates ? `, skipped ${result.duplicates} already present` : '') +
+          (result.invalid ? `, ${result.invalid} unreadable` : '') +
+          '.'
+      );
+    } catch (e) {
+      const kept = added ? ` Kept the ${added} research tasks restored so far.` : '';
+      setMessage(((e as any).name === 'AbortError' ? 'Restore cancelled.' : (e as Error).message) + kept);
+    } finally {
+      abortRef.current = null;
+      setBusy(false);
+      setProgress(null);
+      if (fileRef.current) fileRef.current.value = '';
+    }
+  };
+
+  return (
+    <div className="space-y-3">
+      <label className="flex items-center gap-2 text-sm">
+        <input type="checkbox" checked={gzip} onChange={e => setGzip(e.target.checked)} />
+        Compress backup (gzip)
+      </label>
+      <div className="flex gap-2">
+        <Button onClick={runBackup} disabled={busy || historySize === 0}>Back up history</Button>
+        <Button variant="outline" onClick={() => fileRef.current?.click()} disabled={busy}>Restore from backup</Button>
+        {busy && abortRef.current && (
+          <Button variant="ghost" onClick={() => abortRef.current?.abort()}>Cancel</Button>
+        )}
+        <input
+          ref={fileRef}
+          type="file"
+          accept=".ndjson,.gz,application/x-ndjson,application/gzip"
+          aria-label="Backup file"
+          className="hidden"
+          onChange={e => {
+            const file = e.target.files?.[0];
+            if (file) runRestore(file);
+          }}
+        />
+      </div>
+      {progress && (
+        <div className="text-sm text-muted-foreground">
+          Restoring… {progress.read}{progress.total ? ` of ${progress.total}` : ''}
+        </div>
+      )}
+      {message && <div className="text-sm">{message}</div>}
+    </div>
+  );
+};
+
+export default Backup;
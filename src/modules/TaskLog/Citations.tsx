@@ -0,0 +1,70 @@
+import React, { useState, useSyncExternalStore } from 'react';
+import Input from '@/components/Input';
+import { citationIndex } from '@/services/citations';
+
+const plural = (count: number, word: string) => `${count} ${word}${count === 1 ? '' : 's'}`;
+
+/** Most cited domains; a domain opens its sources, a source lists the research citing it */
+export const Citations: React.FC<{ titleOf: (id: string) => string | undefined; onOpen: (id: string) => void }> = ({ titleOf, onOpen }) => {
+  useSyncExternalStore(
+    listener => citationIndex.subscribe(listener),
+    () => citationIndex.getVersion()
+  );
+  const [filter, setFilter] = useState('');
+  const [openDomain, setOpenDomain] = useState<string | null>(null);
+  const [openSource, setOpenSource] = useState<string | null>(null);
+
+  const filtered = filter.trim() ? citationIndex.domain(filter.trim()) : undefined;
+  const domains = filter.trim() ? (filtered ? [filtered] : []) : citationIndex.topDomains();
+
+  if (citationIndex.size === 0) return <p className="text-sm text-muted-foreground">No sources cited yet.</p>;
+
+  return (
+    <div className="space-y-2">
+      <Input aria-label="Find domain" placeholder="Look up a domain, e.g. nature.com" value={filter} onChange={e => setFilter(e.target.value)} />
+      {domains.length === 0 && <p className="text-sm text-muted-foreground">No research cites {filter.trim()}.</p>}
+      {domains.map(domain => (
+        <div key={domain.domain} className="border rounded-md">
+          <button
+            type="button"
+            className="flex w-full justify-between px-3 py-2 text-left hover:bg-accent/50"
+            onClick={() => setOpenDomain(openDomain === domain.domain ? null : domain.domain)}
+          >
+            <span className="font-medium">{domain.domain}</span>
+            <span className="text-xs text-muted-foreground">
+              {plural(domain.citedBy.size, 'report')} · {plural(domain.urls.size, 'source')}
+            </span>
+          </button>
+          {(openDomain === domain.domain || filtered) && (
+            <ul className="px-3 pb-2 space-y-1">
+              {[...domain.urls].map(url => {
+                const source = citationIndex.source(url)!;
+                return (
+                  <li key={url} className="text-sm">
+                    <button type="button" className="text-left underline" onClick={() => setOpenSource(openSource === url ? null : url)}>
+                      {source.title || url}
+                    </button>
+                    <span className="text-xs text-muted-foreground ml-2">cited {plural(source.citedBy.size, 'time')}</span>
+                    {openSource === url && (
+                      <ul className="ml-4 mt-1">
+                        {[...source.citedBy].map(id => (
+                          <li key={id}>
+                            <button type="button" className="text-primary text-xs underline" onClick={() => onOpen(id)}>
+                              {titleOf(id) ?? id}
+                            </button>
+                          </li>
+                        ))}
+                      </ul>
+                    )}
+                  </li>
+                );
+              })}
+            </ul>
+          )}
+        </div>
+      ))}
+    </div>
+  );
+};
+
+export default Citations;
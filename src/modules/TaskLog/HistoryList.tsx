@@ -0,0 +1,125 @@
+import React, { useCallback, useEffect, useMemo, useRef, useState } from 'react';
+import Select from '@/components/Select';
+import VirtualList from '@/components/VirtualList';
+import { researchMetaStore, type ResearchMeta, type ResearchQuery, type ResearchSort } from '@/services/research-meta';
+import type { Research } from '@/types/types';
+import { formatDate } from '@/utils/utils';
+
+const PAGE_SIZE = 100;
+// Pages kept in memory; older ones are dropped and re-read if scrolled back to
+const MAX_PAGES = 6;
+const ROW_HEIGHT = 56;
+const LIST_HEIGHT = 480;
+
+/**
+ * Rows of `query` read from the metadata store a page at a time as they
+ * come into view. At most MAX_PAGES pages are held, least recently
+ * shown dropped first, so memory stays flat however long the history is.
+ */
+function useResearchPages(query: ResearchQuery) {
+  const [count, setCount] = useState(0);
+  const [, setVersion] = useState(0);
+  const pages = useRef(new Map<number, ResearchMeta[]>());
+  const loading = useRef(new Set<number>());
+  const range = useRef<[number, number]>([0, 0]);
+  // Bumped on every reset so pages read for an older query are discarded
+  const generation = useRef(0);
+
+  const load = useCallback((first: number, last: number) => {
+    range.current = [first, last];
+    const gen = generation.current;
+    for (let page = Math.floor(first / PAGE_SIZE); page * PAGE_SIZE < last; page++) {
+      const cached = pages.current.get(page);
+      if (cached) {
+        // Re-insert to mark as recently used
+        pages.current.delete(page);
+        pages.current.set(page, cached);
+        continue;
+      }
+      if (loading.current.has(page)) continue;
+      loading.current.add(page);
+      researchMetaStore.page(query, page * PAGE_SIZE, PAGE_SIZE).then(rows => {
+        if (gen !== generation.current) return;
+        loading.current.delete(page);
+        pages.current.set(page, rows);
+        while (pages.current.size > MAX_PAGES) pages.current.delete(pages.current.keys().next().value!);
+        setVersion(v => v + 1);
+      }, () => loading.current.delete(page));
+    }
+  }, [query]);
+
+  useEffect(() => {
+    const reset = () => {
+      generation.current++;
+      pages.current.clear();
+      loading.current.clear();
+      researchMetaStore.count(query).then(setCount, () => {});
+      load(...range.current);
+    };
+    reset();
+    return researchMetaStore.subscribe(reset);
+  }, [query, load]);
+
+  const row = (index: number): ResearchMeta | undefined => pages.current.get(Math.floor(index / PAGE_SIZE))?.[index % PAGE_SIZE];
+
+  return { count, row, load };
+}
+
+export const HistoryList: React.FC<{ onOpen: (id: string) => void }> = ({ onOpen }) => {
+  const [sort, setSort] = useState<ResearchSort>('newest');
+  const [status, setStatus] = useState<Research['status'] | ''>('');
+  const query = useMemo<ResearchQuery>(() => ({ sort, status: status || undefined }), [sort, status]);
+  const { count, row, load } = useResearchPages(query);
+
+  return (
+    <div className="mt-4">
+      <div className="flex gap-2 mb-2">
+        <Select aria-label="Sort history" value={sort} onChange={e => setSort(e.target.value as ResearchSort)}>
+          <option value="newest">Newest first</option>
+          <option value="oldest">Oldest first</option>
+          <option value="cost">Most expensive</option>
+        </Select>
+        <Select aria-label="Filter by status" value={status} onChange={e => setStatus(e.target.value as Research['status'] | '')}>
+          <option value="">All statuses</option>
+          <option value="completed">Completed</option>
+          <option value="running">Running</option>
+          <option value="pending">Pending</option>
+          <option value="error">Failed</option>
+        </Select>
+      </div>
+      {count === 0 ? (
+        <p className="text-sm text-muted-foreground">No research yet.</p>
+      ) : (
+        <VirtualList
+          count={count}
+          itemHeight={ROW_HEIGHT}
+          height={LIST_HEIGHT}
+          onRangeChange={load}
+          className="border rounded-md"
+          role="list"
+          renderItem={(index, style) => {
+            const meta = row(index);
+            return (
+              <div key={index} style={style} role="listitem" className="border-b px-3 py-2">
+                {meta ? (
+                  <button type="button" className="block w-full text-left" onClick={() => onOpen(meta.id)}>
+                    <div className="font-medium truncate">{meta.title}</div>
+                    <div className="text-xs text-muted-foreground">
+                      {formatDate(meta.createdAt)} · {meta.status}
+                      {meta.model && ` · ${meta.model}`}
+                      {meta.cost > 0 && ` · $${meta.cost.toFixed(4)}`}
+                    </div>
+                  </button>
+                ) : (
+                  <div className="h-full animate-pulse bg-muted/50 rounded" />
+                )}
+              </div>
+            );
+          }}
+        />
+      )}
+    </div>
+  );
+};
+
+export default HistoryList;
@@ -1,14 +1,120 @@
-import React from 'react';
+import React, { useDeferredValue, useEffect, useState, useSyncExternalStore } from 'react';
 import Card from '@/components/Card';
+import Input from '@/components/Input';
+import ExportSync from '@/modules/ExportSync';
+import { useAppStore } from '@/store/app-store';
+import { buildSnippet, searchService, type SnippetPart } from '@/services/search';
+import type { Research } from '@/types/types';
+import { formatDate, researchPromptText } from '@/utils/utils';
+import Analytics from './Analytics';
+import Backup from './Backup';
+import Citations from './Citations';
+import HistoryList from './HistoryList';
+
+/** Snippet from the first field that contains a matched term */
+function researchSnippet(research: Research, terms: string[]): SnippetPart[] {
+  for (const text of [research.result?.report, researchPromptText(research.prompt)]) {
+    const parts = buildSnippet(text ?? '', terms);
+    if (parts.length) return parts;
+  }
+  return [];
+}
 
-// TODO: Implement research history, analytics, and export/backup functionality
 export const TaskLog: React.FC = () => {
+  // Narrow selectors: the log reads rows from the indexes and looks research up by id only when needed
+  const historySize = useAppStore(state => state.researchHistory.length);
+  const getResearch = useAppStore(state => state.getResearch);
+  const setCurrentResearch = useAppStore(state => state.setCurrentResearch);
+  const setUI = useAppStore(state => state.setUI);
+  const [query, setQuery] = useState('');
+  const deferredQuery = useDeferredValue(query.trim());
+  const [results, setResults] = useState<{ hits: Research[]; terms: string[] } | null>(null);
+  // Changes whenever history changes reach the search index, so an open search runs again
+  const indexVersion = useSyncExternalStore(
+    listener => searchService.subscribe(listener),
+    () => searchService.getVersion()
+  );
+
+  useEffect(() => {
+    if (!deferredQuery) {
+      setResults(null);
+      return;
+    }
+    const controller = new AbortController();
+    searchService.search(deferredQuery, { signal: controller.signal }).then(({ hits, terms }) => {
+      // The index can briefly hold research that was just deleted
+      setResults({ hits: hits.flatMap(hit => getResearch(hit.id) ?? []), terms });
+    }, () => {});
+    return () => controller.abort();
+  }, [deferredQuery, indexVersion, getResearch]);
+
+  const openResearch = (research: Research) => {
+    setCurrentResearch(research);
+    setUI({ currentTab: research.status === 'completed' ? 'results' : 'research' });
+  };
+
+  const openById = (id: string) => {
+    const research = getResearch(id);
+    if (research) openResearch(research);
+  };
+
+  const hits = results?.hits ?? [];
+
   return (
-    <Card>
-      <h2 className="text-xl font-semibold mb-2">Task Log</h2>
-      <p>Research history and analytics will be implemented here.</p>
-    </Card>
+    <div className="space-y-6">
+      <Card>
+        <h2 className="text-xl font-semibold mb-2">Task Log</h2>
+        <Input
+          type="search"
+          aria-label="Search research history"
+          placeholder={`Search ${historySize} research tasks...`}
+          value={query}
+          onChange={e => setQuery(e.target.value)}
+        />
+        {!results && (
+          <HistoryList onOpen={openById} />
+        )}
+        {results && (
+          <div className="mt-4 space-y-2">
+            {hits.length === 0 && <p className="text-sm text-muted-foreground">No research matches “{deferredQuery}”.</p>}
+            {hits.map(research => (
+              <button
+                key={research.id}
+                type="button"
+                className="block w-full text-left border rounded-md p-3 hover:bg-accent/50"
+                onClick={() => openResearch(research)}
+              >
+                <div className="flex justify-between gap-2">
+                  <span className="font-medium">{research.title}</span>
+                  <span className="text-xs text-muted-foreground whitespace-nowrap">
+                    {formatDate(research.createdAt)} · {research.status}
+                  </span>
+                </div>
+                <div className="text-sm text-muted-foreground mt-1">
+                  {researchSnippet(research, results.terms).map((part, i) =>
+                    part.match ? <mark key={i}>{part.text}</mark> : <React.Fragment key={i}>{part.text}</React.Fragment>
+                  )}
+                </div>
+              </button>
+            ))}
+          </div>
+        )}
+      </Card>
+      <Card>
+        <h2 className="text-xl font-semibold mb-2">Usage</h2>
+        <Analytics />
+      </Card>
+      <Card>
+        <h2 className="text-xl font-semibold mb-2">Sources</h2>
+        <Citations titleOf={id => getResearch(id)?.title} onOpen={openById} />
+      </Card>
+      <Card>
+        <h2 className="text-xl font-semibold mb-2">Backup</h2>
+        <Backup />
+      </Card>
+      <ExportSync />
+    </div>
   );
 };
 
-export default TaskLog; 
\ No newline at end of file
+export default TaskLog;
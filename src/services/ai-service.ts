@@ -1,5 +1,7 @@
 import type { PromptConfig, DeepResearchPromptConfig } from '@/types/types'
 import { safeParseJSON } from '@/utils/utils'
+import { calculateCost } from '@/services/model-catalog'
+import { responseCache, type CachedResponse } from '@/services/response-cache'
 
 function mapStatus(apiStatus: string | undefined): 'running' | 'completed' | 'failed' {
   switch (apiStatus) {
@@ -39,51 +41,65 @@ class AIService {
     }
   }
 
-  async generatePrompt(config: PromptConfig): Promise<string> {
+  get isConfigured(): boolean {
+    return this.isOpenRouter && !!this.openRouterConfig
+  }
+
+  async generatePrompt(config: PromptConfig, signal?: AbortSignal): Promise<string> {
     if (this.isOpenRouter && this.openRouterConfig) {
       // Use OpenRouter's /chat/completions endpoint
       const promptEnhancementPrompt = `You are a research prompt specialist. Create a high-quality, detailed research prompt based on the following requirements:\n\nGoal: ${config.goal}\nScope: ${config.scope}\nConstraints: ${config.constraints}\nDepth Level: ${config.depth}\n\nCreate a clear, specific prompt that will guide a research AI to produce comprehensive, well-cited results. The prompt should be concise but information-rich, following best practices for AI research tasks.\n\nReturn only the optimized research prompt, nothing else.`;
-      const res = await fetch(`${this.openRouterConfig.baseUrl}/chat/completions`, {
-        method: 'POST',
-        headers: {
-          'Authorization': `Bearer ${this.openRouterConfig.apiKey}`,
-          'Content-Type': 'application/json',
-          'HTTP-Referer': window.location.origin,
-          'X-Title': 'Research Agent',
-        },
-        body: JSON.stringify({
-          model: config.model,
-          messages: [
-            { role: 'user', content: promptEnhancementPrompt },
-          ],
-          max_tokens: config.maxTokens || 500,
-          temperature: 0.3,
-        }),
-      });
-      if (!res.ok) throw new Error('Failed to generate prompt');
-      const data = await safeParseJSON(res);
-      return data.choices?.[0]?.message?.content || config.goal;
+      const response = await this.chatCompletion({
+        model: config.model,
+        messages: [
+          { role: 'user', content: promptEnhancementPrompt },
+        ],
+        max_tokens: config.maxTokens || 500,
+        temperature: 0.3,
+      }, 'Failed to generate prompt', signal);
+      return response.content || config.goal;
     }
     throw new Error('OpenAI client not initialized');
   }
 
-  async runChatCompletion(payload: { model: string; messages: any[]; max_tokens?: number }): Promise<string> {
+  async runChatCompletion(payload: { model: string; messages: any[]; max_tokens?: number; temperature?: number }, signal?: AbortSignal): Promise<string> {
     if (this.isOpenRouter && this.openRouterConfig) {
-      const res = await fetch(`${this.openRouterConfig.baseUrl}/chat/completions`, {
+      const response = await this.chatCompletion(payload, 'Failed to run completion', signal);
+      return response.content;
+    }
+    throw new Error('OpenAI client not initialized');
+  }
+
+  /**
+   * POST to /chat/completions through the response cache, so identical
+   * payloads are answered from IndexedDB and concurrent ones share a request
+   */
+  private chatCompletion(
+    payload: { model: string; messages: any[]; max_tokens?: number; temperature?: number },
+    errorMessage: string,
+    signal?: AbortSignal
+  ): Promise<CachedResponse> {
+    const config = this.openRouterConfig!;
+    return responseCache.fetch({ endpoint: 'chat/completions', baseUrl: config.baseUrl, ...payload }, async requestSignal => {
+      const res = await fetch(`${config.baseUrl}/chat/completions`, {
         method: 'POST',
         headers: {
-          'Authorization': `Bearer ${this.openRouterConfig.apiKey}`,
+          'Authorization': `Bearer ${config.apiKey}`,
           'Content-Type': 'application/json',
           'HTTP-Referer': window.location.origin,
           'X-Title': 'Research Agent',
         },
         body: JSON.stringify(payload),
+        signal: requestSignal,
       });
-      if (!res.ok) throw new Error('Failed to run completion');
+      if (!res.ok) throw new Error(errorMessage);
       const data = await safeParseJSON(res);
-      return data.choices?.[0]?.message?.content || '';
-    }
-    throw new Error('OpenAI client not initialized');
+      const usage = data.usage ?? {};
+      return {
+        content: data.choices?.[0]?.message?.content || '',
+        cost: calculateCost(usage.prompt_tokens ?? 0, usage.completion_tokens ?? 0, payload.model),
+      };
+    }, signal);
   }
 
   async runDeepResearch(payload: { model: string; input: any[]; max_tokens?: number }): Promise<{
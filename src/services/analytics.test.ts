@@ -0,0 +1,90 @@
+import { describe, it, expect } from 'vitest'
+import { RollupTable, UsageAnalytics, dayNumber, contribution } from './analytics'
+import { IdbStore } from './idb'
+import type { Research } from '@/types/types'
+
+const research = (id: string, status: Research['status'], totalCost = 0, model = 'o3-deep-research'): Research => ({
+  id,
+  title: id,
+  prompt: JSON.stringify({ model, input: [] }),
+  status,
+  createdAt: '2024-03-10T12:00:00.000Z',
+  cost: { inputTokens: 100, outputTokens: 50, totalCost },
+})
+
+describe('RollupTable', () => {
+  it('grows its columns and round-trips through a snapshot', () => {
+    const table = new RollupTable<number>()
+    for (let day = 0; day < 200; day++) table.apply(day, contribution(research(`r${day}`, 'completed', 1)), 1)
+    expect(table.length).toBe(200)
+    const copy = new RollupTable(table.snapshot())
+    expect(copy.value(150, 'spend')).toBe(1)
+    expect(copy.columns.spend).toHaveLength(200)
+  })
+})
+
+describe('UsageAnalytics', () => {
+  // A store per test, since the databases outlive a test wherever IndexedDB is real
+  const create = async (name: string) => {
+    const analytics = new UsageAnalytics(`analytics-test-${name}`)
+    await analytics.restore()
+    return analytics
+  }
+
+  it('applies state transitions as deltas', async () => {
+    const analytics = await create('deltas')
+    const pending = research('a', 'pending')
+    analytics.sync([pending, research('b', 'error', 0, 'gpt-4.1')])
+    const day = dayNumber(pending.createdAt)
+    expect(analytics.days.value(day, 'runs')).toBe(2)
+    expect(analytics.days.value(day, 'completed')).toBe(0)
+
+    const done = { ...pending, status: 'completed' as const, cost: { inputTokens: 1000, outputTokens: 500, totalCost: 0.75 } }
+    analytics.sync([done, research('b', 'error', 0, 'gpt-4.1')])
+    expect(analytics.days.value(day, 'runs')).toBe(2)
+    expect(analytics.days.value(day, 'completed')).toBe(1)
+    expect(analytics.days.value(day, 'spend')).toBeCloseTo(0.75)
+    expect(analytics.models.value('o3-deep-research', 'inputTokens')).toBe(1000)
+    expect(analytics.models.value('gpt-4.1', 'failed')).toBe(1)
+
+    analytics.sync([done])
+    expect(analytics.days.value(day, 'runs')).toBe(1)
+    expect(analytics.models.value('gpt-4.1', 'runs')).toBe(0)
+  })
+
+  it('notifies subscribers only when something changed', async () => {
+    const analytics = await create('notify')
+    const history = [research('a', 'completed', 1)]
+    analytics.sync(history)
+    let calls = 0
+    analytics.subscribe(() => calls++)
+    analytics.sync([...history])
+    expect(calls).toBe(0)
+    analytics.sync([research('a', 'completed', 2)])
+    expect(calls).toBe(1)
+  })
+
+  it('starts the next session from the persisted tables and counts only what changed', async () => {
+    await new IdbStore('analytics-test-seed', { version: 2 }).clear()
+    const first = await create('seed')
+    const pending = research('b', 'pending')
+    first.sync([research('a', 'completed', 1), pending, research('c', 'error', 0, 'gpt-4.1')])
+    await first.persist()
+
+    const second = new UsageAnalytics('analytics-test-seed')
+    const day = dayNumber(pending.createdAt)
+    // The first sync waits for the restore, then deletes c and completes b
+    second.sync([research('a', 'completed', 1), { ...pending, status: 'completed', cost: { inputTokens: 10, outputTokens: 5, totalCost: 2 } }])
+    await second.restore()
+    expect(second.days.value(day, 'runs')).toBe(2)
+    expect(second.days.value(day, 'completed')).toBe(2)
+    expect(second.days.value(day, 'spend')).toBeCloseTo(3)
+    expect(second.models.value('gpt-4.1', 'runs')).toBe(0)
+
+    await second.persist()
+    const third = await create('seed')
+    expect(third.days.value(day, 'spend')).toBeCloseTo(3)
+    third.sync([])
+    expect(third.days.value(day, 'runs')).toBe(0)
+  })
+})
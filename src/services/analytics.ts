@@ -0,0 +1,244 @@
+import type { Research } from '@/types/types'
+import { IdbStore } from '@/services/idb'
+import { HistoryDiff, Subscribable } from '@/services/history-index'
+import { modelFromPrompt } from '@/utils/utils'
+
+const SNAPSHOT_KEY = 'rollups'
+// Rows of what each research was counted as are keyed by this plus its id
+const COUNTED_PREFIX = 'research:'
+// Bump when a metric's meaning changes; older snapshots are then ignored
+const SNAPSHOT_VERSION = 1
+const PERSIST_DELAY_MS = 1000
+const DAY_MS = 24 * 60 * 60 * 1000
+const INITIAL_CAPACITY = 64
+
+export const METRICS = ['runs', 'completed', 'failed', 'spend', 'inputTokens', 'outputTokens'] as const
+export type Metric = (typeof METRICS)[number]
+export type Contribution = Record<Metric, number>
+
+/** Days since the epoch in local time, the row key of daily rollups */
+export function dayNumber(date: string | Date): number {
+  const time = new Date(date)
+  return Math.floor((time.getTime() - time.getTimezoneOffset() * 60_000) / DAY_MS)
+}
+
+export function dayDate(day: number): Date {
+  const utc = new Date(day * DAY_MS)
+  return new Date(utc.getTime() + utc.getTimezoneOffset() * 60_000)
+}
+
+/** What one research adds to the rollups in its current state */
+export function contribution(research: Research): Contribution {
+  return {
+    runs: 1,
+    completed: research.status === 'completed' ? 1 : 0,
+    failed: research.status === 'error' ? 1 : 0,
+    spend: research.cost?.totalCost ?? 0,
+    inputTokens: research.cost?.inputTokens ?? 0,
+    outputTokens: research.cost?.outputTokens ?? 0,
+  }
+}
+
+export interface RollupTableSnapshot<K> {
+  keys: K[]
+  columns: Record<Metric, Float64Array>
+}
+
+/** One row per key with a typed-array column per metric */
+export class RollupTable<K extends string | number> {
+  keys: K[] = []
+  columns: Record<Metric, Float64Array>
+  private rows = new Map<K, number>()
+
+  constructor(snapshot?: RollupTableSnapshot<K>) {
+    if (snapshot) {
+      this.keys = [...snapshot.keys]
+      this.columns = snapshot.columns
+      this.keys.forEach((key, row) => this.rows.set(key, row))
+    } else {
+      this.columns = Object.fromEntries(METRICS.map(metric => [metric, new Float64Array(INITIAL_CAPACITY)])) as Record<Metric, Float64Array>
+    }
+  }
+
+  get length(): number {
+    return this.keys.length
+  }
+
+  row(key: K): number | undefined {
+    return this.rows.get(key)
+  }
+
+  value(key: K, metric: Metric): number {
+    const row = this.rows.get(key)
+    return row === undefined ? 0 : this.columns[metric][row]
+  }
+
+  apply(key: K, delta: Contribution, sign: 1 | -1): void {
+    let row = this.rows.get(key)
+    if (row === undefined) {
+      row = this.keys.length
+      if (row === this.columns.runs.length) this.grow()
+      this.keys.push(key)
+      this.rows.set(key, row)
+    }
+    for (const metric of METRICS) this.columns[metric][row] += sign * delta[metric]
+  }
+
+  snapshot(): RollupTableSnapshot<K> {
+    const columns = Object.fromEntries(METRICS.map(metric => [metric, this.columns[metric].slice(0, this.length)])) as Record<Metric, Float64Array>
+    return { keys: [...this.keys], columns }
+  }
+
+  private grow(): void {
+    for (const metric of METRICS) {
+      const column = new Float64Array(Math.max(INITIAL_CAPACITY, this.columns[metric].length * 2))
+      column.set(this.columns[metric])
+      this.columns[metric] = column
+    }
+  }
+}
+
+interface RollupsSnapshot {
+  version: number
+  days: RollupTableSnapshot<number>
+  models: RollupTableSnapshot<string>
+}
+
+/** What a research was counted as: enough to take it back out, and to tell whether it changed */
+export interface Counted {
+  day: number
+  model: string
+  delta: Contribution
+}
+
+const sameContribution = (a: Contribution, b: Contribution) => METRICS.every(metric => a[metric] === b[metric])
+
+/**
+ * Usage rollups per day and per model. Changes are applied as the
+ * difference between a research's old and new contribution, so a status
+ * transition costs a few array writes. The tables are persisted together
+ * with what each research was counted as, so a new session starts from
+ * them and the first sync only counts research added, changed or deleted
+ * since; unchanged research is matched without parsing its prompt.
+ */
+export class UsageAnalytics extends Subscribable {
+  days = new RollupTable<number>()
+  models = new RollupTable<string>()
+  private store: IdbStore<RollupsSnapshot | Counted>
+  private history = new HistoryDiff<Counted>()
+  // Research the restored tables counted that no sync has matched yet
+  private seeded = new Map<string, Counted>()
+  // Research whose counted row changed since the last write
+  private dirty = new Set<string>()
+  private restored: Promise<void> | null = null
+  private ready = false
+  private latest: Research[] | null = null
+  private persistTimer: ReturnType<typeof setTimeout> | null = null
+
+  constructor(storeName = 'usage-rollups') {
+    super()
+    // Version 2 added the counted rows; upgrading drops tables saved without them
+    this.store = new IdbStore<RollupsSnapshot | Counted>(storeName, { version: 2 })
+  }
+
+  /** Load the persisted tables; the first sync waits for this */
+  restore(): Promise<void> {
+    if (!this.restored) {
+      this.restored = this.load()
+        .catch(() => {})
+        .then(() => {
+          this.ready = true
+        })
+    }
+    return this.restored
+  }
+
+  sync(history: Research[]): void {
+    if (this.ready) return this.update(history)
+    const first = !this.latest
+    this.latest = history
+    if (first) this.restore().then(() => this.update(this.latest!))
+  }
+
+  /** Write the tables and changed rows now instead of after the debounce */
+  async persist(): Promise<void> {
+    if (this.persistTimer) clearTimeout(this.persistTimer)
+    this.persistTimer = null
+    const ids = [...this.dirty]
+    this.dirty.clear()
+    const puts: Array<[string, RollupsSnapshot | Counted]> = [
+      [SNAPSHOT_KEY, { version: SNAPSHOT_VERSION, days: this.days.snapshot(), models: this.models.snapshot() }],
+    ]
+    const deletes: string[] = []
+    for (const id of ids) {
+      const counted = this.history.get(id)?.data
+      if (counted) puts.push([COUNTED_PREFIX + id, counted])
+      else deletes.push(COUNTED_PREFIX + id)
+    }
+    // Tables and rows are written in one transaction so they never disagree
+    await this.store.update(puts, deletes).catch(() => ids.forEach(id => this.dirty.add(id)))
+  }
+
+  private async load(): Promise<void> {
+    const entries = await this.store.entries()
+    const tables = entries.find(([key]) => key === SNAPSHOT_KEY)?.[1] as RollupsSnapshot | undefined
+    if (tables?.version !== SNAPSHOT_VERSION) {
+      // Rows without matching tables cannot be trusted; the first sync recounts and rewrites them
+      if (entries.length) await this.store.clear()
+      return
+    }
+    this.days = new RollupTable(tables.days)
+    this.models = new RollupTable(tables.models)
+    for (const [key, value] of entries) {
+      if (key.startsWith(COUNTED_PREFIX)) this.seeded.set(key.slice(COUNTED_PREFIX.length), value as Counted)
+    }
+    this.notify()
+  }
+
+  private update(history: Research[]): void {
+    const { added, changed, removed, empty } = this.history.diff(history)
+    if (empty && !this.seeded.size) return
+    for (const research of added) {
+      const seeded = this.seeded.get(research.id)
+      if (seeded) {
+        this.seeded.delete(research.id)
+        if (seeded.day === dayNumber(research.createdAt) && sameContribution(seeded.delta, contribution(research))) {
+          this.history.track(research.id, seeded)
+          continue
+        }
+        this.count(seeded, -1, research.id)
+      }
+      this.count(this.counted(research), 1, research.id)
+    }
+    changed.forEach(({ research, previous }) => {
+      this.count(previous.data!, -1, research.id)
+      // The prompt is fixed at creation, so the model is only parsed again if it differs
+      const model = research.prompt === previous.research.prompt ? previous.data!.model : undefined
+      this.count(this.counted(research, model), 1, research.id)
+    })
+    removed.forEach(({ research, data }) => this.count(data!, -1, research.id))
+    // Counted in the persisted tables but deleted since
+    this.seeded.forEach((counted, id) => this.count(counted, -1, id))
+    this.seeded.clear()
+    this.notify()
+    this.schedulePersist()
+  }
+
+  private counted(research: Research, model = modelFromPrompt(research.prompt) || 'unknown'): Counted {
+    return { day: dayNumber(research.createdAt), model, delta: contribution(research) }
+  }
+
+  private count(counted: Counted, sign: 1 | -1, id: string): void {
+    this.days.apply(counted.day, counted.delta, sign)
+    this.models.apply(counted.model, counted.delta, sign)
+    if (sign === 1) this.history.track(id, counted)
+    this.dirty.add(id)
+  }
+
+  private schedulePersist(): void {
+    if (this.persistTimer) clearTimeout(this.persistTimer)
+    this.persistTimer = setTimeout(() => this.persist(), PERSIST_DELAY_MS)
+  }
+}
+
+export const usageAnalytics = new UsageAnalytics()
@@ -0,0 +1,131 @@
+import type { Research } from '@/types/types'
+import { fileSystemService } from '@/services/file-system'
+import { sleep } from '@/utils/utils'
+import { GZIP_MIME_TYPE, NDJSON_MIME_TYPE, backupStream, parseBackup, type RestoreBatch } from './ndjson'
+
+// New records are inserted once this many have been read, so a restore holds
+// at most this many at a time and history is persisted only every few batches
+export const RESTORE_INSERT_SIZE = 2000
+
+export { backupLines, backupStream, parseBackup, BACKUP_FORMAT, BACKUP_VERSION, type BackupHeader, type RestoreBatch } from './ndjson'
+
+// Pull protocol between restoreBatches and the restore worker: the main
+// thread asks for the next batch only once the previous one is stored
+export type RestoreWorkerRequest = { type: 'start'; file: Blob } | { type: 'pull' }
+
+export type RestoreWorkerResponse =
+  | ({ type: 'batch' } & RestoreBatch)
+  | { type: 'end' }
+  | { type: 'error'; message: string }
+
+export interface RestoreProgress {
+  /** Valid records read so far, new or not */
+  read: number
+  /** Records inserted into history so far */
+  added: number
+  /** Records skipped because their id is already in history */
+  duplicates: number
+  invalid: number
+  /** Records the backup says it holds */
+  total: number
+}
+
+export interface RestoreOptions {
+  /** Ids already in history; records with these ids are skipped */
+  existingIds: Iterable<string>
+  /**
+   * Store new records, up to `insertSize` at a time, so history is
+   * persisted and re-indexed every few batches rather than after each one.
+   * May throw if storage refuses the write.
+   */
+  insert: (records: Research[]) => void
+  insertSize?: number
+  onProgress?: (progress: RestoreProgress) => void
+  signal?: AbortSignal
+}
+
+export function backupFilename(gzip: boolean, date: Date = new Date()): string {
+  return `research-backup-${date.toISOString().slice(0, 10)}.ndjson${gzip ? '.gz' : ''}`
+}
+
+/** Stream every research to a file chosen in the save dialog; records are serialized a chunk at a time, never copied */
+export async function backupHistory(history: readonly Research[], { gzip = false }: { gzip?: boolean } = {}): Promise<void> {
+  await fileSystemService.saveStream(backupFilename(gzip), backupStream(history, { gzip }), gzip ? GZIP_MIME_TYPE : NDJSON_MIME_TYPE)
+}
+
+/** Batches of records from a backup file, parsed in a worker where available */
+export async function* restoreBatches(file: Blob, { signal }: { signal?: AbortSignal } = {}): AsyncGenerator<RestoreBatch> {
+  if (typeof Worker === 'undefined') {
+    for await (const batch of parseBackup(file.stream())) {
+      signal?.throwIfAborted()
+      yield batch
+    }
+    return
+  }
+
+  const worker = new Worker(new URL('./worker.ts', import.meta.url), { type: 'module' })
+  const pullRequest: RestoreWorkerRequest = { type: 'pull' }
+  const pull = () =>
+    new Promise<RestoreWorkerResponse>((resolve, reject) => {
+      worker.onmessage = (event: MessageEvent<RestoreWorkerResponse>) => resolve(event.data)
+      worker.onerror = event => reject(new Error(event.message || 'Restore worker crashed'))
+      worker.postMessage(pullRequest)
+    })
+  try {
+    const start: RestoreWorkerRequest = { type: 'start', file }
+    worker.postMessage(start)
+    for (;;) {
+      signal?.throwIfAborted()
+      const message = await pull()
+      if (message.type === 'end') return
+      if (message.type === 'error') throw new Error(message.message)
+      yield { records: message.records, invalid: message.invalid, total: message.total }
+    }
+  } finally {
+    worker.terminate()
+  }
+}
+
+/**
+ * Restore a backup into history, skipping ids that are already present,
+ * including repeats within the backup itself. Batches are parsed and
+ * reported as they arrive, yielding to the browser in between so the UI
+ * stays responsive. New records are inserted `insertSize` at a time; on a
+ * cancel or error, inserted records stay in history, the ones not yet
+ * inserted are dropped, and `onProgress` has last reported the count kept.
+ */
+export async function restoreHistory(
+  file: Blob,
+  { existingIds, insert, insertSize = RESTORE_INSERT_SIZE, onProgress, signal }: RestoreOptions
+): Promise<RestoreProgress> {
+  const seen = new Set(existingIds)
+  const progress: RestoreProgress = { read: 0, added: 0, duplicates: 0, invalid: 0, total: 0 }
+  let pending: Research[] = []
+  const flush = () => {
+    insert(pending)
+    progress.added += pending.length
+    pending = []
+  }
+
+  for await (const batch of restoreBatches(file, { signal })) {
+    for (const research of batch.records) {
+      if (seen.has(research.id)) {
+        progress.duplicates++
+      } else {
+        seen.add(research.id)
+        pending.push(research)
+        if (pending.length === insertSize) flush()
+      }
+    }
+    progress.read += batch.records.length
+    progress.invalid += batch.invalid
+    progress.total = batch.total
+    onProgress?.({ ...progress })
+    await sleep(0)
+  }
+  // A cancel after the last batch still drops what was not inserted
+  signal?.throwIfAborted()
+  if (pending.length) flush()
+  onProgress?.({ ...progress })
+  return progress
+}
@@ -0,0 +1,91 @@
+import { describe, it, expect, vi } from 'vitest'
+import type { Research } from '@/types/types'
+import { backupStream, parseBackup, type RestoreBatch } from './ndjson'
+import { restoreHistory, type RestoreProgress } from './index'
+
+const research = (id: string): Research => ({
+  id,
+  title: `Research ${id}`,
+  prompt: '{"model":"o3-deep-research"}',
+  status: 'completed',
+  createdAt: '2024-01-01T00:00:00.000Z',
+  result: { report: `Report ${id}\nwith "quotes" and a second line`, thoughtProcess: '', sources: [] },
+})
+
+async function toBlob(chunks: AsyncIterable<Uint8Array>): Promise<Blob> {
+  const parts: Uint8Array[] = []
+  for await (const chunk of chunks) parts.push(chunk)
+  return new Blob(parts)
+}
+
+async function collect(batches: AsyncIterable<RestoreBatch>): Promise<RestoreBatch[]> {
+  const all: RestoreBatch[] = []
+  for await (const batch of batches) all.push(batch)
+  return all
+}
+
+describe('backup NDJSON', () => {
+  const history = Array.from({ length: 25 }, (_, i) => research(`r${i}`))
+
+  it('round-trips records in batches', async () => {
+    const blob = await toBlob(backupStream(history))
+    const batches = await collect(parseBackup(blob.stream(), 10))
+    expect(batches.map(batch => batch.records.length)).toEqual([10, 10, 5])
+    expect(batches[0].total).toBe(25)
+    expect(batches.flatMap(batch => batch.records)).toEqual(history)
+  })
+
+  it('detects and inflates gzip backups', async () => {
+    const blob = await toBlob(backupStream(history, { gzip: true }))
+    const bytes = new Uint8Array(await blob.arrayBuffer())
+    expect([bytes[0], bytes[1]]).toEqual([0x1f, 0x8b])
+    const batches = await collect(parseBackup(blob.stream()))
+    expect(batches.flatMap(batch => batch.records).map(r => r.id)).toEqual(history.map(r => r.id))
+  })
+
+  it('counts unreadable lines and rejects files that are not backups', async () => {
+    const header = JSON.stringify({ format: 'research-wrapper-backup', version: 1, count: 2 })
+    const text = `${header}\n${JSON.stringify(research('a'))}\n{broken\n{"id":1}\n`
+    const [batch] = await collect(parseBackup(new Blob([text]).stream()))
+    expect(batch.records.map(r => r.id)).toEqual(['a'])
+    expect(batch.invalid).toBe(2)
+    await expect(collect(parseBackup(new Blob(['{"hello":1}\n']).stream()))).rejects.toThrow('Not a research backup file')
+  })
+
+  it('restores in batches and skips ids already present', async () => {
+    const blob = await toBlob(backupStream([...history, research('r0')]))
+    const insert = vi.fn()
+    const result = await restoreHistory(blob, { existingIds: ['r1', 'r2'], insert })
+    expect(result).toMatchObject({ added: 23, duplicates: 3, invalid: 0, total: 26 })
+    const inserted = insert.mock.calls.flatMap(([records]) => records as Research[])
+    expect(inserted.map(r => r.id)).not.toContain('r1')
+    expect(new Set(inserted.map(r => r.id)).size).toBe(23)
+  })
+
+  it('inserts new records a bounded number at a time', async () => {
+    const blob = await toBlob(backupStream(history))
+    const insert = vi.fn()
+    await restoreHistory(blob, { existingIds: [], insert, insertSize: 10 })
+    expect(insert.mock.calls.map(([records]) => (records as Research[]).length)).toEqual([10, 10, 5])
+  })
+
+  it('keeps inserted records and drops the rest when cancelled', async () => {
+    const blob = await toBlob(backupStream(history))
+    const insert = vi.fn()
+    const controller = new AbortController()
+    const progress: RestoreProgress[] = []
+    const restoring = restoreHistory(blob, {
+      existingIds: [],
+      insert,
+      insertSize: 10,
+      signal: controller.signal,
+      onProgress: latest => {
+        progress.push(latest)
+        controller.abort()
+      },
+    })
+    await expect(restoring).rejects.toMatchObject({ name: 'AbortError' })
+    expect(insert.mock.calls.flatMap(([records]) => records as Research[])).toHaveLength(20)
+    expect(progress[progress.length - 1].added).toBe(20)
+  })
+})
@@ -0,0 +1,151 @@
+import type { Research } from '@/types/types'
+
+export const BACKUP_FORMAT = 'research-wrapper-backup'
+export const BACKUP_VERSION = 1
+export const NDJSON_MIME_TYPE = 'application/x-ndjson'
+export const GZIP_MIME_TYPE = 'application/gzip'
+
+// Lines are joined into chunks of about this many characters before writing
+const CHUNK_CHARS = 64 * 1024
+// Records handed to the store per restore batch
+export const RESTORE_BATCH_SIZE = 250
+
+/** First line of every backup */
+export interface BackupHeader {
+  format: typeof BACKUP_FORMAT
+  version: number
+  createdAt: string
+  count: number
+}
+
+const encoder = new TextEncoder()
+
+/** NDJSON text of a backup: the header line, then one research per line */
+export function* backupLines(history: readonly Research[], createdAt = new Date().toISOString()): Generator<string> {
+  const header: BackupHeader = { format: BACKUP_FORMAT, version: BACKUP_VERSION, createdAt, count: history.length }
+  let chunk = `${JSON.stringify(header)}\n`
+  for (const research of history) {
+    chunk += `${JSON.stringify(research)}\n`
+    if (chunk.length >= CHUNK_CHARS) {
+      yield chunk
+      chunk = ''
+    }
+  }
+  if (chunk) yield chunk
+}
+
+/** Encoded backup bytes, gzip-compressed while they are produced if asked */
+export async function* backupStream(history: readonly Research[], { gzip = false }: { gzip?: boolean } = {}): AsyncGenerator<Uint8Array> {
+  if (!gzip) {
+    for (const chunk of backupLines(history)) yield encoder.encode(chunk)
+    return
+  }
+  const stream = new CompressionStream('gzip')
+  const writer = stream.writable.getWriter()
+  const pump = (async () => {
+    try {
+      for (const chunk of backupLines(history)) {
+        await writer.ready
+        await writer.write(encoder.encode(chunk))
+      }
+      await writer.close()
+    } catch (error) {
+      await writer.abort(error).catch(() => {})
+      throw error
+    }
+  })()
+  const reader = stream.readable.getReader()
+  try {
+    for (;;) {
+      const { value, done } = await reader.read()
+      if (done) break
+      yield value
+    }
+  } finally {
+    reader.releaseLock()
+  }
+  await pump
+}
+
+function isResearch(value: any): value is Research {
+  return (
+    !!value &&
+    typeof value.id === 'string' &&
+    typeof value.title === 'string' &&
+    typeof value.prompt === 'string' &&
+    typeof value.status === 'string' &&
+    typeof value.createdAt === 'string'
+  )
+}
+
+/** Bytes of a backup file, gunzipped when they start with the gzip magic number */
+async function openBackup(stream: ReadableStream<Uint8Array>): Promise<ReadableStream<Uint8Array>> {
+  const [probe, body] = stream.tee()
+  const reader = probe.getReader()
+  const { value } = await reader.read()
+  reader.cancel().catch(() => {})
+  const gzipped = !!value && value.length >= 2 && value[0] === 0x1f && value[1] === 0x8b
+  return gzipped ? body.pipeThrough(new DecompressionStream('gzip') as unknown as ReadableWritablePair<Uint8Array, Uint8Array>) : body
+}
+
+export interface RestoreBatch {
+  records: Research[]
+  /** Lines that were not a valid research record */
+  invalid: number
+  /** Record count from the backup header */
+  total: number
+}
+
+/**
+ * Parse a backup as it is read, yielding batches of records. Only the
+ * current batch and one partial line are ever held, whatever the file size.
+ */
+export async function* parseBackup(stream: ReadableStream<Uint8Array>, batchSize = RESTORE_BATCH_SIZE): AsyncGenerator<RestoreBatch> {
+  const reader = (await openBackup(stream)).getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let line = 0
+  let total = 0
+  let batch: RestoreBatch = { records: [], invalid: 0, total }
+
+  const take = (text: string) => {
+    if (!text.trim()) return
+    line++
+    let value: any
+    try {
+      value = JSON.parse(text)
+    } catch {
+      if (line === 1) throw new Error('Not a research backup file')
+      batch.invalid++
+      return
+    }
+    if (line === 1) {
+      if (value?.format !== BACKUP_FORMAT) throw new Error('Not a research backup file')
+      if (value.version > BACKUP_VERSION) throw new Error('Backup was made by a newer version of the app')
+      total = batch.total = Number(value.count) || 0
+      return
+    }
+    if (isResearch(value)) batch.records.push(value)
+    else batch.invalid++
+  }
+
+  for (;;) {
+    const { value, done } = await reader.read()
+    buffer += done ? decoder.decode() : decoder.decode(value, { stream: true })
+    let start = 0
+    let newline: number
+    while ((newline = buffer.indexOf('\n', start)) >= 0) {
+      take(buffer.slice(start, newline))
+      start = newline + 1
+      if (batch.records.length >= batchSize) {
+        yield batch
+        batch = { records: [], invalid: 0, total }
+      }
+    }
+    buffer = buffer.slice(start)
+    if (done) break
+  }
+  take(buffer)
+  if (line === 0) throw new Error('Backup file is empty')
+  if (batch.records.length || batch.invalid) yield batch
+}
@@ -0,0 +1,24 @@
+// Worker that parses a backup file, handing out one batch of records per
+// pull request, so the store insert paces reading and parsing.
+import { parseBackup, type RestoreBatch } from './ndjson'
+import type { RestoreWorkerRequest, RestoreWorkerResponse } from './index'
+
+const ctx = self as unknown as Worker
+
+const post = (message: RestoreWorkerResponse) => ctx.postMessage(message)
+
+let batches: AsyncGenerator<RestoreBatch> | null = null
+
+ctx.addEventListener('message', async (event: MessageEvent<RestoreWorkerRequest>) => {
+  const message = event.data
+  if (message.type === 'start') {
+    batches = parseBackup(message.file.stream())
+    return
+  }
+  try {
+    const next = await batches!.next()
+    post(next.done ? { type: 'end' } : { type: 'batch', ...next.value })
+  } catch (error) {
+    post({ type: 'error', message: (error as Error).message || 'Restore failed' })
+  }
+})
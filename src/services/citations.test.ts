@@ -0,0 +1,58 @@
+import { describe, it, expect } from 'vitest'
+import type { Research, Source } from '@/types/types'
+import { CitationIndex, normalizeUrl, packSources, unpackSources } from './citations'
+
+const source = (url: string, title = 'Page'): Source => ({ id: 's1', title, url, snippet: 'Snippet', citedAt: '2024-01-01T00:00:00.000Z' })
+
+const research = (id: string, sources: Source[]): Research => ({
+  id,
+  title: id,
+  prompt: '',
+  status: 'completed',
+  createdAt: '2024-01-01T00:00:00.000Z',
+  result: { report: '', thoughtProcess: '', sources },
+})
+
+describe('normalizeUrl', () => {
+  it('drops noise that does not change the page', () => {
+    expect(normalizeUrl('http://WWW.Example.com:443/a/b/?utm_source=x&b=2&a=1#section')).toBe('https://example.com/a/b?a=1&b=2')
+    expect(normalizeUrl('https://example.com/')).toBe('https://example.com')
+    expect(normalizeUrl(' not a url ')).toBe('not a url')
+  })
+})
+
+describe('CitationIndex', () => {
+  it('counts citations by URL and domain and follows updates and deletes', () => {
+    const index = new CitationIndex()
+    const a = research('a', [source('https://nature.com/x'), source('https://www.nature.com/y?utm_medium=email')])
+    const b = research('b', [source('https://nature.com/x/')])
+    index.sync([a, b])
+    expect(index.source('http://nature.com/x')?.citedBy).toEqual(new Set(['a', 'b']))
+    expect(index.domain('www.nature.com')?.urls.size).toBe(2)
+    expect(index.topDomains()[0].citedBy.size).toBe(2)
+
+    index.sync([a, research('b', [source('https://arxiv.org/abs/1')])])
+    expect(index.source('https://nature.com/x')?.citedBy).toEqual(new Set(['a']))
+    expect(index.domain('arxiv.org')?.citedBy.has('b')).toBe(true)
+
+    index.sync([research('b', [source('https://arxiv.org/abs/1')])])
+    expect(index.domain('nature.com')).toBeUndefined()
+    expect(index.size).toBe(1)
+  })
+})
+
+describe('packSources', () => {
+  it('stores a source cited by several reports once and restores it', () => {
+    const shared = source('https://nature.com/x')
+    const history = [research('a', [shared]), research('b', [{ ...shared, id: 's2', citedAt: '2024-02-01T00:00:00.000Z' }])]
+    const { history: packed, sources } = packSources(history)
+    expect(Object.keys(sources)).toHaveLength(1)
+    expect(JSON.stringify(packed)).not.toContain('nature.com')
+    expect(unpackSources(JSON.parse(JSON.stringify(packed)), sources)).toEqual(history)
+  })
+
+  it('passes histories stored before packing through', () => {
+    const history = [research('a', [source('https://nature.com/x')])]
+    expect(unpackSources(history)).toEqual(history)
+  })
+})
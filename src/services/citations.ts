@@ -0,0 +1,183 @@
+import type { Research, Source } from '@/types/types'
+import { HistoryDiff, Subscribable } from '@/services/history-index'
+import { hashString } from '@/utils/utils'
+
+// Query parameters that only track the click and never change the page
+const TRACKING_PARAMS = /^(utm_\w+|fbclid|gclid|msclkid|mc_cid|mc_eid|ref|ref_src)$/i
+
+/**
+ * Canonical form of a source URL: lowercase host without `www.`, no
+ * default port, fragment or tracking parameters, remaining parameters
+ * sorted and no trailing slash. Unparseable URLs are only trimmed.
+ */
+export function normalizeUrl(url: string): string {
+  let parsed: URL
+  try {
+    parsed = new URL(url.trim())
+  } catch {
+    return url.trim()
+  }
+  const host = parsed.hostname.toLowerCase().replace(/^www\./, '')
+  const port = parsed.port && !['80', '443'].includes(parsed.port) ? `:${parsed.port}` : ''
+  const params = [...parsed.searchParams].filter(([key]) => !TRACKING_PARAMS.test(key)).sort(([a], [b]) => a.localeCompare(b))
+  const query = params.length ? `?${new URLSearchParams(params)}` : ''
+  const path = parsed.pathname.replace(/\/+$/, '')
+  return `${parsed.protocol === 'http:' ? 'https:' : parsed.protocol}//${host}${port}${path}${query}`
+}
+
+/** Host of a normalized URL, or '' for URLs that could not be parsed */
+export function domainOf(normalizedUrl: string): string {
+  const match = /^[a-z][a-z0-9+.-]*:\/\/([^/?#:]+)/i.exec(normalizedUrl)
+  return match ? match[1] : ''
+}
+
+export interface CitedSource {
+  url: string
+  title: string
+  domain: string
+  /** Ids of the research citing this source */
+  citedBy: Set<string>
+}
+
+export interface CitedDomain {
+  domain: string
+  /** Normalized URLs cited on this domain */
+  urls: Set<string>
+  /** Research citing anything on this domain, with how many of its sources are here */
+  citedBy: Map<string, number>
+}
+
+/**
+ * Sources of all research keyed by normalized URL and by domain, so
+ * "who cited this" is a map lookup. `sync` is called with each new
+ * history array and only re-reads research whose object changed; each
+ * research remembers the URLs it contributed so they can be taken back.
+ */
+export class CitationIndex extends Subscribable {
+  private sources = new Map<string, CitedSource>()
+  private domains = new Map<string, CitedDomain>()
+  /** URLs each research contributed, so they can be taken back */
+  private contributed = new HistoryDiff<string[]>()
+
+  get size(): number {
+    return this.sources.size
+  }
+
+  source(url: string): CitedSource | undefined {
+    return this.sources.get(normalizeUrl(url))
+  }
+
+  domain(domain: string): CitedDomain | undefined {
+    return this.domains.get(domain.toLowerCase().replace(/^www\./, ''))
+  }
+
+  /** Domains cited by the most research, most first */
+  topDomains(limit = 20): CitedDomain[] {
+    return [...this.domains.values()].sort((a, b) => b.citedBy.size - a.citedBy.size || b.urls.size - a.urls.size).slice(0, limit)
+  }
+
+  sync(history: Research[]): void {
+    const { added, changed, removed } = this.contributed.diff(history)
+    // Sources only arrive with the result, so most updates leave them untouched
+    const recited = changed.filter(({ research, previous }) => previous.research.result?.sources !== research.result?.sources)
+    recited.forEach(({ research, previous }) => this.retract(research.id, previous.data ?? []))
+    removed.forEach(({ research, data }) => this.retract(research.id, data ?? []))
+    for (const research of [...added, ...recited.map(change => change.research)]) {
+      this.contributed.track(research.id, this.cite(research))
+    }
+    if (added.length || recited.length || removed.length) this.notify()
+  }
+
+  private cite(research: Research): string[] {
+    const urls = new Set<string>()
+    for (const source of research.result?.sources ?? []) {
+      if (!source.url) continue
+      const url = normalizeUrl(source.url)
+      if (urls.has(url)) continue
+      urls.add(url)
+      let cited = this.sources.get(url)
+      if (!cited) this.sources.set(url, (cited = { url, title: source.title, domain: domainOf(url), citedBy: new Set() }))
+      cited.citedBy.add(research.id)
+      if (!cited.domain) continue
+      let domain = this.domains.get(cited.domain)
+      if (!domain) this.domains.set(cited.domain, (domain = { domain: cited.domain, urls: new Set(), citedBy: new Map() }))
+      domain.urls.add(url)
+      domain.citedBy.set(research.id, (domain.citedBy.get(research.id) ?? 0) + 1)
+    }
+    return [...urls]
+  }
+
+  private retract(researchId: string, urls: string[]): void {
+    for (const url of urls) {
+      const cited = this.sources.get(url)
+      if (!cited) continue
+      cited.citedBy.delete(researchId)
+      const domain = this.domains.get(cited.domain)
+      if (domain) {
+        const count = (domain.citedBy.get(researchId) ?? 1) - 1
+        if (count > 0) domain.citedBy.set(researchId, count)
+        else domain.citedBy.delete(researchId)
+      }
+      if (cited.citedBy.size > 0) continue
+      this.sources.delete(url)
+      domain?.urls.delete(url)
+      if (domain && domain.urls.size === 0) this.domains.delete(domain.domain)
+    }
+  }
+}
+
+export const citationIndex = new CitationIndex()
+
+/** A source as persisted: per-citation fields plus a key into the shared source table */
+export interface SourceRef {
+  id: string
+  citedAt: string
+  ref: string
+}
+
+export type SourceTable = Record<string, Pick<Source, 'title' | 'url' | 'snippet'>>
+
+const isSourceRef = (source: Source | SourceRef): source is SourceRef => 'ref' in source
+
+// Sources are immutable once stored, so each one is hashed only the first time it is packed
+const sourceKeys = new WeakMap<Source, string>()
+
+function sourceKey(source: Source): string {
+  let key = sourceKeys.get(source)
+  if (key === undefined) {
+    key = hashString(`${normalizeUrl(source.url || '')}\n${source.title}\n${source.snippet}`)
+    sourceKeys.set(source, key)
+  }
+  return key
+}
+
+/**
+ * Replace each source with a reference into one table, so a page cited by
+ * many reports is stored once. Identical means same normalized URL, title
+ * and snippet; anything else is kept as its own entry.
+ */
+export function packSources(history: Research[]): { history: Research[]; sources: SourceTable } {
+  const sources: SourceTable = {}
+  const packed = history.map(research => {
+    if (!research.result?.sources?.length) return research
+    const refs = research.result.sources.map((source): SourceRef => {
+      const ref = sourceKey(source)
+      sources[ref] ??= { title: source.title, url: source.url, snippet: source.snippet }
+      return { id: source.id, citedAt: source.citedAt, ref }
+    })
+    return { ...research, result: { ...research.result, sources: refs as unknown as Source[] } }
+  })
+  return { history: packed, sources }
+}
+
+/** Inverse of `packSources`; histories stored before packing pass through unchanged */
+export function unpackSources(history: Research[], sources: SourceTable = {}): Research[] {
+  return history.map(research => {
+    const stored = research.result?.sources as Array<Source | SourceRef> | undefined
+    if (!stored?.some(isSourceRef)) return research
+    const unpacked = stored.map(source =>
+      isSourceRef(source) ? { id: source.id, citedAt: source.citedAt, title: '', url: '', snippet: '', ...sources[source.ref] } : source
+    )
+    return { ...research, result: { ...research.result!, sources: unpacked } }
+  })
+}
@@ -0,0 +1,33 @@
+import type { ExportProgress, Research } from '@/types/types'
+import { renderResearch } from './renderers'
+
+export interface ExportBuildOptions {
+  /** Sections default to included, matching the Results Viewer exports */
+  includeThoughtProcess?: boolean
+  includeSources?: boolean
+  onProgress?: (progress: ExportProgress) => void
+  signal?: AbortSignal
+}
+
+/** Formats whose output is binary and expensive enough to build off the main thread */
+export type BinaryExportFormat = 'pdf' | 'docx'
+
+export function buildExport(
+  format: BinaryExportFormat,
+  research: Research,
+  options: ExportBuildOptions = {}
+): Promise<ArrayBuffer> {
+  return renderResearch<Promise<ArrayBuffer>>(format, research, options)
+}
+
+// Message protocol between ExportService and the export worker
+export interface ExportWorkerRequest {
+  format: BinaryExportFormat
+  research: Research
+  options: Pick<ExportBuildOptions, 'includeThoughtProcess' | 'includeSources'>
+}
+
+export type ExportWorkerResponse =
+  | { type: 'progress'; progress: ExportProgress }
+  | { type: 'done'; buffer: ArrayBuffer }
+  | { type: 'error'; message: string }
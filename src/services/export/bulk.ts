@@ -0,0 +1,104 @@
+import type { ExportFormat, Research } from '@/types/types'
+import { fileSystemService, type ExportChunk } from '@/services/file-system'
+import { mapWithConcurrency } from '@/utils/utils'
+import { exportService, type ExportJobOptions } from './index'
+import { renderMarkdownChunks } from './markdown'
+
+const EXTENSIONS: Record<ExportFormat, string> = { markdown: 'md', pdf: 'pdf', docx: 'docx' }
+
+export interface BulkExportProgress {
+  total: number
+  completed: number
+  failed: number
+  bytesWritten: number
+  elapsedMs: number
+  /** Researches finished per minute so far */
+  throughput: number
+}
+
+export interface BulkExportOptions extends Pick<ExportJobOptions, 'includeThoughtProcess' | 'includeSources' | 'signal'> {
+  formats?: ExportFormat[]
+  concurrency?: number
+  onProgress?: (progress: BulkExportProgress) => void
+}
+
+export interface BulkExportResult extends BulkExportProgress {
+  errors: Array<{ id: string; title: string; message: string }>
+}
+
+/**
+ * Export many researches into dated folders under the selected export
+ * directory. Researches are processed concurrently up to `concurrency`;
+ * PDF/DOCX rendering runs in the export worker pool and every file is
+ * streamed to disk, so the UI stays responsive throughout.
+ */
+export async function bulkExport(
+  researches: Research[],
+  { formats = ['markdown', 'pdf'], concurrency = 4, onProgress, signal, ...renderOptions }: BulkExportOptions = {}
+): Promise<BulkExportResult> {
+  if (!fileSystemService.hasDirectory) {
+    await fileSystemService.selectExportDirectory()
+  }
+
+  const exportable = researches.filter(research => research.result)
+  const startedAt = performance.now()
+  const progress: BulkExportProgress = {
+    total: exportable.length,
+    completed: 0,
+    failed: 0,
+    bytesWritten: 0,
+    elapsedMs: 0,
+    throughput: 0,
+  }
+  const errors: BulkExportResult['errors'] = []
+
+  const report = () => {
+    progress.elapsedMs = performance.now() - startedAt
+    progress.throughput = progress.elapsedMs ? (progress.completed / progress.elapsedMs) * 60_000 : 0
+    onProgress?.({ ...progress })
+  }
+
+  // Count bytes as chunks stream past, without buffering them
+  async function* counted(chunks: Iterable<ExportChunk> | AsyncIterable<ExportChunk>) {
+    for await (const chunk of chunks) {
+      progress.bytesWritten +=
+        typeof chunk === 'string' ? chunk.length : chunk instanceof Blob ? chunk.size : chunk.byteLength
+      yield chunk
+    }
+  }
+
+  // Same-day researches with the same title would otherwise share a folder
+  const usedFolders = new Set<string>()
+  const folderFor = (research: Research) => {
+    let folder = fileSystemService.researchFolderName(research.title, research.createdAt)
+    if (usedFolders.has(folder)) folder = `${folder}_${research.id.slice(-6)}`
+    usedFolders.add(folder)
+    return folder
+  }
+
+  await mapWithConcurrency(exportable, concurrency, async research => {
+    signal?.throwIfAborted()
+    const folder = folderFor(research)
+    try {
+      for (const format of formats) {
+        const filename = `report.${EXTENSIONS[format]}`
+        const chunks: Iterable<ExportChunk> =
+          format === 'markdown'
+            ? renderMarkdownChunks(research, renderOptions)
+            : [await exportService.render(format, research, { ...renderOptions, signal })]
+        await fileSystemService.saveStreamToDirectory(filename, counted(chunks), folder)
+      }
+      progress.completed++
+    } catch (error) {
+      progress.failed++
+      errors.push({ id: research.id, title: research.title, message: (error as Error).message })
+      if ((error as any).name === 'AbortError') throw error
+    } finally {
+      report()
+    }
+  })
+
+  signal?.throwIfAborted()
+  report()
+  return { ...progress, errors }
+}
@@ -0,0 +1,29 @@
+// Worker that zips a research bundle, handing out one chunk per pull request
+import { bundleStream, type BundleWorkerRequest, type BundleWorkerResponse } from './bundle'
+
+const ctx = self as unknown as Worker
+
+const post = (message: BundleWorkerResponse, transfer: Transferable[] = []) => ctx.postMessage(message, transfer)
+
+let chunks: AsyncGenerator<Uint8Array> | null = null
+
+ctx.addEventListener('message', async (event: MessageEvent<BundleWorkerRequest>) => {
+  const message = event.data
+  if (message.type === 'start') {
+    chunks = bundleStream(message.research, message.artifacts, message.options)
+    return
+  }
+  try {
+    const next = await chunks!.next()
+    if (next.done) {
+      post({ type: 'end' })
+      return
+    }
+    const bytes = next.value
+    // Only transfer buffers the chunk owns outright
+    const owned = bytes.byteOffset === 0 && bytes.byteLength === bytes.buffer.byteLength
+    post({ type: 'chunk', bytes }, owned ? [bytes.buffer as ArrayBuffer] : [])
+  } catch (error) {
+    post({ type: 'error', message: (error as Error).message || 'Bundle export failed' })
+  }
+})
@@ -0,0 +1,51 @@
+import type { Research } from '@/types/types'
+import type { ExportBuildOptions } from './builders'
+import { renderMarkdownChunks } from './markdown'
+import { zipStream, type ZipEntry } from './zip'
+
+export const BUNDLE_MIME_TYPE = 'application/zip'
+
+export type BundleRenderOptions = Pick<ExportBuildOptions, 'includeThoughtProcess' | 'includeSources'>
+
+/** Binary artifacts rendered by the export pool before bundling */
+export interface BundleArtifacts {
+  pdf: ArrayBuffer
+  docx: ArrayBuffer
+}
+
+// Pull protocol between ExportService.bundle and the bundle worker: the
+// main thread asks for one chunk at a time, so a slow disk throttles zipping
+export type BundleWorkerRequest =
+  | { type: 'start'; research: Research; artifacts: BundleArtifacts; options: BundleRenderOptions }
+  | { type: 'pull' }
+
+export type BundleWorkerResponse =
+  | { type: 'chunk'; bytes: Uint8Array }
+  | { type: 'end' }
+  | { type: 'error'; message: string }
+
+const csvField = (value: string) => (/[",\r\n]/.test(value) ? `"${value.replace(/"/g, '""')}"` : value)
+
+function* sourcesCsv(research: Research): Generator<string> {
+  yield 'index,title,url,snippet,cited_at\n'
+  const sources = research.result?.sources || []
+  for (let i = 0; i < sources.length; i++) {
+    const { title, url, snippet, citedAt } = sources[i]
+    yield `${[String(i + 1), title, url, snippet, citedAt].map(value => csvField(value || '')).join(',')}\n`
+  }
+}
+
+/** Files in a research bundle, in archive order */
+export function* bundleEntries(research: Research, artifacts: BundleArtifacts, options: BundleRenderOptions = {}): Generator<ZipEntry> {
+  const date = new Date(research.completedAt || research.createdAt)
+  yield { name: 'report.md', data: renderMarkdownChunks(research, options), date, compress: true }
+  // PDF and DOCX are already compressed
+  yield { name: 'report.pdf', data: new Uint8Array(artifacts.pdf), date }
+  yield { name: 'report.docx', data: new Uint8Array(artifacts.docx), date }
+  yield { name: 'research.json', data: [JSON.stringify(research, null, 2)], date, compress: true }
+  yield { name: 'sources.csv', data: sourcesCsv(research), date, compress: true }
+}
+
+export function bundleStream(research: Research, artifacts: BundleArtifacts, options: BundleRenderOptions = {}): AsyncGenerator<Uint8Array> {
+  return zipStream(bundleEntries(research, artifacts, options))
+}
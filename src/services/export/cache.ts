@@ -0,0 +1,92 @@
+import type { ExportOptions } from '@/types/types'
+import { IdbStore } from '@/services/idb'
+
+interface ArtifactEntry {
+  size: number
+  lastUsed: number
+}
+
+// Bump whenever a renderer's output changes, so artifacts cached by an older
+// renderer stop matching and age out through LRU eviction
+export const EXPORT_RENDERER_VERSION = 3
+
+const INDEX_KEY = 'index'
+const DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+/** Cache key for a rendered artifact: renderer version, research content hash and every option that affects output */
+export function exportCacheKey(contentHash: string, options: ExportOptions): string {
+  return [
+    `v${EXPORT_RENDERER_VERSION}`,
+    contentHash,
+    options.format,
+    options.includeThoughtProcess ? 1 : 0,
+    options.includeSources ? 1 : 0,
+    options.template || '',
+  ].join(':')
+}
+
+/**
+ * Persistent cache of rendered export bytes with size-bounded LRU eviction.
+ * Artifact bytes and the small LRU index live in separate stores so
+ * eviction decisions never have to load the artifacts themselves.
+ */
+export class ExportArtifactCache {
+  private artifacts = new IdbStore<ArrayBuffer>('export-artifacts')
+  private indexStore = new IdbStore<Record<string, ArtifactEntry>>('export-artifact-index')
+  private index: Promise<Record<string, ArtifactEntry>> | null = null
+
+  constructor(private maxBytes: number = DEFAULT_MAX_BYTES) {}
+
+  private loadIndex(): Promise<Record<string, ArtifactEntry>> {
+    if (!this.index) {
+      this.index = this.indexStore.get(INDEX_KEY).then(index => index || {})
+    }
+    return this.index
+  }
+
+  async get(key: string): Promise<ArrayBuffer | undefined> {
+    const index = await this.loadIndex()
+    if (!index[key]) return undefined
+    const bytes = await this.artifacts.get(key)
+    if (!bytes) {
+      delete index[key]
+      await this.indexStore.set(INDEX_KEY, index)
+      return undefined
+    }
+    index[key].lastUsed = Date.now()
+    await this.indexStore.set(INDEX_KEY, index)
+    // Hand out a copy so callers can transfer or detach it freely
+    return bytes.slice(0)
+  }
+
+  async set(key: string, bytes: ArrayBuffer): Promise<void> {
+    if (bytes.byteLength > this.maxBytes) return
+    // Copy before the first await; the caller may transfer `bytes` meanwhile
+    const copy = bytes.slice(0)
+    const index = await this.loadIndex()
+    await this.artifacts.set(key, copy)
+    index[key] = { size: copy.byteLength, lastUsed: Date.now() }
+    await this.evict(index)
+    await this.indexStore.set(INDEX_KEY, index)
+  }
+
+  async clear(): Promise<void> {
+    await this.artifacts.clear()
+    await this.indexStore.clear()
+    this.index = null
+  }
+
+  private async evict(index: Record<string, ArtifactEntry>): Promise<void> {
+    let total = Object.values(index).reduce((sum, entry) => sum + entry.size, 0)
+    if (total <= this.maxBytes) return
+    const oldestFirst = Object.entries(index).sort(([, a], [, b]) => a.lastUsed - b.lastUsed)
+    for (const [key, entry] of oldestFirst) {
+      if (total <= this.maxBytes) break
+      await this.artifacts.delete(key)
+      delete index[key]
+      total -= entry.size
+    }
+  }
+}
+
+export const exportArtifactCache = new ExportArtifactCache()
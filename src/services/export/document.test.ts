@@ -0,0 +1,80 @@
+import { describe, it, expect } from 'vitest'
+import { parseBlocks, parseInlines, parseResearchDocument } from './document'
+import { renderResearch } from './renderers'
+import type { NotionBlock } from './notion'
+import type { Research } from '@/types/types'
+
+const report = [
+  '# Findings',
+  '',
+  'Costs fell **sharply** in 2024 [1].',
+  'See [the survey](https://example.com/survey).',
+  '',
+  '- first',
+  '- second',
+  '',
+  '```',
+  'code line',
+  '```',
+].join('\n')
+
+const research: Research = {
+  id: '1',
+  title: 'Test Research',
+  prompt: 'Prompt',
+  status: 'completed',
+  createdAt: '2025-01-01T00:00:00.000Z',
+  result: {
+    report,
+    thoughtProcess: 'Process',
+    sources: [{ id: 's1', title: 'Source 1', url: 'https://example.com', snippet: '', citedAt: '' }],
+  },
+}
+
+describe('document IR', () => {
+  it('parses inline formatting, links and citations', () => {
+    expect(parseInlines('a **b** [c](https://x.y) [2]')).toEqual([
+      { type: 'text', text: 'a ' },
+      { type: 'text', text: 'b', bold: true },
+      { type: 'text', text: ' ' },
+      { type: 'link', text: 'c', href: 'https://x.y' },
+      { type: 'text', text: ' ' },
+      { type: 'citation', index: 2 },
+    ])
+  })
+
+  it('groups lines into blocks', () => {
+    expect(parseBlocks(report).map(block => block.type)).toEqual(['heading', 'paragraph', 'list', 'code'])
+  })
+
+  it('reuses the parse for unchanged content', () => {
+    const doc = parseResearchDocument(research)
+    expect(parseResearchDocument({ ...research })).toBe(doc)
+    expect(parseResearchDocument({ ...research, title: 'Other' })).not.toBe(doc)
+  })
+
+  it('renders the same structure to every target', () => {
+    const markdown = [...renderResearch<Iterable<string>>('markdown', research)].join('')
+    expect(markdown).toContain('# Findings\n\nCosts fell **sharply** in 2024 [1].\nSee [the survey](https://example.com/survey).')
+
+    const html = renderResearch<string>('html', research)
+    expect(html).toContain('<ul><li>first</li><li>second</li></ul>')
+
+    const blocks = renderResearch<NotionBlock[]>('notion', research, { includeThoughtProcess: false })
+    expect(blocks.filter(block => block.type === 'bulleted_list_item')).toHaveLength(3)
+    expect(blocks.some(block => JSON.stringify(block).includes('Research Process'))).toBe(false)
+  })
+
+  it('carries rich text past the Notion item limit into continuation blocks', () => {
+    const cited = Array.from({ length: 150 }, (_, i) => `[${i + 1}]`).join(' ')
+    const manyCitations: Research = { ...research, id: 'many-citations', result: { ...research.result!, report: cited } }
+    const blocks = renderResearch<NotionBlock[]>('notion', manyCitations, { includeSources: false, includeThoughtProcess: false })
+    const paragraphs = blocks.filter(block => block.type === 'paragraph')
+    expect(paragraphs).toHaveLength(3)
+    const text = paragraphs
+      .flatMap(block => (block.paragraph as { rich_text: Array<{ text: { content: string } }> }).rich_text)
+      .map(item => item.text.content)
+      .join('')
+    expect(text).toBe(cited)
+  })
+})
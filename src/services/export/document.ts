@@ -0,0 +1,191 @@
+import type { Research, Source } from '@/types/types'
+import { hashString } from '@/utils/utils'
+
+// Intermediate representation shared by every export renderer. A report is
+// parsed once into blocks of inline runs; renderers only walk this tree.
+
+export type Inline =
+  | { type: 'text'; text: string; bold?: boolean; italic?: boolean; code?: boolean }
+  | { type: 'link'; text: string; href: string }
+  | { type: 'citation'; index: number }
+  | { type: 'break' }
+
+export type Block =
+  | { type: 'heading'; level: number; inlines: Inline[] }
+  | { type: 'paragraph'; inlines: Inline[] }
+  | { type: 'list'; ordered: boolean; items: Inline[][] }
+  | { type: 'quote'; inlines: Inline[] }
+  | { type: 'code'; language: string; text: string }
+  | { type: 'rule' }
+
+export interface ResearchDocument {
+  /** Content hash of the research fields the document was parsed from */
+  hash: string
+  title: string
+  createdAt: string
+  completedAt?: string
+  prompt: string
+  report: Block[]
+  process: Block[]
+  sources: Source[]
+}
+
+const INLINE_PATTERN =
+  /\*\*(.+?)\*\*|__(.+?)__|\*(?!\s)(.+?)\*|(?<!\w)_(?!\s)(.+?)_(?!\w)|`([^`]+)`|\[([^\]]+)\]\(([^)\s]+)\)|\[(\d+)\]/g
+
+export function parseInlines(text: string): Inline[] {
+  const inlines: Inline[] = []
+  let lastIndex = 0
+  for (const match of text.matchAll(INLINE_PATTERN)) {
+    const index = match.index ?? 0
+    if (index > lastIndex) inlines.push({ type: 'text', text: text.slice(lastIndex, index) })
+    const [, bold, boldAlt, italic, italicAlt, code, linkText, href, citation] = match
+    if (bold ?? boldAlt) {
+      inlines.push({ type: 'text', text: (bold ?? boldAlt)!, bold: true })
+    } else if (italic ?? italicAlt) {
+      inlines.push({ type: 'text', text: (italic ?? italicAlt)!, italic: true })
+    } else if (code) {
+      inlines.push({ type: 'text', text: code, code: true })
+    } else if (linkText) {
+      inlines.push({ type: 'link', text: linkText, href: href! })
+    } else {
+      inlines.push({ type: 'citation', index: parseInt(citation!, 10) })
+    }
+    lastIndex = index + match[0].length
+  }
+  if (lastIndex < text.length) inlines.push({ type: 'text', text: text.slice(lastIndex) })
+  return inlines
+}
+
+/** Plain text of a run of inlines, with citations kept as `[n]` */
+export function inlineText(inlines: Inline[]): string {
+  return inlines
+    .map(inline => {
+      switch (inline.type) {
+        case 'citation':
+          return `[${inline.index}]`
+        case 'break':
+          return '\n'
+        default:
+          return inline.text
+      }
+    })
+    .join('')
+}
+
+const HEADING = /^(#{1,6})\s+(.*)$/
+const BULLET = /^\s*[-*+]\s+(.*)$/
+const NUMBERED = /^\s*\d+[.)]\s+(.*)$/
+const QUOTE = /^>\s?(.*)$/
+const RULE = /^(-{3,}|\*{3,}|_{3,})\s*$/
+const FENCE = /^```(.*)$/
+
+/** Parse markdown-ish report text into blocks. Unknown syntax becomes paragraphs. */
+export function parseBlocks(text: string): Block[] {
+  const blocks: Block[] = []
+  const lines = text.split('\n')
+  let paragraph: string[] = []
+
+  const flushParagraph = () => {
+    if (!paragraph.length) return
+    const inlines: Inline[] = []
+    paragraph.forEach((line, i) => {
+      if (i) inlines.push({ type: 'break' })
+      inlines.push(...parseInlines(line))
+    })
+    blocks.push({ type: 'paragraph', inlines })
+    paragraph = []
+  }
+
+  for (let i = 0; i < lines.length; i++) {
+    const line = lines[i].replace(/\s+$/, '')
+    let match: RegExpMatchArray | null
+
+    if ((match = line.match(FENCE))) {
+      flushParagraph()
+      const code: string[] = []
+      while (++i < lines.length && !lines[i].startsWith('```')) code.push(lines[i])
+      blocks.push({ type: 'code', language: match[1].trim(), text: code.join('\n') })
+    } else if (!line.trim()) {
+      flushParagraph()
+    } else if ((match = line.match(HEADING))) {
+      flushParagraph()
+      blocks.push({ type: 'heading', level: match[1].length, inlines: parseInlines(match[2]) })
+    } else if (RULE.test(line)) {
+      flushParagraph()
+      blocks.push({ type: 'rule' })
+    } else if ((match = line.match(BULLET) || line.match(NUMBERED))) {
+      flushParagraph()
+      const ordered = NUMBERED.test(line)
+      const previous = blocks[blocks.length - 1]
+      const item = parseInlines(match[1])
+      if (previous?.type === 'list' && previous.ordered === ordered) {
+        previous.items.push(item)
+      } else {
+        blocks.push({ type: 'list', ordered, items: [item] })
+      }
+    } else if ((match = line.match(QUOTE))) {
+      flushParagraph()
+      const previous = blocks[blocks.length - 1]
+      const inlines = parseInlines(match[1])
+      if (previous?.type === 'quote') {
+        previous.inlines.push({ type: 'break' }, ...inlines)
+      } else {
+        blocks.push({ type: 'quote', inlines })
+      }
+    } else {
+      paragraph.push(line)
+    }
+  }
+  flushParagraph()
+  return blocks
+}
+
+export function hashResearchContent(research: Research): string {
+  const result = research.result
+  return hashString(
+    JSON.stringify([
+      research.title,
+      research.createdAt,
+      research.completedAt,
+      research.prompt,
+      result?.report,
+      result?.thoughtProcess,
+      result?.sources,
+    ])
+  )
+}
+
+// Small LRU of parsed documents keyed by content hash. Map preserves
+// insertion order, so re-inserting on access keeps the oldest entry first.
+const MAX_CACHED_DOCUMENTS = 16
+const documentCache = new Map<string, ResearchDocument>()
+
+/** Parse a research into the shared document IR, reusing the cached parse when content is unchanged */
+export function parseResearchDocument(research: Research): ResearchDocument {
+  const hash = hashResearchContent(research)
+  const cached = documentCache.get(hash)
+  if (cached) {
+    documentCache.delete(hash)
+    documentCache.set(hash, cached)
+    return cached
+  }
+
+  const result = research.result
+  const doc: ResearchDocument = {
+    hash,
+    title: research.title,
+    createdAt: research.createdAt,
+    completedAt: research.completedAt,
+    prompt: research.prompt,
+    report: parseBlocks(result?.report || ''),
+    process: parseBlocks(result?.thoughtProcess || ''),
+    sources: result?.sources || [],
+  }
+
+  documentCache.set(hash, doc)
+  if (documentCache.size > MAX_CACHED_DOCUMENTS) {
+    documentCache.delete(documentCache.keys().next().value!)
+  }
+  return doc
+}
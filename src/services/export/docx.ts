@@ -0,0 +1,118 @@
+import {
+  Document,
+  ExternalHyperlink,
+  HeadingLevel,
+  Packer,
+  Paragraph,
+  TextRun,
+  type ParagraphChild,
+} from 'docx'
+import type { ExportBuildOptions } from './builders'
+import type { Block, Inline, ResearchDocument } from './document'
+
+const BLOCK_HEADINGS = [HeadingLevel.HEADING_2, HeadingLevel.HEADING_3, HeadingLevel.HEADING_4]
+
+function runs(inlines: Inline[]): ParagraphChild[] {
+  return inlines.map(inline => {
+    switch (inline.type) {
+      case 'text':
+        return new TextRun({
+          text: inline.text,
+          bold: inline.bold,
+          italics: inline.italic,
+          font: inline.code ? 'Courier New' : undefined,
+        })
+      case 'link':
+        return new ExternalHyperlink({ link: inline.href, children: [new TextRun({ text: inline.text, style: 'Hyperlink' })] })
+      case 'citation':
+        return new TextRun({ text: `[${inline.index}]`, color: '0066CC' })
+      case 'break':
+        return new TextRun({ break: 1 })
+    }
+  })
+}
+
+function blockParagraphs(blocks: Block[]): Paragraph[] {
+  const paragraphs: Paragraph[] = []
+  for (const block of blocks) {
+    switch (block.type) {
+      case 'heading':
+        paragraphs.push(new Paragraph({
+          children: runs(block.inlines),
+          heading: BLOCK_HEADINGS[Math.min(block.level, BLOCK_HEADINGS.length) - 1],
+        }))
+        break
+      case 'paragraph':
+        paragraphs.push(new Paragraph({ children: runs(block.inlines) }))
+        break
+      case 'list':
+        block.items.forEach((item, i) => {
+          paragraphs.push(block.ordered
+            ? new Paragraph({ children: [new TextRun({ text: `${i + 1}. ` }), ...runs(item)], indent: { left: 360 } })
+            : new Paragraph({ children: runs(item), bullet: { level: 0 } }))
+        })
+        break
+      case 'quote':
+        paragraphs.push(new Paragraph({ children: runs(block.inlines), indent: { left: 720 } }))
+        break
+      case 'code':
+        block.text.split('\n').forEach(line => {
+          paragraphs.push(new Paragraph({ children: [new TextRun({ text: line, font: 'Courier New', size: 18 })] }))
+        })
+        break
+      case 'rule':
+        paragraphs.push(new Paragraph({ thematicBreak: true }))
+        break
+    }
+  }
+  return paragraphs
+}
+
+export async function renderDOCX(
+  doc: ResearchDocument,
+  { includeThoughtProcess = true, includeSources = true, onProgress, signal }: ExportBuildOptions = {}
+): Promise<ArrayBuffer> {
+  const paragraphs: Paragraph[] = []
+
+  paragraphs.push(new Paragraph({ text: doc.title, heading: HeadingLevel.TITLE }))
+  paragraphs.push(new Paragraph({ children: [new TextRun({ text: `Generated: ${new Date(doc.createdAt).toLocaleDateString()}`, italics: true })] }))
+  if (doc.completedAt) {
+    paragraphs.push(new Paragraph({ children: [new TextRun({ text: `Completed: ${new Date(doc.completedAt).toLocaleDateString()}`, italics: true })] }))
+  }
+  paragraphs.push(new Paragraph({ text: '' }))
+  onProgress?.({ stage: 'layout', progress: 0.25 })
+
+  if (doc.report.length) {
+    paragraphs.push(new Paragraph({ text: 'Research Report', heading: HeadingLevel.HEADING_1 }))
+    paragraphs.push(...blockParagraphs(doc.report))
+  }
+  signal?.throwIfAborted()
+  onProgress?.({ stage: 'layout', progress: 0.5 })
+
+  if (includeThoughtProcess && doc.process.length) {
+    paragraphs.push(new Paragraph({ text: '' }))
+    paragraphs.push(new Paragraph({ text: 'Research Process', heading: HeadingLevel.HEADING_1 }))
+    paragraphs.push(...blockParagraphs(doc.process))
+  }
+  signal?.throwIfAborted()
+  onProgress?.({ stage: 'layout', progress: 0.75 })
+
+  if (includeSources && doc.sources.length) {
+    paragraphs.push(new Paragraph({ text: '' }))
+    paragraphs.push(new Paragraph({ text: 'Sources', heading: HeadingLevel.HEADING_1 }))
+    doc.sources.forEach((source, i) => {
+      paragraphs.push(new Paragraph({ children: [new TextRun({ text: `${i + 1}. `, bold: true }), new TextRun({ text: source.title })] }))
+      if (source.url) paragraphs.push(new Paragraph({ children: [new TextRun({ text: `   ${source.url}`, color: '0066CC' })] }))
+      if (source.snippet) paragraphs.push(new Paragraph({ children: [new TextRun({ text: `   "${source.snippet}"`, italics: true })] }))
+    })
+  }
+  signal?.throwIfAborted()
+  onProgress?.({ stage: 'layout', progress: 1 })
+
+  onProgress?.({ stage: 'encode', progress: 0 })
+  const document = new Document({ sections: [{ properties: {}, children: paragraphs }] })
+  const blob = await Packer.toBlob(document)
+  const buffer = await blob.arrayBuffer()
+  onProgress?.({ stage: 'encode', progress: 1 })
+  return buffer
+}
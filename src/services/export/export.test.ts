@@ -0,0 +1,145 @@
+import { describe, it, expect, vi } from 'vitest'
+import JSZip from 'jszip'
+import { PDFDocument } from 'pdf-lib'
+import { ExportService, renderMarkdownChunks } from './index'
+import { fontRegistry, needsUnicodeFonts } from './fonts'
+import { parseResearchDocument } from './document'
+import { renderPDF } from './pdf'
+import { EXPORT_RENDERER_VERSION, ExportArtifactCache, exportCacheKey } from './cache'
+import type { Research } from '@/types/types'
+
+const research: Research = {
+  id: '1',
+  title: 'Test Research',
+  prompt: 'Prompt',
+  status: 'completed',
+  createdAt: new Date().toISOString(),
+  completedAt: new Date().toISOString(),
+  result: {
+    report: 'First paragraph. [1]\nSecond paragraph.',
+    thoughtProcess: 'Process',
+    sources: [
+      { id: 's1', title: 'Source 1', url: 'https://example.com', snippet: 'Snippet', citedAt: new Date().toISOString() },
+    ],
+  },
+}
+
+describe('ExportService', () => {
+  it('renders a PDF and reports progress', async () => {
+    const onProgress = vi.fn()
+    const buffer = await new ExportService(1, null).render('pdf', research, { onProgress })
+    const header = new TextDecoder().decode(new Uint8Array(buffer, 0, 5))
+    expect(header).toBe('%PDF-')
+    expect(onProgress).toHaveBeenLastCalledWith({ stage: 'encode', progress: 1 })
+  })
+
+  it('renders a DOCX as a zip container', async () => {
+    const buffer = await new ExportService(1, null).render('docx', research)
+    const bytes = new Uint8Array(buffer, 0, 2)
+    expect(String.fromCharCode(bytes[0], bytes[1])).toBe('PK')
+  })
+
+  it('renders text outside the standard font encoding', async () => {
+    const multilingual = { ...research, result: { ...research.result!, report: '研究报告 — Überblick\tdone' } }
+    const buffer = await new ExportService(1, null).render('pdf', multilingual)
+    expect(buffer.byteLength).toBeGreaterThan(0)
+  })
+
+  it('rejects when the job is cancelled', async () => {
+    const controller = new AbortController()
+    controller.abort()
+    await expect(new ExportService(1, null).render('pdf', research, { signal: controller.signal })).rejects.toThrow()
+  })
+})
+
+// fetch is mocked in setup, so font files served by the test server are read with XHR
+const loadAsset = (url: string) =>
+  new Promise<ArrayBuffer>((resolve, reject) => {
+    const request = new XMLHttpRequest()
+    request.open('GET', url)
+    request.responseType = 'arraybuffer'
+    request.onload = () => (request.status === 200 ? resolve(request.response) : reject(new Error(url)))
+    request.onerror = () => reject(new Error(url))
+    request.send()
+  })
+
+describe('PDF fonts', () => {
+  it('embeds a Unicode font for Cyrillic text instead of substituting it', async () => {
+    vi.mocked(fetch).mockImplementation(async url => ({ ok: true, arrayBuffer: () => loadAsset(String(url)) }) as Response)
+    try {
+      const cyrillic = 'Отчёт о рынке тепловых насосов'
+      expect(needsUnicodeFonts(cyrillic)).toBe(true)
+      expect(needsUnicodeFonts('Plain “quoted” text — €5')).toBe(false)
+
+      const buffer = await new ExportService(1, null).render('pdf', { ...research, result: { ...research.result!, report: cyrillic } })
+      expect(new TextDecoder().decode(new Uint8Array(buffer, 0, 5))).toBe('%PDF-')
+      expect(fetch).toHaveBeenCalledWith(expect.stringContaining('DejaVuSans'))
+
+      const fonts = await fontRegistry.embed(await PDFDocument.create(), { unicode: true })
+      expect(fonts.encodable(fonts.regular, cyrillic)).toBe(cyrillic)
+      expect(fonts.encodable(fonts.bold, cyrillic)).not.toContain('?')
+    } finally {
+      vi.mocked(fetch).mockReset()
+    }
+  })
+
+  it('keeps the standard fonts when non-Latin text is left out of the export', async () => {
+    vi.mocked(fetch).mockClear()
+    const doc = parseResearchDocument({ ...research, result: { ...research.result!, thoughtProcess: 'Поиск источников' } })
+    const buffer = await renderPDF(doc, { includeThoughtProcess: false })
+    expect(new TextDecoder().decode(new Uint8Array(buffer, 0, 5))).toBe('%PDF-')
+    expect(fetch).not.toHaveBeenCalled()
+  })
+})
+
+describe('ExportService.bundle', () => {
+  it('streams a zip with every artifact', async () => {
+    const bytes: number[] = []
+    for await (const chunk of new ExportService(1, null).bundle(research)) bytes.push(...chunk)
+    // Chunks come from the bundle worker with their buffers transferred
+    const zip = await JSZip.loadAsync(new Uint8Array(bytes), { checkCRC32: true })
+    expect(Object.keys(zip.files).sort()).toEqual(['report.docx', 'report.md', 'report.pdf', 'research.json', 'sources.csv'])
+    expect(JSON.parse(await zip.file('research.json')!.async('string')).id).toBe(research.id)
+    expect(await zip.file('sources.csv')!.async('string')).toContain('1,Source 1,https://example.com,Snippet,')
+  })
+})
+
+describe('ExportArtifactCache', () => {
+  it('returns byte-identical artifacts without rebuilding', async () => {
+    const cache = new ExportArtifactCache()
+    await cache.clear()
+    const service = new ExportService(1, cache)
+    const first = new Uint8Array(await service.render('pdf', research, { template: 'cache-test' }))
+    // Let the fire-and-forget cache write settle
+    await new Promise(resolve => setTimeout(resolve, 50))
+    const onProgress = vi.fn()
+    const second = new Uint8Array(await service.render('pdf', research, { template: 'cache-test', onProgress }))
+    expect(second).toEqual(first)
+    expect(onProgress).not.toHaveBeenCalled()
+  })
+
+  it('keys artifacts by renderer version', () => {
+    const key = exportCacheKey('hash', { format: 'pdf', includeThoughtProcess: true, includeSources: true })
+    expect(key.startsWith(`v${EXPORT_RENDERER_VERSION}:hash:pdf:`)).toBe(true)
+  })
+
+  it('evicts least recently used artifacts past the size bound', async () => {
+    const cache = new ExportArtifactCache(10)
+    await cache.clear()
+    await cache.set('a', new Uint8Array(6).buffer)
+    await cache.set('b', new Uint8Array(6).buffer)
+    expect(await cache.get('a')).toBeUndefined()
+    expect((await cache.get('b'))?.byteLength).toBe(6)
+  })
+})
+
+describe('renderMarkdownChunks', () => {
+  it('yields the markdown export in pieces', () => {
+    const chunks = [...renderMarkdownChunks(research)]
+    expect(chunks.length).toBeGreaterThan(1)
+    const markdown = chunks.join('')
+    expect(markdown.startsWith('# Test Research')).toBe(true)
+    expect(markdown).toContain('## Research Report\n\nFirst paragraph. [1]')
+    expect(markdown).toContain('1. [Source 1](https://example.com)\n> Snippet')
+  })
+})
@@ -0,0 +1,152 @@
+import { PDFDocument, StandardFonts, type PDFFont } from 'pdf-lib'
+import fontkit from '@pdf-lib/fontkit'
+import unicodeRegularUrl from 'dejavu-fonts-ttf/ttf/DejaVuSans.ttf?url'
+import unicodeBoldUrl from 'dejavu-fonts-ttf/ttf/DejaVuSans-Bold.ttf?url'
+import unicodeMonoUrl from 'dejavu-fonts-ttf/ttf/DejaVuSansMono.ttf?url'
+
+type Fontkit = Parameters<PDFDocument['registerFontkit']>[0]
+export type FontRole = 'regular' | 'bold' | 'mono'
+type FontLoader = () => Promise<ArrayBuffer>
+
+const STANDARD_FONTS: Record<FontRole, StandardFonts> = {
+  regular: StandardFonts.Helvetica,
+  bold: StandardFonts.HelveticaBold,
+  mono: StandardFonts.Courier,
+}
+
+// Characters beyond Latin-1 that the standard fonts' WinAnsi encoding still covers
+const WIN_ANSI_EXTRAS = '€‚ƒ„…†‡ˆ‰Š‹ŒŽ‘’“”•–—˜™š›œžŸ'
+const NOT_WIN_ANSI = new RegExp(`[^\\u0000-\\u00ff${WIN_ANSI_EXTRAS}]`, 'u')
+
+/** Whether `text` has characters the standard fonts cannot draw */
+export function needsUnicodeFonts(text: string): boolean {
+  return NOT_WIN_ANSI.test(text)
+}
+
+async function fetchFont(url: string): Promise<ArrayBuffer> {
+  const response = await fetch(url)
+  if (!response?.ok) throw new Error(`Font request failed: ${url}`)
+  return response.arrayBuffer()
+}
+
+// Upper bound on cached word widths per font before the cache is reset
+const MAX_CACHED_WORDS = 20_000
+
+// Subset fonts get a random `ABCDEF+` tag per document; metrics are shared across tags
+const fontKey = (font: PDFFont) => font.name.replace(/^[A-Z]{6}\+/, '')
+
+/** Fonts embedded into one document, plus cached measuring helpers */
+export interface PDFFontSet {
+  regular: PDFFont
+  bold: PDFFont
+  mono: PDFFont
+  /** Width of a single word at `size`, from the per-font metrics cache */
+  widthOfWord(font: PDFFont, word: string, size: number): number
+  /** Replace characters `font` cannot encode so drawing never throws */
+  encodable(font: PDFFont, text: string): string
+}
+
+/**
+ * Loads font bytes once per session and caches glyph metrics across
+ * exports. Documents the standard Helvetica/Courier fonts can encode
+ * use them; others get the registered TTF/OTF fonts, embedded as subsets
+ * containing only the glyphs used. Text no embedded font can encode is
+ * replaced instead of failing the export.
+ */
+export class FontRegistry {
+  private fontkit: Fontkit | null = null
+  private loaders = new Map<FontRole, FontLoader>()
+  private bytes = new Map<FontRole, Promise<ArrayBuffer>>()
+  private widths = new Map<string, Map<string, number>>()
+  private charsets = new Map<string, Set<number>>()
+
+  useFontkit(fontkit: Fontkit): void {
+    this.fontkit = fontkit
+  }
+
+  /** Register a custom font for `role`; its bytes are fetched lazily on first export */
+  register(role: FontRole, loader: FontLoader): void {
+    this.loaders.set(role, loader)
+    this.bytes.delete(role)
+  }
+
+  /** Embed one font per role; with `unicode` the registered fonts replace the standard ones */
+  async embed(pdfDoc: PDFDocument, { unicode = false }: { unicode?: boolean } = {}): Promise<PDFFontSet> {
+    const custom = unicode && !!this.fontkit && this.loaders.size > 0
+    if (custom) pdfDoc.registerFontkit(this.fontkit!)
+    const [regular, bold, mono] = await Promise.all(
+      (['regular', 'bold', 'mono'] as const).map(role => this.embedRole(pdfDoc, role, custom))
+    )
+    return {
+      regular,
+      bold,
+      mono,
+      widthOfWord: (font, word, size) => this.widthOfWord(font, word) * size,
+      encodable: (font, text) => this.encodable(font, text),
+    }
+  }
+
+  private async embedRole(pdfDoc: PDFDocument, role: FontRole, custom: boolean): Promise<PDFFont> {
+    const bytes = custom ? await this.loadBytes(role) : null
+    if (bytes) {
+      // pdf-lib copies the bytes into the document, so the cached buffer stays reusable
+      return pdfDoc.embedFont(bytes, { subset: true })
+    }
+    return pdfDoc.embedFont(STANDARD_FONTS[role])
+  }
+
+  private loadBytes(role: FontRole): Promise<ArrayBuffer | null> {
+    const loader = this.loaders.get(role)
+    if (!loader) return Promise.resolve(null)
+    if (!this.bytes.has(role)) {
+      const pending = loader()
+      // Forget failed loads so a later export can retry
+      pending.catch(() => this.bytes.delete(role))
+      this.bytes.set(role, pending)
+    }
+    return this.bytes.get(role)!.catch(() => null)
+  }
+
+  /** Width of `word` at size 1, measured once per font */
+  private widthOfWord(font: PDFFont, word: string): number {
+    let cache = this.widths.get(fontKey(font))
+    if (!cache || cache.size > MAX_CACHED_WORDS) {
+      cache = new Map()
+      this.widths.set(fontKey(font), cache)
+    }
+    let width = cache.get(word)
+    if (width === undefined) {
+      width = font.widthOfTextAtSize(word, 1)
+      cache.set(word, width)
+    }
+    return width
+  }
+
+  private encodable(font: PDFFont, text: string): string {
+    let charset = this.charsets.get(fontKey(font))
+    if (!charset) {
+      charset = new Set(font.getCharacterSet())
+      this.charsets.set(fontKey(font), charset)
+    }
+    let result = ''
+    for (const ch of text) {
+      const codePoint = ch.codePointAt(0)!
+      if (charset.has(codePoint)) {
+        result += ch
+      } else if (ch === '\t') {
+        result += '    '
+      } else if (codePoint >= 0x20) {
+        result += '?'
+      }
+    }
+    return result
+  }
+}
+
+// PDFs are built in the export worker, so this registration runs there when the renderer loads.
+// DejaVu covers Latin, Greek and Cyrillic; the files are fetched only for documents that need them
+export const fontRegistry = new FontRegistry()
+fontRegistry.useFontkit(fontkit)
+fontRegistry.register('regular', () => fetchFont(unicodeRegularUrl))
+fontRegistry.register('bold', () => fetchFont(unicodeBoldUrl))
+fontRegistry.register('mono', () => fetchFont(unicodeMonoUrl))
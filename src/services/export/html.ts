@@ -0,0 +1,90 @@
+import type { ExportBuildOptions } from './builders'
+import type { Block, Inline, ResearchDocument } from './document'
+
+const ESCAPES: Record<string, string> = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }
+
+function escapeHTML(text: string): string {
+  return text.replace(/[&<>"']/g, ch => ESCAPES[ch])
+}
+
+function htmlInlines(inlines: Inline[]): string {
+  return inlines
+    .map(inline => {
+      switch (inline.type) {
+        case 'text': {
+          const text = escapeHTML(inline.text)
+          if (inline.code) return `<code>${text}</code>`
+          if (inline.bold) return `<strong>${text}</strong>`
+          if (inline.italic) return `<em>${text}</em>`
+          return text
+        }
+        case 'link':
+          return `<a href="${escapeHTML(inline.href)}">${escapeHTML(inline.text)}</a>`
+        case 'citation':
+          return `<a class="citation" href="#source-${inline.index}">[${inline.index}]</a>`
+        case 'break':
+          return '<br>'
+      }
+    })
+    .join('')
+}
+
+function htmlBlocks(blocks: Block[]): string {
+  return blocks
+    .map(block => {
+      switch (block.type) {
+        case 'heading': {
+          const level = Math.min(block.level + 1, 6)
+          return `<h${level}>${htmlInlines(block.inlines)}</h${level}>`
+        }
+        case 'paragraph':
+          return `<p>${htmlInlines(block.inlines)}</p>`
+        case 'list': {
+          const tag = block.ordered ? 'ol' : 'ul'
+          return `<${tag}>${block.items.map(item => `<li>${htmlInlines(item)}</li>`).join('')}</${tag}>`
+        }
+        case 'quote':
+          return `<blockquote>${htmlInlines(block.inlines)}</blockquote>`
+        case 'code':
+          return `<pre><code>${escapeHTML(block.text)}</code></pre>`
+        case 'rule':
+          return '<hr>'
+      }
+    })
+    .join('\n')
+}
+
+/** Render a standalone HTML document */
+export function renderHTML(
+  doc: ResearchDocument,
+  { includeThoughtProcess = true, includeSources = true }: ExportBuildOptions = {}
+): string {
+  const parts = [
+    '<!doctype html>',
+    `<html><head><meta charset="utf-8"><title>${escapeHTML(doc.title)}</title></head><body>`,
+    `<h1>${escapeHTML(doc.title)}</h1>`,
+    `<p><em>Generated: ${new Date(doc.createdAt).toLocaleDateString()}</em></p>`,
+  ]
+  if (doc.completedAt) {
+    parts.push(`<p><em>Completed: ${new Date(doc.completedAt).toLocaleDateString()}</em></p>`)
+  }
+  if (doc.report.length) {
+    parts.push('<h2>Research Report</h2>', htmlBlocks(doc.report))
+  }
+  if (includeThoughtProcess && doc.process.length) {
+    parts.push('<h2>Research Process</h2>', htmlBlocks(doc.process))
+  }
+  if (includeSources && doc.sources.length) {
+    parts.push('<h2>Sources</h2>', '<ol>')
+    doc.sources.forEach((source, i) => {
+      parts.push(
+        `<li id="source-${i + 1}"><a href="${escapeHTML(source.url)}">${escapeHTML(source.title)}</a>` +
+          (source.snippet ? `<blockquote>${escapeHTML(source.snippet)}</blockquote>` : '') +
+          '</li>'
+      )
+    })
+    parts.push('</ol>')
+  }
+  parts.push('</body></html>')
+  return parts.join('\n')
+}
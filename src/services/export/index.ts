@@ -0,0 +1,238 @@
+import type { ExportFormat, ExportOptions, Research } from '@/types/types'
+import { exportArtifactCache, exportCacheKey, type ExportArtifactCache } from './cache'
+import { hashResearchContent } from './document'
+import { bundleStream, type BundleWorkerRequest, type BundleWorkerResponse } from './bundle'
+import {
+  buildExport,
+  type BinaryExportFormat,
+  type ExportBuildOptions,
+  type ExportWorkerResponse,
+} from './builders'
+import { loadBinaryRenderers } from './renderers'
+
+export type { BinaryExportFormat, ExportBuildOptions } from './builders'
+export { parseResearchDocument, type ResearchDocument, type Block, type Inline } from './document'
+export { registerRenderer, renderResearch, type DocumentRenderer } from './renderers'
+export { renderMarkdownChunks } from './markdown'
+export { exportArtifactCache } from './cache'
+export type { FontRole } from './fonts'
+export { BUNDLE_MIME_TYPE } from './bundle'
+export type { NotionBlock } from './notion'
+
+export const EXPORT_MIME_TYPES: Record<ExportFormat, string> = {
+  markdown: 'text/markdown',
+  pdf: 'application/pdf',
+  docx: 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+export type ExportJobOptions = ExportBuildOptions & Pick<ExportOptions, 'template'>
+
+function createAbortError(): DOMException {
+  return new DOMException('Export cancelled', 'AbortError')
+}
+
+function defaultPoolSize(): number {
+  const cores = typeof navigator !== 'undefined' ? navigator.hardwareConcurrency || 2 : 2
+  return Math.max(1, Math.min(cores - 1, 4))
+}
+
+/**
+ * Renders binary exports in a small pool of dedicated workers so building
+ * and encoding large documents never blocks the UI. Results come back as
+ * transferred `ArrayBuffer`s. Cancelling a job terminates its worker, which
+ * is the only way to interrupt pdf-lib/docx mid-render.
+ *
+ * Rendered artifacts are cached by research content hash and export
+ * options, so repeat exports return the stored bytes without rebuilding.
+ */
+export class ExportService {
+  private idle: Worker[] = []
+  private size = 0
+  private waiting: Array<(worker: Worker) => void> = []
+
+  constructor(
+    private maxWorkers: number = defaultPoolSize(),
+    private cache: ExportArtifactCache | null = exportArtifactCache
+  ) {}
+
+  async render(
+    format: BinaryExportFormat,
+    research: Research,
+    { template, ...options }: ExportJobOptions = {}
+  ): Promise<ArrayBuffer> {
+    options.signal?.throwIfAborted()
+    if (!this.cache) return this.build(format, research, options)
+
+    const key = exportCacheKey(hashResearchContent(research), {
+      format,
+      includeThoughtProcess: options.includeThoughtProcess ?? true,
+      includeSources: options.includeSources ?? true,
+      template,
+    })
+    const cached = await this.cache.get(key).catch(() => undefined)
+    if (cached) return cached
+
+    const buffer = await this.build(format, research, options)
+    // A failed cache write must never fail the export itself
+    this.cache.set(key, buffer).catch(() => {})
+    return buffer
+  }
+
+  private async build(
+    format: BinaryExportFormat,
+    research: Research,
+    { onProgress, signal, ...options }: ExportBuildOptions
+  ): Promise<ArrayBuffer> {
+    signal?.throwIfAborted()
+
+    // Environments without workers (tests, old browsers) render inline
+    if (typeof Worker === 'undefined') {
+      return buildExport(format, research, { ...options, onProgress, signal })
+    }
+
+    const worker = await this.acquire(signal)
+    return new Promise<ArrayBuffer>((resolve, reject) => {
+      const cleanup = () => {
+        worker.onmessage = null
+        worker.onerror = null
+        signal?.removeEventListener('abort', onAbort)
+      }
+      const onAbort = () => {
+        cleanup()
+        this.discard(worker)
+        reject(createAbortError())
+      }
+
+      worker.onmessage = (event: MessageEvent<ExportWorkerResponse>) => {
+        const message = event.data
+        if (message.type === 'progress') {
+          onProgress?.(message.progress)
+          return
+        }
+        cleanup()
+        this.release(worker)
+        if (message.type === 'done') {
+          resolve(message.buffer)
+        } else {
+          reject(new Error(message.message))
+        }
+      }
+      worker.onerror = (event) => {
+        cleanup()
+        this.discard(worker)
+        reject(new Error(event.message || 'Export worker crashed'))
+      }
+
+      signal?.addEventListener('abort', onAbort, { once: true })
+      worker.postMessage({ format, research, options })
+    })
+  }
+
+  /**
+   * Stream a ZIP bundle of every export format plus the research JSON and
+   * sources. PDF/DOCX come from the pool (and cache); the archive itself is
+   * zipped in its own worker one pulled chunk at a time, so consuming the
+   * stream into a file writer keeps memory flat.
+   */
+  async *bundle(
+    research: Research,
+    { signal, ...options }: Pick<ExportJobOptions, 'includeThoughtProcess' | 'includeSources' | 'signal'> = {}
+  ): AsyncGenerator<Uint8Array> {
+    const [pdf, docx] = await Promise.all([
+      this.render('pdf', research, { ...options, signal }),
+      this.render('docx', research, { ...options, signal }),
+    ])
+    if (typeof Worker === 'undefined') {
+      for await (const chunk of bundleStream(research, { pdf, docx }, options)) {
+        signal?.throwIfAborted()
+        yield chunk
+      }
+      return
+    }
+
+    const worker = new Worker(new URL('./bundle-worker.ts', import.meta.url), { type: 'module' })
+    const pullRequest: BundleWorkerRequest = { type: 'pull' }
+    const pull = () =>
+      new Promise<BundleWorkerResponse>((resolve, reject) => {
+        worker.onmessage = (event: MessageEvent<BundleWorkerResponse>) => resolve(event.data)
+        worker.onerror = event => reject(new Error(event.message || 'Bundle worker crashed'))
+        worker.postMessage(pullRequest)
+      })
+    try {
+      const start: BundleWorkerRequest = { type: 'start', research, artifacts: { pdf, docx }, options }
+      worker.postMessage(start, [pdf, docx])
+      for (;;) {
+        signal?.throwIfAborted()
+        const message = await pull()
+        if (message.type === 'end') return
+        if (message.type === 'error') throw new Error(message.message)
+        yield message.bytes
+      }
+    } finally {
+      // Also runs when the consumer stops early, e.g. a cancelled save
+      worker.terminate()
+    }
+  }
+
+  /**
+   * Get ready for an export that is likely soon: start one pool worker,
+   * which loads the PDF and DOCX renderers, or load them here when
+   * exports render inline.
+   */
+  prewarm(): void {
+    if (typeof Worker === 'undefined') {
+      loadBinaryRenderers().catch(() => {})
+    } else if (this.size === 0) {
+      this.idle.push(this.spawn())
+    }
+  }
+
+  /** Terminate all idle workers, e.g. when leaving the results view */
+  dispose(): void {
+    this.idle.forEach(worker => worker.terminate())
+    this.size -= this.idle.length
+    this.idle = []
+  }
+
+  private spawn(): Worker {
+    this.size++
+    return new Worker(new URL('./worker.ts', import.meta.url), { type: 'module' })
+  }
+
+  private acquire(signal?: AbortSignal): Promise<Worker> {
+    const worker = this.idle.pop()
+    if (worker) return Promise.resolve(worker)
+    if (this.size < this.maxWorkers) return Promise.resolve(this.spawn())
+
+    return new Promise((resolve, reject) => {
+      const onAbort = () => {
+        this.waiting = this.waiting.filter(waiter => waiter !== handOff)
+        reject(createAbortError())
+      }
+      const handOff = (next: Worker) => {
+        signal?.removeEventListener('abort', onAbort)
+        resolve(next)
+      }
+      signal?.addEventListener('abort', onAbort, { once: true })
+      this.waiting.push(handOff)
+    })
+  }
+
+  private release(worker: Worker): void {
+    const next = this.waiting.shift()
+    if (next) {
+      next(worker)
+    } else {
+      this.idle.push(worker)
+    }
+  }
+
+  private discard(worker: Worker): void {
+    worker.terminate()
+    this.size--
+    const next = this.waiting.shift()
+    if (next) next(this.spawn())
+  }
+}
+
+export const exportService = new ExportService()
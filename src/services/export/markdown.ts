@@ -0,0 +1,97 @@
+import type { Research } from '@/types/types'
+import type { ExportBuildOptions } from './builders'
+import { parseResearchDocument, type Block, type Inline, type ResearchDocument } from './document'
+
+// Slice size for long text fields so no single chunk approaches report size
+const CHUNK_SIZE = 64 * 1024
+
+function* sliceText(text: string): Generator<string> {
+  for (let i = 0; i < text.length; i += CHUNK_SIZE) {
+    yield text.slice(i, i + CHUNK_SIZE)
+  }
+}
+
+export function markdownInlines(inlines: Inline[]): string {
+  return inlines
+    .map(inline => {
+      switch (inline.type) {
+        case 'text':
+          if (inline.code) return `\`${inline.text}\``
+          if (inline.bold) return `**${inline.text}**`
+          if (inline.italic) return `*${inline.text}*`
+          return inline.text
+        case 'link':
+          return `[${inline.text}](${inline.href})`
+        case 'citation':
+          return `[${inline.index}]`
+        case 'break':
+          return '\n'
+      }
+    })
+    .join('')
+}
+
+export function markdownBlock(block: Block): string {
+  switch (block.type) {
+    case 'heading':
+      return `${'#'.repeat(block.level)} ${markdownInlines(block.inlines)}`
+    case 'paragraph':
+      return markdownInlines(block.inlines)
+    case 'list':
+      return block.items
+        .map((item, i) => `${block.ordered ? `${i + 1}.` : '-'} ${markdownInlines(item)}`)
+        .join('\n')
+    case 'quote':
+      return markdownInlines(block.inlines)
+        .split('\n')
+        .map(line => `> ${line}`)
+        .join('\n')
+    case 'code':
+      return `\`\`\`${block.language}\n${block.text}\n\`\`\``
+    case 'rule':
+      return '---'
+  }
+}
+
+function* markdownBlocks(blocks: Block[]): Generator<string> {
+  for (let i = 0; i < blocks.length; i++) {
+    yield `${i ? '\n\n' : ''}${markdownBlock(blocks[i])}`
+  }
+}
+
+/**
+ * Yield the markdown export of a parsed document block by block, so it can
+ * be streamed to disk without concatenating the whole document first.
+ */
+export function* renderMarkdown(
+  doc: ResearchDocument,
+  { includeThoughtProcess = true, includeSources = true }: ExportBuildOptions = {}
+): Generator<string> {
+  yield `# ${doc.title}\n\n**Generated:** ${new Date(doc.createdAt).toLocaleDateString()}\n`
+  if (doc.completedAt) {
+    yield `**Completed:** ${new Date(doc.completedAt).toLocaleDateString()}`
+  }
+  yield '\n\n## Research Prompt\n\n```\n'
+  yield* sliceText(doc.prompt)
+  yield '\n```\n\n## Research Report\n\n'
+  yield* markdownBlocks(doc.report)
+  yield '\n\n'
+
+  if (includeThoughtProcess && doc.process.length) {
+    yield '## Research Process\n\n'
+    yield* markdownBlocks(doc.process)
+    yield '\n\n'
+  }
+
+  if (includeSources && doc.sources.length) {
+    yield '## Sources\n\n'
+    for (let i = 0; i < doc.sources.length; i++) {
+      const source = doc.sources[i]
+      yield `${i ? '\n\n' : ''}${i + 1}. [${source.title}](${source.url})${source.snippet ? `\n> ${source.snippet}` : ''}`
+    }
+  }
+}
+
+export function renderMarkdownChunks(research: Research, options: ExportBuildOptions = {}): Generator<string> {
+  return renderMarkdown(parseResearchDocument(research), options)
+}
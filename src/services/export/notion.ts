@@ -0,0 +1,122 @@
+import type { ExportBuildOptions } from './builders'
+import type { Block, Inline, ResearchDocument } from './document'
+
+// Notion API limits for block payloads
+export const NOTION_MAX_TEXT_LENGTH = 2000
+const NOTION_MAX_RICH_TEXT_ITEMS = 100
+
+export interface NotionRichText {
+  type: 'text'
+  text: { content: string; link?: { url: string } }
+  annotations?: { bold?: boolean; italic?: boolean; code?: boolean }
+}
+
+export interface NotionBlock {
+  object: 'block'
+  type: string
+  [blockType: string]: unknown
+}
+
+function richText(content: string, extra: Omit<NotionRichText, 'type' | 'text'> = {}, url?: string): NotionRichText[] {
+  const pieces: NotionRichText[] = []
+  // Rich text objects are capped at 2000 characters each
+  for (let i = 0; i < content.length; i += NOTION_MAX_TEXT_LENGTH) {
+    pieces.push({
+      type: 'text',
+      text: { content: content.slice(i, i + NOTION_MAX_TEXT_LENGTH), ...(url ? { link: { url } } : {}) },
+      ...extra,
+    })
+  }
+  return pieces
+}
+
+function notionRichText(inlines: Inline[], sources: ResearchDocument['sources']): NotionRichText[] {
+  const items = inlines.flatMap(inline => {
+    switch (inline.type) {
+      case 'text': {
+        const annotations = { bold: inline.bold, italic: inline.italic, code: inline.code }
+        return richText(inline.text, inline.bold || inline.italic || inline.code ? { annotations } : {})
+      }
+      case 'link':
+        return richText(inline.text, {}, inline.href)
+      case 'citation':
+        return richText(`[${inline.index}]`, {}, sources[inline.index - 1]?.url || undefined)
+      case 'break':
+        return richText('\n')
+    }
+  })
+  return items
+}
+
+function textBlock(type: string, rich_text: NotionRichText[], extra: Record<string, unknown> = {}): NotionBlock {
+  return { object: 'block', type, [type]: { rich_text, ...extra } }
+}
+
+/**
+ * Blocks are capped at 100 rich text items, so a long run of links,
+ * citations or breaks carries on in `continuation` blocks rather than
+ * being cut off.
+ */
+function richTextBlocks(type: string, items: NotionRichText[], continuation = type): NotionBlock[] {
+  const blocks = [textBlock(type, items.slice(0, NOTION_MAX_RICH_TEXT_ITEMS))]
+  for (let i = NOTION_MAX_RICH_TEXT_ITEMS; i < items.length; i += NOTION_MAX_RICH_TEXT_ITEMS) {
+    blocks.push(textBlock(continuation, items.slice(i, i + NOTION_MAX_RICH_TEXT_ITEMS)))
+  }
+  return blocks
+}
+
+/** Split text into code blocks that each stay under the rich text limits */
+function codeBlocks(text: string, language: string): NotionBlock[] {
+  const blocks: NotionBlock[] = []
+  const limit = NOTION_MAX_TEXT_LENGTH * NOTION_MAX_RICH_TEXT_ITEMS
+  for (let i = 0; i < Math.max(text.length, 1); i += limit) {
+    blocks.push(textBlock('code', richText(text.slice(i, i + limit)), { language }))
+  }
+  return blocks
+}
+
+function notionBlocks(blocks: Block[], sources: ResearchDocument['sources']): NotionBlock[] {
+  return blocks.flatMap(block => {
+    switch (block.type) {
+      // A heading or list item continues as a paragraph, not as a second heading or bullet
+      case 'heading':
+        return richTextBlocks(`heading_${Math.min(block.level + 1, 3)}`, notionRichText(block.inlines, sources), 'paragraph')
+      case 'paragraph':
+        return richTextBlocks('paragraph', notionRichText(block.inlines, sources))
+      case 'list':
+        return block.items.flatMap(item =>
+          richTextBlocks(block.ordered ? 'numbered_list_item' : 'bulleted_list_item', notionRichText(item, sources), 'paragraph')
+        )
+      case 'quote':
+        return richTextBlocks('quote', notionRichText(block.inlines, sources))
+      case 'code':
+        return codeBlocks(block.text, block.language || 'plain text')
+      case 'rule':
+        return [{ object: 'block' as const, type: 'divider', divider: {} }]
+    }
+  })
+}
+
+/** Render the document as a flat list of Notion blocks for `pages.create` / `blocks.children.append` */
+export function renderNotionBlocks(
+  doc: ResearchDocument,
+  { includeThoughtProcess = true, includeSources = true }: ExportBuildOptions = {}
+): NotionBlock[] {
+  const blocks: NotionBlock[] = [
+    textBlock('heading_2', richText('Research Prompt')),
+    ...codeBlocks(doc.prompt, 'plain text'),
+  ]
+  if (doc.report.length) {
+    blocks.push(textBlock('heading_2', richText('Research Report')), ...notionBlocks(doc.report, doc.sources))
+  }
+  if (includeThoughtProcess && doc.process.length) {
+    blocks.push(textBlock('heading_2', richText('Research Process')), ...notionBlocks(doc.process, doc.sources))
+  }
+  if (includeSources && doc.sources.length) {
+    blocks.push(textBlock('heading_2', richText('Sources')))
+    doc.sources.forEach(source => {
+      blocks.push(textBlock('bulleted_list_item', richText(source.title || source.url, {}, source.url || undefined)))
+    })
+  }
+  return blocks
+}
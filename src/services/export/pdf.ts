@@ -0,0 +1,171 @@
+import { PDFDocument, rgb, type PDFFont, type PDFPage, type RGB } from 'pdf-lib'
+import type { ExportBuildOptions } from './builders'
+import { inlineText, type Block, type ResearchDocument } from './document'
+import { fontRegistry, needsUnicodeFonts } from './fonts'
+
+const PAGE_SIZE: [number, number] = [612, 792] // Letter size
+const MARGIN = 50
+const INDENT = 18
+
+interface TextStyle {
+  font?: PDFFont
+  size?: number
+  color?: RGB
+  indent?: number
+}
+
+const dateLine = (label: string, date: string) => `${label}: ${new Date(date).toLocaleDateString()}`
+
+function* blockText(blocks: Block[]): Generator<string> {
+  for (const block of blocks) {
+    if (block.type === 'code') yield block.text
+    else if (block.type === 'list') for (const item of block.items) yield inlineText(item)
+    else if (block.type !== 'rule') yield inlineText(block.inlines)
+  }
+}
+
+/** Every string the PDF draws, so the Unicode check skips hashes, ids and anything left out */
+function* drawnText(doc: ResearchDocument, includeThoughtProcess: boolean, includeSources: boolean): Generator<string> {
+  yield doc.title
+  yield dateLine('Generated', doc.createdAt)
+  if (doc.completedAt) yield dateLine('Completed', doc.completedAt)
+  yield* blockText(doc.report)
+  if (includeThoughtProcess) yield* blockText(doc.process)
+  if (includeSources) {
+    for (const source of doc.sources) yield* [source.title, source.url, source.snippet]
+  }
+}
+
+function needsUnicode(texts: Iterable<string>): boolean {
+  for (const text of texts) {
+    if (needsUnicodeFonts(text)) return true
+  }
+  return false
+}
+
+export async function renderPDF(
+  doc: ResearchDocument,
+  { includeThoughtProcess = true, includeSources = true, onProgress, signal }: ExportBuildOptions = {}
+): Promise<ArrayBuffer> {
+  const pdfDoc = await PDFDocument.create()
+  // Fixed metadata dates keep output deterministic for identical content
+  pdfDoc.setCreationDate(new Date(doc.createdAt))
+  pdfDoc.setModificationDate(new Date(doc.completedAt || doc.createdAt))
+  const unicode = needsUnicode(drawnText(doc, includeThoughtProcess, includeSources))
+  const fonts = await fontRegistry.embed(pdfDoc, { unicode })
+  const { regular: helveticaFont, bold: helveticaBold, mono: courierFont } = fonts
+
+  let page: PDFPage = pdfDoc.addPage(PAGE_SIZE)
+  const { width, height } = page.getSize()
+  let y = height - MARGIN
+
+  const drawLine = (line: string, font: PDFFont, size: number, color: RGB, x: number) => {
+    if (y < MARGIN) {
+      page = pdfDoc.addPage(PAGE_SIZE)
+      y = height - MARGIN
+    }
+    page.drawText(line, { x, y, size, font, color })
+    y -= size + 5
+  }
+
+  // Word-wrap each line of `text` to the printable width, starting new pages as needed
+  const addText = (text: string, { font = helveticaFont, size = 12, color = rgb(0, 0, 0), indent = 0 }: TextStyle = {}) => {
+    const x = MARGIN + indent
+    const maxWidth = width - MARGIN - x
+    const spaceWidth = fonts.widthOfWord(font, ' ', size)
+    for (const paragraph of text.split('\n')) {
+      // Line width grows word by word from cached metrics instead of re-measuring the whole line
+      let line = ''
+      let lineWidth = 0
+      for (const word of fonts.encodable(font, paragraph).split(' ')) {
+        const wordWidth = fonts.widthOfWord(font, word, size)
+        const testWidth = line ? lineWidth + spaceWidth + wordWidth : wordWidth
+        if (testWidth > maxWidth && line) {
+          drawLine(line, font, size, color, x)
+          line = word
+          lineWidth = wordWidth
+        } else {
+          line = line ? `${line} ${word}` : word
+          lineWidth = testWidth
+        }
+      }
+      if (line) drawLine(line, font, size, color, x)
+    }
+    y -= 5
+  }
+
+  const addBlocks = (blocks: Block[]) => {
+    for (const block of blocks) {
+      switch (block.type) {
+        case 'heading':
+          y -= 5
+          addText(inlineText(block.inlines), { font: helveticaBold, size: Math.max(12, 15 - block.level) })
+          break
+        case 'paragraph':
+          addText(inlineText(block.inlines))
+          break
+        case 'list':
+          block.items.forEach((item, i) => {
+            addText(`${block.ordered ? `${i + 1}.` : '•'} ${inlineText(item)}`, { indent: INDENT })
+          })
+          break
+        case 'quote':
+          addText(inlineText(block.inlines), { color: rgb(0.3, 0.3, 0.3), indent: INDENT })
+          break
+        case 'code':
+          addText(block.text, { font: courierFont, size: 10, indent: INDENT })
+          break
+        case 'rule':
+          y -= 10
+          break
+      }
+    }
+  }
+
+  const addSection = (title: string, render: () => void) => {
+    addText(title, { font: helveticaBold, size: 14 })
+    y -= 5
+    render()
+    y -= 20
+  }
+
+  const sections: Array<() => void> = [
+    () => {
+      addText(doc.title, { font: helveticaBold, size: 16, color: rgb(0.1, 0.1, 0.5) })
+      y -= 10
+      addText(dateLine('Generated', doc.createdAt), { size: 10, color: rgb(0.5, 0.5, 0.5) })
+      if (doc.completedAt) {
+        addText(dateLine('Completed', doc.completedAt), { size: 10, color: rgb(0.5, 0.5, 0.5) })
+      }
+      y -= 20
+    },
+  ]
+  if (doc.report.length) {
+    sections.push(() => addSection('Research Report', () => addBlocks(doc.report)))
+  }
+  if (includeThoughtProcess && doc.process.length) {
+    sections.push(() => addSection('Research Process', () => addBlocks(doc.process)))
+  }
+  if (includeSources && doc.sources.length) {
+    sections.push(() => addSection('Sources', () => {
+      doc.sources.forEach((source, i) => {
+        addText(`${i + 1}. ${source.title}`)
+        if (source.url) addText(source.url, { size: 10, color: rgb(0, 0, 0.8), indent: INDENT })
+        if (source.snippet) addText(`"${source.snippet}"`, { size: 10, color: rgb(0.3, 0.3, 0.3), indent: INDENT })
+        y -= 5
+      })
+    }))
+  }
+
+  sections.forEach((renderSection, i) => {
+    signal?.throwIfAborted()
+    renderSection()
+    onProgress?.({ stage: 'layout', progress: (i + 1) / sections.length })
+  })
+
+  signal?.throwIfAborted()
+  onProgress?.({ stage: 'encode', progress: 0 })
+  const pdfBytes = await pdfDoc.save()
+  onProgress?.({ stage: 'encode', progress: 1 })
+  return pdfBytes.buffer.slice(pdfBytes.byteOffset, pdfBytes.byteOffset + pdfBytes.byteLength) as ArrayBuffer
+}
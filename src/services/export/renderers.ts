@@ -0,0 +1,42 @@
+import type { Research } from '@/types/types'
+import type { ExportBuildOptions } from './builders'
+import { parseResearchDocument, type ResearchDocument } from './document'
+import { renderMarkdown } from './markdown'
+import { renderHTML } from './html'
+import { renderNotionBlocks } from './notion'
+
+/** A renderer turns the parsed document IR into one export target */
+export type DocumentRenderer<T = unknown> = (doc: ResearchDocument, options: ExportBuildOptions) => T
+
+const renderers = new Map<string, DocumentRenderer>()
+
+export function registerRenderer<T>(format: string, renderer: DocumentRenderer<T>): void {
+  renderers.set(format, renderer)
+}
+
+/**
+ * Render a research to `format`. The report is parsed once per content hash,
+ * so rendering the same research to several formats costs a single parse.
+ */
+export function renderResearch<T>(format: string, research: Research, options: ExportBuildOptions = {}): T {
+  const renderer = renderers.get(format)
+  if (!renderer) {
+    throw new Error(`No renderer registered for format: ${format}`)
+  }
+  return renderer(parseResearchDocument(research), options) as T
+}
+
+registerRenderer('markdown', renderMarkdown)
+registerRenderer('html', renderHTML)
+registerRenderer('notion', renderNotionBlocks)
+/**
+ * Load the PDF and DOCX renderers. pdf-lib and docx are large and most
+ * sessions never export, so they are fetched on first use or when a
+ * caller expects an export soon.
+ */
+export function loadBinaryRenderers(): Promise<unknown> {
+  return Promise.all([import('./pdf'), import('./docx')])
+}
+
+registerRenderer('pdf', (doc, options) => import('./pdf').then(({ renderPDF }) => renderPDF(doc, options)))
+registerRenderer('docx', (doc, options) => import('./docx').then(({ renderDOCX }) => renderDOCX(doc, options)))
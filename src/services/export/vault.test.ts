@@ -0,0 +1,57 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import type { Research } from '@/types/types'
+
+const writes = vi.hoisted(() => [] as Array<{ path: string; content: string }>)
+
+vi.mock('@/services/file-system', () => ({
+  fileSystemService: {
+    hasDirectory: true,
+    directoryName: 'Vault',
+    researchFolderName: (title: string, date: string) => `${date.split('T')[0]}_${title.replace(/\W+/g, '_')}`,
+    saveToDirectory: vi.fn(async (filename: string, content: string, subdirectory?: string) => {
+      writes.push({ path: subdirectory ? `${subdirectory}/${filename}` : filename, content })
+    }),
+  },
+}))
+
+import { syncVault } from './vault'
+
+const makeResearch = (i: number): Research => ({
+  id: `research-${i}`,
+  title: `Research ${i}`,
+  prompt: 'Prompt',
+  status: 'completed',
+  createdAt: `2024-01-${String((i % 28) + 1).padStart(2, '0')}T00:00:00.000Z`,
+  completedAt: `2024-01-${String((i % 28) + 1).padStart(2, '0')}T01:00:00.000Z`,
+  result: { report: `Report ${i}`, thoughtProcess: 'Process', sources: [] },
+})
+
+describe('syncVault', () => {
+  beforeEach(() => {
+    writes.length = 0
+  })
+
+  it('writes notes and the index once, then nothing on a no-op sync', async () => {
+    const researches = Array.from({ length: 1000 }, (_, i) => makeResearch(i))
+    const first = await syncVault(researches)
+    expect(first.written).toBe(1001)
+    expect(writes.find(w => w.path === 'Research Index.md')?.content).toContain('count: 1000')
+    expect(writes.find(w => w.path === 'Research/2024-01-01_Research_0.md')?.content).toMatch(/^---\ntitle: "Research 0"/)
+
+    writes.length = 0
+    const second = await syncVault(researches)
+    expect(second).toMatchObject({ written: 0, skipped: 1000 })
+    expect(writes).toHaveLength(0)
+  })
+
+  it('rewrites only the notes whose content changed', async () => {
+    const researches = [makeResearch(1), makeResearch(2)].map(r => ({ ...r, id: `edited-${r.id}`, title: `Edited ${r.title}` }))
+    await syncVault(researches)
+    writes.length = 0
+
+    researches[1] = { ...researches[1], result: { ...researches[1].result!, report: 'Revised report' } }
+    const result = await syncVault(researches)
+    expect(writes.map(w => w.path)).toEqual(['Research/2024-01-03_Edited_Research_2.md'])
+    expect(result.written).toBe(1)
+  })
+})
@@ -0,0 +1,166 @@
+import type { Research } from '@/types/types'
+import { fileSystemService } from '@/services/file-system'
+import { IdbStore } from '@/services/idb'
+import { hashString, mapWithConcurrency } from '@/utils/utils'
+import { hashResearchContent } from './document'
+import type { ExportJobOptions } from './index'
+import { renderMarkdownChunks } from './markdown'
+
+// Bump when note or index layout changes so every file is rewritten once
+const NOTE_FORMAT_VERSION = 1
+const INDEX_NOTE = 'Research Index.md'
+
+interface ManifestEntry {
+  path: string
+  /** Hash of everything the note is rendered from; unchanged means no render at all */
+  sourceHash: string
+  /** Hash of the rendered note as last written */
+  contentHash: string
+}
+
+/** What was last written to a vault, keyed by research id plus the index note */
+export interface VaultManifest {
+  researches: Record<string, ManifestEntry>
+  indexHash?: string
+}
+
+export interface VaultSyncOptions extends Pick<ExportJobOptions, 'includeThoughtProcess' | 'includeSources' | 'signal'> {
+  /** Vault subfolder for research notes; the index note sits next to it */
+  folder?: string
+  concurrency?: number
+  /** Rewrite every note even if the manifest says it is current */
+  force?: boolean
+  onProgress?: (progress: { checked: number; written: number; total: number }) => void
+}
+
+export interface VaultSyncResult {
+  total: number
+  written: number
+  skipped: number
+  errors: Array<{ id: string; title: string; message: string }>
+}
+
+const manifestStore = new IdbStore<VaultManifest>('vault-manifest')
+
+const yamlString = (value: string) => JSON.stringify(value)
+
+function frontmatter(fields: Record<string, string | number | string[] | undefined>): string {
+  const lines = Object.entries(fields)
+    .filter(([, value]) => value !== undefined)
+    .map(([key, value]) =>
+      Array.isArray(value)
+        ? `${key}:\n${value.map(item => `  - ${yamlString(item)}`).join('\n')}`
+        : `${key}: ${typeof value === 'number' ? value : yamlString(value!)}`
+    )
+  return `---\n${lines.join('\n')}\n---\n\n`
+}
+
+function renderNote(research: Research, options: VaultSyncOptions): string {
+  return (
+    frontmatter({
+      title: research.title,
+      status: research.status,
+      created: research.createdAt,
+      completed: research.completedAt,
+      sources: research.result?.sources.length ?? 0,
+      cost: research.cost?.totalCost,
+      tags: ['research'],
+    }) + [...renderMarkdownChunks(research, options)].join('')
+  )
+}
+
+function renderIndex(notes: Array<{ research: Research; path: string }>): string {
+  const latest = notes.reduce((max, { research }) => (research.createdAt > max ? research.createdAt : max), '')
+  const rows = notes.map(({ research, path }) => {
+    const title = research.title.replace(/[|[\]]/g, ' ')
+    return `| [[${path.replace(/\.md$/, '')}\\|${title}]] | ${research.createdAt.split('T')[0]} | ${research.status} |`
+  })
+  return (
+    frontmatter({ type: 'research-index', count: notes.length, updated: latest || undefined, tags: ['research'] }) +
+    `# Research Index\n\n| Research | Created | Status |\n| --- | --- | --- |\n${rows.join('\n')}\n`
+  )
+}
+
+/**
+ * Sync researches into the selected Obsidian vault as one note per
+ * research plus an index note. A manifest of source and content hashes
+ * per vault lets unchanged researches skip rendering entirely, and only
+ * notes whose rendered text changed are written, so Obsidian re-indexes
+ * just those files.
+ */
+export async function syncVault(
+  researches: Research[],
+  { folder = 'Research', concurrency = 4, force = false, onProgress, signal, ...renderOptions }: VaultSyncOptions = {}
+): Promise<VaultSyncResult> {
+  if (!fileSystemService.hasDirectory) {
+    await fileSystemService.selectExportDirectory()
+  }
+
+  const vault = fileSystemService.directoryName
+  const manifest: VaultManifest = (!force && (await manifestStore.get(vault))) || { researches: {} }
+  const exportable = researches.filter(research => research.result)
+  const renderKey = [NOTE_FORMAT_VERSION, folder, renderOptions.includeThoughtProcess ?? true, renderOptions.includeSources ?? true]
+  const result: VaultSyncResult = { total: exportable.length, written: 0, skipped: 0, errors: [] }
+  let checked = 0
+  const report = () => onProgress?.({ checked, written: result.written, total: result.total })
+
+  // Paths are fixed per research on first sync so renamed titles keep their note
+  const usedPaths = new Set(Object.values(manifest.researches).map(entry => entry.path))
+  const notes = exportable.map(research => {
+    let path = manifest.researches[research.id]?.path
+    if (!path) {
+      const base = `${folder}/${fileSystemService.researchFolderName(research.title, research.createdAt)}`
+      path = usedPaths.has(`${base}.md`) ? `${base}_${research.id.slice(-6)}.md` : `${base}.md`
+      usedPaths.add(path)
+    }
+    return { research, path }
+  })
+
+  const write = (path: string, content: string) => {
+    const slash = path.lastIndexOf('/')
+    return fileSystemService.saveToDirectory(path.slice(slash + 1), content, slash < 0 ? undefined : path.slice(0, slash))
+  }
+
+  try {
+    await mapWithConcurrency(notes, concurrency, async ({ research, path }) => {
+      signal?.throwIfAborted()
+      try {
+        const sourceHash = hashString(JSON.stringify([hashResearchContent(research), research.status, research.cost, renderKey]))
+        const entry = manifest.researches[research.id]
+        if (entry && entry.path === path && entry.sourceHash === sourceHash) {
+          result.skipped++
+          return
+        }
+        const content = renderNote(research, renderOptions)
+        const contentHash = hashString(content)
+        if (entry?.path !== path || entry.contentHash !== contentHash) {
+          await write(path, content)
+          result.written++
+        } else {
+          result.skipped++
+        }
+        manifest.researches[research.id] = { path, sourceHash, contentHash }
+      } catch (error) {
+        result.errors.push({ id: research.id, title: research.title, message: (error as Error).message })
+        if ((error as any).name === 'AbortError') throw error
+      } finally {
+        checked++
+        report()
+      }
+    })
+    signal?.throwIfAborted()
+
+    const index = renderIndex(notes)
+    const indexHash = hashString(index)
+    if (manifest.indexHash !== indexHash) {
+      await write(INDEX_NOTE, index)
+      manifest.indexHash = indexHash
+      result.written++
+      report()
+    }
+  } finally {
+    // Keep whatever was written, even when the sync stops part way
+    await manifestStore.set(vault, manifest).catch(() => {})
+  }
+  return result
+}
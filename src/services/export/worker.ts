@@ -0,0 +1,27 @@
+// Dedicated worker that builds PDF/DOCX exports off the main thread.
+// Each worker handles one job at a time; ExportService pools and recycles them.
+import { buildExport, type ExportWorkerRequest, type ExportWorkerResponse } from './builders'
+import { loadBinaryRenderers } from './renderers'
+
+const ctx = self as unknown as Worker
+
+// Workers are only started to export, sometimes ahead of the first job, so fetch the renderers now
+loadBinaryRenderers().catch(() => {
+  // Retried, and reported, by the first job that needs them
+})
+
+const post = (message: ExportWorkerResponse, transfer: Transferable[] = []) => ctx.postMessage(message, transfer)
+
+ctx.addEventListener('message', async (event: MessageEvent<ExportWorkerRequest>) => {
+  const { format, research, options } = event.data
+  try {
+    const buffer = await buildExport(format, research, {
+      ...options,
+      onProgress: progress => post({ type: 'progress', progress }),
+    })
+    // Transfer rather than copy the bytes back to the main thread
+    post({ type: 'done', buffer }, [buffer])
+  } catch (error) {
+    post({ type: 'error', message: (error as Error).message || 'Export failed' })
+  }
+})
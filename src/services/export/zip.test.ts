@@ -0,0 +1,66 @@
+import { describe, it, expect } from 'vitest'
+import JSZip from 'jszip'
+import { crc32, zipStream } from './zip'
+
+async function collect(chunks: AsyncIterable<Uint8Array>): Promise<Uint8Array> {
+  const parts: Uint8Array[] = []
+  for await (const chunk of chunks) parts.push(chunk)
+  const bytes = new Uint8Array(parts.reduce((sum, part) => sum + part.length, 0))
+  let offset = 0
+  for (const part of parts) {
+    bytes.set(part, offset)
+    offset += part.length
+  }
+  return bytes
+}
+
+describe('crc32', () => {
+  it('matches the standard check value, also when computed incrementally', () => {
+    const bytes = new TextEncoder().encode('123456789')
+    expect(crc32(bytes)).toBe(0xcbf43926)
+    expect(crc32(bytes.subarray(4), crc32(bytes.subarray(0, 4)))).toBe(0xcbf43926)
+  })
+})
+
+describe('zipStream', () => {
+  it('writes an archive that standard readers accept', async () => {
+    const bytes = await collect(
+      zipStream([
+        { name: 'known.bin', data: new Uint8Array([1, 2, 3]) },
+        { name: 'streamed.txt', data: ['hello ', 'world'] },
+        { name: 'dir/compressed.md', data: ['# Title\n', 'text '.repeat(1000)], compress: true },
+        { name: 'ünïcode.txt', data: (function* () { yield 'ok' })() },
+      ])
+    )
+    const zip = await JSZip.loadAsync(bytes, { checkCRC32: true })
+    expect(Array.from(await zip.file('known.bin')!.async('uint8array'))).toEqual([1, 2, 3])
+    expect(await zip.file('streamed.txt')!.async('string')).toBe('hello world')
+    expect(await zip.file('dir/compressed.md')!.async('string')).toBe(`# Title\n${'text '.repeat(1000)}`)
+    expect(await zip.file('ünïcode.txt')!.async('string')).toBe('ok')
+  })
+
+  it('stays valid when each chunk is transferred to another thread as it is yielded', async () => {
+    // What the bundle worker does: postMessage empties every buffer it transfers
+    async function* transferred(chunks: AsyncIterable<Uint8Array>) {
+      for await (const chunk of chunks) {
+        const owned = chunk.byteOffset === 0 && chunk.byteLength === chunk.buffer.byteLength
+        yield owned ? structuredClone(chunk, { transfer: [chunk.buffer as ArrayBuffer] }) : chunk
+      }
+    }
+    const known = new Uint8Array([4, 5, 6])
+    const bytes = await collect(
+      transferred(
+        zipStream([
+          { name: 'known.bin', data: known },
+          { name: 'compressed.md', data: ['text '.repeat(1000)], compress: true },
+          { name: 'streamed.txt', data: ['hello'] },
+        ])
+      )
+    )
+    expect(known.length).toBe(0)
+    const zip = await JSZip.loadAsync(bytes, { checkCRC32: true })
+    expect(Array.from(await zip.file('known.bin')!.async('uint8array'))).toEqual([4, 5, 6])
+    expect(await zip.file('compressed.md')!.async('string')).toBe('text '.repeat(1000))
+    expect(await zip.file('streamed.txt')!.async('string')).toBe('hello')
+  })
+})
@@ -0,0 +1,222 @@
+// Minimal streaming ZIP writer. Entries are emitted as they are read, with
+// CRC-32 and sizes computed incrementally and written in data descriptors,
+// so an archive of any size is produced without buffering it.
+
+export interface ZipEntry {
+  /** Path inside the archive, '/'-separated */
+  name: string
+  /** Known bytes, or a stream of chunks produced on demand */
+  data: Uint8Array | Iterable<Uint8Array | string> | AsyncIterable<Uint8Array | string>
+  date?: Date
+  /** Deflate the entry (when the runtime supports it); leave off for already compressed formats */
+  compress?: boolean
+}
+
+interface CentralRecord {
+  name: Uint8Array
+  flags: number
+  method: number
+  time: number
+  date: number
+  crc: number
+  compressedSize: number
+  size: number
+  offset: number
+}
+
+const FLAG_DATA_DESCRIPTOR = 0x0008
+const FLAG_UTF8 = 0x0800
+const METHOD_STORE = 0
+const METHOD_DEFLATE = 8
+const MAX_ZIP32 = 0xffffffff
+
+const CRC_TABLE = (() => {
+  const table = new Uint32Array(256)
+  for (let n = 0; n < 256; n++) {
+    let c = n
+    for (let k = 0; k < 8; k++) c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1
+    table[n] = c >>> 0
+  }
+  return table
+})()
+
+/** Continue a CRC-32 over `bytes`; start with `crc32(bytes)` and pass the previous value after */
+export function crc32(bytes: Uint8Array, previous = 0): number {
+  let crc = previous ^ 0xffffffff
+  for (let i = 0; i < bytes.length; i++) crc = CRC_TABLE[(crc ^ bytes[i]) & 0xff] ^ (crc >>> 8)
+  return (crc ^ 0xffffffff) >>> 0
+}
+
+let deflateSupported: boolean | undefined
+function canDeflate(): boolean {
+  if (deflateSupported === undefined) {
+    try {
+      new CompressionStream('deflate-raw' as CompressionFormat)
+      deflateSupported = true
+    } catch {
+      deflateSupported = false
+    }
+  }
+  return deflateSupported
+}
+
+function dosDateTime(date: Date): { time: number; date: number } {
+  return {
+    time: (date.getHours() << 11) | (date.getMinutes() << 5) | (date.getSeconds() >> 1),
+    date: (Math.max(date.getFullYear() - 1980, 0) << 9) | ((date.getMonth() + 1) << 5) | date.getDate(),
+  }
+}
+
+const encoder = new TextEncoder()
+
+async function* toBytes(chunks: Iterable<Uint8Array | string> | AsyncIterable<Uint8Array | string>): AsyncGenerator<Uint8Array> {
+  for await (const chunk of chunks) yield typeof chunk === 'string' ? encoder.encode(chunk) : chunk
+}
+
+/** Pipe chunks through a raw deflate stream, reading output while input is still being written */
+async function* deflateRaw(chunks: AsyncIterable<Uint8Array>): AsyncGenerator<Uint8Array> {
+  const stream = new CompressionStream('deflate-raw' as CompressionFormat)
+  const writer = stream.writable.getWriter()
+  const pump = (async () => {
+    try {
+      for await (const chunk of chunks) await writer.write(chunk)
+      await writer.close()
+    } catch (error) {
+      await writer.abort(error).catch(() => {})
+      throw error
+    }
+  })()
+  const reader = stream.readable.getReader()
+  try {
+    for (;;) {
+      const { value, done } = await reader.read()
+      if (done) break
+      yield value
+    }
+  } finally {
+    reader.releaseLock()
+  }
+  await pump
+}
+
+function localHeader(record: CentralRecord): Uint8Array {
+  const header = new Uint8Array(30 + record.name.length)
+  const view = new DataView(header.buffer)
+  view.setUint32(0, 0x04034b50, true)
+  view.setUint16(4, 20, true)
+  view.setUint16(6, record.flags, true)
+  view.setUint16(8, record.method, true)
+  view.setUint16(10, record.time, true)
+  view.setUint16(12, record.date, true)
+  // With a data descriptor these stay zero and follow the data instead
+  view.setUint32(14, record.crc, true)
+  view.setUint32(18, record.compressedSize, true)
+  view.setUint32(22, record.size, true)
+  view.setUint16(26, record.name.length, true)
+  header.set(record.name, 30)
+  return header
+}
+
+function dataDescriptor(record: CentralRecord): Uint8Array {
+  const descriptor = new Uint8Array(16)
+  const view = new DataView(descriptor.buffer)
+  view.setUint32(0, 0x08074b50, true)
+  view.setUint32(4, record.crc, true)
+  view.setUint32(8, record.compressedSize, true)
+  view.setUint32(12, record.size, true)
+  return descriptor
+}
+
+function centralDirectory(records: CentralRecord[], offset: number): Uint8Array {
+  const size = records.reduce((sum, record) => sum + 46 + record.name.length, 0)
+  const bytes = new Uint8Array(size + 22)
+  const view = new DataView(bytes.buffer)
+  let p = 0
+  for (const record of records) {
+    view.setUint32(p, 0x02014b50, true)
+    view.setUint16(p + 4, 20, true)
+    view.setUint16(p + 6, 20, true)
+    view.setUint16(p + 8, record.flags, true)
+    view.setUint16(p + 10, record.method, true)
+    view.setUint16(p + 12, record.time, true)
+    view.setUint16(p + 14, record.date, true)
+    view.setUint32(p + 16, record.crc, true)
+    view.setUint32(p + 20, record.compressedSize, true)
+    view.setUint32(p + 24, record.size, true)
+    view.setUint16(p + 28, record.name.length, true)
+    view.setUint32(p + 42, record.offset, true)
+    bytes.set(record.name, p + 46)
+    p += 46 + record.name.length
+  }
+  // End of central directory record
+  view.setUint32(p, 0x06054b50, true)
+  view.setUint16(p + 8, records.length, true)
+  view.setUint16(p + 10, records.length, true)
+  view.setUint32(p + 12, size, true)
+  view.setUint32(p + 16, offset, true)
+  return bytes
+}
+
+/**
+ * Stream a ZIP archive of `entries`. Entries with known bytes get sizes in
+ * their local header; streamed entries use data descriptors. Archives are
+ * limited to ZIP32 (4GB, 65535 entries), which is far beyond any export.
+ */
+export async function* zipStream(entries: Iterable<ZipEntry> | AsyncIterable<ZipEntry>): AsyncGenerator<Uint8Array> {
+  const records: CentralRecord[] = []
+  let offset = 0
+  // Consumers may transfer a yielded chunk's buffer to another thread, which
+  // empties it here, so every length is read before its chunk is yielded
+
+  for await (const entry of entries) {
+    const { time, date } = dosDateTime(entry.date ?? new Date())
+    const method = entry.compress && canDeflate() ? METHOD_DEFLATE : METHOD_STORE
+    const record: CentralRecord = {
+      name: encoder.encode(entry.name),
+      flags: FLAG_UTF8,
+      method,
+      time,
+      date,
+      crc: 0,
+      compressedSize: 0,
+      size: 0,
+      offset,
+    }
+
+    if (entry.data instanceof Uint8Array && method === METHOD_STORE) {
+      record.crc = crc32(entry.data)
+      record.size = record.compressedSize = entry.data.length
+      const header = localHeader(record)
+      offset += header.length + record.size
+      yield header
+      yield entry.data
+    } else {
+      record.flags |= FLAG_DATA_DESCRIPTOR
+      const header = localHeader(record)
+      offset += header.length
+      yield header
+
+      // CRC and uncompressed size are taken from the input as it passes through
+      const input = async function* () {
+        for await (const chunk of toBytes(entry.data instanceof Uint8Array ? [entry.data] : entry.data)) {
+          record.crc = crc32(chunk, record.crc)
+          record.size += chunk.length
+          yield chunk
+        }
+      }
+      for await (const chunk of method === METHOD_DEFLATE ? deflateRaw(input()) : input()) {
+        record.compressedSize += chunk.length
+        yield chunk
+      }
+      const descriptor = dataDescriptor(record)
+      offset += record.compressedSize + descriptor.length
+      yield descriptor
+    }
+    if (offset > MAX_ZIP32) {
+      throw new Error('Archive exceeds the 4GB ZIP limit')
+    }
+    records.push(record)
+  }
+
+  yield centralDirectory(records, offset)
+}
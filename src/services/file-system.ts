@@ -1,7 +1,17 @@
 import { fileOpen, fileSave, supported } from 'browser-fs-access'
+import { IdbStore } from '@/services/idb'
+
+export type ExportChunk = string | Uint8Array | ArrayBuffer | Blob
+
+/** Anything an exporter can yield output from, chunk by chunk */
+export type ChunkSource = Iterable<ExportChunk> | AsyncIterable<ExportChunk>
+
+const DIRECTORY_HANDLE_KEY = 'export-directory'
 
 export class FileSystemService {
   private directoryHandle: FileSystemDirectoryHandle | null = null
+  // Directory handles are structured-cloneable, so they survive reloads in IndexedDB
+  private handleStore = new IdbStore<FileSystemDirectoryHandle>('file-handles')
 
   async selectExportDirectory(): Promise<void> {
     if (!supported) {
@@ -18,6 +28,36 @@ export class FileSystemService {
       }
       throw error
     }
+    await this.handleStore.set(DIRECTORY_HANDLE_KEY, this.directoryHandle!).catch(() => {})
+  }
+
+  /**
+   * Restore the export directory chosen in a previous session. Browsers only
+   * grant a fresh permission prompt during a user gesture, so pass
+   * `request: true` only from a click handler.
+   * Returns whether the directory is ready for writing.
+   */
+  async restoreExportDirectory({ request = false }: { request?: boolean } = {}): Promise<boolean> {
+    if (this.directoryHandle) return true
+    const handle = await this.handleStore.get(DIRECTORY_HANDLE_KEY).catch(() => undefined)
+    if (!handle) return false
+
+    const descriptor = { mode: 'readwrite' }
+    // Browsers without the permission methods grant access with the handle
+    let permission: PermissionState = (await (handle as any).queryPermission?.(descriptor)) ?? 'granted'
+    if (permission === 'prompt' && request) {
+      permission = await (handle as any).requestPermission(descriptor)
+    }
+    if (permission !== 'granted') return false
+
+    this.directoryHandle = handle
+    return true
+  }
+
+  /** Name of the previously chosen directory, even before permission is restored */
+  async storedDirectoryName(): Promise<string | null> {
+    const handle = await this.handleStore.get(DIRECTORY_HANDLE_KEY).catch(() => undefined)
+    return handle?.name ?? null
   }
 
   async saveFile(
@@ -40,31 +80,95 @@ export class FileSystemService {
     }
   }
 
+  /**
+   * Stream `chunks` to a file chosen through the save dialog. Chunks are
+   * written as they are produced, so the export is never held in memory as
+   * a whole. Falls back to a buffered `saveFile` when the browser has no
+   * `showSaveFilePicker`.
+   */
+  async saveStream(
+    filename: string,
+    chunks: ChunkSource,
+    mimeType: string = 'text/plain'
+  ): Promise<void> {
+    if (!('showSaveFilePicker' in window)) {
+      const parts: BlobPart[] = []
+      for await (const chunk of chunks) parts.push(chunk)
+      return this.saveFile(filename, new Blob(parts, { type: mimeType }), mimeType)
+    }
+
+    let fileHandle: FileSystemFileHandle
+    try {
+      fileHandle = await (window as any).showSaveFilePicker({
+        suggestedName: filename,
+        types: [{ accept: { [mimeType]: [this.getExtension(filename)] } }],
+      })
+    } catch (error) {
+      if ((error as any).name === 'AbortError') {
+        throw new Error('Save cancelled')
+      }
+      throw error
+    }
+
+    await this.writeChunks(await fileHandle.createWritable(), chunks)
+  }
+
   async saveToDirectory(
     filename: string,
     content: string | Blob,
     subdirectory?: string
   ): Promise<void> {
+    await this.saveStreamToDirectory(filename, [content], subdirectory)
+  }
+
+  async saveStreamToDirectory(
+    filename: string,
+    chunks: ChunkSource,
+    subdirectory?: string
+  ): Promise<void> {
+    const writable = await this.openDirectoryWritable(filename, subdirectory)
+    await this.writeChunks(writable, chunks)
+  }
+
+  private async openDirectoryWritable(
+    filename: string,
+    subdirectory?: string
+  ): Promise<FileSystemWritableFileStream> {
     if (!this.directoryHandle) {
       throw new Error('No directory selected')
     }
 
     let targetDir = this.directoryHandle
 
-    // Create subdirectory if specified
-    if (subdirectory) {
-      targetDir = await this.directoryHandle.getDirectoryHandle(subdirectory, {
+    // Create subdirectory if specified; nested paths use '/' separators
+    for (const segment of subdirectory?.split('/').filter(Boolean) ?? []) {
+      targetDir = await targetDir.getDirectoryHandle(segment, {
         create: true,
       })
     }
 
     // Create file handle
     const fileHandle = await targetDir.getFileHandle(filename, { create: true })
-    const writable = await fileHandle.createWritable()
+    return fileHandle.createWritable()
+  }
 
-    const blob = content instanceof Blob ? content : new Blob([content])
-    await writable.write(blob)
-    await writable.close()
+  // Waiting on `writer.ready` before each write applies the stream's
+  // backpressure to the producer, keeping memory flat for large exports.
+  private async writeChunks(
+    writable: FileSystemWritableFileStream,
+    chunks: ChunkSource
+  ): Promise<void> {
+    const writer = writable.getWriter()
+    try {
+      for await (const chunk of chunks) {
+        await writer.ready
+        await writer.write(chunk)
+      }
+      await writer.close()
+    } catch (error) {
+      await writer.abort(error).catch(() => {})
+      throw error
+    }
   }
 
   async loadFile(): Promise<{ content: string; filename: string }> {
@@ -76,19 +180,22 @@ export class FileSystemService {
     return { content, filename: file.name }
   }
 
-  async createResearchFolder(researchTitle: string): Promise<string> {
+  async createResearchFolder(researchTitle: string, date: string | Date = new Date()): Promise<string> {
     if (!this.directoryHandle) {
       await this.selectExportDirectory()
     }
 
-    const sanitizedTitle = this.sanitizeFilename(researchTitle)
-    const timestamp = new Date().toISOString().split('T')[0]
-    const folderName = `${timestamp}_${sanitizedTitle}`
-
+    const folderName = this.researchFolderName(researchTitle, date)
     await this.directoryHandle!.getDirectoryHandle(folderName, { create: true })
     return folderName
   }
 
+  researchFolderName(researchTitle: string, date: string | Date = new Date()): string {
+    const sanitizedTitle = this.sanitizeFilename(researchTitle)
+    const timestamp = new Date(date).toISOString().split('T')[0]
+    return `${timestamp}_${sanitizedTitle}`
+  }
+
   private getExtension(filename: string): string {
     const parts = filename.split('.')
     return parts.length > 1 ? `.${parts.pop()}` : ''
@@ -0,0 +1,34 @@
+import { describe, it, expect } from 'vitest'
+import { HistoryDiff } from './history-index'
+import type { Research } from '@/types/types'
+
+const research = (id: string, status: Research['status'] = 'running'): Research => ({
+  id,
+  title: id,
+  prompt: '',
+  status,
+  createdAt: '2024-01-01T00:00:00.000Z',
+})
+
+describe('HistoryDiff', () => {
+  it('reports added, replaced and removed research by identity', () => {
+    const diff = new HistoryDiff<string>()
+    const [a, b, c] = [research('a'), research('b'), research('c')]
+    expect(diff.diff([a, b]).added).toEqual([a, b])
+    diff.track('a', 'stamp a')
+
+    const updated = { ...a, status: 'completed' as const }
+    const changes = diff.diff([updated, c])
+    expect(changes.added).toEqual([c])
+    expect(changes.changed).toEqual([{ research: updated, previous: { research: a, data: 'stamp a' } }])
+    expect(changes.removed).toEqual([{ research: b, data: undefined }])
+    expect(diff.size).toBe(2)
+  })
+
+  it('is empty when nothing changed identity', () => {
+    const diff = new HistoryDiff()
+    const history = [research('a'), research('b')]
+    diff.diff(history)
+    expect(diff.diff([...history]).empty).toBe(true)
+  })
+})
@@ -0,0 +1,91 @@
+import type { Research } from '@/types/types'
+
+/** A research as last seen, with whatever the index derived from it */
+export interface Tracked<T> {
+  research: Research
+  data?: T
+}
+
+export interface HistoryChanges<T> {
+  /** Research seen for the first time */
+  added: Research[]
+  /** Research replaced by a new object since the last diff, with what was tracked before */
+  changed: Array<{ research: Research; previous: Tracked<T> }>
+  /** Research no longer in history */
+  removed: Tracked<T>[]
+  empty: boolean
+}
+
+/**
+ * Changes between successive history arrays. The store replaces a research
+ * object on every update and keeps the rest, so comparing identities per id
+ * finds what changed without reading any content. Each research can carry
+ * data derived from it, such as a stamp or what it contributed to an
+ * index, which is handed back when it changes or is removed.
+ */
+export class HistoryDiff<T = never> {
+  private known = new Map<string, Tracked<T>>()
+
+  get size(): number {
+    return this.known.size
+  }
+
+  has(id: string): boolean {
+    return this.known.has(id)
+  }
+
+  get(id: string): Tracked<T> | undefined {
+    return this.known.get(id)
+  }
+
+  /** Record `history` as the latest and return what changed since the previous call */
+  diff(history: Research[]): HistoryChanges<T> {
+    const added: Research[] = []
+    const changed: HistoryChanges<T>['changed'] = []
+    const removed: Tracked<T>[] = []
+    for (const research of history) {
+      const previous = this.known.get(research.id)
+      if (previous?.research === research) continue
+      if (previous) changed.push({ research, previous: { ...previous } })
+      else added.push(research)
+      this.known.set(research.id, { research, data: previous?.data })
+    }
+    // Every id in history is known by now, so only a larger map can hold removed research
+    if (this.known.size > history.length) {
+      const ids = new Set(history.map(research => research.id))
+      for (const [id, tracked] of this.known) {
+        if (ids.has(id)) continue
+        removed.push(tracked)
+        this.known.delete(id)
+      }
+    }
+    return { added, changed, removed, empty: added.length + changed.length + removed.length === 0 }
+  }
+
+  /** Attach derived data to a research seen in the last diff */
+  track(id: string, data: T): void {
+    const tracked = this.known.get(id)
+    if (tracked) tracked.data = data
+  }
+}
+
+/** Version counter and listeners, so an index can back useSyncExternalStore */
+export class Subscribable {
+  private version = 0
+  private listeners = new Set<() => void>()
+
+  /** Changes on every update, for useSyncExternalStore */
+  getVersion(): number {
+    return this.version
+  }
+
+  subscribe(listener: () => void): () => void {
+    this.listeners.add(listener)
+    return () => this.listeners.delete(listener)
+  }
+
+  protected notify(): void {
+    this.version++
+    this.listeners.forEach(listener => listener())
+  }
+}
@@ -0,0 +1,57 @@
+import { describe, it, expect } from 'vitest'
+import { IdbStore, compareKeys } from './idb'
+
+interface Row {
+  id: string
+  group: string
+  score: number
+  note?: string
+}
+
+const rows: Row[] = [
+  { id: 'a', group: 'x', score: 3 },
+  { id: 'b', group: 'y', score: 1, note: 'only b' },
+  { id: 'c', group: 'x', score: 2 },
+  { id: 'd', group: 'x', score: 5 },
+]
+
+describe('compareKeys', () => {
+  it('orders numbers before strings before arrays, and arrays element by element', () => {
+    const keys = [['x', 2], 'b', ['x'], 10, 'a', ['w', 9], -1]
+    expect([...keys].sort(compareKeys)).toEqual([-1, 10, 'a', 'b', ['w', 9], ['x'], ['x', 2]])
+  })
+})
+
+describe('IdbStore indexes', () => {
+  // A store per test, since the databases outlive a test wherever IndexedDB is real
+  const create = async (name: string) => {
+    const store = new IdbStore<Row>(`idb-test-${name}`, {
+      keyPath: 'id',
+      indexes: { score: 'score', group_score: ['group', 'score'], note: 'note' },
+    })
+    await store.clear()
+    await store.update(rows.map(row => [row.id, row]), [])
+    return store
+  }
+
+  it('reads values in index order a page at a time', async () => {
+    const store = await create('order')
+    expect((await store.query('score')).map(row => row.id)).toEqual(['b', 'c', 'a', 'd'])
+    expect((await store.query('score', { direction: 'prev', offset: 1, limit: 2 })).map(row => row.id)).toEqual(['a', 'c'])
+  })
+
+  it('counts and filters within compound key bounds', async () => {
+    const store = await create('bounds')
+    const bounds = { lower: ['x', -Infinity], upper: ['x', Infinity] }
+    expect(await store.count('group_score', bounds)).toBe(3)
+    expect((await store.query('group_score', { bounds, direction: 'prev' })).map(row => row.id)).toEqual(['d', 'a', 'c'])
+  })
+
+  it('leaves values without the indexed property out of the index', async () => {
+    const store = await create('sparse')
+    expect(await store.indexKeys('note')).toEqual([['b', 'only b']])
+    await store.update([], ['b'])
+    expect(await store.count('note')).toBe(0)
+    expect(await store.count('score')).toBe(3)
+  })
+})
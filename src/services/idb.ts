@@ -0,0 +1,233 @@
+const OBJECT_STORE = 'kv'
+
+export interface IdbStoreOptions {
+  /** Property holding each value's key; values are then stored without a separate key */
+  keyPath?: string
+  /** Indexes by name, each on one property or a compound of several */
+  indexes?: Record<string, string | string[]>
+  /**
+   * Schema version. Bump it when keyPath or indexes change: the upgrade
+   * recreates the store empty, so only use indexes for data that can be rebuilt.
+   */
+  version?: number
+}
+
+/** Inclusive bounds on an index key */
+export interface KeyBounds {
+  lower: IDBValidKey
+  upper: IDBValidKey
+}
+
+export interface IndexQuery {
+  bounds?: KeyBounds
+  /** 'prev' reads the index in descending order */
+  direction?: 'next' | 'prev'
+  offset?: number
+  limit?: number
+}
+
+function promisify<T>(request: IDBRequest<T>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result)
+    request.onerror = () => reject(request.error)
+  })
+}
+
+const keyRank = (key: IDBValidKey) =>
+  typeof key === 'number' ? 0 : key instanceof Date ? 1 : typeof key === 'string' ? 2 : Array.isArray(key) ? 4 : 3
+
+/** IndexedDB's key order, so the in-memory fallback reads indexes the same way */
+export function compareKeys(a: IDBValidKey, b: IDBValidKey): number {
+  const rank = keyRank(a) - keyRank(b)
+  if (rank !== 0) return rank
+  if (Array.isArray(a) && Array.isArray(b)) {
+    for (let i = 0; i < Math.min(a.length, b.length); i++) {
+      const order = compareKeys(a[i], b[i])
+      if (order !== 0) return order
+    }
+    return a.length - b.length
+  }
+  const [x, y] = [a, b].map(key => (key instanceof Date ? key.getTime() : key)) as [number | string, number | string]
+  return x < y ? -1 : x > y ? 1 : 0
+}
+
+/**
+ * Minimal promise wrapper around an IndexedDB key-value store. Each store
+ * lives in its own database so features can add storage without
+ * coordinating schema versions. Stores with indexes can be counted and
+ * read a page at a time in index order. When IndexedDB is unavailable
+ * (tests, private browsing) it falls back to an in-memory map.
+ */
+export class IdbStore<T> {
+  private dbPromise: Promise<IDBDatabase | null> | null = null
+  private memory = new Map<string, T>()
+
+  constructor(private name: string, private options: IdbStoreOptions = {}) {}
+
+  private open(): Promise<IDBDatabase | null> {
+    if (!this.dbPromise) {
+      this.dbPromise = new Promise(resolve => {
+        if (typeof indexedDB === 'undefined') return resolve(null)
+        const { keyPath, indexes = {}, version = 1 } = this.options
+        const request = indexedDB.open(`research-wrapper-${this.name}`, version)
+        request.onupgradeneeded = () => {
+          const db = request.result
+          Array.from(db.objectStoreNames).forEach(name => db.deleteObjectStore(name))
+          const store = db.createObjectStore(OBJECT_STORE, keyPath ? { keyPath } : undefined)
+          Object.entries(indexes).forEach(([name, path]) => store.createIndex(name, path))
+        }
+        request.onsuccess = () => resolve(request.result)
+        request.onerror = () => resolve(null)
+      })
+    }
+    return this.dbPromise
+  }
+
+  private async transaction(mode: IDBTransactionMode): Promise<IDBObjectStore | null> {
+    const db = await this.open()
+    return db ? db.transaction(OBJECT_STORE, mode).objectStore(OBJECT_STORE) : null
+  }
+
+  async get(key: string): Promise<T | undefined> {
+    const store = await this.transaction('readonly')
+    return store ? promisify<T | undefined>(store.get(key)) : this.memory.get(key)
+  }
+
+  async set(key: string, value: T): Promise<void> {
+    const store = await this.transaction('readwrite')
+    if (store) {
+      await promisify(this.put(store, key, value))
+    } else {
+      this.memory.set(key, value)
+    }
+  }
+
+  /** Write many entries in a single transaction */
+  setMany(entries: Array<[string, T]>): Promise<void> {
+    return this.update(entries, [])
+  }
+
+  /** Write `puts` and remove `deletes` in a single transaction */
+  async update(puts: Array<[string, T]>, deletes: string[]): Promise<void> {
+    const store = await this.transaction('readwrite')
+    if (!store) {
+      puts.forEach(([key, value]) => this.memory.set(key, value))
+      deletes.forEach(key => this.memory.delete(key))
+      return
+    }
+    await new Promise<void>((resolve, reject) => {
+      puts.forEach(([key, value]) => this.put(store, key, value))
+      deletes.forEach(key => store.delete(key))
+      store.transaction.oncomplete = () => resolve()
+      store.transaction.onerror = () => reject(store.transaction.error)
+    })
+  }
+
+  async delete(key: string): Promise<void> {
+    const store = await this.transaction('readwrite')
+    if (store) {
+      await promisify(store.delete(key))
+    } else {
+      this.memory.delete(key)
+    }
+  }
+
+  async keys(): Promise<string[]> {
+    const store = await this.transaction('readonly')
+    return store ? ((await promisify(store.getAllKeys())) as string[]) : [...this.memory.keys()]
+  }
+
+  /** Every key and value, read in one transaction */
+  async entries(): Promise<Array<[string, T]>> {
+    const store = await this.transaction('readonly')
+    if (!store) return [...this.memory.entries()]
+    const [keys, values] = await Promise.all([promisify(store.getAllKeys()), promisify<T[]>(store.getAll())])
+    return keys.map((key, i) => [key as string, values[i]])
+  }
+
+  async clear(): Promise<void> {
+    const store = await this.transaction('readwrite')
+    if (store) {
+      await promisify(store.clear())
+    } else {
+      this.memory.clear()
+    }
+  }
+
+  /** Number of values whose key in `index` is within `bounds` */
+  async count(index: string, bounds?: KeyBounds): Promise<number> {
+    const source = await this.index(index)
+    return source ? promisify(source.count(toRange(bounds) ?? undefined)) : this.memoryIndex(index, bounds).length
+  }
+
+  /** Values in `index` order, read with a cursor so only the requested rows are loaded */
+  async query(index: string, { bounds, direction = 'next', offset = 0, limit = Infinity }: IndexQuery = {}): Promise<T[]> {
+    const source = await this.index(index)
+    if (!source) {
+      const values = this.memoryIndex(index, bounds).map(([, , value]) => value)
+      if (direction === 'prev') values.reverse()
+      return values.slice(offset, offset + limit)
+    }
+    const request = source.openCursor(toRange(bounds), direction)
+    const values: T[] = []
+    return new Promise((resolve, reject) => {
+      let skipped = offset === 0
+      request.onsuccess = () => {
+        const cursor = request.result
+        if (!cursor || values.length >= limit) return resolve(values)
+        if (!skipped) {
+          skipped = true
+          return cursor.advance(offset)
+        }
+        values.push(cursor.value)
+        cursor.continue()
+      }
+      request.onerror = () => reject(request.error)
+    })
+  }
+
+  /** Key and `index` key of every indexed value; a key cursor reads them without loading values */
+  async indexKeys(index: string): Promise<Array<[key: string, indexKey: IDBValidKey]>> {
+    const source = await this.index(index)
+    if (!source) return this.memoryIndex(index).map(([indexKey, key]) => [key, indexKey])
+    const request = source.openKeyCursor()
+    const keys: Array<[string, IDBValidKey]> = []
+    return new Promise((resolve, reject) => {
+      request.onsuccess = () => {
+        const cursor = request.result
+        if (!cursor) return resolve(keys)
+        keys.push([cursor.primaryKey as string, cursor.key])
+        cursor.continue()
+      }
+      request.onerror = () => reject(request.error)
+    })
+  }
+
+  private put(store: IDBObjectStore, key: string, value: T): IDBRequest {
+    return this.options.keyPath ? store.put(value) : store.put(value, key)
+  }
+
+  private async index(name: string): Promise<IDBIndex | null> {
+    const store = await this.transaction('readonly')
+    return store ? store.index(name) : null
+  }
+
+  /** In-memory stand-in for an index: [index key, key, value] in index order */
+  private memoryIndex(index: string, bounds?: KeyBounds): Array<[IDBValidKey, string, T]> {
+    const path = this.options.indexes?.[index]
+    if (path === undefined) throw new Error(`Unknown index ${index}`)
+    const read = (value: T, property: string) => (value as Record<string, unknown>)[property] as IDBValidKey | undefined
+    const rows: Array<[IDBValidKey, string, T]> = []
+    for (const [key, value] of this.memory) {
+      const parts = (Array.isArray(path) ? path : [path]).map(property => read(value, property))
+      // Like IndexedDB, values missing an indexed property are left out of the index
+      if (parts.some(part => part === undefined)) continue
+      const indexKey = Array.isArray(path) ? (parts as IDBValidKey[]) : parts[0]!
+      if (bounds && (compareKeys(indexKey, bounds.lower) < 0 || compareKeys(indexKey, bounds.upper) > 0)) continue
+      rows.push([indexKey, key, value])
+    }
+    return rows.sort((a, b) => compareKeys(a[0], b[0]) || compareKeys(a[1], b[1]))
+  }
+}
+
+const toRange = (bounds?: KeyBounds) => (bounds ? IDBKeyRange.bound(bounds.lower, bounds.upper) : null)
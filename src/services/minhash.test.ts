@@ -0,0 +1,48 @@
+import { describe, it, expect } from 'vitest'
+import { MinHashIndex, estimateSimilarity, minhashSignature } from './minhash'
+
+const prompt =
+  'Compare the long-term economic impacts of remote work adoption on commercial real estate markets in major US cities since 2020, including vacancy rates and municipal tax revenue.'
+const reworded =
+  'Compare the long term economic impacts of remote work adoption on commercial real estate markets in major US cities since 2020, including vacancy rates and city tax revenue.'
+const unrelated = 'Summarize recent advances in solid-state battery chemistry and the main obstacles to commercial production at scale.'
+
+describe('minhash', () => {
+  it('estimates high similarity for lightly edited text and none for unrelated text', () => {
+    expect(estimateSimilarity(minhashSignature(prompt), minhashSignature(prompt))).toBe(1)
+    expect(estimateSimilarity(minhashSignature(prompt), minhashSignature(reworded))).toBeGreaterThan(0.7)
+    expect(estimateSimilarity(minhashSignature(prompt), minhashSignature(unrelated))).toBeLessThan(0.2)
+  })
+
+  it('finds near duplicates and forgets removed entries', () => {
+    const index = new MinHashIndex()
+    index.add('a', prompt)
+    index.add('b', unrelated)
+    expect(index.query(reworded).map(match => match.id)).toEqual(['a'])
+    index.remove('a')
+    expect(index.has('a')).toBe(false)
+    expect(index.query(reworded)).toEqual([])
+  })
+
+  it('replaces an entry whose text changed', () => {
+    const index = new MinHashIndex()
+    index.add('a', prompt)
+    index.add('a', unrelated)
+    expect(index.size).toBe(1)
+    expect(index.query(prompt)).toEqual([])
+    expect(index.query(unrelated)[0]).toEqual({ id: 'a', similarity: 1 })
+  })
+
+  it('answers lookups quickly with thousands of entries', () => {
+    const index = new MinHashIndex()
+    const words = 'market policy climate energy health finance labour housing trade supply chain water'.split(' ')
+    for (let i = 0; i < 5000; i++) {
+      index.add(`r${i}`, Array.from({ length: 20 }, (_, j) => words[(i * 7 + j * j) % words.length]).join(' ') + ` study ${i}`)
+    }
+    index.add('target', prompt)
+    const start = performance.now()
+    for (let i = 0; i < 20; i++) index.query(reworded)
+    expect((performance.now() - start) / 20).toBeLessThan(5)
+    expect(index.query(reworded)[0].id).toBe('target')
+  })
+})
@@ -0,0 +1,149 @@
+// MinHash signatures with LSH banding for near-duplicate text lookup.
+// 32 bands of 4 rows make pairs above Jaccard 0.6 candidates almost
+// surely; each candidate is then confirmed from its full signature.
+
+const BANDS = 32
+const ROWS = 4
+const NUM_HASHES = BANDS * ROWS
+const SHINGLE_SIZE = 3
+
+export interface SimilarMatch {
+  id: string
+  /** Estimated Jaccard similarity of word shingles, 0–1 */
+  similarity: number
+}
+
+/** Deterministic seeds so signatures are comparable across sessions */
+const SEEDS = (() => {
+  let state = 0x9e3779b9
+  const next = () => {
+    state = (state + 0x6d2b79f5) | 0
+    let t = Math.imul(state ^ (state >>> 15), 1 | state)
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t
+    return (t ^ (t >>> 14)) >>> 0
+  }
+  const a = new Uint32Array(NUM_HASHES)
+  const b = new Uint32Array(NUM_HASHES)
+  for (let i = 0; i < NUM_HASHES; i++) {
+    a[i] = next() | 1
+    b[i] = next()
+  }
+  return { a, b }
+})()
+
+function fnv1a(text: string): number {
+  let h = 0x811c9dc5
+  for (let i = 0; i < text.length; i++) h = Math.imul(h ^ text.charCodeAt(i), 0x01000193)
+  return h >>> 0
+}
+
+function fmix32(h: number): number {
+  h = Math.imul(h ^ (h >>> 16), 0x85ebca6b)
+  h = Math.imul(h ^ (h >>> 13), 0xc2b2ae35)
+  return (h ^ (h >>> 16)) >>> 0
+}
+
+const NON_ASCII = /[^\x00-\x7f]/
+
+/** Hashed word 3-grams of normalized text; shorter texts use their words */
+export function shingles(text: string): Uint32Array {
+  const normalized = NON_ASCII.test(text) ? text.normalize('NFKC').toLowerCase() : text.toLowerCase()
+  const words = (normalized.match(/[\p{L}\p{N}]+/gu) ?? []).map(fnv1a)
+  const set = new Set<number>()
+  if (words.length < SHINGLE_SIZE) {
+    words.forEach(word => set.add(fmix32(word)))
+  } else {
+    // Combine word hashes rather than joining strings
+    for (let i = 0; i + SHINGLE_SIZE <= words.length; i++) {
+      set.add(fmix32(Math.imul(words[i], 0x9e3779b1) ^ Math.imul(words[i + 1], 0x85ebca77) ^ words[i + 2]))
+    }
+  }
+  return Uint32Array.from(set)
+}
+
+export function minhashSignature(text: string): Uint32Array {
+  const signature = new Uint32Array(NUM_HASHES).fill(0xffffffff)
+  const { a, b } = SEEDS
+  for (const shingle of shingles(text)) {
+    for (let i = 0; i < NUM_HASHES; i++) {
+      // Shingles are already mixed, so one multiply-xorshift per hash function is enough
+      let h = Math.imul(shingle ^ b[i], a[i])
+      h = (h ^ (h >>> 15)) >>> 0
+      if (h < signature[i]) signature[i] = h
+    }
+  }
+  return signature
+}
+
+function bandKey(signature: Uint32Array, band: number): number {
+  let h = 0x811c9dc5
+  for (let r = band * ROWS; r < (band + 1) * ROWS; r++) h = Math.imul(h ^ signature[r], 0x01000193)
+  return h >>> 0
+}
+
+export function estimateSimilarity(x: Uint32Array, y: Uint32Array): number {
+  let same = 0
+  for (let i = 0; i < NUM_HASHES; i++) if (x[i] === y[i]) same++
+  return same / NUM_HASHES
+}
+
+/**
+ * Index of texts by MinHash signature. Adding or removing an entry only
+ * touches its own LSH buckets, and a lookup compares signatures for the
+ * few entries that share a bucket, so cost does not grow with the index.
+ */
+export class MinHashIndex {
+  private signatures = new Map<string, { signature: Uint32Array; textHash: number }>()
+  /** One map per band from band hash to the ids sharing it */
+  private buckets = Array.from({ length: BANDS }, () => new Map<number, Set<string>>())
+
+  get size(): number {
+    return this.signatures.size
+  }
+
+  has(id: string): boolean {
+    return this.signatures.has(id)
+  }
+
+  /** Add or replace `id`; unchanged text is a no-op */
+  add(id: string, text: string): void {
+    const textHash = fnv1a(text)
+    if (this.signatures.get(id)?.textHash === textHash) return
+    this.remove(id)
+    const signature = minhashSignature(text)
+    this.signatures.set(id, { signature, textHash })
+    for (let band = 0; band < BANDS; band++) {
+      const key = bandKey(signature, band)
+      let bucket = this.buckets[band].get(key)
+      if (!bucket) this.buckets[band].set(key, (bucket = new Set()))
+      bucket.add(id)
+    }
+  }
+
+  remove(id: string): void {
+    const entry = this.signatures.get(id)
+    if (!entry) return
+    for (let band = 0; band < BANDS; band++) {
+      const key = bandKey(entry.signature, band)
+      const bucket = this.buckets[band].get(key)
+      bucket?.delete(id)
+      if (bucket?.size === 0) this.buckets[band].delete(key)
+    }
+    this.signatures.delete(id)
+  }
+
+  /** Entries at or above `threshold` estimated similarity, most similar first */
+  query(text: string, threshold = 0.7): SimilarMatch[] {
+    const signature = minhashSignature(text)
+    const candidates = new Set<string>()
+    for (let band = 0; band < BANDS; band++) {
+      this.buckets[band].get(bandKey(signature, band))?.forEach(id => candidates.add(id))
+    }
+    const matches: SimilarMatch[] = []
+    for (const id of candidates) {
+      const similarity = estimateSimilarity(signature, this.signatures.get(id)!.signature)
+      if (similarity >= threshold) matches.push({ id, similarity })
+    }
+    return matches.sort((x, y) => y.similarity - x.similarity)
+  }
+}
@@ -0,0 +1,40 @@
+import { describe, it, expect, beforeEach } from 'vitest'
+import { ModelCatalog, calculateCost } from './model-catalog'
+
+const catalog = [
+  {
+    id: 'openai/o4-mini',
+    name: 'OpenAI: o4 Mini',
+    pricing: { prompt: '0.0000011', completion: '0.0000044' },
+    context_length: 200000,
+    top_provider: { max_completion_tokens: 100000 },
+  },
+  { id: 'openrouter/auto', name: 'Auto Router', pricing: { prompt: '-1', completion: '-1' } },
+]
+
+describe('ModelCatalog', () => {
+  beforeEach(() => localStorage.clear())
+
+  it('looks up pricing and limits by full id, bare id or dated snapshot', () => {
+    const models = new ModelCatalog()
+    models.update(catalog)
+    expect(models.get('openai/o4-mini')).toMatchObject({ inputPrice: 1.1, outputPrice: 4.4, contextLength: 200000, maxOutputTokens: 100000 })
+    expect(models.get('o4-mini')?.id).toBe('openai/o4-mini')
+    expect(models.get('o4-mini-2025-04-16')?.id).toBe('openai/o4-mini')
+    expect(models.get('openrouter/auto')).toBeUndefined()
+  })
+
+  it('restores the persisted table on startup', () => {
+    new ModelCatalog().update(catalog)
+    const restored = new ModelCatalog()
+    expect(restored.size).toBe(1)
+    expect(restored.get('o4-mini')?.contextLength).toBe(200000)
+  })
+})
+
+describe('calculateCost', () => {
+  it('falls back to built-in pricing for unknown models', () => {
+    expect(calculateCost(1_000_000, 0, 'o3-deep-research-2025-06-26')).toBe(10)
+    expect(calculateCost(1_000_000, 1_000_000, 'unknown-model')).toBe(0)
+  })
+})
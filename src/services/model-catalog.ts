@@ -0,0 +1,154 @@
+import type { OpenRouterModel } from '@/services/openrouter-service'
+
+const STORAGE_KEY = 'research-wrapper-model-catalog'
+const STORAGE_VERSION = 1
+const DATED_SUFFIX = /-\d{4}-\d{2}-\d{2}$/
+
+/** Pricing and limits for one model, with prices in USD per 1M tokens */
+export interface ModelInfo {
+  id: string
+  name: string
+  inputPrice: number
+  outputPrice: number
+  contextLength?: number
+  maxOutputTokens?: number
+}
+
+// Compact tuple form keeps the persisted catalog small
+type StoredModel = [id: string, name: string, inputPrice: number, outputPrice: number, contextLength?: number, maxOutputTokens?: number]
+
+/** OpenRouter's per-token price string as USD per 1M tokens, or NaN when unknown or variable */
+export const perMillion = (perToken: string | undefined) => {
+  const price = parseFloat(perToken ?? '')
+  // OpenRouter uses -1 for variable-priced routers such as openrouter/auto
+  return Number.isFinite(price) && price >= 0 ? price * 1_000_000 : NaN
+}
+
+/**
+ * Lookup table of model pricing and context limits built from the
+ * OpenRouter catalog. It is persisted to localStorage so estimates are
+ * available synchronously on startup, and replaced whenever the catalog
+ * is fetched again. Models are also indexed by their id without the
+ * provider prefix, so `o3-deep-research` finds `openai/o3-deep-research`.
+ */
+export class ModelCatalog {
+  private models = new Map<string, ModelInfo>()
+  private aliases = new Map<string, ModelInfo>()
+  private updatedAt = 0
+
+  constructor() {
+    this.restore()
+  }
+
+  get(id: string): ModelInfo | undefined {
+    const exact = this.models.get(id)
+    if (exact) return exact
+    const alias = id.split('/').pop()!
+    return this.aliases.get(alias) ?? this.aliases.get(alias.replace(DATED_SUFFIX, ''))
+  }
+
+  get size(): number {
+    return this.models.size
+  }
+
+  get lastUpdated(): number {
+    return this.updatedAt
+  }
+
+  update(catalog: OpenRouterModel[]): void {
+    const entries: ModelInfo[] = []
+    for (const model of catalog) {
+      const inputPrice = perMillion(model.pricing?.prompt)
+      const outputPrice = perMillion(model.pricing?.completion)
+      if (Number.isNaN(inputPrice) || Number.isNaN(outputPrice)) continue
+      entries.push({
+        id: model.id,
+        name: model.name,
+        inputPrice,
+        outputPrice,
+        contextLength: model.context_length || undefined,
+        maxOutputTokens: model.top_provider?.max_completion_tokens || undefined,
+      })
+    }
+    this.index(entries, Date.now())
+    this.persist(entries)
+  }
+
+  private index(entries: ModelInfo[], updatedAt: number): void {
+    this.models = new Map(entries.map(entry => [entry.id, entry]))
+    this.aliases = new Map()
+    for (const entry of entries) {
+      const alias = entry.id.split('/').pop()!
+      // Dated snapshots like o3-deep-research-2025-06-26 resolve to their base model too
+      const base = alias.replace(DATED_SUFFIX, '')
+      if (!this.aliases.has(alias)) this.aliases.set(alias, entry)
+      if (!this.aliases.has(base)) this.aliases.set(base, entry)
+    }
+    this.updatedAt = updatedAt
+  }
+
+  private persist(entries: ModelInfo[]): void {
+    try {
+      const models: StoredModel[] = entries.map(entry => [
+        entry.id,
+        entry.name,
+        entry.inputPrice,
+        entry.outputPrice,
+        entry.contextLength,
+        entry.maxOutputTokens,
+      ])
+      localStorage.setItem(STORAGE_KEY, JSON.stringify({ version: STORAGE_VERSION, updatedAt: this.updatedAt, models }))
+    } catch {
+      // Storage full or unavailable; the in-memory table still works
+    }
+  }
+
+  private restore(): void {
+    try {
+      const stored = JSON.parse(localStorage.getItem(STORAGE_KEY) || 'null')
+      if (stored?.version !== STORAGE_VERSION) return
+      const entries = (stored.models as StoredModel[]).map(
+        ([id, name, inputPrice, outputPrice, contextLength, maxOutputTokens]): ModelInfo => ({
+          id,
+          name,
+          inputPrice,
+          outputPrice,
+          contextLength: contextLength ?? undefined,
+          maxOutputTokens: maxOutputTokens ?? undefined,
+        })
+      )
+      this.index(entries, stored.updatedAt || 0)
+    } catch {
+      // Corrupt or missing entry; start empty until the next fetch
+    }
+  }
+}
+
+export const modelCatalog = new ModelCatalog()
+
+/** Estimated USD cost of a request, from catalog pricing when the model is known */
+export function calculateCost(inputTokens: number, outputTokens: number, model: string): number {
+  const catalogPricing = modelCatalog.get(model)
+  if (catalogPricing) {
+    return (
+      (inputTokens / 1000000) * catalogPricing.inputPrice +
+      (outputTokens / 1000000) * catalogPricing.outputPrice
+    )
+  }
+
+  // Fallback pricing as of 2025, until the model catalog has been fetched
+  const pricing = {
+    'gpt-4.1': { input: 2.5, output: 10 }, // per 1M tokens
+    'o3-deep-research': { input: 10, output: 40 }, // per 1M tokens
+  }
+
+  // Accept provider-prefixed and dated ids, e.g. openai/o3-deep-research-2025-06-26
+  const baseModel = model.split('/').pop()!.replace(DATED_SUFFIX, '')
+  const modelPricing = pricing[baseModel as keyof typeof pricing]
+  if (!modelPricing) return 0
+
+  return (
+    (inputTokens / 1000000) * modelPricing.input +
+    (outputTokens / 1000000) * modelPricing.output
+  )
+}
@@ -0,0 +1,58 @@
+import { describe, it, expect } from 'vitest'
+import { ModelSearchIndex } from './model-search'
+import type { OpenRouterModel } from './openrouter-service'
+
+const model = (id: string, name: string, context: number, prompt: string): OpenRouterModel => ({
+  id,
+  name,
+  context_length: context,
+  pricing: { prompt, completion: prompt },
+})
+
+const catalog = [
+  model('openai/gpt-4.1', 'OpenAI: GPT-4.1', 1_047_576, '0.000002'),
+  model('openai/gpt-4.1-mini', 'OpenAI: GPT-4.1 Mini', 1_047_576, '0.0000004'),
+  model('openai/o3-deep-research', 'OpenAI: o3 Deep Research', 200_000, '0.00001'),
+  model('anthropic/claude-sonnet-4', 'Anthropic: Claude Sonnet 4', 200_000, '0.000003'),
+  model('meta-llama/llama-3.3-70b-instruct:free', 'Meta: Llama 3.3 70B Instruct (free)', 65_536, '0'),
+]
+
+describe('ModelSearchIndex', () => {
+  const index = new ModelSearchIndex(catalog)
+  const ids = (query: string, filter = {}) => index.search(query, filter).map(m => m.id)
+
+  it('matches word prefixes across ids, names and providers', () => {
+    expect(ids('gpt')).toEqual(['openai/gpt-4.1', 'openai/gpt-4.1-mini'])
+    expect(ids('anthropic son')).toEqual(['anthropic/claude-sonnet-4'])
+    expect(ids('deep res')).toEqual(['openai/o3-deep-research'])
+  })
+
+  it('ranks exact words and id prefixes first', () => {
+    expect(ids('openai/gpt-4.1-mini')[0]).toBe('openai/gpt-4.1-mini')
+    expect(ids('o3')[0]).toBe('openai/o3-deep-research')
+  })
+
+  it('falls back to fuzzy subsequence matching', () => {
+    expect(ids('gpt41mini')).toEqual(['openai/gpt-4.1-mini'])
+    expect(ids('zzz')).toEqual([])
+  })
+
+  it('filters by context length and input price', () => {
+    expect(ids('', { minContext: 1_000_000 })).toEqual(['openai/gpt-4.1', 'openai/gpt-4.1-mini'])
+    expect(ids('', { maxInputPrice: 0 })).toEqual(['meta-llama/llama-3.3-70b-instruct:free'])
+    expect(ids('openai', { maxInputPrice: 5 })).toEqual(['openai/gpt-4.1', 'openai/gpt-4.1-mini'])
+  })
+
+  it('searches a large catalog well within a frame per keystroke', () => {
+    const large = Array.from({ length: 5000 }, (_, i) =>
+      model(`provider-${i % 50}/model-${i}-v${i % 7}`, `Provider ${i % 50}: Model ${i}`, 8192 * (1 + (i % 16)), '0.000001')
+    )
+    const largeIndex = new ModelSearchIndex(large)
+    const keystrokes = ['p', 'pr', 'pro', 'prov', 'provider-1', 'provider-1 m', 'provider-1 model-12', 'mdl12']
+    // One pass to warm up the JIT, then time a second
+    for (const query of keystrokes) largeIndex.search(query)
+    const start = performance.now()
+    for (const query of keystrokes) largeIndex.search(query, { minContext: 32_000 })
+    expect((performance.now() - start) / keystrokes.length).toBeLessThan(16)
+  })
+})
@@ -0,0 +1,151 @@
+import type { OpenRouterModel } from '@/services/openrouter-service'
+import { perMillion } from '@/services/model-catalog'
+
+export interface ModelFilter {
+  /** Smallest acceptable context window, in tokens */
+  minContext?: number
+  /** Highest acceptable input price, in USD per 1M tokens */
+  maxInputPrice?: number
+}
+
+const TOKEN_SPLIT = /[\s/:_.,\-()]+/
+
+// Per-term scores: whole token, token prefix, scattered characters
+const EXACT_SCORE = 3
+const PREFIX_SCORE = 2
+const FUZZY_SCORE = 1
+const ID_PREFIX_BONUS = 2
+
+const isSeparator = (code: number) => code === 47 || code === 45 || code === 46 || code === 58 || code === 95 // / - . : _
+
+/**
+ * True when every character of `needle` appears in `id` in order, starting
+ * at the beginning of one of its words
+ */
+function fuzzyMatch(needle: string, id: string): boolean {
+  const first = needle.charCodeAt(0)
+  for (let start = 0; start < id.length; start++) {
+    if (id.charCodeAt(start) !== first || (start > 0 && !isSeparator(id.charCodeAt(start - 1)))) continue
+    let j = 1
+    for (let i = start + 1; i < id.length && j < needle.length; i++) {
+      if (id.charCodeAt(i) === needle.charCodeAt(j)) j++
+    }
+    if (j === needle.length) return true
+  }
+  return false
+}
+
+/**
+ * Search index over the OpenRouter catalog, built once per model list.
+ * Words from ids, names and providers are kept sorted with posting lists,
+ * so a term resolves to every word it prefixes with a binary search.
+ * Terms with no prefix hit fall back to a subsequence match against the
+ * id, which lets `gpt41` find `openai/gpt-4.1`. Context length and price
+ * live in typed arrays for filtering.
+ */
+export class ModelSearchIndex {
+  private byId = new Map<string, number>()
+  private words: string[] = []
+  private postings: number[][] = []
+  private haystacks: string[]
+  private ids: string[]
+  private contextLengths: Float64Array
+  private inputPrices: Float64Array
+
+  constructor(readonly models: OpenRouterModel[]) {
+    const wordMap = new Map<string, number[]>()
+    this.haystacks = new Array(models.length)
+    this.ids = models.map(model => model.id.toLowerCase())
+    this.contextLengths = new Float64Array(models.length)
+    this.inputPrices = new Float64Array(models.length)
+
+    models.forEach((model, i) => {
+      this.byId.set(model.id, i)
+      const haystack = `${model.id} ${model.name}`.toLowerCase()
+      this.haystacks[i] = haystack
+      this.contextLengths[i] = model.context_length || NaN
+      this.inputPrices[i] = perMillion(model.pricing?.prompt)
+      // The provider is the id prefix, so it is indexed along with the rest
+      for (const word of new Set(haystack.split(TOKEN_SPLIT))) {
+        if (!word) continue
+        const posting = wordMap.get(word)
+        if (posting) posting.push(i)
+        else wordMap.set(word, [i])
+      }
+    })
+
+    this.words = [...wordMap.keys()].sort()
+    this.postings = this.words.map(word => wordMap.get(word)!)
+  }
+
+  has(id: string): boolean {
+    return this.byId.has(id)
+  }
+
+  get size(): number {
+    return this.models.length
+  }
+
+  /** Index of the first word not less than `prefix` */
+  private lowerBound(prefix: string): number {
+    let lo = 0
+    let hi = this.words.length
+    while (lo < hi) {
+      const mid = (lo + hi) >>> 1
+      if (this.words[mid] < prefix) lo = mid + 1
+      else hi = mid
+    }
+    return lo
+  }
+
+  private passes(i: number, { minContext, maxInputPrice }: ModelFilter): boolean {
+    // Unknown context or variable pricing never satisfies an active filter
+    if (minContext && !(this.contextLengths[i] >= minContext)) return false
+    if (maxInputPrice !== undefined && !(this.inputPrices[i] <= maxInputPrice)) return false
+    return true
+  }
+
+  /** Models matching every term of `query` and the filter, best match first */
+  search(query: string, filter: ModelFilter = {}): OpenRouterModel[] {
+    const q = query.trim().toLowerCase()
+    const terms = q.split(TOKEN_SPLIT).filter(Boolean)
+    const n = this.models.length
+
+    if (terms.length === 0) {
+      return filter.minContext || filter.maxInputPrice !== undefined
+        ? this.models.filter((_, i) => this.passes(i, filter))
+        : this.models
+    }
+
+    // Candidates shrink with every term, since all terms must match
+    let candidates: number[] = []
+    for (let i = 0; i < n; i++) if (this.passes(i, filter)) candidates.push(i)
+    const scores = new Float64Array(n)
+    const termScores = new Float64Array(n)
+
+    for (const term of terms) {
+      termScores.fill(0)
+      for (let w = this.lowerBound(term); w < this.words.length && this.words[w].startsWith(term); w++) {
+        const score = this.words[w].length === term.length ? EXACT_SCORE : PREFIX_SCORE
+        for (const i of this.postings[w]) if (score > termScores[i]) termScores[i] = score
+      }
+      const next: number[] = []
+      for (const i of candidates) {
+        if (!termScores[i] && term.length > 1 && fuzzyMatch(term, this.ids[i])) termScores[i] = FUZZY_SCORE
+        if (termScores[i]) {
+          scores[i] += termScores[i]
+          next.push(i)
+        }
+      }
+      candidates = next
+    }
+
+    for (const i of candidates) {
+      // Haystacks start with the id, so this rewards queries that spell the id out
+      const haystack = this.haystacks[i]
+      if (haystack.startsWith(q) || haystack.includes(`/${q}`)) scores[i] += ID_PREFIX_BONUS
+    }
+    candidates.sort((a, b) => scores[b] - scores[a] || a - b)
+    return candidates.map(i => this.models[i])
+  }
+}
@@ -0,0 +1,243 @@
+import { beforeEach, describe, it, expect } from 'vitest'
+import { NotionService, chunkBlocks, diffBlocks } from './notion-service'
+import { IdbStore } from '@/services/idb'
+import { renderResearch, type NotionBlock } from '@/services/export'
+import type { Research } from '@/types/types'
+
+/** In-memory stand-in for the parts of the Notion API the sync engine uses */
+function createFakeNotion() {
+  const pages = new Map<string, Array<{ id: string; block: NotionBlock }>>()
+  const properties = new Map<string, any>()
+  const requests: Array<{ method: string; path: string; children?: NotionBlock[] }> = []
+  const failures: Array<{ status: number; headers?: Record<string, string> }> = []
+  let nextId = 1
+
+  const json = (body: unknown, status = 200, headers: Record<string, string> = {}) =>
+    new Response(JSON.stringify(body), { status, headers: { 'Content-Type': 'application/json', ...headers } })
+  const findBlock = (id: string) => {
+    for (const children of pages.values()) {
+      const index = children.findIndex(child => child.id === id)
+      if (index >= 0) return { children, index }
+    }
+    return null
+  }
+
+  const fetch = async (input: RequestInfo | URL, init: RequestInit = {}) => {
+    const url = new URL(String(input))
+    const method = init.method || 'GET'
+    const body = init.body ? JSON.parse(String(init.body)) : {}
+    requests.push({ method, path: url.pathname, children: body.children })
+
+    const failure = failures.shift()
+    if (failure) return json({ code: 'fake_error', message: 'Injected failure' }, failure.status, failure.headers)
+    if ((body.children?.length ?? 0) > 100) return json({ code: 'validation_error', message: 'Too many children' }, 400)
+
+    if (method === 'POST' && url.pathname === '/v1/pages') {
+      const id = `page-${nextId++}`
+      pages.set(id, [])
+      properties.set(id, body.properties)
+      return json({ id })
+    }
+    if (method === 'POST' && url.pathname.endsWith('/query')) {
+      const [title, created] = body.filter.and
+      const results = [...properties].filter(
+        ([, props]) => props.Title.title[0].text.content === title.title.equals && props.Created.date.start === created.date.equals
+      )
+      return json({ results: results.map(([id]) => ({ id })), next_cursor: null })
+    }
+    if (method === 'PATCH' && url.pathname.startsWith('/v1/pages/')) {
+      return json({ id: url.pathname.split('/').pop() })
+    }
+    const children = url.pathname.match(/^\/v1\/blocks\/([^/]+)\/children$/)
+    if (children) {
+      const blocks = pages.get(children[1])
+      if (!blocks) return json({ code: 'object_not_found', message: 'Not found' }, 404)
+      if (method === 'PATCH') {
+        const created = body.children.map((block: NotionBlock) => ({ id: `block-${nextId++}`, block }))
+        const index = body.after ? blocks.findIndex(child => child.id === body.after) + 1 : blocks.length
+        blocks.splice(index, 0, ...created)
+        return json({ results: created.map((child: { id: string }) => ({ id: child.id })) })
+      }
+      const start = Number(url.searchParams.get('start_cursor') || 0)
+      const end = start + Number(url.searchParams.get('page_size') || 100)
+      return json({
+        results: blocks.slice(start, end).map(child => ({ id: child.id })),
+        next_cursor: end < blocks.length ? String(end) : null,
+      })
+    }
+    const found = findBlock(url.pathname.split('/').pop()!)
+    if (!found) return json({ code: 'object_not_found', message: 'Not found' }, 404)
+    if (method === 'DELETE') {
+      found.children.splice(found.index, 1)
+    } else {
+      const child = found.children[found.index]
+      child.block = { ...child.block, ...body }
+    }
+    return json({ id: found.children[found.index]?.id })
+  }
+
+  return {
+    pages,
+    requests,
+    fetch,
+    contents: (pageId: string) => pages.get(pageId)!.map(child => child.block),
+    fail: (status: number, headers?: Record<string, string>) => failures.push({ status, headers }),
+  }
+}
+
+const longResearch: Research = {
+  id: 'r1',
+  title: 'Long Research',
+  prompt: 'Prompt',
+  status: 'completed',
+  createdAt: '2024-01-01T00:00:00.000Z',
+  completedAt: '2024-01-01T01:00:00.000Z',
+  result: {
+    report: Array.from({ length: 250 }, (_, i) => `Paragraph ${i} ${'x'.repeat(i === 7 ? 4500 : 10)}`).join('\n\n'),
+    thoughtProcess: 'Process',
+    sources: [{ id: 's1', title: 'Source 1', url: 'https://example.com', snippet: '', citedAt: '2024-01-01T00:00:00.000Z' }],
+  },
+}
+
+const setup = () => {
+  const fake = createFakeNotion()
+  const service = new NotionService({ token: 'secret', baseUrl: 'http://notion.test/v1', fetch: fake.fetch, requestsPerSecond: 1000 })
+  return { fake, service }
+}
+
+describe('chunkBlocks', () => {
+  it('splits by block count and payload size', () => {
+    const block = (text: string): NotionBlock => ({ object: 'block', type: 'paragraph', paragraph: { rich_text: [{ type: 'text', text: { content: text } }] } })
+    expect(chunkBlocks(Array.from({ length: 250 }, () => block('a'))).map(b => b.length)).toEqual([100, 100, 50])
+    expect(chunkBlocks([block('a'.repeat(600)), block('b'.repeat(600))], 100, 1000)).toHaveLength(2)
+  })
+})
+
+describe('diffBlocks', () => {
+  const blocks = (spec: string) => spec.split('').map(hash => ({ type: hash === hash.toUpperCase() ? 'heading' : 'paragraph', hash }))
+
+  it('keeps matching blocks and turns same-type replacements into updates', () => {
+    expect(diffBlocks(blocks('Aabc'), blocks('Aaxc'))).toEqual([
+      { op: 'keep', from: 0, to: 0 },
+      { op: 'keep', from: 1, to: 1 },
+      { op: 'update', from: 2, to: 2 },
+      { op: 'keep', from: 3, to: 3 },
+    ])
+  })
+
+  it('inserts and deletes blocks that have no counterpart', () => {
+    expect(diffBlocks(blocks('Aab'), blocks('AbBc'))).toEqual([
+      { op: 'keep', from: 0, to: 0 },
+      { op: 'delete', from: 1 },
+      { op: 'keep', from: 2, to: 1 },
+      { op: 'insert', to: 2 },
+      { op: 'insert', to: 3 },
+    ])
+  })
+})
+
+describe('NotionService', () => {
+  // Sync state outlives a service instance wherever IndexedDB is real
+  beforeEach(() => new IdbStore('notion-sync').clear())
+
+  it('syncs a long report in batches within Notion limits', async () => {
+    const { fake, service } = setup()
+    const pageId = await service.syncResearch(longResearch, 'db')
+
+    const expected = renderResearch<NotionBlock[]>('notion', longResearch)
+    expect(fake.contents(pageId)).toEqual(expected)
+    expect(fake.requests.every(r => (r.children?.length ?? 0) <= 100)).toBe(true)
+    expect(fake.requests).toHaveLength(1 + Math.ceil(expected.length / 100))
+  })
+
+  it('retries rate limited and failing requests', async () => {
+    const { fake, service } = setup()
+    fake.fail(429, { 'Retry-After': '0' })
+    fake.fail(503)
+    const pageId = await service.syncResearch(longResearch, 'db')
+    expect(fake.pages.size).toBe(1)
+    expect(fake.contents(pageId)).toEqual(renderResearch<NotionBlock[]>('notion', longResearch))
+  })
+
+  it('finds the page instead of creating another when the create response is lost', async () => {
+    const { fake, service } = setup()
+    let calls = 0
+    service.setConfig({
+      token: 'secret',
+      baseUrl: 'http://notion.test/v1',
+      requestsPerSecond: 1000,
+      fetch: async (input, init) => {
+        const res = await fake.fetch(input, init)
+        if (++calls === 1) throw new TypeError('offline')
+        return res
+      },
+    })
+    const pageId = await service.syncResearch(longResearch, 'db')
+    expect(fake.pages.size).toBe(1)
+    expect(fake.requests[1].path).toBe('/v1/databases/db/query')
+    expect(fake.contents(pageId)).toEqual(renderResearch<NotionBlock[]>('notion', longResearch))
+  })
+
+  it('does not repeat an append whose outcome is unknown', async () => {
+    const { fake, service } = setup()
+    let calls = 0
+    service.setConfig({
+      token: 'secret',
+      baseUrl: 'http://notion.test/v1',
+      requestsPerSecond: 1000,
+      fetch: async (input, init) => {
+        const res = await fake.fetch(input, init)
+        return ++calls === 2 ? new Response('{}', { status: 502 }) : res
+      },
+    })
+    await expect(service.syncResearch(longResearch, 'db')).rejects.toThrow('Notion API error 502')
+    expect(fake.requests.map(r => r.method)).toEqual(['POST', 'PATCH'])
+  })
+
+  it('resumes an interrupted sync on the same page without duplicating blocks', async () => {
+    const { fake, service } = setup()
+    let calls = 0
+    service.setConfig({
+      token: 'secret',
+      baseUrl: 'http://notion.test/v1',
+      requestsPerSecond: 1000,
+      maxRetries: 0,
+      // The third request (second append) reaches the server but its response is lost
+      fetch: async (input, init) => {
+        const res = await fake.fetch(input, init)
+        if (++calls === 3) throw new TypeError('offline')
+        return res
+      },
+    })
+    await expect(service.syncResearch(longResearch, 'db')).rejects.toThrow('offline')
+    expect((await service.getSyncState('r1'))?.pending).toHaveLength(100)
+
+    service.setConfig({ token: 'secret', baseUrl: 'http://notion.test/v1', requestsPerSecond: 1000, fetch: fake.fetch })
+    const pageId = await service.syncResearch(longResearch, 'db')
+    expect(fake.pages.size).toBe(1)
+    expect(fake.contents(pageId)).toEqual(renderResearch<NotionBlock[]>('notion', longResearch))
+  })
+
+  it('sends only changed blocks when re-syncing an edited research', async () => {
+    const { fake, service } = setup()
+    const pageId = await service.syncResearch(longResearch, 'db')
+    const report = longResearch.result!.report.replace('Paragraph 10 ', 'Edited paragraph 10 ') + '\n\nA new closing paragraph.'
+    const edited = { ...longResearch, result: { ...longResearch.result!, report } }
+
+    fake.requests.length = 0
+    expect(await service.syncResearch(edited, 'db')).toBe(pageId)
+    expect(fake.contents(pageId)).toEqual(renderResearch<NotionBlock[]>('notion', edited))
+    expect(fake.requests.map(r => r.method)).toEqual(['PATCH', 'PATCH'])
+
+    fake.requests.length = 0
+    await service.syncResearch(edited, 'db')
+    expect(fake.requests).toHaveLength(0)
+  })
+
+  it('does not retry client errors', async () => {
+    const { fake, service } = setup()
+    fake.fail(400)
+    await expect(service.syncResearch(longResearch, 'db')).rejects.toThrow('Notion API error 400')
+    expect(fake.requests).toHaveLength(1)
+  })
+})
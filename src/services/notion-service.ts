@@ -0,0 +1,484 @@
+import type { Research } from '@/types/types'
+import { IdbStore } from '@/services/idb'
+import { hashResearchContent } from '@/services/export/document'
+import { renderResearch, type NotionBlock } from '@/services/export'
+import { hashString, safeParseJSON, sleep } from '@/utils/utils'
+
+const NOTION_VERSION = '2022-06-28'
+// Notion rejects requests with more than 100 children or bodies over ~500KB
+const MAX_BLOCKS_PER_REQUEST = 100
+const MAX_BATCH_BYTES = 400_000
+
+export interface NotionServiceConfig {
+  token: string
+  /** API root; point this at a proxy or a local fake server */
+  baseUrl?: string
+  fetch?: typeof fetch
+  /** Sustained request rate; Notion allows an average of 3 per second */
+  requestsPerSecond?: number
+  maxRetries?: number
+}
+
+export interface NotionSyncOptions {
+  includeThoughtProcess?: boolean
+  includeSources?: boolean
+  /** `completed` of `total` changed blocks sent so far */
+  onProgress?: (progress: { completed: number; total: number }) => void
+  signal?: AbortSignal
+}
+
+/** A block on a synced page, identified by its Notion id and content hash */
+export interface SyncedBlock {
+  id: string
+  type: string
+  hash: string
+}
+
+/**
+ * What is known to be on a research's Notion page, saved after every
+ * request. `pending` is set while a request is in flight (with the blocks
+ * it inserts) so a sync interrupted mid-request can reconcile with the page.
+ */
+export interface NotionSyncState {
+  pageId: string
+  contentHash: string
+  propertiesHash: string
+  blocks: SyncedBlock[]
+  pending?: Array<Omit<SyncedBlock, 'id'>>
+}
+
+export type BlockEdit =
+  | { op: 'keep'; from: number; to: number }
+  | { op: 'update'; from: number; to: number }
+  | { op: 'insert'; to: number }
+  | { op: 'delete'; from: number }
+
+/**
+ * How `request` treats a request that is not safe to repeat. After a
+ * network error or 5xx the server may already have applied it, so it is
+ * only retried once `recover` has found no trace of it; without `recover`
+ * such failures are thrown to the caller.
+ */
+export interface UnsafeRequest<T> {
+  recover?: (signal?: AbortSignal) => Promise<T | undefined>
+}
+
+export class NotionAPIError extends Error {
+  constructor(public status: number, public code: string, message: string) {
+    super(`Notion API error ${status}: ${message}`)
+    this.name = 'NotionAPIError'
+  }
+}
+
+/**
+ * Token bucket limiter. Callers await `take()` before each request; a
+ * 429 response pauses the whole bucket for the server's Retry-After.
+ */
+export class RateLimiter {
+  private tokens: number
+  private updatedAt = Date.now()
+  private pausedUntil = 0
+
+  constructor(private ratePerSecond: number, private burst: number = ratePerSecond) {
+    this.tokens = burst
+  }
+
+  pause(ms: number): void {
+    this.pausedUntil = Math.max(this.pausedUntil, Date.now() + ms)
+  }
+
+  async take(signal?: AbortSignal): Promise<void> {
+    for (;;) {
+      const now = Date.now()
+      if (now < this.pausedUntil) {
+        await sleep(this.pausedUntil - now, signal)
+        continue
+      }
+      this.tokens = Math.min(this.burst, this.tokens + ((now - this.updatedAt) / 1000) * this.ratePerSecond)
+      this.updatedAt = now
+      if (this.tokens >= 1) {
+        this.tokens -= 1
+        return
+      }
+      await sleep(((1 - this.tokens) / this.ratePerSecond) * 1000, signal)
+    }
+  }
+}
+
+/** Split blocks into request-sized batches by count and serialized size */
+export function chunkBlocks(blocks: NotionBlock[], maxBlocks = MAX_BLOCKS_PER_REQUEST, maxBytes = MAX_BATCH_BYTES): NotionBlock[][] {
+  const batches: NotionBlock[][] = []
+  let batch: NotionBlock[] = []
+  let bytes = 0
+  for (const block of blocks) {
+    const size = JSON.stringify(block).length
+    if (batch.length && (batch.length >= maxBlocks || bytes + size > maxBytes)) {
+      batches.push(batch)
+      batch = []
+      bytes = 0
+    }
+    batch.push(block)
+    bytes += size
+  }
+  if (batch.length) batches.push(batch)
+  return batches
+}
+
+// Above this many cells the LCS table is skipped and the changed range is replaced wholesale
+const MAX_DIFF_CELLS = 4_000_000
+
+/**
+ * Edit script turning `previous` into `next`, in page order. Blocks are
+ * matched by content hash (LCS after trimming the common prefix and
+ * suffix); a removed block followed by an added block of the same type
+ * becomes an in-place update.
+ */
+export function diffBlocks(previous: Array<Pick<SyncedBlock, 'type' | 'hash'>>, next: Array<Pick<SyncedBlock, 'type' | 'hash'>>): BlockEdit[] {
+  let start = 0
+  while (start < previous.length && start < next.length && previous[start].hash === next[start].hash) start++
+  let endPrev = previous.length
+  let endNext = next.length
+  while (endPrev > start && endNext > start && previous[endPrev - 1].hash === next[endNext - 1].hash) {
+    endPrev--
+    endNext--
+  }
+
+  const n = endPrev - start
+  const m = endNext - start
+  const raw: BlockEdit[] = []
+  for (let i = 0; i < start; i++) raw.push({ op: 'keep', from: i, to: i })
+  if (n * m <= MAX_DIFF_CELLS) {
+    // lengths[i * (m + 1) + j] = LCS length of previous[start + i..] and next[start + j..]
+    const lengths = new Uint32Array((n + 1) * (m + 1))
+    for (let i = n - 1; i >= 0; i--) {
+      for (let j = m - 1; j >= 0; j--) {
+        lengths[i * (m + 1) + j] =
+          previous[start + i].hash === next[start + j].hash
+            ? lengths[(i + 1) * (m + 1) + j + 1] + 1
+            : Math.max(lengths[(i + 1) * (m + 1) + j], lengths[i * (m + 1) + j + 1])
+      }
+    }
+    let i = 0
+    let j = 0
+    while (i < n || j < m) {
+      if (i < n && j < m && previous[start + i].hash === next[start + j].hash) {
+        raw.push({ op: 'keep', from: start + i++, to: start + j++ })
+      } else if (j < m && (i === n || lengths[i * (m + 1) + j + 1] >= lengths[(i + 1) * (m + 1) + j])) {
+        raw.push({ op: 'insert', to: start + j++ })
+      } else {
+        raw.push({ op: 'delete', from: start + i++ })
+      }
+    }
+  } else {
+    for (let i = 0; i < n; i++) raw.push({ op: 'delete', from: start + i })
+    for (let j = 0; j < m; j++) raw.push({ op: 'insert', to: start + j })
+  }
+  for (let k = 0; k < previous.length - endPrev; k++) raw.push({ op: 'keep', from: endPrev + k, to: endNext + k })
+
+  // Within each run of changes, pair deletes with inserts of the same type into updates
+  const edits: BlockEdit[] = []
+  for (let k = 0; k < raw.length; ) {
+    if (raw[k].op === 'keep') {
+      edits.push(raw[k++])
+      continue
+    }
+    const deletes: number[] = []
+    const inserts: number[] = []
+    for (; k < raw.length && raw[k].op !== 'keep'; k++) {
+      const edit = raw[k]
+      if (edit.op === 'delete') deletes.push(edit.from)
+      else if (edit.op === 'insert') inserts.push(edit.to)
+    }
+    let d = 0
+    for (const to of inserts) {
+      let match = d
+      while (match < deletes.length && previous[deletes[match]].type !== next[to].type) match++
+      if (match < deletes.length) {
+        for (; d < match; d++) edits.push({ op: 'delete', from: deletes[d] })
+        edits.push({ op: 'update', from: deletes[d++], to })
+      } else {
+        edits.push({ op: 'insert', to })
+      }
+    }
+    for (; d < deletes.length; d++) edits.push({ op: 'delete', from: deletes[d] })
+  }
+  return edits
+}
+
+function pageProperties(research: Research): Record<string, unknown> {
+  const properties: Record<string, unknown> = {
+    Title: { title: [{ text: { content: research.title } }] },
+    Status: { select: { name: research.status.charAt(0).toUpperCase() + research.status.slice(1) } },
+    Created: { date: { start: research.createdAt } },
+  }
+  if (research.completedAt) {
+    properties.Completed = { date: { start: research.completedAt } }
+  }
+  if (research.cost) {
+    properties.Cost = { number: research.cost.totalCost }
+  }
+  return properties
+}
+
+const blockHash = (block: NotionBlock) => hashString(JSON.stringify(block))
+
+/**
+ * Syncs research pages to a Notion database over the REST API. The block
+ * ids and content hashes on each page are remembered per research, so a
+ * re-sync diffs against them and only sends changed blocks as in-place
+ * updates, anchored inserts and deletes. Requests are throttled and
+ * retried on 429/5xx; page creation and block appends are not repeated
+ * blindly, since a lost response may hide a request that was applied. The
+ * state is saved after every request so an interrupted sync resumes on
+ * the same page.
+ */
+export class NotionService {
+  private config: NotionServiceConfig | null = null
+  private limiter = new RateLimiter(3)
+  private states = new IdbStore<NotionSyncState>('notion-sync')
+
+  constructor(config?: NotionServiceConfig) {
+    if (config?.token) {
+      this.setConfig(config)
+    }
+  }
+
+  setConfig(config: NotionServiceConfig) {
+    this.config = config
+    this.limiter = new RateLimiter(config.requestsPerSecond ?? 3)
+  }
+
+  getSyncState(researchId: string): Promise<NotionSyncState | undefined> {
+    return this.states.get(researchId)
+  }
+
+  /** Create or update the Notion page for `research`, returning its page id */
+  async syncResearch(research: Research, databaseId: string, options: NotionSyncOptions = {}): Promise<string> {
+    const { onProgress, signal, ...renderOptions } = options
+    const blocks = renderResearch<NotionBlock[]>('notion', research, renderOptions)
+    const contentHash = [
+      hashResearchContent(research),
+      (renderOptions.includeThoughtProcess ?? true) ? 1 : 0,
+      (renderOptions.includeSources ?? true) ? 1 : 0,
+    ].join(':')
+    const properties = pageProperties(research)
+    const propertiesHash = hashString(JSON.stringify(properties))
+
+    let state = await this.states.get(research.id)
+    if (state && !state.blocks) {
+      // Checkpoints from before block ids were tracked only know the page; read its blocks back
+      state = { pageId: state.pageId, contentHash: '', propertiesHash: '', blocks: [], pending: [] }
+    }
+    if (state && state.contentHash === contentHash && state.propertiesHash === propertiesHash && !state.pending) {
+      return state.pageId
+    }
+    const save = (next: NotionSyncState) => {
+      state = next
+      return this.states.set(research.id, next)
+    }
+
+    if (!state) {
+      const page = await this.request<{ id: string }>('POST', '/pages', {
+        parent: { database_id: databaseId },
+        properties,
+      }, signal, {
+        // A lost response may still have created the page; find it instead of making a second one
+        recover: async recoverSignal => {
+          const id = await this.findPage(research, databaseId, recoverSignal)
+          return id ? { id } : undefined
+        },
+      })
+      await save({ pageId: page.id, contentHash: '', propertiesHash, blocks: [] })
+    } else if (state.pending) {
+      await save(await this.reconcile(state, signal))
+    }
+    if (state!.propertiesHash !== propertiesHash) {
+      await this.request('PATCH', `/pages/${state!.pageId}`, { properties }, signal)
+      await save({ ...state!, propertiesHash })
+    }
+
+    const { pageId, blocks: previous } = state!
+    const target = blocks.map(block => ({ type: block.type, hash: blockHash(block) }))
+    let edits = diffBlocks(previous, target)
+    // Notion can only insert after an existing block, so an insert ahead of every kept block means a rebuild
+    const firstAnchor = edits.findIndex(edit => edit.op === 'keep' || edit.op === 'update')
+    if (previous.length && edits.slice(0, firstAnchor < 0 ? edits.length : firstAnchor).some(edit => edit.op === 'insert')) {
+      edits = [
+        ...previous.map((_, from): BlockEdit => ({ op: 'delete', from })),
+        ...target.map((_, to): BlockEdit => ({ op: 'insert', to })),
+      ]
+    }
+
+    const total = edits.filter(edit => edit.op !== 'keep').length
+    let completed = 0
+    const synced: SyncedBlock[] = []
+    let cursor = 0 // previous blocks before `cursor` have been kept, updated or deleted
+    // The page holds the synced blocks followed by the previous blocks not yet visited
+    const checkpoint = (pending?: NotionSyncState['pending']) =>
+      save({ ...state!, blocks: [...synced, ...previous.slice(cursor)], pending })
+    const advance = async (count: number) => {
+      completed += count
+      await checkpoint()
+      onProgress?.({ completed, total })
+    }
+    onProgress?.({ completed, total })
+
+    for (let k = 0; k < edits.length; ) {
+      signal?.throwIfAborted()
+      const edit = edits[k]
+      if (edit.op === 'keep') {
+        synced.push(previous[cursor++])
+        k++
+      } else if (edit.op === 'update') {
+        const block = blocks[edit.to]
+        await checkpoint([])
+        await this.request('PATCH', `/blocks/${previous[edit.from].id}`, { [block.type]: block[block.type] }, signal)
+        synced.push({ ...previous[cursor++], hash: target[edit.to].hash })
+        k++
+        await advance(1)
+      } else if (edit.op === 'delete') {
+        await checkpoint([])
+        await this.request('DELETE', `/blocks/${previous[edit.from].id}`, undefined, signal)
+        cursor++
+        k++
+        await advance(1)
+      } else {
+        // Consecutive inserts go out together, anchored after the last synced block
+        const run: NotionBlock[] = []
+        for (; k < edits.length && edits[k].op === 'insert'; k++) run.push(blocks[(edits[k] as { to: number }).to])
+        for (const batch of chunkBlocks(run)) {
+          const hashes = batch.map(block => ({ type: block.type, hash: blockHash(block) }))
+          const after = synced[synced.length - 1]?.id
+          await checkpoint(hashes)
+          // Appending twice would duplicate blocks, so an uncertain failure ends the sync;
+          // the next one reconciles the page from the pending checkpoint
+          const { results } = await this.request<{ results: Array<{ id: string }> }>(
+            'PATCH',
+            `/blocks/${pageId}/children`,
+            after ? { children: batch, after } : { children: batch },
+            signal,
+            {}
+          )
+          // The response may hold just the new blocks or the parent's children; find the new ones either way
+          const anchorIndex = after ? results.findIndex(block => block.id === after) : -1
+          const created =
+            anchorIndex >= 0
+              ? results.slice(anchorIndex + 1, anchorIndex + 1 + batch.length)
+              : after
+                ? results.slice(0, batch.length)
+                : results.slice(-batch.length)
+          created.forEach((block, i) => synced.push({ id: block.id, ...hashes[i] }))
+          await advance(batch.length)
+        }
+      }
+    }
+
+    await save({ ...state!, blocks: synced, contentHash, pending: undefined })
+    return pageId
+  }
+
+  /** Rebuild the block list from the page after a request whose outcome is unknown */
+  private async reconcile(state: NotionSyncState, signal?: AbortSignal): Promise<NotionSyncState> {
+    const ids = await this.listChildren(state.pageId, signal)
+    const known = new Map(state.blocks.map(block => [block.id, block]))
+    const unknown = ids.filter(id => !known.has(id))
+    const pending = state.pending || []
+    let p = 0
+    const blocks = ids.map(id => {
+      const block = known.get(id)
+      if (block) return block
+      // New blocks match the in-flight insert only when the counts agree; otherwise they get replaced
+      return unknown.length === pending.length ? { id, ...pending[p++] } : { id, type: '', hash: '' }
+    })
+    return { ...state, contentHash: '', blocks, pending: undefined }
+  }
+
+  /** Page created for `research` in the database, matched on the title and creation date it was created with */
+  private async findPage(research: Research, databaseId: string, signal?: AbortSignal): Promise<string | undefined> {
+    const { results } = await this.request<{ results: Array<{ id: string }> }>('POST', `/databases/${databaseId}/query`, {
+      filter: {
+        and: [
+          { property: 'Title', title: { equals: research.title } },
+          { property: 'Created', date: { equals: research.createdAt } },
+        ],
+      },
+      page_size: 1,
+    }, signal)
+    return results[0]?.id
+  }
+
+  private async listChildren(blockId: string, signal?: AbortSignal): Promise<string[]> {
+    const ids: string[] = []
+    let cursor: string | null = null
+    do {
+      const query: string = `page_size=100${cursor ? `&start_cursor=${encodeURIComponent(cursor)}` : ''}`
+      const page: { results: Array<{ id: string }>; next_cursor: string | null } = await this.request(
+        'GET',
+        `/blocks/${blockId}/children?${query}`,
+        undefined,
+        signal
+      )
+      ids.push(...page.results.map(block => block.id))
+      cursor = page.next_cursor
+    } while (cursor)
+    return ids
+  }
+
+  /** Send one API request, retrying 429s, and network errors and 5xx unless `unsafe` says otherwise */
+  private async request<T = any>(method: string, path: string, body?: unknown, signal?: AbortSignal, unsafe?: UnsafeRequest<T>): Promise<T> {
+    if (!this.config) {
+      throw new Error('Notion client not initialized')
+    }
+    const { token, baseUrl = 'https://api.notion.com/v1', maxRetries = 5 } = this.config
+    // window.fetch throws if called detached from window
+    const fetchFn = this.config.fetch ?? ((input: RequestInfo | URL, init?: RequestInit) => fetch(input, init))
+    // Uncertain failures of an unsafe request are only retried once `recover` rules out that it was applied
+    const repeatable = !unsafe || !!unsafe.recover
+    for (let attempt = 0; ; attempt++) {
+      await this.limiter.take(signal)
+      let res: Response
+      try {
+        res = await fetchFn(`${baseUrl}${path}`, {
+          method,
+          headers: {
+            Authorization: `Bearer ${token}`,
+            'Content-Type': 'application/json',
+            'Notion-Version': NOTION_VERSION,
+          },
+          body: body === undefined ? undefined : JSON.stringify(body),
+          signal,
+        })
+      } catch (error) {
+        // Network failures are retried like 5xx responses
+        if ((error as any).name === 'AbortError' || attempt >= maxRetries || !repeatable) throw error
+        await sleep(this.backoff(attempt), signal)
+        const recovered = await unsafe?.recover?.(signal)
+        if (recovered !== undefined) return recovered
+        continue
+      }
+      if (res.ok) return safeParseJSON<T>(res)
+
+      const retryable = res.status === 429 || (res.status >= 500 && repeatable)
+      if (!retryable || attempt >= maxRetries) {
+        const data = await safeParseJSON<{ code?: string; message?: string }>(res).catch(() => ({} as any))
+        throw new NotionAPIError(res.status, data.code || 'unknown', data.message || res.statusText)
+      }
+      // A 429 is rejected before it is applied, so only 5xx can need recovering
+      if (res.status === 429) {
+        const retryAfter = parseFloat(res.headers.get('Retry-After') ?? '')
+        this.limiter.pause(Number.isNaN(retryAfter) ? this.backoff(attempt) : retryAfter * 1000)
+      } else {
+        await sleep(this.backoff(attempt), signal)
+        const recovered = await unsafe?.recover?.(signal)
+        if (recovered !== undefined) return recovered
+      }
+    }
+  }
+
+  /** Exponential backoff with jitter: ~0.5s, 1s, 2s, ... capped at 30s */
+  private backoff(attempt: number): number {
+    return Math.min(30_000, 500 * 2 ** attempt) * (0.5 + Math.random() / 2)
+  }
+}
+
+export const notionService = new NotionService()
@@ -1,21 +1,79 @@
 export interface OpenRouterModel {
   id: string
   name: string
+  /** USD per token, as decimal strings */
+  pricing?: {
+    prompt: string
+    completion: string
+  }
+  context_length?: number
+  top_provider?: {
+    max_completion_tokens?: number | null
+  }
+}
+
+import { hashString, safeParseJSON } from '@/utils/utils'
+import { modelCatalog } from '@/services/model-catalog'
+
+const ETAG_STORAGE_KEY = 'research-wrapper-models-etag'
+
+/** Validator for the last catalog response, tied to the API key and the exact list it came with */
+interface CatalogValidator {
+  key: string
+  etag: string
+  hash: string
 }
 
-import { safeParseJSON } from '@/utils/utils'
+const fingerprint = (models: OpenRouterModel[]) => hashString(JSON.stringify(models))
+
+function readValidator(): CatalogValidator | null {
+  try {
+    return JSON.parse(localStorage.getItem(ETAG_STORAGE_KEY) || 'null')
+  } catch {
+    return null
+  }
+}
+
+export interface FetchModelsOptions {
+  signal?: AbortSignal
+  /** Models already shown to the user; enables a conditional request that returns them unchanged on 304 */
+  cached?: OpenRouterModel[]
+}
+
+export async function fetchOpenRouterModels(apiKey: string, { signal, cached }: FetchModelsOptions = {}): Promise<OpenRouterModel[]> {
+  const key = hashString(apiKey)
+  const validator = cached && readValidator()
+  // Only revalidate when the cached list is the one the stored ETag was issued for
+  const conditional = validator && validator.key === key && validator.hash === fingerprint(cached) ? validator.etag : null
 
-export async function fetchOpenRouterModels(apiKey: string): Promise<OpenRouterModel[]> {
   const res = await fetch('https://openrouter.ai/api/v1/models', {
     headers: {
       Authorization: `Bearer ${apiKey}`,
       'HTTP-Referer': window.location.origin,
       'X-Title': 'Research Agent',
+      ...(conditional ? { 'If-None-Match': conditional } : {}),
     },
+    signal,
   })
+  if (res.status === 304 && cached) {
+    return cached
+  }
   if (!res.ok) {
     throw new Error(`Failed to fetch models: ${res.status}`)
   }
   const data = await safeParseJSON<{ data: OpenRouterModel[] }>(res)
+  // Every successful fetch refreshes the pricing and context-limit table
+  modelCatalog.update(data.data)
+
+  const etag = res.headers.get('ETag')
+  try {
+    if (etag) {
+      localStorage.setItem(ETAG_STORAGE_KEY, JSON.stringify({ key, etag, hash: fingerprint(data.data) }))
+    } else {
+      localStorage.removeItem(ETAG_STORAGE_KEY)
+    }
+  } catch {
+    // Storage full or unavailable; the next refresh is simply unconditional
+  }
   return data.data
 }
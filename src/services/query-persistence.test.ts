@@ -0,0 +1,61 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { QueryClient } from '@tanstack/react-query'
+import { persistQueryCache, restoreQueryCache } from './query-persistence'
+import { fetchOpenRouterModels } from './openrouter-service'
+
+const models = [{ id: 'openai/gpt-4.1', name: 'GPT-4.1' }]
+
+describe('query persistence', () => {
+  it('restores opted-in queries into a fresh client', async () => {
+    const client = new QueryClient()
+    const stop = persistQueryCache(client, { throttleMs: 0 })
+    await client.fetchQuery({ queryKey: ['models'], queryFn: async () => models, meta: { persist: true } })
+    await client.fetchQuery({ queryKey: ['other'], queryFn: async () => 'not persisted' })
+    await new Promise(resolve => setTimeout(resolve, 10))
+    stop()
+
+    const restored = new QueryClient()
+    expect(await restoreQueryCache(restored)).toBe(true)
+    expect(restored.getQueryData(['models'])).toEqual(models)
+    expect(restored.getQueryData(['other'])).toBeUndefined()
+  })
+
+  it('drops a cache older than maxAge', async () => {
+    const client = new QueryClient()
+    const stop = persistQueryCache(client, { throttleMs: 0 })
+    await client.fetchQuery({ queryKey: ['models'], queryFn: async () => models, meta: { persist: true } })
+    await new Promise(resolve => setTimeout(resolve, 10))
+    stop()
+
+    expect(await restoreQueryCache(new QueryClient(), { maxAge: -1 })).toBe(false)
+    expect(await restoreQueryCache(new QueryClient())).toBe(false)
+  })
+})
+
+describe('fetchOpenRouterModels', () => {
+  const fetchMock = globalThis.fetch as ReturnType<typeof vi.fn>
+
+  beforeEach(() => {
+    fetchMock.mockReset()
+    localStorage.clear()
+  })
+
+  it('revalidates cached models with the stored ETag', async () => {
+    fetchMock.mockResolvedValueOnce(new Response(JSON.stringify({ data: models }), { status: 200, headers: { ETag: '"v1"' } }))
+    const first = await fetchOpenRouterModels('key')
+    expect(first).toEqual(models)
+
+    fetchMock.mockResolvedValueOnce(new Response(null, { status: 304 }))
+    expect(await fetchOpenRouterModels('key', { cached: first })).toBe(first)
+    expect(fetchMock.mock.calls[1][1].headers['If-None-Match']).toBe('"v1"')
+  })
+
+  it('fetches unconditionally when the cached list does not match the ETag', async () => {
+    fetchMock.mockResolvedValueOnce(new Response(JSON.stringify({ data: models }), { status: 200, headers: { ETag: '"v1"' } }))
+    await fetchOpenRouterModels('key')
+
+    fetchMock.mockResolvedValueOnce(new Response(JSON.stringify({ data: models }), { status: 200 }))
+    await fetchOpenRouterModels('key', { cached: [] })
+    expect(fetchMock.mock.calls[1][1].headers['If-None-Match']).toBeUndefined()
+  })
+})
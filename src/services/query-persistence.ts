@@ -0,0 +1,70 @@
+import { dehydrate, hydrate, type DehydratedState, type Query, type QueryClient } from '@tanstack/react-query'
+import { IdbStore } from '@/services/idb'
+
+// Bump whenever the data shape of a persisted query changes; older caches are discarded
+export const QUERY_CACHE_VERSION = 1
+const CACHE_KEY = 'queries'
+const DEFAULT_MAX_AGE = 7 * 24 * 60 * 60 * 1000
+
+interface PersistedQueryCache {
+  version: number
+  savedAt: number
+  state: DehydratedState
+}
+
+export interface QueryPersistenceOptions {
+  /** Discard a persisted cache older than this */
+  maxAge?: number
+  /** Coalesce saves that happen within this window */
+  throttleMs?: number
+}
+
+const store = new IdbStore<PersistedQueryCache>('query-cache')
+
+/** Queries opt in with `meta: { persist: true }`; only successful results are written */
+export const shouldPersistQuery = (query: Query) => query.meta?.persist === true && query.state.status === 'success'
+
+/**
+ * Load persisted queries into `client`. Restored data keeps its original
+ * fetch time, so queries past their stale time show the cached data at
+ * once and refetch in the background on mount.
+ */
+export async function restoreQueryCache(client: QueryClient, { maxAge = DEFAULT_MAX_AGE }: QueryPersistenceOptions = {}): Promise<boolean> {
+  try {
+    const cached = await store.get(CACHE_KEY)
+    if (!cached) return false
+    if (cached.version !== QUERY_CACHE_VERSION || Date.now() - cached.savedAt > maxAge) {
+      await store.delete(CACHE_KEY)
+      return false
+    }
+    // Keep restored queries around until a component observes them
+    hydrate(client, cached.state, { defaultOptions: { queries: { gcTime: maxAge } } })
+    return true
+  } catch {
+    return false
+  }
+}
+
+/** Write opted-in queries to IndexedDB whenever one of them succeeds. Returns an unsubscribe function. */
+export function persistQueryCache(client: QueryClient, { throttleMs = 1000 }: QueryPersistenceOptions = {}): () => void {
+  let timer: ReturnType<typeof setTimeout> | undefined
+
+  const save = () => {
+    timer = undefined
+    const state = dehydrate(client, { shouldDehydrateQuery: shouldPersistQuery, shouldDehydrateMutation: () => false })
+    store.set(CACHE_KEY, { version: QUERY_CACHE_VERSION, savedAt: Date.now(), state }).catch(() => {})
+  }
+
+  const unsubscribe = client.getQueryCache().subscribe(event => {
+    if (event.type !== 'updated' || event.action.type !== 'success' || !event.query.meta?.persist) return
+    if (timer === undefined) timer = setTimeout(save, throttleMs)
+  })
+
+  return () => {
+    unsubscribe()
+    if (timer !== undefined) {
+      clearTimeout(timer)
+      save()
+    }
+  }
+}
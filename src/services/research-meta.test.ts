@@ -0,0 +1,39 @@
+import { describe, it, expect } from 'vitest'
+import { ResearchMetaStore } from './research-meta'
+import type { Research } from '@/types/types'
+
+const research = (id: string, day: number, status: Research['status'], totalCost = 0): Research => ({
+  id,
+  title: `Research ${id}`,
+  prompt: JSON.stringify({ model: 'o3-deep-research', input: [] }),
+  status,
+  createdAt: new Date(Date.UTC(2024, 0, day)).toISOString(),
+  cost: { inputTokens: 0, outputTokens: 0, totalCost },
+})
+
+describe('ResearchMetaStore', () => {
+  const history = [research('a', 1, 'completed', 0.5), research('b', 3, 'error'), research('c', 2, 'completed', 2)]
+
+  it('pages rows in each sort order and filters by status', async () => {
+    const store = new ResearchMetaStore()
+    store.sync(history)
+    expect(await store.count()).toBe(3)
+    expect((await store.page({ sort: 'newest' }, 0, 10)).map(meta => meta.id)).toEqual(['b', 'c', 'a'])
+    expect((await store.page({ sort: 'oldest' }, 1, 10)).map(meta => meta.id)).toEqual(['c', 'b'])
+    expect((await store.page({ sort: 'cost' }, 0, 2)).map(meta => meta.id)).toEqual(['c', 'a'])
+    expect(await store.count({ status: 'completed' })).toBe(2)
+    expect((await store.page({ status: 'completed' }, 0, 10)).map(meta => meta.id)).toEqual(['c', 'a'])
+  })
+
+  it('keeps only metadata and follows updates and deletes', async () => {
+    const store = new ResearchMetaStore()
+    store.sync(history)
+    const [first] = await store.page({}, 0, 1)
+    expect(first).toMatchObject({ id: 'b', status: 'error', model: 'o3-deep-research' })
+    expect(first).not.toHaveProperty('prompt')
+
+    store.sync([{ ...history[1], status: 'completed' }, history[2]])
+    expect(await store.count()).toBe(2)
+    expect(await store.count({ status: 'error' })).toBe(0)
+  })
+})
@@ -0,0 +1,118 @@
+import type { Research } from '@/types/types'
+import { IdbStore, type KeyBounds } from '@/services/idb'
+import { HistoryDiff, Subscribable } from '@/services/history-index'
+import { modelFromPrompt } from '@/utils/utils'
+
+const INDEXES = {
+  createdAt: 'createdAt',
+  cost: 'cost',
+  status_createdAt: ['status', 'createdAt'],
+  status_cost: ['status', 'cost'],
+  stamp: 'stamp',
+}
+
+/** What a history row shows; no prompt, report or sources */
+export interface ResearchMeta {
+  id: string
+  title: string
+  status: Research['status']
+  createdAt: string
+  completedAt?: string
+  /** Total cost in USD, 0 when unknown */
+  cost: number
+  model: string
+  /** Changes whenever a stored field does */
+  stamp: string
+}
+
+export type ResearchSort = 'newest' | 'oldest' | 'cost'
+
+export interface ResearchQuery {
+  sort?: ResearchSort
+  status?: Research['status']
+}
+
+export function researchMeta(research: Research): ResearchMeta {
+  const meta = {
+    id: research.id,
+    title: research.title,
+    status: research.status,
+    createdAt: research.createdAt,
+    completedAt: research.completedAt,
+    cost: research.cost?.totalCost ?? 0,
+    model: modelFromPrompt(research.prompt),
+  }
+  return { ...meta, stamp: [meta.title, meta.status, meta.createdAt, meta.completedAt ?? '', meta.cost].join('|') }
+}
+
+/** Index and key bounds that yield `query` already filtered and in ascending sort order */
+function indexQuery({ sort = 'newest', status }: ResearchQuery): { index: string; bounds?: KeyBounds } {
+  const field = sort === 'cost' ? 'cost' : 'createdAt'
+  if (!status) return { index: field }
+  const [lower, upper] = field === 'cost' ? [-Infinity, Infinity] : ['', '\uffff']
+  return { index: `status_${field}`, bounds: { lower: [status, lower], upper: [status, upper] } }
+}
+
+/**
+ * Row metadata for every research in an IndexedDB store with an index per
+ * sort order and status filter, so the history list can read one page at
+ * a time in order without sorting or holding the whole history. `sync`
+ * writes only entries whose metadata changed, and subscribers are called
+ * once each batch of changes is stored.
+ */
+export class ResearchMetaStore extends Subscribable {
+  // Version 1 kept rows in a hand-opened 'meta' store; the upgrade recreates them from history
+  private store = new IdbStore<ResearchMeta>('research-meta', { keyPath: 'id', indexes: INDEXES, version: 2 })
+  private stamps = new HistoryDiff<string>()
+  private started = false
+  private writes: Promise<void> = Promise.resolve()
+
+  /** Bring the store in line with `history`; writes are queued in order */
+  sync(history: Research[]): void {
+    const first = !this.started
+    this.started = true
+    const { added, changed, removed } = this.stamps.diff(history)
+    const puts: ResearchMeta[] = []
+    const put = (research: Research, previousStamp?: string) => {
+      const meta = researchMeta(research)
+      this.stamps.track(research.id, meta.stamp)
+      if (meta.stamp !== previousStamp) puts.push(meta)
+    }
+    added.forEach(research => put(research))
+    changed.forEach(({ research, previous }) => put(research, previous.data))
+    const deletes = removed.map(({ research }) => research.id)
+    if (!first && puts.length === 0 && deletes.length === 0) return
+
+    this.writes = this.writes
+      .then(() => (first ? this.reconcile(puts) : this.write(puts, deletes)))
+      .catch(() => {})
+      .then(() => this.notify())
+  }
+
+  async count(query: ResearchQuery = {}): Promise<number> {
+    await this.writes
+    const { index, bounds } = indexQuery(query)
+    return this.store.count(index, bounds)
+  }
+
+  /** Up to `limit` rows of `query` starting at `offset` */
+  async page(query: ResearchQuery, offset: number, limit: number): Promise<ResearchMeta[]> {
+    await this.writes
+    const { index, bounds } = indexQuery(query)
+    return this.store.query(index, { bounds, direction: query.sort === 'oldest' ? 'next' : 'prev', offset, limit })
+  }
+
+  /** First sync of a session: compare stamps with what earlier sessions stored */
+  private async reconcile(metas: ResearchMeta[]): Promise<void> {
+    const stored = new Map(await this.store.indexKeys('stamp'))
+    const stale = [...stored.keys()].filter(id => !this.stamps.has(id))
+    await this.write(metas.filter(meta => stored.get(meta.id) !== meta.stamp), stale)
+  }
+
+  private write(puts: ResearchMeta[], deletes: string[]): Promise<void> {
+    if (puts.length === 0 && deletes.length === 0) return Promise.resolve()
+    return this.store.update(puts.map(meta => [meta.id, meta]), deletes)
+  }
+}
+
+export const researchMetaStore = new ResearchMetaStore()
@@ -0,0 +1,102 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { ResponseCache, canonicalJSON } from './response-cache'
+
+const payload = (content: string) => ({ model: 'openai/gpt-4.1', messages: [{ role: 'user', content }], max_tokens: 100, temperature: 0.3 })
+
+const deferred = () => {
+  let resolve!: (value: { content: string; cost: number }) => void
+  const promise = new Promise<{ content: string; cost: number }>(r => (resolve = r))
+  return { promise, resolve }
+}
+
+describe('ResponseCache', () => {
+  // Every instance shares the same IndexedDB stores, so start each test from an empty cache
+  beforeEach(async () => {
+    localStorage.clear()
+    await new ResponseCache().clear()
+  })
+
+  it('hashes payloads independently of key order', () => {
+    expect(canonicalJSON({ b: 1, a: [{ d: 2, c: 3 }], e: undefined })).toBe('{"a":[{"c":3,"d":2}],"b":1}')
+    const cache = new ResponseCache()
+    expect(cache.keyFor({ model: 'm', max_tokens: 1 })).toBe(cache.keyFor({ max_tokens: 1, model: 'm' }))
+  })
+
+  it('answers repeated requests from the cache and counts the saving', async () => {
+    const cache = new ResponseCache()
+    const request = vi.fn(async () => ({ content: 'answer', cost: 0.01 }))
+    await cache.fetch(payload('q'), request)
+    await expect(cache.fetch(payload('q'), request)).resolves.toEqual({ content: 'answer', cost: 0.01 })
+    expect(request).toHaveBeenCalledTimes(1)
+    expect(cache.getStats()).toMatchObject({ hits: 1, misses: 1, savedCost: 0.01 })
+  })
+
+  it('coalesces concurrent identical requests', async () => {
+    const cache = new ResponseCache()
+    const pending = deferred()
+    const request = vi.fn(() => pending.promise)
+    const first = cache.fetch(payload('q'), request)
+    const second = cache.fetch(payload('q'), request)
+    await new Promise(resolve => setTimeout(resolve, 0))
+    pending.resolve({ content: 'shared', cost: 0.02 })
+    await expect(Promise.all([first, second])).resolves.toEqual([
+      { content: 'shared', cost: 0.02 },
+      { content: 'shared', cost: 0.02 },
+    ])
+    expect(request).toHaveBeenCalledTimes(1)
+    expect(cache.getStats().coalesced).toBe(1)
+  })
+
+  it('aborts the shared request only when every caller has', async () => {
+    const cache = new ResponseCache()
+    let requestSignal!: AbortSignal
+    const pending = deferred()
+    const request = (signal: AbortSignal) => {
+      requestSignal = signal
+      return pending.promise
+    }
+    const a = new AbortController()
+    const b = new AbortController()
+    const first = cache.fetch(payload('q'), request, a.signal)
+    const second = cache.fetch(payload('q'), request, b.signal)
+    await new Promise(resolve => setTimeout(resolve, 0))
+
+    a.abort()
+    await expect(first).rejects.toBeDefined()
+    expect(requestSignal.aborted).toBe(false)
+    b.abort()
+    await expect(second).rejects.toBeDefined()
+    expect(requestSignal.aborted).toBe(true)
+
+    // A later caller does not join the aborted request
+    await expect(cache.fetch(payload('q'), async () => ({ content: 'fresh', cost: 0 }))).resolves.toEqual({ content: 'fresh', cost: 0 })
+  })
+
+  it('does not cache empty responses', async () => {
+    const cache = new ResponseCache()
+    const request = vi.fn(async () => ({ content: '', cost: 0 }))
+    await cache.fetch(payload('q'), request)
+    await cache.fetch(payload('q'), request)
+    expect(request).toHaveBeenCalledTimes(2)
+    expect(cache.getStats()).toMatchObject({ hits: 0, misses: 2 })
+  })
+
+  it('evicts the least recently used entry and expires old ones', async () => {
+    const cache = new ResponseCache({ maxEntries: 2 })
+    const request = vi.fn(async () => ({ content: 'x', cost: 0 }))
+    await cache.fetch(payload('a'), request)
+    await cache.fetch(payload('b'), request)
+    await cache.fetch(payload('a'), request) // a is now more recent than b
+    await cache.fetch(payload('c'), request) // evicts b
+    expect(request).toHaveBeenCalledTimes(3)
+    await cache.fetch(payload('a'), request)
+    expect(request).toHaveBeenCalledTimes(3)
+    await cache.fetch(payload('b'), request)
+    expect(request).toHaveBeenCalledTimes(4)
+
+    const expiring = new ResponseCache({ ttlMs: -1 })
+    await expiring.fetch(payload('a'), request)
+    await expiring.fetch(payload('a'), request)
+    expect(request).toHaveBeenCalledTimes(6)
+  })
+})
@@ -0,0 +1,254 @@
+import { IdbStore } from '@/services/idb'
+import { hashString } from '@/utils/utils'
+
+const STATS_STORAGE_KEY = 'research-wrapper-response-cache-stats'
+const INDEX_KEY = 'index'
+
+export interface CachedResponse {
+  content: string
+  /** Cost of the original request in USD, credited as saved on every hit */
+  cost: number
+}
+
+interface CacheEntry extends CachedResponse {
+  createdAt: number
+}
+
+/** Last use and size per key, kept apart from the entries so eviction never loads responses */
+type CacheIndex = Record<string, [lastUsed: number, bytes: number]>
+
+export interface ResponseCacheStats {
+  hits: number
+  misses: number
+  /** Callers that joined an identical request already in flight */
+  coalesced: number
+  savedCost: number
+}
+
+export interface ResponseCacheOptions {
+  ttlMs?: number
+  maxEntries?: number
+  maxBytes?: number
+}
+
+interface Flight {
+  promise: Promise<CachedResponse>
+  controller: AbortController
+  waiters: number
+}
+
+/** JSON with object keys sorted, so equal payloads hash equally whatever their key order */
+export function canonicalJSON(value: unknown): string {
+  if (Array.isArray(value)) return `[${value.map(canonicalJSON).join(',')}]`
+  if (value && typeof value === 'object') {
+    const entries = Object.keys(value)
+      .filter(key => (value as Record<string, unknown>)[key] !== undefined)
+      .sort()
+      .map(key => `${JSON.stringify(key)}:${canonicalJSON((value as Record<string, unknown>)[key])}`)
+    return `{${entries.join(',')}}`
+  }
+  return JSON.stringify(value) ?? 'null'
+}
+
+const emptyStats = (): ResponseCacheStats => ({ hits: 0, misses: 0, coalesced: 0, savedCost: 0 })
+
+/**
+ * Request-level cache for completion calls. Responses are stored in
+ * IndexedDB under a hash of the canonical payload, expire after a TTL and
+ * are evicted least recently used first once the entry or byte budget is
+ * exceeded. Responses with no content are not stored. Identical requests
+ * made while one is in flight share it; the network request is only aborted
+ * once every caller has given up on it.
+ */
+export class ResponseCache {
+  private entries = new IdbStore<CacheEntry>('response-cache')
+  private meta = new IdbStore<CacheIndex>('response-cache-index')
+  private index: Promise<CacheIndex> | null = null
+  private inFlight = new Map<string, Flight>()
+  private stats: ResponseCacheStats
+  private listeners = new Set<() => void>()
+  private ttlMs: number
+  private maxEntries: number
+  private maxBytes: number
+  private lastTick = 0
+
+  constructor({ ttlMs = 24 * 60 * 60 * 1000, maxEntries = 500, maxBytes = 5_000_000 }: ResponseCacheOptions = {}) {
+    this.ttlMs = ttlMs
+    this.maxEntries = maxEntries
+    this.maxBytes = maxBytes
+    this.stats = this.loadStats()
+  }
+
+  keyFor(payload: unknown): string {
+    return hashString(canonicalJSON(payload))
+  }
+
+  /**
+   * Cached response for `payload`, or the result of `request`. `signal`
+   * detaches this caller only; the shared request continues while anyone
+   * else is still waiting for it.
+   */
+  async fetch(payload: unknown, request: (signal: AbortSignal) => Promise<CachedResponse>, signal?: AbortSignal): Promise<CachedResponse> {
+    signal?.throwIfAborted()
+    const key = this.keyFor(payload)
+
+    let flight = this.inFlight.get(key)
+    if (flight) {
+      this.record({ coalesced: 1 })
+    } else {
+      const cached = await this.read(key)
+      if (cached) {
+        this.record({ hits: 1, savedCost: cached.cost })
+        return cached
+      }
+      // Another caller may have started the request while the cache was read
+      flight = this.inFlight.get(key)
+      if (flight) {
+        this.record({ coalesced: 1 })
+      } else {
+        this.record({ misses: 1 })
+        flight = this.start(key, request)
+      }
+    }
+    return this.wait(flight, signal)
+  }
+
+  /** Current stats; a new object after every change, so it can back useSyncExternalStore */
+  getStats(): Readonly<ResponseCacheStats> {
+    return this.stats
+  }
+
+  /** Subscribe to stats changes; returns an unsubscribe function */
+  subscribe(listener: () => void): () => void {
+    this.listeners.add(listener)
+    return () => this.listeners.delete(listener)
+  }
+
+  async clear(): Promise<void> {
+    await Promise.all([this.entries.clear(), this.meta.clear()])
+    this.index = Promise.resolve({})
+    this.stats = emptyStats()
+    this.saveStats()
+    this.listeners.forEach(listener => listener())
+  }
+
+  private start(key: string, request: (signal: AbortSignal) => Promise<CachedResponse>): Flight {
+    const controller = new AbortController()
+    const flight: Flight = { controller, waiters: 0, promise: null! }
+    flight.promise = request(controller.signal)
+      .then(async response => {
+        // An empty answer is usually a provider hiccup; don't serve it back for a whole TTL
+        if (response.content) await this.write(key, response).catch(() => {})
+        return response
+      })
+      .finally(() => this.forget(key, flight))
+    // Once aborted the flight can only fail, so later callers must start a fresh request
+    controller.signal.addEventListener('abort', () => this.forget(key, flight), { once: true })
+    this.inFlight.set(key, flight)
+    return flight
+  }
+
+  private forget(key: string, flight: Flight): void {
+    if (this.inFlight.get(key) === flight) this.inFlight.delete(key)
+  }
+
+  private wait(flight: Flight, signal?: AbortSignal): Promise<CachedResponse> {
+    flight.waiters++
+    if (!signal) return flight.promise.finally(() => flight.waiters--)
+    return new Promise((resolve, reject) => {
+      const onAbort = () => {
+        if (--flight.waiters === 0) flight.controller.abort(signal.reason)
+        reject(signal.reason)
+      }
+      signal.addEventListener('abort', onAbort, { once: true })
+      flight.promise.then(
+        value => {
+          signal.removeEventListener('abort', onAbort)
+          flight.waiters--
+          resolve(value)
+        },
+        error => {
+          signal.removeEventListener('abort', onAbort)
+          flight.waiters--
+          reject(error)
+        }
+      )
+    })
+  }
+
+  /** Millisecond clock that never repeats, so recency is strictly ordered */
+  private tick(): number {
+    this.lastTick = Math.max(Date.now(), this.lastTick + 1)
+    return this.lastTick
+  }
+
+  private loadIndex(): Promise<CacheIndex> {
+    if (!this.index) {
+      this.index = this.meta.get(INDEX_KEY).then(index => index ?? {}, () => ({}))
+    }
+    return this.index
+  }
+
+  private async read(key: string): Promise<CachedResponse | null> {
+    const index = await this.loadIndex()
+    if (!index[key]) return null
+    const entry = await this.entries.get(key).catch(() => undefined)
+    if (!entry || Date.now() - entry.createdAt > this.ttlMs) {
+      delete index[key]
+      await Promise.all([this.entries.delete(key), this.meta.set(INDEX_KEY, index)]).catch(() => {})
+      return null
+    }
+    index[key][0] = this.tick()
+    this.meta.set(INDEX_KEY, index).catch(() => {})
+    return { content: entry.content, cost: entry.cost }
+  }
+
+  private async write(key: string, response: CachedResponse): Promise<void> {
+    const index = await this.loadIndex()
+    index[key] = [this.tick(), response.content.length * 2]
+
+    const keys = Object.keys(index)
+    let bytes = keys.reduce((sum, k) => sum + index[k][1], 0)
+    const evicted: string[] = []
+    if (keys.length > this.maxEntries || bytes > this.maxBytes) {
+      keys.sort((a, b) => index[a][0] - index[b][0])
+      for (const k of keys) {
+        if (keys.length - evicted.length <= this.maxEntries && bytes <= this.maxBytes) break
+        if (k === key) continue
+        bytes -= index[k][1]
+        delete index[k]
+        evicted.push(k)
+      }
+    }
+
+    await this.entries.set(key, { ...response, createdAt: Date.now() })
+    await Promise.all([...evicted.map(k => this.entries.delete(k)), this.meta.set(INDEX_KEY, index)])
+  }
+
+  private record(delta: Partial<ResponseCacheStats>): void {
+    this.stats = { ...this.stats }
+    for (const [name, value] of Object.entries(delta) as Array<[keyof ResponseCacheStats, number]>) {
+      this.stats[name] += value
+    }
+    this.saveStats()
+    this.listeners.forEach(listener => listener())
+  }
+
+  private loadStats(): ResponseCacheStats {
+    try {
+      return { ...emptyStats(), ...JSON.parse(localStorage.getItem(STATS_STORAGE_KEY) || '{}') }
+    } catch {
+      return emptyStats()
+    }
+  }
+
+  private saveStats(): void {
+    try {
+      localStorage.setItem(STATS_STORAGE_KEY, JSON.stringify(this.stats))
+    } catch {
+      // Storage full or unavailable; stats stay in memory
+    }
+  }
+}
+
+export const responseCache = new ResponseCache()
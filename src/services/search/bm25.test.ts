@@ -0,0 +1,81 @@
+import { describe, it, expect } from 'vitest'
+import { SearchIndex, analyzeDocument, type SearchDocument } from './bm25'
+import { buildSnippet } from './snippet'
+
+const doc = (id: string, fields: Partial<SearchDocument>): SearchDocument => ({
+  id,
+  title: '',
+  prompt: '',
+  sources: '',
+  report: '',
+  ...fields,
+})
+
+const build = (...docs: SearchDocument[]) => {
+  const index = new SearchIndex()
+  docs.forEach(d => index.add(analyzeDocument(d, 'v1')))
+  return index
+}
+
+describe('SearchIndex', () => {
+  it('ranks title matches above report matches', () => {
+    const index = build(
+      doc('report', { title: 'Housing policy', report: 'Battery storage is mentioned once here.' }),
+      doc('title', { title: 'Battery storage economics', report: 'Costs fell sharply.' }),
+      doc('other', { title: 'Coral reefs', report: 'Bleaching events.' })
+    )
+    expect(index.search('battery storage').hits.map(hit => hit.id)).toEqual(['title', 'report'])
+  })
+
+  it('matches the last word as a prefix while typing', () => {
+    const index = build(doc('a', { report: 'Semiconductor supply chains' }))
+    expect(index.search('semicond').hits.map(hit => hit.id)).toEqual(['a'])
+    expect(index.search('semicond').terms).toContain('semiconductor')
+    expect(index.search('semicond ').hits).toEqual([])
+  })
+
+  it('drops removed documents and replaces changed ones', () => {
+    const index = build(doc('a', { report: 'wind turbines' }), doc('b', { report: 'wind farms' }))
+    index.remove('a')
+    expect(index.search('wind').hits.map(hit => hit.id)).toEqual(['b'])
+    index.add(analyzeDocument(doc('b', { report: 'solar panels' }), 'v2'))
+    expect(index.search('wind').hits).toEqual([])
+    expect(index.stamp('b')).toBe('v2')
+  })
+
+  it('stays correct across compaction', () => {
+    const index = new SearchIndex()
+    for (let i = 0; i < 200; i++) index.add(analyzeDocument(doc(`d${i}`, { report: `tidal energy report ${i}` }), 'v1'))
+    for (let i = 0; i < 150; i++) index.remove(`d${i}`)
+    expect(index.size).toBe(50)
+    expect(index.search('tidal', 100).hits).toHaveLength(50)
+  })
+
+  it('answers queries over 10k reports in under 50 ms', () => {
+    const words = 'market policy climate energy health finance labour housing trade supply chain water transport education'.split(' ')
+    const index = new SearchIndex()
+    for (let i = 0; i < 10_000; i++) {
+      const report = Array.from({ length: 150 }, (_, j) => words[(i * 31 + j * j) % words.length] + ((i + j) % 97)).join(' ')
+      index.add(analyzeDocument(doc(`r${i}`, { title: `Report ${i}`, report }), 'v1'))
+    }
+    index.search('energy42 policy')
+    const start = performance.now()
+    const { hits } = index.search('energy42 policy supply')
+    expect(performance.now() - start).toBeLessThan(50)
+    expect(hits.length).toBeGreaterThan(0)
+  })
+})
+
+describe('buildSnippet', () => {
+  it('highlights whole-word matches around the first hit', () => {
+    const text = `${'Background. '.repeat(20)}Grid batteries smooth demand, and batteries are cheap.${' Filler.'.repeat(30)}`
+    const parts = buildSnippet(text, ['batteries'], 40)
+    expect(parts[0].text).toBe('…')
+    expect(parts.filter(part => part.match).map(part => part.text)).toEqual(['batteries', 'batteries'])
+    expect(parts[parts.length - 1].text).toBe('…')
+  })
+
+  it('returns nothing when no term occurs', () => {
+    expect(buildSnippet('Nothing relevant', ['batteries'])).toEqual([])
+  })
+})
@@ -0,0 +1,168 @@
+// BM25 ranking over an inverted index of research history
+
+const K1 = 1.2
+const B = 0.75
+// Longer runs are almost always URLs or encoded data rather than words
+const MAX_TERM_LENGTH = 40
+// A trailing partial word expands to at most this many indexed terms
+const MAX_PREFIX_EXPANSIONS = 30
+// Expansions count for less than a word matched as typed
+const PREFIX_WEIGHT = 0.5
+// Removed documents are dropped from postings once they are this share of all slots
+const COMPACT_RATIO = 0.25
+
+const STOP_WORDS = new Set(
+  'a an and are as at be by for from has have in is it its of on or that the this to was were what with'.split(' ')
+)
+
+export type SearchField = 'title' | 'prompt' | 'sources' | 'report'
+
+/** Term frequency multipliers, so a title hit outranks the same word deep in a report */
+export const FIELD_WEIGHTS: Record<SearchField, number> = { title: 3, prompt: 2, sources: 1.5, report: 1 }
+
+export type SearchDocument = { id: string } & Record<SearchField, string>
+
+/** A document reduced to weighted term frequencies; this is the persisted form */
+export interface IndexedDocument {
+  id: string
+  /** Changes whenever the indexed content does */
+  stamp: string
+  terms: string[]
+  freqs: number[]
+  length: number
+}
+
+export interface SearchHit {
+  id: string
+  score: number
+}
+
+export interface SearchResults {
+  hits: SearchHit[]
+  /** Indexed terms the query matched, for highlighting */
+  terms: string[]
+}
+
+const NON_ASCII = /[^\x00-\x7f]/
+
+/** Lowercased words of `text` without stop words */
+export function searchTerms(text: string): string[] {
+  const normalized = NON_ASCII.test(text) ? text.normalize('NFKC').toLowerCase() : text.toLowerCase()
+  return (normalized.match(/[\p{L}\p{N}]+/gu) ?? []).filter(term => term.length <= MAX_TERM_LENGTH && !STOP_WORDS.has(term))
+}
+
+export function analyzeDocument(doc: SearchDocument, stamp: string): IndexedDocument {
+  const freqs = new Map<string, number>()
+  let length = 0
+  for (const field of Object.keys(FIELD_WEIGHTS) as SearchField[]) {
+    const weight = FIELD_WEIGHTS[field]
+    for (const term of searchTerms(doc[field])) {
+      freqs.set(term, (freqs.get(term) ?? 0) + weight)
+      length += weight
+    }
+  }
+  return { id: doc.id, stamp, terms: [...freqs.keys()], freqs: [...freqs.values()], length }
+}
+
+/**
+ * Inverted index with BM25 scoring. Documents are added already analyzed,
+ * so the index can be rebuilt from persisted term frequencies without
+ * tokenizing any text. Removal only frees the document's slot; its
+ * postings are skipped at query time and dropped on the next compaction.
+ */
+export class SearchIndex {
+  private slots: Array<IndexedDocument | null> = []
+  private slotOf = new Map<string, number>()
+  /** Term to interleaved `[slot, freq, slot, freq, ...]` */
+  private postings = new Map<string, number[]>()
+  private totalLength = 0
+
+  get size(): number {
+    return this.slotOf.size
+  }
+
+  ids(): string[] {
+    return [...this.slotOf.keys()]
+  }
+
+  stamp(id: string): string | undefined {
+    const slot = this.slotOf.get(id)
+    return slot === undefined ? undefined : this.slots[slot]!.stamp
+  }
+
+  /** Add or replace a document; one with an unchanged stamp is a no-op */
+  add(doc: IndexedDocument): void {
+    if (this.stamp(doc.id) === doc.stamp) return
+    this.remove(doc.id)
+    const slot = this.slots.length
+    this.slots.push(doc)
+    this.slotOf.set(doc.id, slot)
+    this.totalLength += doc.length
+    for (let i = 0; i < doc.terms.length; i++) {
+      let list = this.postings.get(doc.terms[i])
+      if (!list) this.postings.set(doc.terms[i], (list = []))
+      list.push(slot, doc.freqs[i])
+    }
+  }
+
+  remove(id: string): void {
+    const slot = this.slotOf.get(id)
+    if (slot === undefined) return
+    this.totalLength -= this.slots[slot]!.length
+    this.slots[slot] = null
+    this.slotOf.delete(id)
+    if (this.slots.length - this.size > Math.max(64, this.slots.length * COMPACT_RATIO)) this.compact()
+  }
+
+  /** Best `limit` documents for `query`; its last word also matches as a prefix */
+  search(query: string, limit = 20): SearchResults {
+    const words = searchTerms(query)
+    if (words.length === 0 || this.size === 0) return { hits: [], terms: [] }
+
+    const weights = new Map<string, number>()
+    for (const word of words) if (this.postings.has(word)) weights.set(word, 1)
+    const partial = words[words.length - 1]
+    if (/[\p{L}\p{N}]$/u.test(query)) {
+      let expansions = 0
+      for (const term of this.postings.keys()) {
+        if (term.length > partial.length && term.startsWith(partial) && !weights.has(term)) {
+          weights.set(term, PREFIX_WEIGHT)
+          if (++expansions >= MAX_PREFIX_EXPANSIONS) break
+        }
+      }
+    }
+
+    const count = this.size
+    const avgLength = this.totalLength / count || 1
+    const scores = new Float64Array(this.slots.length)
+    const matched: number[] = []
+    for (const [term, weight] of weights) {
+      const list = this.postings.get(term)!
+      // Postings of removed documents still count here until compaction
+      const df = Math.min(list.length / 2, count)
+      const idf = Math.log(1 + (count - df + 0.5) / (df + 0.5))
+      for (let i = 0; i < list.length; i += 2) {
+        const doc = this.slots[list[i]]
+        if (!doc) continue
+        const tf = list[i + 1]
+        if (scores[list[i]] === 0) matched.push(list[i])
+        scores[list[i]] += (weight * idf * tf * (K1 + 1)) / (tf + K1 * (1 - B + (B * doc.length) / avgLength))
+      }
+    }
+
+    const hits = matched
+      .sort((a, b) => scores[b] - scores[a])
+      .slice(0, limit)
+      .map(slot => ({ id: this.slots[slot]!.id, score: scores[slot] }))
+    return { hits, terms: [...weights.keys()] }
+  }
+
+  private compact(): void {
+    const docs = this.slots.filter((doc): doc is IndexedDocument => doc !== null)
+    this.slots = []
+    this.slotOf.clear()
+    this.postings.clear()
+    this.totalLength = 0
+    docs.forEach(doc => this.add(doc))
+  }
+}
@@ -0,0 +1,156 @@
+import type { Research } from '@/types/types'
+import { HistoryDiff, Subscribable } from '@/services/history-index'
+import { researchPromptText } from '@/utils/utils'
+import { SearchIndex, analyzeDocument, type SearchDocument, type SearchResults } from './bm25'
+
+export { SearchIndex, analyzeDocument, searchTerms, type IndexedDocument, type SearchDocument, type SearchHit, type SearchResults } from './bm25'
+export { buildSnippet, type SnippetPart } from './snippet'
+
+// Bump when tokenizing or weighting changes, so persisted documents are re-indexed
+export const SEARCH_INDEX_VERSION = 1
+
+/** Cheap fingerprint of the indexed fields; reports are written once, so lengths are enough */
+export function researchStamp(research: Research): string {
+  return [
+    SEARCH_INDEX_VERSION,
+    research.title,
+    research.prompt.length,
+    research.result?.report.length ?? 0,
+    research.result?.sources.length ?? 0,
+    research.completedAt ?? '',
+  ].join('|')
+}
+
+export function researchSearchDocument(research: Research): SearchDocument {
+  return {
+    id: research.id,
+    title: research.title,
+    prompt: researchPromptText(research.prompt),
+    report: research.result?.report ?? '',
+    sources: research.result?.sources.map(source => source.title).join('\n') ?? '',
+  }
+}
+
+// Message protocol between SearchService and the search worker
+export type SearchWorkerRequest =
+  /** Every id in history with its stamp; the worker drops the rest and asks for what it lacks */
+  | { type: 'sync'; stamps: Array<[id: string, stamp: string]> }
+  | { type: 'upsert'; docs: Array<{ doc: SearchDocument; stamp: string }> }
+  | { type: 'remove'; ids: string[] }
+  | { type: 'query'; id: number; query: string; limit: number }
+
+export type SearchWorkerResponse =
+  | { type: 'missing'; ids: string[] }
+  | ({ type: 'results'; id: number } & SearchResults)
+
+export interface SearchOptions {
+  limit?: number
+  signal?: AbortSignal
+}
+
+/**
+ * Full-text search over research history. The index lives in a worker that
+ * persists it, so startup only sends the research added or changed since
+ * the last session. `sync` is called with every new history array and
+ * forwards just the entries that changed identity and content. Without
+ * Worker support the index is kept in memory on the main thread.
+ * Subscribers hear of every change sent to the index, so open searches
+ * can run again.
+ */
+export class SearchService extends Subscribable {
+  private worker: Worker | null = null
+  private local: SearchIndex | null = null
+  private stamps = new HistoryDiff<string>()
+  private started = false
+  private history: Research[] = []
+  private nextId = 0
+  private pending = new Map<number, (results: SearchResults) => void>()
+
+  sync(history: Research[]): void {
+    this.history = history
+    const { added, changed, removed } = this.stamps.diff(history)
+    if (!this.started) {
+      this.started = true
+      const stamps = added.map((research): [string, string] => [research.id, researchStamp(research)])
+      stamps.forEach(([id, stamp]) => this.stamps.track(id, stamp))
+      this.post({ type: 'sync', stamps })
+      this.notify()
+      return
+    }
+
+    const docs: Array<{ doc: SearchDocument; stamp: string }> = []
+    const upsert = (research: Research, previousStamp?: string) => {
+      const stamp = researchStamp(research)
+      this.stamps.track(research.id, stamp)
+      if (stamp !== previousStamp) docs.push({ doc: researchSearchDocument(research), stamp })
+    }
+    added.forEach(research => upsert(research))
+    changed.forEach(({ research, previous }) => upsert(research, previous.data))
+    if (docs.length) this.post({ type: 'upsert', docs })
+    if (removed.length) this.post({ type: 'remove', ids: removed.map(({ research }) => research.id) })
+    if (docs.length || removed.length) this.notify()
+  }
+
+  search(query: string, { limit = 20, signal }: SearchOptions = {}): Promise<SearchResults> {
+    signal?.throwIfAborted()
+    if (this.getLocal()) return Promise.resolve(this.local!.search(query, limit))
+    const id = ++this.nextId
+    return new Promise((resolve, reject) => {
+      this.pending.set(id, resolve)
+      signal?.addEventListener('abort', () => {
+        this.pending.delete(id)
+        reject(signal.reason)
+      }, { once: true })
+      this.post({ type: 'query', id, query, limit })
+    })
+  }
+
+  private post(request: SearchWorkerRequest): void {
+    const local = this.getLocal()
+    if (!local) {
+      this.getWorker().postMessage(request)
+      return
+    }
+    if (request.type === 'sync') {
+      this.upsert(request.stamps.map(([id]) => id))
+    } else if (request.type === 'upsert') {
+      request.docs.forEach(({ doc, stamp }) => local.add(analyzeDocument(doc, stamp)))
+    } else if (request.type === 'remove') {
+      request.ids.forEach(id => local.remove(id))
+    }
+  }
+
+  /** Send the current content of `ids`, which the index lacks or has stale */
+  private upsert(ids: string[]): void {
+    if (ids.length === 0) return
+    const wanted = new Set(ids)
+    const docs = this.history
+      .filter(research => wanted.has(research.id))
+      .map(research => ({ doc: researchSearchDocument(research), stamp: this.stamps.get(research.id)!.data! }))
+    this.post({ type: 'upsert', docs })
+  }
+
+  private getLocal(): SearchIndex | null {
+    if (!this.local && typeof Worker === 'undefined') this.local = new SearchIndex()
+    return this.local
+  }
+
+  private getWorker(): Worker {
+    if (!this.worker) {
+      this.worker = new Worker(new URL('./worker.ts', import.meta.url), { type: 'module' })
+      this.worker.onmessage = (event: MessageEvent<SearchWorkerResponse>) => {
+        const message = event.data
+        if (message.type === 'missing') {
+          this.upsert(message.ids)
+        } else {
+          const { id, ...results } = message
+          this.pending.get(id)?.(results)
+          this.pending.delete(id)
+        }
+      }
+    }
+    return this.worker
+  }
+}
+
+export const searchService = new SearchService()
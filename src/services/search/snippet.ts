@@ -0,0 +1,39 @@
+export interface SnippetPart {
+  text: string
+  match: boolean
+}
+
+const escapeRegExp = (text: string) => text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')
+
+/**
+ * A window of `text` around the first whole-word occurrence of any of
+ * `terms`, split into highlighted and plain parts. Markdown markers and
+ * line breaks are flattened so the snippet reads as one line.
+ */
+export function buildSnippet(text: string, terms: string[], radius = 80): SnippetPart[] {
+  if (!text || terms.length === 0) return []
+  const source = `(?<![\\p{L}\\p{N}])(?:${terms.map(escapeRegExp).join('|')})(?![\\p{L}\\p{N}])`
+  const first = new RegExp(source, 'iu').exec(text)
+  if (!first) return []
+
+  let start = Math.max(0, first.index - radius)
+  let end = Math.min(text.length, first.index + radius * 2)
+  // Snap to word boundaries so the window does not open or close mid-word
+  const space = text.indexOf(' ', start)
+  if (start > 0 && space >= 0 && space < first.index) start = space + 1
+  const endSpace = text.lastIndexOf(' ', end)
+  if (end < text.length && endSpace > first.index + first[0].length) end = endSpace
+
+  const window = text.slice(start, end).replace(/[#*_`>]+/g, '').replace(/\s+/g, ' ')
+  const parts: SnippetPart[] = []
+  if (start > 0) parts.push({ text: '…', match: false })
+  let last = 0
+  for (const match of window.matchAll(new RegExp(source, 'giu'))) {
+    if (match.index! > last) parts.push({ text: window.slice(last, match.index), match: false })
+    parts.push({ text: match[0], match: true })
+    last = match.index! + match[0].length
+  }
+  if (last < window.length) parts.push({ text: window.slice(last), match: false })
+  if (end < text.length) parts.push({ text: '…', match: false })
+  return parts
+}
@@ -0,0 +1,71 @@
+// Worker that owns the history search index. Analyzed documents are kept in
+// IndexedDB, so a new session reloads term frequencies instead of
+// tokenizing every report again, and is only sent what changed since.
+import { IdbStore } from '@/services/idb'
+import { SearchIndex, analyzeDocument, type IndexedDocument } from './bm25'
+import type { SearchWorkerRequest, SearchWorkerResponse } from './index'
+
+// Quiet period before pending index changes are written
+const PERSIST_DELAY_MS = 500
+
+const ctx = self as unknown as Worker
+
+const post = (message: SearchWorkerResponse) => ctx.postMessage(message)
+
+const store = new IdbStore<IndexedDocument>('search-index')
+const index = new SearchIndex()
+
+const loaded = store
+  .entries()
+  .then(entries => entries.forEach(([, doc]) => index.add(doc)))
+  .catch(() => {
+    // Start empty; the first sync asks for every document
+  })
+
+// Changes are batched so a burst of updates costs one transaction; null marks a delete
+let writes = new Map<string, IndexedDocument | null>()
+let persistTimer: ReturnType<typeof setTimeout> | null = null
+
+function persist(id: string, doc: IndexedDocument | null): void {
+  writes.set(id, doc)
+  if (persistTimer) clearTimeout(persistTimer)
+  persistTimer = setTimeout(() => {
+    const batch = writes
+    writes = new Map()
+    persistTimer = null
+    const puts = [...batch].filter((entry): entry is [string, IndexedDocument] => entry[1] !== null)
+    const deletes = [...batch.keys()].filter(key => batch.get(key) === null)
+    Promise.all([store.setMany(puts), ...deletes.map(key => store.delete(key))]).catch(() => {})
+  }, PERSIST_DELAY_MS)
+}
+
+function remove(id: string): void {
+  index.remove(id)
+  persist(id, null)
+}
+
+ctx.addEventListener('message', async (event: MessageEvent<SearchWorkerRequest>) => {
+  await loaded
+  const request = event.data
+  switch (request.type) {
+    case 'sync': {
+      const wanted = new Map(request.stamps)
+      index.ids().filter(id => !wanted.has(id)).forEach(remove)
+      post({ type: 'missing', ids: request.stamps.filter(([id, stamp]) => index.stamp(id) !== stamp).map(([id]) => id) })
+      break
+    }
+    case 'upsert':
+      for (const { doc, stamp } of request.docs) {
+        const analyzed = analyzeDocument(doc, stamp)
+        index.add(analyzed)
+        persist(analyzed.id, analyzed)
+      }
+      break
+    case 'remove':
+      request.ids.forEach(remove)
+      break
+    case 'query':
+      post({ type: 'results', id: request.id, ...index.search(request.query, request.limit) })
+      break
+  }
+})
@@ -0,0 +1,72 @@
+import { describe, it, expect, vi, afterEach } from 'vitest'
+import { Speculator } from './speculation'
+
+const setup = (maxWasted = 5) => {
+  const calls: Array<{ input: string; signal: AbortSignal }> = []
+  const run = vi.fn((input: string, signal: AbortSignal) => {
+    calls.push({ input, signal })
+    return new Promise<string>((resolve, reject) => {
+      const timer = setTimeout(() => resolve(`enhanced ${input}`), 500)
+      signal.addEventListener('abort', () => {
+        clearTimeout(timer)
+        reject(new DOMException('Aborted', 'AbortError'))
+      })
+    })
+  })
+  const speculator = new Speculator<string, string>({ run, key: input => input, debounceMs: 1000, maxWasted })
+  return { calls, run, speculator }
+}
+
+describe('Speculator', () => {
+  afterEach(() => {
+    vi.useRealTimers()
+  })
+
+  it('starts once the input settles and serves the result immediately', async () => {
+    vi.useFakeTimers()
+    const { run, speculator } = setup()
+    speculator.schedule('a')
+    speculator.schedule('ab')
+    speculator.schedule('abc')
+    await vi.advanceTimersByTimeAsync(1000)
+    expect(run).toHaveBeenCalledTimes(1)
+    await vi.advanceTimersByTimeAsync(500)
+
+    expect(speculator.peek('abc')).toBe('enhanced abc')
+    await expect(speculator.get('abc')).resolves.toBe('enhanced abc')
+    expect(run).toHaveBeenCalledTimes(1)
+    expect(speculator.getStats()).toEqual({ started: 1, used: 1, wasted: 0 })
+  })
+
+  it('aborts a superseded request and joins one still in flight', async () => {
+    vi.useFakeTimers()
+    const { calls, run, speculator } = setup()
+    speculator.schedule('first')
+    await vi.advanceTimersByTimeAsync(1000)
+    speculator.schedule('second')
+    expect(calls[0].signal.aborted).toBe(true)
+
+    await vi.advanceTimersByTimeAsync(1100)
+    const result = speculator.get('second')
+    await vi.advanceTimersByTimeAsync(500)
+    await expect(result).resolves.toBe('enhanced second')
+    expect(run).toHaveBeenCalledTimes(2)
+    expect(speculator.getStats()).toEqual({ started: 2, used: 1, wasted: 1 })
+  })
+
+  it('stops speculating after too many unused results', async () => {
+    vi.useFakeTimers()
+    const { run, speculator } = setup(2)
+    for (const input of ['one', 'two', 'three', 'four']) {
+      speculator.schedule(input)
+      await vi.advanceTimersByTimeAsync(2000)
+    }
+    expect(speculator.enabled).toBe(false)
+    expect(run).toHaveBeenCalledTimes(2)
+
+    // Explicit requests still go through
+    const result = speculator.get('five')
+    await vi.advanceTimersByTimeAsync(500)
+    await expect(result).resolves.toBe('enhanced five')
+  })
+})
@@ -0,0 +1,144 @@
+import { runWhenIdle } from '@/utils/utils'
+
+export interface SpeculatorOptions<I, O> {
+  run: (input: I, signal: AbortSignal) => Promise<O>
+  /** Inputs with the same key share a result */
+  key: (input: I) => string
+  /** Quiet period after the last change before speculating */
+  debounceMs?: number
+  /** Stop speculating after this many background results go unused */
+  maxWasted?: number
+}
+
+export interface SpeculationStats {
+  started: number
+  used: number
+  wasted: number
+}
+
+interface Flight<O> {
+  key: string
+  speculative: boolean
+  controller: AbortController
+  promise: Promise<O>
+}
+
+/**
+ * Runs an expensive request ahead of time for the input the user is most
+ * likely to ask about. `schedule` is called as the input changes; once it
+ * settles the request starts at background priority, and any request for
+ * an older input is aborted. `get` returns the finished or in-flight
+ * result for the current input, or starts one if there is none. Unused
+ * background requests are counted, and speculation stops at `maxWasted`.
+ */
+export class Speculator<I, O> {
+  private cancelPending: (() => void) | null = null
+  private flight: Flight<O> | null = null
+  private result: { key: string; value: O; speculative: boolean } | null = null
+  private stats: SpeculationStats = { started: 0, used: 0, wasted: 0 }
+
+  constructor(private options: SpeculatorOptions<I, O>) {}
+
+  get enabled(): boolean {
+    return this.stats.wasted < (this.options.maxWasted ?? 5)
+  }
+
+  getStats(): SpeculationStats {
+    return { ...this.stats }
+  }
+
+  /** Note a new input; speculation starts only if it stays unchanged for the debounce period */
+  schedule(input: I): void {
+    const key = this.options.key(input)
+    this.clearPending()
+    if (this.result?.key === key || this.flight?.key === key) return
+    // The user kept typing, so whatever was computed for the old input is dead
+    this.discardFlight()
+    this.discardResult()
+    if (!this.enabled) return
+
+    const timer = setTimeout(() => {
+      this.cancelPending = runWhenIdle(() => {
+        this.cancelPending = null
+        this.start(input, key, true).catch(() => {})
+      })
+    }, this.options.debounceMs ?? 1200)
+    this.cancelPending = () => clearTimeout(timer)
+  }
+
+  /** The ready result for `input`, if speculation already produced it */
+  peek(input: I): O | undefined {
+    const key = this.options.key(input)
+    return this.result?.key === key ? this.result.value : undefined
+  }
+
+  /** Result for `input`: immediate if speculated, joined if in flight, otherwise fetched now */
+  get(input: I): Promise<O> {
+    const key = this.options.key(input)
+    this.clearPending()
+    if (this.result?.key === key) {
+      this.markUsed(this.result)
+      return Promise.resolve(this.result.value)
+    }
+    if (this.flight?.key === key) {
+      this.markUsed(this.flight)
+      return this.flight.promise
+    }
+    this.discardFlight()
+    return this.start(input, key, false)
+  }
+
+  /** Abort everything, e.g. when the builder unmounts */
+  cancel(): void {
+    this.clearPending()
+    this.discardFlight()
+  }
+
+  private start(input: I, key: string, speculative: boolean): Promise<O> {
+    const controller = new AbortController()
+    const promise = this.options.run(input, controller.signal).then(
+      value => {
+        if (this.flight?.promise === promise) {
+          this.result = { key, value, speculative: flight.speculative }
+          this.flight = null
+        }
+        return value
+      },
+      error => {
+        if (this.flight?.promise === promise) {
+          if (flight.speculative) this.stats.wasted++
+          this.flight = null
+        }
+        throw error
+      }
+    )
+    const flight: Flight<O> = { key, speculative, controller, promise }
+    this.flight = flight
+    if (speculative) this.stats.started++
+    return promise
+  }
+
+  private markUsed(entry: { speculative: boolean }): void {
+    if (entry.speculative) {
+      this.stats.used++
+      entry.speculative = false
+    }
+  }
+
+  private clearPending(): void {
+    this.cancelPending?.()
+    this.cancelPending = null
+  }
+
+  private discardFlight(): void {
+    if (!this.flight) return
+    if (this.flight.speculative) this.stats.wasted++
+    this.flight.controller.abort()
+    this.flight = null
+  }
+
+  private discardResult(): void {
+    if (this.result?.speculative) this.stats.wasted++
+    this.result = null
+  }
+}
@@ -0,0 +1,37 @@
+import { describe, it, expect } from 'vitest'
+import { BpeTokenCounter, estimateTokens, parseTiktokenRanks } from './bpe'
+
+// Every single byte, plus a few merges, in tiktoken's file format
+const byteLines = Array.from({ length: 256 }, (_, i) => `${btoa(String.fromCharCode(i))} ${i}`)
+const mergeLines = ['he', 'll', 'hell', ' w', ' wo'].map((token, i) => `${btoa(token)} ${256 + i}`)
+const ranks = parseTiktokenRanks([...byteLines, ...mergeLines].join('\n'))
+
+describe('BpeTokenCounter', () => {
+  it('parses tiktoken rank files', () => {
+    expect(ranks.size).toBe(261)
+    expect(ranks.get('hell')).toBe(258)
+  })
+
+  it('applies merges in rank order within each piece', () => {
+    const counter = new BpeTokenCounter(ranks)
+    // "hello" -> he|ll|o -> hell|o; " world" -> " wo"|r|l|d
+    expect(counter.count('hello')).toBe(2)
+    expect(counter.count('hello world')).toBe(6)
+  })
+
+  it('counts multi-byte characters by their UTF-8 bytes', () => {
+    expect(new BpeTokenCounter(ranks).count('é')).toBe(2)
+  })
+
+  it('gives the same totals when pieces come from the cache', () => {
+    const counter = new BpeTokenCounter(ranks)
+    const first = counter.count('hello world hello')
+    expect(counter.count('hello world hello')).toBe(first)
+  })
+})
+
+describe('estimateTokens', () => {
+  it('approximates four characters per token', () => {
+    expect(estimateTokens('12345678')).toBe(2)
+  })
+})
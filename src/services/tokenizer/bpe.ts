@@ -0,0 +1,99 @@
+// Byte-level BPE token counting compatible with tiktoken vocabularies
+
+/**
+ * Pre-tokenizer of the o200k_base encoding (GPT-4o, GPT-4.1, o3, o4).
+ * JS has no inline `(?i:)` groups, so the contraction suffixes spell out both cases.
+ */
+const CONTRACTION = "(?:'[sS]|'[tT]|'[rR][eE]|'[vV][eE]|'[mM]|'[lL][lL]|'[dD])?"
+export const O200K_PATTERN = new RegExp(
+  [
+    `[^\\r\\n\\p{L}\\p{N}]?[\\p{Lu}\\p{Lt}\\p{Lm}\\p{Lo}\\p{M}]*[\\p{Ll}\\p{Lm}\\p{Lo}\\p{M}]+${CONTRACTION}`,
+    `[^\\r\\n\\p{L}\\p{N}]?[\\p{Lu}\\p{Lt}\\p{Lm}\\p{Lo}\\p{M}]+[\\p{Ll}\\p{Lm}\\p{Lo}\\p{M}]*${CONTRACTION}`,
+    '\\p{N}{1,3}',
+    ' ?[^\\s\\p{L}\\p{N}]+[\\r\\n/]*',
+    '\\s*[\\r\\n]+',
+    '\\s+(?!\\S)',
+    '\\s+',
+  ].join('|'),
+  'gu'
+)
+
+// Distinct pieces remembered before the cache is reset
+const MAX_CACHED_PIECES = 50_000
+// Merging is quadratic per piece; pathological pieces (long whitespace or symbol runs) are split first
+const MAX_PIECE_BYTES = 512
+
+const encoder = new TextEncoder()
+
+/** Byte strings are keyed as latin1 strings so the rank table can be a plain Map */
+function latin1(bytes: Uint8Array): string {
+  let text = ''
+  for (let i = 0; i < bytes.length; i++) text += String.fromCharCode(bytes[i])
+  return text
+}
+
+/** Parse a `.tiktoken` file: one `<base64 token> <rank>` pair per line */
+export function parseTiktokenRanks(text: string): Map<string, number> {
+  const ranks = new Map<string, number>()
+  for (const line of text.split('\n')) {
+    const space = line.indexOf(' ')
+    if (space < 0) continue
+    ranks.set(atob(line.slice(0, space)), Number(line.slice(space + 1)))
+  }
+  return ranks
+}
+
+/** Rough count used until the vocabulary is available */
+export function estimateTokens(text: string): number {
+  return Math.ceil(text.length / 4)
+}
+
+/**
+ * Counts tokens by splitting text with the encoding's pattern and running
+ * BPE merges per piece. Piece counts are cached, so re-counting text that
+ * changed by a few keystrokes only merges the pieces that are new.
+ */
+export class BpeTokenCounter {
+  private pieces = new Map<string, number>()
+
+  constructor(private ranks: Map<string, number>, private pattern: RegExp = O200K_PATTERN) {}
+
+  count(text: string): number {
+    let total = 0
+    for (const [piece] of text.matchAll(this.pattern)) {
+      let count = this.pieces.get(piece)
+      if (count === undefined) {
+        const bytes = latin1(encoder.encode(piece))
+        count = 0
+        for (let i = 0; i < bytes.length; i += MAX_PIECE_BYTES) {
+          count += this.countPiece(bytes.slice(i, i + MAX_PIECE_BYTES))
+        }
+        if (this.pieces.size >= MAX_CACHED_PIECES) this.pieces.clear()
+        this.pieces.set(piece, count)
+      }
+      total += count
+    }
+    return total
+  }
+
+  /** Number of tokens after greedily applying the lowest-ranked merge until none apply */
+  private countPiece(bytes: string): number {
+    if (this.ranks.has(bytes)) return 1
+    // parts[i] is the start offset of the i-th token; the last entry closes the final token
+    const parts = Array.from({ length: bytes.length + 1 }, (_, i) => i)
+    for (;;) {
+      let best = -1
+      let bestRank = Infinity
+      for (let i = 0; i < parts.length - 2; i++) {
+        const rank = this.ranks.get(bytes.slice(parts[i], parts[i + 2]))
+        if (rank !== undefined && rank < bestRank) {
+          bestRank = rank
+          best = i
+        }
+      }
+      if (best < 0) break
+      parts.splice(best + 1, 1)
+    }
+    return parts.length - 1
+  }
+}
@@ -0,0 +1,43 @@
+import { BpeTokenCounter, estimateTokens, parseTiktokenRanks } from './bpe'
+import type { TokenCount, TokenizerRequest, TokenizerResponse } from './protocol'
+
+export { BpeTokenCounter, estimateTokens, parseTiktokenRanks }
+export { VOCABULARY_URL, type TokenCount, type TokenizerRequest, type TokenizerResponse } from './protocol'
+
+/**
+ * Counts tokens off the main thread so typing never waits on BPE merges.
+ * Each request may be answered twice: an estimate first, then the exact
+ * count once the vocabulary has loaded. Without Worker support only
+ * estimates are available.
+ */
+export class TokenizerService {
+  private worker: Worker | null = null
+  private nextId = 0
+  private listeners = new Map<number, (count: TokenCount) => void>()
+
+  /** Count tokens in `text`, calling `onCount` with each result; returns a cancel function */
+  count(text: string, onCount: (count: TokenCount) => void): () => void {
+    if (typeof Worker === 'undefined') {
+      onCount({ tokens: estimateTokens(text), exact: false })
+      return () => {}
+    }
+    const id = ++this.nextId
+    this.listeners.set(id, onCount)
+    this.getWorker().postMessage({ id, text } as TokenizerRequest)
+    return () => this.listeners.delete(id)
+  }
+
+  private getWorker(): Worker {
+    if (!this.worker) {
+      this.worker = new Worker(new URL('./worker.ts', import.meta.url), { type: 'module' })
+      this.worker.onmessage = (event: MessageEvent<TokenizerResponse>) => {
+        const { id, ...count } = event.data
+        this.listeners.get(id)?.(count)
+        if (count.exact) this.listeners.delete(id)
+      }
+    }
+    return this.worker
+  }
+}
+
+export const tokenizerService = new TokenizerService()
@@ -0,0 +1,23 @@
+// Constants and messages shared by TokenizerService and the tokenizer
+// worker. Kept apart from index.ts so the worker never imports the module
+// that spawns it.
+
+/** tiktoken vocabulary for o200k_base, the encoding of current OpenAI models */
+export const VOCABULARY_URL: string =
+  (import.meta as any).env?.VITE_TOKENIZER_VOCAB_URL ||
+  'https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken'
+
+export interface TokenCount {
+  tokens: number
+  /** False while the count is a character-based estimate */
+  exact: boolean
+}
+
+export interface TokenizerRequest {
+  id: number
+  text: string
+}
+
+export interface TokenizerResponse extends TokenCount {
+  id: number
+}
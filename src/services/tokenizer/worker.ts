@@ -0,0 +1,46 @@
+// Worker that counts prompt tokens with a lazily loaded BPE vocabulary.
+// Replies with an estimate straight away while the vocabulary loads, then
+// with the exact count once it is ready.
+import { IdbStore } from '@/services/idb'
+import { BpeTokenCounter, estimateTokens, parseTiktokenRanks } from './bpe'
+import { VOCABULARY_URL, type TokenizerRequest, type TokenizerResponse } from './protocol'
+
+const ctx = self as unknown as Worker
+
+const post = (message: TokenizerResponse) => ctx.postMessage(message)
+
+const vocabularyStore = new IdbStore<string>('tokenizer-vocab')
+
+let counter: BpeTokenCounter | null = null
+let loading: Promise<BpeTokenCounter | null> | null = null
+
+function loadCounter(): Promise<BpeTokenCounter | null> {
+  if (!loading) {
+    loading = (async () => {
+      let text = await vocabularyStore.get(VOCABULARY_URL).catch(() => undefined)
+      if (!text) {
+        const res = await fetch(VOCABULARY_URL)
+        if (!res.ok) throw new Error(`Failed to fetch tokenizer vocabulary: ${res.status}`)
+        text = await res.text()
+        await vocabularyStore.set(VOCABULARY_URL, text).catch(() => {})
+      }
+      counter = new BpeTokenCounter(parseTiktokenRanks(text))
+      return counter
+    })().catch(() => {
+      // Stay on estimates this session; the next page load retries
+      return null
+    })
+  }
+  return loading
+}
+
+ctx.addEventListener('message', async (event: MessageEvent<TokenizerRequest>) => {
+  const { id, text } = event.data
+  if (counter) {
+    post({ id, tokens: counter.count(text), exact: true })
+    return
+  }
+  post({ id, tokens: estimateTokens(text), exact: false })
+  const loaded = await loadCounter()
+  if (loaded) post({ id, tokens: loaded.count(text), exact: true })
+})
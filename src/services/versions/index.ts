@@ -0,0 +1,250 @@
+import type { Research } from '@/types/types'
+import { IdbStore } from '@/services/idb'
+import { HistoryDiff } from '@/services/history-index'
+import { hashString, researchPromptText } from '@/utils/utils'
+import { applyDelta, createDelta, sideBySide, type DiffRow, type TextDelta } from './myers'
+
+export { applyDelta, createDelta, diffLines, sideBySide, type DiffRow, type DiffRun, type TextDelta } from './myers'
+
+// A full report is stored again at least every this many versions, so
+// rebuilding any version applies fewer deltas than this
+export const REBASE_INTERVAL = 8
+
+export interface StoredVersion {
+  researchId: string
+  completedAt: string
+  /** Full report; versions without one hold a delta from the previous version */
+  base?: string
+  delta?: TextDelta
+}
+
+export interface VersionGroup {
+  key: string
+  /** In the order they were recorded */
+  versions: StoredVersion[]
+}
+
+export interface VersionInfo {
+  researchId: string
+  completedAt: string
+  /** Position in the group, for `text` and `diff` */
+  index: number
+}
+
+// Message protocol between ResearchVersions and the diff worker
+export type VersionWorkerRequest =
+  | { id: number; type: 'delta'; base: string; target: string }
+  | { id: number; type: 'diff'; left: string; right: string }
+
+export type VersionWorkerResponse =
+  | { id: number; type: 'delta'; delta: TextDelta }
+  | { id: number; type: 'diff'; rows: DiffRow[] }
+  | { id: number; type: 'error'; message: string }
+
+type Unsent<T> = T extends unknown ? Omit<T, 'id'> : never
+
+const keys = new WeakMap<Research, string>()
+
+/** Research re-run from the same prompt text share a key, whatever the model */
+export function versionKey(research: Research): string {
+  let key = keys.get(research)
+  if (key === undefined) {
+    key = hashString(researchPromptText(research.prompt).trim().replace(/\s+/g, ' ').toLowerCase())
+    keys.set(research, key)
+  }
+  return key
+}
+
+const hasReport = (research: Research) => research.status === 'completed' && !!research.result?.report
+
+/** Report of version `index`, from the nearest base at or before it */
+export function reconstructVersion(group: VersionGroup, index: number): string {
+  let start = index
+  while (start > 0 && group.versions[start].base === undefined) start--
+  let text = group.versions[start].base ?? ''
+  for (let i = start + 1; i <= index; i++) text = applyDelta(text, group.versions[i].delta!)
+  return text
+}
+
+/** Rough stored size of a delta, to tell when a full copy is cheaper */
+const deltaSize = (delta: TextDelta) => delta.reduce<number>((size, op) => size + (typeof op === 'string' ? op.length + 3 : 4), 0)
+
+/**
+ * Report history of research run more than once from the same prompt.
+ * Each group stores a full report every REBASE_INTERVAL versions and
+ * line deltas in between, so keeping every version costs little more
+ * than the edits. Versions are recorded when a research completes during
+ * the session and backfilled from history the first time one is viewed.
+ * Deleting a research drops its version, re-basing the one after it, and
+ * versions of research deleted in another session are dropped when their
+ * group is next viewed. Diffs are computed in a worker; without Worker
+ * support on the main thread.
+ */
+export class ResearchVersions {
+  private store = new IdbStore<VersionGroup>('research-versions')
+  private worker: Worker | null = null
+  private nextId = 0
+  private pending = new Map<number, { resolve: (response: VersionWorkerResponse) => void; reject: (reason: unknown) => void }>()
+  // Writes to a group are chained so concurrent completions and deletes keep their order
+  private writes = new Map<string, Promise<VersionGroup>>()
+  private history = new HistoryDiff()
+  private started = false
+
+  sync(history: Research[]): void {
+    const { added, changed, removed } = this.history.diff(history)
+    // Research already complete at startup are backfilled when viewed, not recorded here
+    if (this.started) {
+      added.filter(hasReport).forEach(research => this.record(research).catch(() => {}))
+      changed
+        .filter(({ research, previous }) => hasReport(research) && !hasReport(previous.research))
+        .forEach(({ research }) => this.record(research).catch(() => {}))
+    }
+    const deleted = new Map<string, string[]>()
+    for (const { research } of removed) {
+      if (!hasReport(research)) continue
+      const key = versionKey(research)
+      deleted.set(key, [...(deleted.get(key) ?? []), research.id])
+    }
+    deleted.forEach((ids, key) => this.remove(key, ids).catch(() => {}))
+    this.started = true
+  }
+
+  /** Versions of the research's prompt, recording any completed runs in `history` that are missing */
+  async versions(research: Research, history: Research[]): Promise<VersionInfo[]> {
+    const key = versionKey(research)
+    const ids = new Set(history.map(candidate => candidate.id))
+    let group = await this.group(key)
+    // Research deleted while the app was closed
+    const stale = group.versions.filter(version => !ids.has(version.researchId)).map(version => version.researchId)
+    if (stale.length) group = await this.remove(key, stale)
+    const recorded = new Set(group.versions.map(version => version.researchId))
+    const missing = history
+      .filter(candidate => hasReport(candidate) && !recorded.has(candidate.id) && versionKey(candidate) === key)
+      .sort((a, b) => (a.completedAt ?? a.createdAt).localeCompare(b.completedAt ?? b.createdAt))
+    for (const candidate of missing) group = await this.record(candidate)
+    return group.versions.map(({ researchId, completedAt }, index) => ({ researchId, completedAt, index }))
+  }
+
+  async text(key: string, index: number): Promise<string> {
+    return reconstructVersion(await this.group(key), index)
+  }
+
+  /** Side-by-side rows from version `left` to version `right` */
+  async diff(key: string, left: number, right: number, { signal }: { signal?: AbortSignal } = {}): Promise<DiffRow[]> {
+    const group = await this.group(key)
+    signal?.throwIfAborted()
+    const response = await this.request({ type: 'diff', left: reconstructVersion(group, left), right: reconstructVersion(group, right) }, signal)
+    return response.type === 'diff' ? response.rows : []
+  }
+
+  record(research: Research): Promise<VersionGroup> {
+    return this.write(versionKey(research), group => this.append(group, research))
+  }
+
+  /** Drop the versions of `researchIds` from a group */
+  remove(key: string, researchIds: string[]): Promise<VersionGroup> {
+    return this.write(key, group => this.drop(group, new Set(researchIds)))
+  }
+
+  /** Stored versions of a prompt, including writes still in flight */
+  async group(key: string): Promise<VersionGroup> {
+    return (await (this.writes.get(key) ?? this.store.get(key))) ?? { key, versions: [] }
+  }
+
+  private write(key: string, change: (group: VersionGroup) => Promise<VersionGroup>): Promise<VersionGroup> {
+    const next = this.group(key)
+      .catch((): VersionGroup => ({ key, versions: [] }))
+      .then(change)
+    this.writes.set(key, next)
+    const settle = () => {
+      if (this.writes.get(key) === next) this.writes.delete(key)
+    }
+    next.then(settle, settle)
+    return next
+  }
+
+  private async append(group: VersionGroup, research: Research): Promise<VersionGroup> {
+    if (group.versions.some(version => version.researchId === research.id)) return group
+    const report = research.result!.report
+    const index = group.versions.length
+    const version: StoredVersion = { researchId: research.id, completedAt: research.completedAt ?? research.createdAt }
+    let lastBase = index - 1
+    while (lastBase >= 0 && group.versions[lastBase].base === undefined) lastBase--
+    if (lastBase < 0 || index - lastBase >= REBASE_INTERVAL) {
+      version.base = report
+    } else {
+      const response = await this.request({ type: 'delta', base: reconstructVersion(group, index - 1), target: report })
+      const delta = response.type === 'delta' ? response.delta : []
+      // A rewrite diffs to more than a copy would take, so start a new base instead
+      if (response.type === 'delta' && deltaSize(delta) < report.length) version.delta = delta
+      else version.base = report
+    }
+    const updated = { key: group.key, versions: [...group.versions, version] }
+    await this.store.set(group.key, updated)
+    return updated
+  }
+
+  /** Group without the given versions; the next kept version after a dropped one becomes a base if it was a delta */
+  private async drop(group: VersionGroup, ids: Set<string>): Promise<VersionGroup> {
+    if (!group.versions.some(version => ids.has(version.researchId))) return group
+    const versions: StoredVersion[] = []
+    let rebase = false
+    group.versions.forEach((version, index) => {
+      if (ids.has(version.researchId)) {
+        rebase = true
+        return
+      }
+      if (rebase && version.base === undefined) {
+        versions.push({ researchId: version.researchId, completedAt: version.completedAt, base: reconstructVersion(group, index) })
+      } else {
+        versions.push(version)
+      }
+      rebase = false
+    })
+    const updated = { key: group.key, versions }
+    if (versions.length) await this.store.set(group.key, updated)
+    else await this.store.delete(group.key)
+    return updated
+  }
+
+  private request(request: Unsent<VersionWorkerRequest>, signal?: AbortSignal): Promise<VersionWorkerResponse> {
+    const id = ++this.nextId
+    const message = { ...request, id } as VersionWorkerRequest
+    if (typeof Worker === 'undefined') {
+      return Promise.resolve(
+        message.type === 'delta'
+          ? { id, type: 'delta', delta: createDelta(message.base, message.target) }
+          : { id, type: 'diff', rows: sideBySide(message.left, message.right) }
+      )
+    }
+    return new Promise((resolve, reject) => {
+      this.pending.set(id, { resolve, reject })
+      signal?.addEventListener('abort', () => {
+        this.pending.delete(id)
+        reject(signal.reason)
+      }, { once: true })
+      this.getWorker().postMessage(message)
+    })
+  }
+
+  private getWorker(): Worker {
+    if (!this.worker) {
+      this.worker = new Worker(new URL('./worker.ts', import.meta.url), { type: 'module' })
+      this.worker.onmessage = (event: MessageEvent<VersionWorkerResponse>) => {
+        const message = event.data
+        const pending = this.pending.get(message.id)
+        this.pending.delete(message.id)
+        if (message.type === 'error') pending?.reject(new Error(message.message))
+        else pending?.resolve(message)
+      }
+      this.worker.onerror = event => {
+        this.pending.forEach(({ reject }) => reject(new Error(event.message || 'Diff worker crashed')))
+        this.pending.clear()
+        this.worker = null
+      }
+    }
+    return this.worker
+  }
+}
+
+export const researchVersions = new ResearchVersions()
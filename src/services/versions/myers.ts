@@ -0,0 +1,176 @@
+// Line diff with Myers' O(ND) algorithm in its linear-space form: each
+// step finds the middle snake of the remaining edit graph and recurses on
+// the halves, so memory stays O(N + M) however different the texts are.
+
+export interface DiffRun {
+  type: 'equal' | 'delete' | 'insert'
+  /** Start line in the old text (equal, delete) or the new text (insert) */
+  start: number
+  count: number
+}
+
+/**
+ * Compact edit script from one text to another: a positive number copies
+ * that many lines of the old text, a negative number skips lines of it,
+ * and a string is a line of the new text.
+ */
+export type TextDelta = Array<number | string>
+
+export interface DiffRow {
+  kind: 'same' | 'changed' | 'removed' | 'added'
+  left?: string
+  right?: string
+}
+
+export const splitLines = (text: string): string[] => text.split('\n')
+
+/** Runs that turn `a` into `b`, in order */
+export function diffLines(a: string[], b: string[]): DiffRun[] {
+  // Compare interned ids rather than strings
+  const ids = new Map<string, number>()
+  const intern = (lines: string[]) =>
+    Int32Array.from(lines, line => {
+      let id = ids.get(line)
+      if (id === undefined) ids.set(line, (id = ids.size))
+      return id
+    })
+  const x = intern(a)
+  const y = intern(b)
+  const size = x.length + y.length + 3
+  const forward = new Int32Array(2 * size)
+  const backward = new Int32Array(2 * size)
+  const runs: DiffRun[] = []
+
+  const push = (type: DiffRun['type'], start: number, count: number) => {
+    if (count <= 0) return
+    const last = runs[runs.length - 1]
+    if (last?.type === type && last.start + last.count === start) last.count += count
+    else runs.push({ type, start, count })
+  }
+
+  /** Snake `[x0, y0, x1, y1]` through the middle of the shortest edit path, in local coordinates */
+  const middleSnake = (aLo: number, aHi: number, bLo: number, bHi: number): [number, number, number, number] => {
+    const n = aHi - aLo
+    const m = bHi - bLo
+    const delta = n - m
+    const odd = (delta & 1) !== 0
+    const offset = size
+    forward[offset + 1] = 0
+    backward[offset + 1] = 0
+    for (let d = 0; d <= Math.ceil((n + m) / 2); d++) {
+      for (let k = -d; k <= d; k += 2) {
+        let i = k === -d || (k !== d && forward[offset + k - 1] < forward[offset + k + 1]) ? forward[offset + k + 1] : forward[offset + k - 1] + 1
+        let j = i - k
+        const i0 = i
+        const j0 = j
+        while (i < n && j < m && x[aLo + i] === y[bLo + j]) {
+          i++
+          j++
+        }
+        forward[offset + k] = i
+        if (odd && k >= delta - (d - 1) && k <= delta + (d - 1) && i + backward[offset + delta - k] >= n) return [i0, j0, i, j]
+      }
+      for (let k = -d; k <= d; k += 2) {
+        let i = k === -d || (k !== d && backward[offset + k - 1] < backward[offset + k + 1]) ? backward[offset + k + 1] : backward[offset + k - 1] + 1
+        let j = i - k
+        const i0 = i
+        const j0 = j
+        while (i < n && j < m && x[aHi - 1 - i] === y[bHi - 1 - j]) {
+          i++
+          j++
+        }
+        backward[offset + k] = i
+        if (!odd && k >= delta - d && k <= delta + d && i + forward[offset + delta - k] >= n) return [n - i, m - j, n - i0, m - j0]
+      }
+    }
+    throw new Error('diff: no middle snake')
+  }
+
+  const diff = (aLo: number, aHi: number, bLo: number, bHi: number): void => {
+    const prefixStart = aLo
+    while (aLo < aHi && bLo < bHi && x[aLo] === y[bLo]) {
+      aLo++
+      bLo++
+    }
+    push('equal', prefixStart, aLo - prefixStart)
+    let suffix = 0
+    while (aLo < aHi - suffix && bLo < bHi - suffix && x[aHi - 1 - suffix] === y[bHi - 1 - suffix]) suffix++
+    aHi -= suffix
+    bHi -= suffix
+
+    if (aLo === aHi) {
+      push('insert', bLo, bHi - bLo)
+    } else if (bLo === bHi) {
+      push('delete', aLo, aHi - aLo)
+    } else {
+      const [x0, y0, x1, y1] = middleSnake(aLo, aHi, bLo, bHi)
+      diff(aLo, aLo + x0, bLo, bLo + y0)
+      push('equal', aLo + x0, x1 - x0)
+      diff(aLo + x1, aHi, bLo + y1, bHi)
+    }
+    push('equal', aHi, suffix)
+  }
+
+  diff(0, a.length, 0, b.length)
+  return runs
+}
+
+export function createDelta(base: string, target: string): TextDelta {
+  const b = splitLines(target)
+  const delta: TextDelta = []
+  for (const run of diffLines(splitLines(base), b)) {
+    if (run.type === 'equal') delta.push(run.count)
+    else if (run.type === 'delete') delta.push(-run.count)
+    else for (let i = run.start; i < run.start + run.count; i++) delta.push(b[i])
+  }
+  return delta
+}
+
+export function applyDelta(base: string, delta: TextDelta): string {
+  const lines = splitLines(base)
+  const out: string[] = []
+  let position = 0
+  for (const op of delta) {
+    if (typeof op === 'string') {
+      out.push(op)
+    } else if (op > 0) {
+      for (let i = 0; i < op; i++) out.push(lines[position++])
+    } else {
+      position -= op
+    }
+  }
+  return out.join('\n')
+}
+
+/** Aligned rows for a two-column view; removed and added lines between the same unchanged lines pair up as changed */
+export function sideBySide(oldText: string, newText: string): DiffRow[] {
+  const a = splitLines(oldText)
+  const b = splitLines(newText)
+  const rows: DiffRow[] = []
+  let removed: string[] = []
+  let added: string[] = []
+  const flush = () => {
+    for (let i = 0; i < Math.max(removed.length, added.length); i++) {
+      if (i >= added.length) rows.push({ kind: 'removed', left: removed[i] })
+      else if (i >= removed.length) rows.push({ kind: 'added', right: added[i] })
+      else rows.push({ kind: 'changed', left: removed[i], right: added[i] })
+    }
+    removed = []
+    added = []
+  }
+  let bPosition = 0
+  for (const run of diffLines(a, b)) {
+    if (run.type === 'delete') {
+      removed.push(...a.slice(run.start, run.start + run.count))
+    } else if (run.type === 'insert') {
+      added.push(...b.slice(run.start, run.start + run.count))
+      bPosition = run.start + run.count
+    } else {
+      flush()
+      for (let i = 0; i < run.count; i++) rows.push({ kind: 'same', left: a[run.start + i], right: b[bPosition + i] })
+      bPosition += run.count
+    }
+  }
+  flush()
+  return rows
+}
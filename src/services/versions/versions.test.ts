@@ -0,0 +1,98 @@
+import { describe, it, expect } from 'vitest'
+import type { Research } from '@/types/types'
+import { REBASE_INTERVAL, ResearchVersions, applyDelta, createDelta, diffLines, reconstructVersion, sideBySide, versionKey } from './index'
+
+const research = (id: string, report: string, prompt = 'Compare heat pumps', completedAt = '2024-01-01T00:00:00.000Z'): Research => ({
+  id,
+  title: id,
+  prompt: JSON.stringify({ model: 'openai/o3', messages: [{ role: 'user', content: prompt }] }),
+  status: 'completed',
+  createdAt: completedAt,
+  completedAt,
+  result: { report, thoughtProcess: '', sources: [] },
+})
+
+describe('diffLines', () => {
+  it('finds a shortest edit script', () => {
+    const runs = diffLines(['a', 'b', 'c', 'a', 'b', 'b', 'a'], ['c', 'b', 'a', 'b', 'a', 'c'])
+    const kept = runs.filter(run => run.type === 'equal').reduce((total, run) => total + run.count, 0)
+    expect(kept).toBe(4)
+  })
+
+  it('round-trips edits through a delta', () => {
+    const base = Array.from({ length: 200 }, (_, i) => `line ${i}`).join('\n')
+    const target = base.replace('line 5\n', '').replace('line 100', 'line one hundred') + '\nconclusion'
+    const delta = createDelta(base, target)
+    expect(applyDelta(base, delta)).toBe(target)
+    expect(delta.filter(op => typeof op === 'string')).toEqual(['line one hundred', 'conclusion'])
+  })
+})
+
+describe('sideBySide', () => {
+  it('pairs replaced lines and keeps both texts in order', () => {
+    const rows = sideBySide('intro\nold claim\nend', 'intro\nnew claim\nextra\nend')
+    expect(rows.map(row => row.kind)).toEqual(['same', 'changed', 'added', 'same'])
+    expect(rows[1]).toEqual({ kind: 'changed', left: 'old claim', right: 'new claim' })
+  })
+})
+
+describe('ResearchVersions', () => {
+  it('groups re-runs of the same prompt regardless of model and spacing', () => {
+    const rerun = { ...research('b', 'x', '  compare   heat pumps'), prompt: JSON.stringify({ model: 'anthropic/claude', messages: [{ role: 'user', content: 'compare heat pumps ' }] }) }
+    expect(versionKey(rerun)).toBe(versionKey(research('a', 'x')))
+    expect(versionKey(research('c', 'x', 'Compare boilers'))).not.toBe(versionKey(research('a', 'x')))
+  })
+
+  // Groups persist across instances wherever IndexedDB is real, so each test uses its own prompt
+  const reports = (count: number) =>
+    Array.from({ length: count }, (_, i) =>
+      Array.from({ length: 50 }, (_, line) => (line === i ? `revised in run ${i}` : `finding ${line}`)).join('\n')
+    )
+  const runs = (texts: string[], prompt: string) =>
+    texts.map((report, i) => research(`${prompt}-${i}`, report, prompt, new Date(Date.UTC(2024, 0, 1 + i)).toISOString())).reverse()
+
+  it('stores deltas between bases and rebuilds every version', async () => {
+    const versions = new ResearchVersions()
+    const texts = reports(REBASE_INTERVAL + 2)
+    const history = runs(texts, 'Compare heat pumps for rebasing')
+    const info = await versions.versions(history[0], history)
+    expect(info.map(version => version.researchId)).toEqual(texts.map((_, i) => `Compare heat pumps for rebasing-${i}`))
+
+    const key = versionKey(history[0])
+    const group = await versions.group(key)
+    expect(group.versions.map(version => version.base !== undefined)).toEqual(texts.map((_, i) => i % REBASE_INTERVAL === 0))
+    texts.forEach((report, i) => expect(reconstructVersion(group, i)).toBe(report))
+
+    const rows = await versions.diff(key, 0, REBASE_INTERVAL + 1)
+    expect(rows.filter(row => row.kind !== 'same')).toHaveLength(2)
+  })
+
+  it('records a research when it completes during the session', async () => {
+    const versions = new ResearchVersions()
+    const first = research('a', 'one', 'Compare heat pumps as they complete')
+    const running: Research = { ...research('b', '', 'Compare heat pumps as they complete'), status: 'running', result: undefined }
+    versions.sync([first, running])
+    versions.sync([first, { ...running, status: 'completed', result: { report: 'two', thoughtProcess: '', sources: [] } }])
+    expect((await versions.group(versionKey(first))).versions.map(version => version.researchId)).toEqual(['b'])
+  })
+
+  it('drops deleted research and re-bases the version after it', async () => {
+    const versions = new ResearchVersions()
+    const texts = reports(4)
+    const history = runs(texts, 'Compare heat pumps after deleting')
+    versions.sync(history)
+    await versions.versions(history[0], history)
+    const key = versionKey(history[0])
+
+    // Delete the base and the second run during the session
+    versions.sync(history.filter(run => !run.id.endsWith('-0') && !run.id.endsWith('-1')))
+    const group = await versions.group(key)
+    expect(group.versions.map(version => version.researchId)).toEqual(['Compare heat pumps after deleting-2', 'Compare heat pumps after deleting-3'])
+    expect(group.versions[0].base).toBe(texts[2])
+    expect(reconstructVersion(group, 1)).toBe(texts[3])
+
+    // A run deleted in another session is dropped when the group is viewed
+    const remaining = history.filter(run => run.id.endsWith('-2'))
+    expect((await versions.versions(remaining[0], remaining)).map(version => version.researchId)).toEqual(['Compare heat pumps after deleting-2'])
+  })
+})
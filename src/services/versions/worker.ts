@@ -0,0 +1,18 @@
+// Worker that diffs report versions, so comparing two long reports never
+// blocks the main thread.
+import { createDelta, sideBySide } from './myers'
+import type { VersionWorkerRequest, VersionWorkerResponse } from './index'
+
+const ctx = self as unknown as Worker
+
+const post = (message: VersionWorkerResponse) => ctx.postMessage(message)
+
+ctx.addEventListener('message', (event: MessageEvent<VersionWorkerRequest>) => {
+  const request = event.data
+  try {
+    if (request.type === 'delta') post({ id: request.id, type: 'delta', delta: createDelta(request.base, request.target) })
+    else post({ id: request.id, type: 'diff', rows: sideBySide(request.left, request.right) })
+  } catch (error) {
+    post({ id: request.id, type: 'error', message: (error as Error).message || 'Diff failed' })
+  }
+})
@@ -0,0 +1,49 @@
+import { describe, it, expect, vi, afterEach } from 'vitest'
+import { HistoryStorageError, useAppStore } from './app-store'
+import type { Research } from '@/types/types'
+
+const research = (id: string): Research => ({
+  id,
+  title: id,
+  prompt: '',
+  status: 'completed',
+  createdAt: '2024-01-01T00:00:00.000Z',
+})
+
+describe('importResearch', () => {
+  afterEach(() => {
+    vi.restoreAllMocks()
+    useAppStore.setState({ researchHistory: [] })
+  })
+
+  it('appends restored research in one update', () => {
+    useAppStore.setState({ researchHistory: [research('a')] })
+    const listener = vi.fn()
+    const unsubscribe = useAppStore.subscribe(listener)
+    useAppStore.getState().importResearch([research('b'), research('c')])
+    unsubscribe()
+    expect(listener).toHaveBeenCalledTimes(1)
+    expect(useAppStore.getState().researchHistory.map(r => r.id)).toEqual(['a', 'b', 'c'])
+  })
+
+  it('undoes the import and reports when storage is full', () => {
+    useAppStore.setState({ researchHistory: [research('a')] })
+    vi.spyOn(Storage.prototype, 'setItem').mockImplementation(() => {
+      throw new DOMException('Quota exceeded', 'QuotaExceededError')
+    })
+    expect(() => useAppStore.getState().importResearch([research('b')])).toThrow(HistoryStorageError)
+    expect(useAppStore.getState().researchHistory.map(r => r.id)).toEqual(['a'])
+  })
+})
+
+describe('persistence', () => {
+  it('packs sources again only when the history changes', () => {
+    type State = ReturnType<typeof useAppStore.getState>
+    const partialize = useAppStore.persist.getOptions().partialize as (state: State) => { researchHistory: Research[] }
+    useAppStore.setState({ researchHistory: [research('a')] })
+    const state = useAppStore.getState()
+    const packed = partialize(state).researchHistory
+    expect(partialize({ ...state, ui: { ...state.ui, darkMode: !state.ui.darkMode } }).researchHistory).toBe(packed)
+    expect(partialize({ ...state, researchHistory: [...state.researchHistory] }).researchHistory).not.toBe(packed)
+  })
+})
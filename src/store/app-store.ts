@@ -1,6 +1,7 @@
 import { create } from 'zustand'
 import { devtools, persist } from 'zustand/middleware'
 import type { Research } from '@/types/types'
+import { packSources, unpackSources, type SourceTable } from '@/services/citations'
 
 interface AppState {
   // Current research session
@@ -9,9 +10,17 @@ interface AppState {
 
   // Research history
   researchHistory: Research[]
+  /** Look up one research without subscribing to the whole history */
+  getResearch: (id: string) => Research | undefined
   addResearch: (research: Research) => void
   updateResearch: (id: string, updates: Partial<Research>) => void
   deleteResearch: (id: string) => void
+  /**
+   * Append restored research in one update; callers drop ids already in
+   * history. If storage is full the import is undone and a
+   * HistoryStorageError thrown, so memory never holds history that is not saved.
+   */
+  importResearch: (research: Research[]) => void
 
   // Application settings
   settings: {
@@ -33,10 +42,31 @@ interface AppState {
   setUI: (ui: Partial<AppState['ui']>) => void
 }
 
+type PersistedState = Pick<AppState, 'researchHistory' | 'settings' | 'ui'> & { sources?: SourceTable }
+
+/** Thrown when the browser refuses to persist history, almost always because storage is full */
+export class HistoryStorageError extends Error {
+  constructor(public cause: unknown) {
+    super('Browser storage is full, so the research could not be saved. Back up and delete older research, then try again.')
+    this.name = 'HistoryStorageError'
+  }
+}
+
+// partialize runs on every set, settings and UI included, so the packed
+// history is kept for as long as the history array itself is unchanged
+let packed: { history: Research[]; result: ReturnType<typeof packSources> } | null = null
+const packHistory = (history: Research[]) => {
+  if (packed?.history !== history) packed = { history, result: packSources(history) }
+  return packed.result
+}
+
+const isQuotaError = (error: unknown) =>
+  error instanceof DOMException && (error.name === 'QuotaExceededError' || error.name === 'NS_ERROR_DOM_QUOTA_REACHED')
+
 export const useAppStore = create<AppState>()(
   devtools(
       persist(
-      (set) => ({
+      (set, get) => ({
         // Initial state
         currentResearch: null,
         researchHistory: [],
@@ -58,6 +88,8 @@ export const useAppStore = create<AppState>()(
         setCurrentResearch: (research) => 
           set({ currentResearch: research }, false, 'setCurrentResearch'),
 
+        getResearch: (id) => get().researchHistory.find((r) => r.id === id),
+
         addResearch: (research) =>
           set(
             (state) => ({
@@ -93,6 +125,27 @@ export const useAppStore = create<AppState>()(
             'deleteResearch'
           ),
 
+        importResearch: (research) => {
+          const previous = get().researchHistory
+          try {
+            set(
+              (state) => ({
+                researchHistory: [...state.researchHistory, ...research],
+              }),
+              false,
+              'importResearch'
+            )
+          } catch (error) {
+            if (!isQuotaError(error)) throw error
+            try {
+              set({ researchHistory: previous }, false, 'importResearch/rollback')
+            } catch {
+              // Storage still holds the history from before the import
+            }
+            throw new HistoryStorageError(error)
+          }
+        },
+
         updateSettings: (newSettings) =>
           set(
             (state) => ({
@@ -113,11 +166,27 @@ export const useAppStore = create<AppState>()(
       }),
       {
         name: 'research-wrapper-storage',
-        partialize: (state) => ({
-          researchHistory: state.researchHistory,
-          settings: state.settings,
-          ui: state.ui,
-        }),
+        version: 1,
+        partialize: (state): PersistedState => {
+          // Sources cited by several reports are stored once in a shared table
+          const { history, sources } = packHistory(state.researchHistory)
+          return {
+            researchHistory: history,
+            sources,
+            settings: state.settings,
+            ui: state.ui,
+          }
+        },
+        // Version 0 stored sources inline, which unpackSources passes through
+        migrate: (persistedState) => persistedState as PersistedState,
+        merge: (persistedState, currentState) => {
+          const { sources, researchHistory, ...rest } = (persistedState ?? {}) as Partial<PersistedState>
+          return {
+            ...currentState,
+            ...rest,
+            ...(researchHistory && { researchHistory: unpackSources(researchHistory, sources) }),
+          }
+        },
       }
     ),
     {
@@ -0,0 +1,24 @@
+import type { Research } from '@/types/types'
+import { usageAnalytics } from '@/services/analytics'
+import { citationIndex } from '@/services/citations'
+import { researchMetaStore } from '@/services/research-meta'
+import { searchService } from '@/services/search'
+import { researchVersions } from '@/services/versions'
+import { useAppStore } from '@/store/app-store'
+
+/** Bring every index derived from history in line with it: search, row metadata, usage, citations and versions */
+export function syncHistory(history: Research[]): void {
+  searchService.sync(history)
+  researchMetaStore.sync(history)
+  usageAnalytics.sync(history)
+  citationIndex.sync(history)
+  researchVersions.sync(history)
+}
+
+/** Sync now, then after every add, update and delete; returns a stop function */
+export function startHistorySync(): () => void {
+  syncHistory(useAppStore.getState().researchHistory)
+  return useAppStore.subscribe((state, prev) => {
+    if (state.researchHistory !== prev.researchHistory) syncHistory(state.researchHistory)
+  })
+}
@@ -51,6 +51,14 @@ export interface ExportOptions {
   template?: string
 }
 
+export type ExportFormat = ExportOptions['format']
+
+/** Progress reported by an export job; `progress` runs from 0 to 1 within each stage */
+export interface ExportProgress {
+  stage: 'layout' | 'encode'
+  progress: number
+}
+
 export interface FileSystemHandle {
   kind: 'file' | 'directory'
   name: string
@@ -1,5 +1,5 @@
 import { describe, it, expect } from 'vitest'
-import { safeParseJSON } from './utils'
+import { hashString, mapWithConcurrency, safeParseJSON } from './utils'
 
 function createResponse(body: string, contentType = 'application/json') {
   return new Response(body, { headers: { 'Content-Type': contentType } })
@@ -17,3 +17,28 @@ describe('safeParseJSON', () => {
     await expect(safeParseJSON(res)).rejects.toThrow(/Invalid JSON/)
   })
 })
+
+describe('hashString', () => {
+  it('is stable and content sensitive', () => {
+    expect(hashString('report')).toBe(hashString('report'))
+    expect(hashString('report')).not.toBe(hashString('report.'))
+    expect(hashString('report', 1)).not.toBe(hashString('report'))
+  })
+})
+
+describe('mapWithConcurrency', () => {
+  it('caps in-flight calls and keeps result order', async () => {
+    let inFlight = 0
+    let peak = 0
+    const results = await mapWithConcurrency([1, 2, 3, 4, 5], 2, async n => {
+      inFlight++
+      peak = Math.max(peak, inFlight)
+      await new Promise(resolve => setTimeout(resolve, 5))
+      inFlight--
+      if (n === 3) throw new Error('boom')
+      return n * 2
+    })
+    expect(peak).toBe(2)
+    expect(results.map(r => (r.status === 'fulfilled' ? r.value : 'failed'))).toEqual([2, 4, 'failed', 8, 10])
+  })
+})
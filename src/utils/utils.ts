@@ -25,20 +25,93 @@ export function formatTokenCount(count: number): string {
   return `${(count / 1000000).toFixed(1)}M`
 }
 
-export function calculateCost(inputTokens: number, outputTokens: number, model: string): number {
-  // Pricing as of 2025
-  const pricing = {
-    'gpt-4.1': { input: 2.5, output: 10 }, // per 1M tokens
-    'o3-deep-research': { input: 10, output: 40 }, // per 1M tokens
+/** Model id from a research's stored request payload, or '' if it cannot be read */
+export function modelFromPrompt(prompt: string): string {
+  try {
+    const payload = JSON.parse(prompt)
+    return typeof payload?.model === 'string' ? payload.model : ''
+  } catch {
+    return ''
   }
+}
 
-  const modelPricing = pricing[model as keyof typeof pricing]
-  if (!modelPricing) return 0
+/**
+ * User text of a research's stored request payload, or the raw prompt if it
+ * is not JSON. System instructions are left out, since a shared template
+ * says nothing about what was asked.
+ */
+export function researchPromptText(prompt: string): string {
+  try {
+    const payload = JSON.parse(prompt)
+    const messages: Array<{ role?: string; content?: unknown }> = payload.messages ?? payload.input ?? []
+    return messages
+      .filter(message => message.role === 'user' && typeof message.content === 'string')
+      .map(message => message.content)
+      .join('\n')
+  } catch {
+    return prompt
+  }
+}
 
-  return (
-    (inputTokens / 1000000) * modelPricing.input +
-    (outputTokens / 1000000) * modelPricing.output
-  )
+/**
+ * Run `fn` over `items` with at most `limit` calls in flight, preserving
+ * result order. Rejections are returned as settled results so one failure
+ * does not abandon the rest of the batch.
+ */
+export async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<PromiseSettledResult<R>[]> {
+  const results: PromiseSettledResult<R>[] = new Array(items.length)
+  let next = 0
+  const runWorker = async () => {
+    while (next < items.length) {
+      const index = next++
+      try {
+        results[index] = { status: 'fulfilled', value: await fn(items[index], index) }
+      } catch (reason) {
+        results[index] = { status: 'rejected', reason }
+      }
+    }
+  }
+  await Promise.all(Array.from({ length: Math.min(limit, items.length) }, runWorker))
+  return results
+}
+
+/** Resolve after `ms` milliseconds, rejecting early with an AbortError if `signal` aborts */
+export function sleep(ms: number, signal?: AbortSignal): Promise<void> {
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) return reject(signal.reason)
+    const timer = setTimeout(() => {
+      signal?.removeEventListener('abort', onAbort)
+      resolve()
+    }, ms)
+    const onAbort = () => {
+      clearTimeout(timer)
+      reject(signal!.reason)
+    }
+    signal?.addEventListener('abort', onAbort, { once: true })
+  })
+}
+
+/**
+ * Run `fn` at background priority: scheduler.postTask where supported,
+ * then requestIdleCallback, then a plain timeout. Returns a cancel function.
+ */
+export function runWhenIdle(fn: () => void): () => void {
+  const g = globalThis as any
+  if (g.scheduler?.postTask) {
+    const controller = new AbortController()
+    g.scheduler.postTask(fn, { priority: 'background', signal: controller.signal }).catch(() => {})
+    return () => controller.abort()
+  }
+  if (typeof g.requestIdleCallback === 'function') {
+    const handle = g.requestIdleCallback(fn, { timeout: 2000 })
+    return () => g.cancelIdleCallback(handle)
+  }
+  const timer = setTimeout(fn, 0)
+  return () => clearTimeout(timer)
 }
 
 /**
@@ -53,4 +126,20 @@ export async function safeParseJSON<T = any>(res: Response): Promise<T> {
   } catch {
     throw new Error(`Invalid JSON response: ${text.slice(0, 200)}`)
   }
-}
\ No newline at end of file
+}
+/**
+ * Fast, non-cryptographic 53-bit string hash (cyrb53) returned as hex.
+ * Used to key caches by content; not suitable for anything security related.
+ */
+export function hashString(text: string, seed = 0): string {
+  let h1 = 0xdeadbeef ^ seed
+  let h2 = 0x41c6ce57 ^ seed
+  for (let i = 0; i < text.length; i++) {
+    const ch = text.charCodeAt(i)
+    h1 = Math.imul(h1 ^ ch, 2654435761)
+    h2 = Math.imul(h2 ^ ch, 1597334677)
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909)
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909)
+  return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(16)
+}
@@ -27,6 +27,10 @@ export default defineConfig({
     port: 5173,
     open: true,
   },
+  // Workers are created with { type: 'module' } and load their renderers lazily
+  worker: {
+    format: 'es',
+  },
   build: {
     outDir: 'dist',
     sourcemap: true,
@@ -36,6 +40,10 @@ export default defineConfig({
           vendor: ['react', 'react-dom'],
           query: ['@tanstack/react-query'],
           ui: ['lucide-react'],
+          // Only reached through dynamic imports, so never part of the first load
+          'export-pdf': ['pdf-lib'],
+          'export-docx': ['docx'],
+          devtools: ['@tanstack/react-query-devtools'],
         },
       },
     },